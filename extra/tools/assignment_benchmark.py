@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Measure encoding and decoding of partition assignments.
+
+Generates the assignment of a consumer group of ``--members``
+members, consuming ``--topics`` source topics and as many table
+changelog topics, all of ``--partitions`` partitions, and one global
+table.  Then compares the two formats the leader can send assignments
+in (see :mod:`faust.assignor.assignment_codec`):
+
+- ``json_zlib``: zlib compressed JSON :class:`ClientMetadata`, as sent
+  to members running versions of Faust before the compact format.
+- ``compact``: the compact binary format.
+
+Prints one JSON line per case, with the size of the assignment of one
+member and of the assignments of all members (the SyncGroup request of
+the leader) in bytes, the time the leader takes to encode all
+assignments, and the median time a member takes to decode its
+assignment in :meth:`PartitionAssignor.on_assignment`
+in milliseconds::
+
+    {"case": "compact", "decode_ms": 3.05, "encode_ms": 46.0,
+     "member_bytes": 1159, "total_bytes": 115990}
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import zlib
+from functools import partial
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from faust.assignor import assignment_codec
+from faust.assignor.client_assignment import ClientAssignment, ClientMetadata
+from faust.types.assignor import HostToPartitionMap
+
+Distributions = Tuple[HostToPartitionMap, HostToPartitionMap]
+
+
+def generate(
+    members: int, topics: int, partitions: int
+) -> Tuple[Dict[str, ClientAssignment], Distributions]:
+    urls = [f"http://worker-{i}.example.com:6066" for i in range(members)]
+    assignments = {url: ClientAssignment(actives={}, standbys={}) for url in urls}
+    for t in range(topics):
+        for partition in range(partitions):
+            owner = assignments[urls[partition % members]]
+            standby = assignments[urls[(partition + 1) % members]]
+            owner.actives.setdefault(f"topic-{t}", []).append(partition)
+            owner.actives.setdefault(f"table-{t}-changelog", []).append(partition)
+            standby.standbys.setdefault(f"table-{t}-changelog", []).append(partition)
+    for assignment in assignments.values():
+        assignment.actives["global-changelog"] = list(range(partitions))
+    changelog_distribution = {
+        url: {
+            topic: ps for topic, ps in a.actives.items() if topic.endswith("changelog")
+        }
+        for url, a in assignments.items()
+    }
+    external_topic_distribution = {
+        url: {
+            topic: ps
+            for topic, ps in a.actives.items()
+            if not topic.endswith("changelog")
+        }
+        for url, a in assignments.items()
+    }
+    return assignments, (changelog_distribution, external_topic_distribution)
+
+
+def encode_json_zlib(
+    assignments: Mapping[str, ClientAssignment], distributions: Distributions
+) -> Dict[str, bytes]:
+    return {
+        url: zlib.compress(
+            ClientMetadata(
+                assignment=assignment,
+                url=url,
+                changelog_distribution=distributions[0],
+                external_topic_distribution=distributions[1],
+            ).dumps()
+        )
+        for url, assignment in assignments.items()
+    }
+
+
+def encode_compact(
+    assignments: Mapping[str, ClientAssignment], distributions: Distributions
+) -> Dict[str, bytes]:
+    encoded = assignment_codec.dumps_distributions(*distributions)
+    return {
+        url: assignment_codec.dumps_assignment(assignment, url, {}, encoded)
+        for url, assignment in assignments.items()
+    }
+
+
+CASES: Mapping[str, Callable[..., Dict[str, bytes]]] = {
+    "json_zlib": encode_json_zlib,
+    "compact": encode_compact,
+}
+
+
+def timed(fun: Callable[[], Any], rounds: int) -> Tuple[Any, float]:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fun()
+        timings.append((time.perf_counter() - started) * 1000.0)
+    return result, statistics.median(timings)
+
+
+def benchmark(
+    members: int, topics: int, partitions: int, rounds: int
+) -> List[Dict[str, Any]]:
+    assignments, distributions = generate(members, topics, partitions)
+    results = []
+    for case, encode in CASES.items():
+        payloads, encode_ms = timed(partial(encode, assignments, distributions), rounds)
+        payload = next(iter(payloads.values()))
+        metadata, decode_ms = timed(
+            partial(assignment_codec.loads_assignment, payload), rounds
+        )
+        assert metadata.changelog_distribution == distributions[0]
+        results.append(
+            {
+                "case": case,
+                "member_bytes": len(payload),
+                "total_bytes": sum(len(p) for p in payloads.values()),
+                "encode_ms": round(encode_ms, 1),
+                "decode_ms": round(decode_ms, 2),
+            }
+        )
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--members",
+        type=int,
+        default=100,
+        help="Members of the consumer group (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--topics",
+        type=int,
+        default=4,
+        help="Source topics, with one table each (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=1000,
+        help="Partitions of every topic (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=5,
+        help="Runs to take the median of (default: %(default)s).",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    for result in benchmark(args.members, args.topics, args.partitions, args.rounds):
+        print(json.dumps(result, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Replay recorded consumer group metadata through the partition assignors.
+
+Runs the count-balancing and the weighted copartitioned assignors offline
+on the same cluster state and reports how evenly each spreads the load,
+how many partitions each moves, how many land on a client without local
+table state for them, and how long each takes.
+
+A recording is a JSON document of the form::
+
+    {
+        "topics": {"orders": 32, "app-orders-table-changelog": 32},
+        "members": {
+            "<member id>": {
+                "subscription": ["orders", "app-orders-table-changelog"],
+                "metadata": { ...ClientMetadata... }
+            }
+        }
+    }
+
+where ``metadata`` is the decoded subscription user data each worker sends
+(``PartitionAssignor.metadata``), including its ``partition_weights``
+and ``changelog_offsets``.
+Use ``--generate`` to write a synthetic recording with skewed load.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import pathlib
+import random
+import sys
+import time
+from typing import Any, Dict, List, Mapping, MutableMapping, Optional, Set
+
+from faust.assignor.client_assignment import ClientMetadata, CopartitionedAssignment
+from faust.assignor.cluster_assignment import ClusterAssignment
+from faust.assignor.copartitioned_assignor import CopartitionedAssignor, RecoveryCosts
+from faust.assignor.partition_assignor import PartitionAssignor
+from faust.assignor.weighted_assignor import (
+    DEFAULT_TOLERANCE,
+    WeightedCopartitionedAssignor,
+)
+
+Assignments = MutableMapping[str, CopartitionedAssignment]
+
+
+class RecordedCluster:
+    """Stand-in for :class:`aiokafka.cluster.ClusterMetadata`."""
+
+    def __init__(self, topics: Mapping[str, int]) -> None:
+        self.topics = topics
+
+    def partitions_for_topic(self, topic: str) -> Optional[Set[int]]:
+        num_partitions = self.topics.get(topic)
+        return set(range(num_partitions)) if num_partitions else None
+
+
+def generate(
+    num_members: int, num_partitions: int, replicas: int, skew: float, seed: int
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    topics = {"events": num_partitions, "app-events-table-changelog": num_partitions}
+    subscription = sorted(topics)
+    # Zipf-like: a handful of partitions carry most of the traffic.
+    weights = [1000.0 / (rank + 1) ** skew for rank in range(num_partitions)]
+    rng.shuffle(weights)
+    members = {
+        f"member-{i}": {"actives": [], "standbys": []} for i in range(num_members)
+    }
+    names = sorted(members)
+    for partition in range(num_partitions):
+        owner = names[partition % num_members]
+        members[owner]["actives"].append(partition)
+        for replica in range(1, replicas + 1):
+            standby = names[(partition + replica) % num_members]
+            members[standby]["standbys"].append(partition)
+    recording: Dict[str, Any] = {"topics": topics, "members": {}}
+    for member_id, partitions in members.items():
+        recording["members"][member_id] = {
+            "subscription": subscription,
+            "metadata": {
+                "assignment": {
+                    "actives": {t: partitions["actives"] for t in subscription},
+                    "standbys": {t: partitions["standbys"] for t in subscription},
+                },
+                "url": f"http://{member_id}:6066",
+                "changelog_distribution": {},
+                "partition_weights": {
+                    "events": [[p, weights[p]] for p in partitions["actives"]],
+                },
+                "changelog_offsets": {
+                    "app-events-table-changelog": [
+                        [p, int(weights[p] * 100)]
+                        for p in sorted(partitions["actives"] + partitions["standbys"])
+                    ],
+                },
+            },
+        }
+    return recording
+
+
+def load_recording(data: Mapping[str, Any]) -> tuple:
+    cluster_assgn = ClusterAssignment()
+    clients_metadata = {}
+    subscriptions = {}
+    for member_id, member in data["members"].items():
+        metadata = ClientMetadata.from_data(member["metadata"])
+        clients_metadata[member_id] = metadata
+        subscriptions[member_id] = list(member["subscription"])
+        cluster_assgn.add_client(member_id, subscriptions[member_id], metadata)
+    return cluster_assgn, clients_metadata, subscriptions
+
+
+def summarize(
+    name: str,
+    before: Assignments,
+    after: Assignments,
+    weights: Mapping[int, float],
+    recovery_costs: RecoveryCosts,
+    elapsed: float,
+) -> Dict[str, Any]:
+    loads = [sum(weights.get(p, 0.0) for p in a.actives) for a in after.values()]
+    counts = [len(a.actives) for a in after.values()]
+    mean = sum(loads) / len(loads) if loads else 0.0
+    moved = sum(len(after[client].actives - before[client].actives) for client in after)
+    cold = sum(
+        1
+        for client, assignment in after.items()
+        for partition in assignment.actives
+        if recovery_costs.get(partition) and client not in recovery_costs[partition]
+    )
+    return {
+        "assignor": name,
+        "max_load": round(max(loads, default=0.0), 3),
+        "mean_load": round(mean, 3),
+        "max_over_mean": round(max(loads) / mean, 3) if mean else 1.0,
+        "min_partitions": min(counts, default=0),
+        "max_partitions": max(counts, default=0),
+        "moved_actives": moved,
+        "cold_actives": cold,
+        "elapsed_ms": round(elapsed * 1000.0, 3),
+    }
+
+
+def replay(
+    data: Mapping[str, Any], replicas: int, tolerance: float
+) -> List[Dict[str, Any]]:
+    cluster_assgn, clients_metadata, subscriptions = load_recording(data)
+    cluster = RecordedCluster(data["topics"])
+    groups = PartitionAssignor._get_copartitioned_groups(
+        cluster_assgn.topics(), cluster, subscriptions  # type: ignore
+    )
+    results = []
+    for num_partitions, topic_groups in sorted(groups.items()):
+        for topics in topic_groups:
+            weights = PartitionAssignor._group_partition_weights(
+                topics, clients_metadata
+            )
+            recovery_costs = PartitionAssignor._recovery_costs(topics, clients_metadata)
+            before = cluster_assgn.copartitioned_assignments(topics)
+            for name in ("count", "weighted"):
+                assgn = copy.deepcopy(before)
+                started = time.perf_counter()
+                if name == "count":
+                    assignor: Any = CopartitionedAssignor(
+                        topics,
+                        assgn,
+                        num_partitions,
+                        replicas,
+                        recovery_costs=recovery_costs,
+                    )
+                else:
+                    assignor = WeightedCopartitionedAssignor(
+                        topics,
+                        assgn,
+                        num_partitions,
+                        replicas,
+                        weights=weights,
+                        tolerance=tolerance,
+                        recovery_costs=recovery_costs,
+                    )
+                after = assignor.get_assignment()
+                elapsed = time.perf_counter() - started
+                summary = summarize(
+                    name, before, after, weights, recovery_costs, elapsed
+                )
+                summary["topics"] = sorted(topics)
+                results.append(summary)
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", type=pathlib.Path, nargs="?")
+    parser.add_argument("--replicas", type=int, default=1)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument(
+        "--generate",
+        type=pathlib.Path,
+        help="write a synthetic recording to this path and replay it",
+    )
+    parser.add_argument("--members", type=int, default=12)
+    parser.add_argument("--partitions", type=int, default=96)
+    parser.add_argument("--skew", type=float, default=1.2)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.generate:
+        recording = generate(
+            args.members, args.partitions, args.replicas, args.skew, args.seed
+        )
+        args.generate.write_text(json.dumps(recording, indent=2) + "\n")
+    elif args.recording:
+        recording = json.loads(args.recording.read_text())
+    else:
+        print("error: need a recording or --generate PATH", file=sys.stderr)
+        return 2
+    for result in replay(recording, args.replicas, args.tolerance):
+        print(json.dumps(result, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Benchmark Faust end-to-end on the in-process memory transport.
+
+Runs a worker app against the ``memory://`` broker
+(:mod:`faust.transport.drivers.memory`), so no Kafka is needed,
+and measures:
+
+- ``throughput``: messages/s sent to a topic and processed by an agent.
+- ``latency``: p50/p99 milliseconds from sending a message until
+  the agent receives it.
+- ``table``: table updates/s by an agent (``table[key] += 1``).
+- ``recovery``: changelog records/s recovered by a new worker
+  taking over the table.
+
+Prints one JSON line per benchmark::
+
+    {"benchmark": "throughput", "messages": 100000, "msgs_per_sec": 31234.5}
+
+With ``--baseline`` the results are compared to the output of
+an earlier run, and the exit status is 1 if any of them regressed
+by more than ``--max-regression``, so CI can catch regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Mapping, Optional
+from uuid import uuid4
+
+import faust
+from faust.transport.drivers.memory import get_broker
+
+DEFAULT_MAX_REGRESSION = 1.25
+
+#: Metrics compared to the baseline, and whether higher is better.
+METRICS = {
+    "msgs_per_sec": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "ops_per_sec": True,
+    "records_per_sec": True,
+}
+
+
+def new_app(broker: str, partitions: int) -> faust.App:
+    return faust.App(
+        "e2e-benchmark",
+        broker=f"memory://{broker}",
+        store="memory://",
+        web_enabled=False,
+        topic_partitions=partitions,
+    )
+
+
+async def start(app: faust.App) -> None:
+    await app.start()
+    # wait for the first rebalance (and table recovery) to complete.
+    await app.tables.recovery.completed.wait()
+
+
+async def wait_for(done: asyncio.Event, timeout: float) -> None:
+    try:
+        await asyncio.wait_for(done.wait(), timeout)
+    except asyncio.TimeoutError:
+        raise SystemExit(f"Benchmark did not complete within {timeout}s")
+
+
+async def bench_throughput(
+    broker: str, partitions: int, messages: int, timeout: float
+) -> Dict[str, Any]:
+    app = new_app(broker, partitions)
+    topic = app.topic("throughput", key_serializer="raw", value_serializer="raw")
+    done = asyncio.Event()
+    received = 0
+
+    @app.agent(topic)
+    async def consume(stream: Any) -> None:
+        nonlocal received
+        async for _ in stream:
+            received += 1
+            if received >= messages:
+                done.set()
+
+    await start(app)
+    started = time.perf_counter()
+    for i in range(messages):
+        await topic.send(key=str(i).encode(), value=b"x")
+    await wait_for(done, timeout)
+    elapsed = time.perf_counter() - started
+    await app.stop()
+    return {
+        "benchmark": "throughput",
+        "messages": messages,
+        "msgs_per_sec": round(messages / elapsed, 1),
+    }
+
+
+async def bench_latency(
+    broker: str, partitions: int, messages: int, timeout: float
+) -> Dict[str, Any]:
+    app = new_app(broker, partitions)
+    topic = app.topic("latency", key_serializer="raw", value_serializer="raw")
+    done = asyncio.Event()
+    latencies: List[float] = []
+
+    @app.agent(topic)
+    async def consume(stream: Any) -> None:
+        async for value in stream:
+            latencies.append(time.perf_counter() - float(value))
+            if len(latencies) >= messages:
+                done.set()
+
+    await start(app)
+    for i in range(messages):
+        await topic.send(key=str(i).encode(), value=repr(time.perf_counter()).encode())
+        # let the message through before sending the next one.
+        await asyncio.sleep(0)
+    await wait_for(done, timeout)
+    await app.stop()
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "benchmark": "latency",
+        "messages": messages,
+        "p50_ms": round(percentiles[49] * 1000.0, 3),
+        "p99_ms": round(percentiles[98] * 1000.0, 3),
+    }
+
+
+async def bench_table(
+    broker: str, partitions: int, messages: int, keys: int, timeout: float
+) -> List[Dict[str, Any]]:
+    app = new_app(broker, partitions)
+    topic = app.topic("table", key_type=str, value_serializer="raw")
+    table = app.Table("counts", default=int, partitions=partitions)
+    done = asyncio.Event()
+    updated = 0
+
+    @app.agent(topic)
+    async def count(stream: Any) -> None:
+        nonlocal updated
+        async for key, _ in stream.items():
+            table[key] += 1
+            updated += 1
+            if updated >= messages:
+                done.set()
+
+    await start(app)
+    started = time.perf_counter()
+    for i in range(messages):
+        await topic.send(key=str(i % keys), value=b"x")
+    await wait_for(done, timeout)
+    elapsed = time.perf_counter() - started
+    expected = dict(table)
+    await app.stop()
+    return [
+        {
+            "benchmark": "table",
+            "messages": messages,
+            "keys": keys,
+            "ops_per_sec": round(messages / elapsed, 1),
+        },
+        await bench_recovery(broker, partitions, expected, timeout),
+    ]
+
+
+async def bench_recovery(
+    broker: str, partitions: int, expected: Mapping[Any, int], timeout: float
+) -> Dict[str, Any]:
+    # A new worker takes over the table written by bench_table.
+    app = new_app(broker, partitions)
+    table = app.Table("counts", default=int, partitions=partitions)
+    changelog = get_broker(app.conf.broker[0]).topics[
+        table.changelog_topic.get_topic_name()
+    ]
+    records = sum(len(plog.records) for plog in changelog.partitions)
+    started = time.perf_counter()
+    await app.start()
+    try:
+        await asyncio.wait_for(app.tables.recovery.completed.wait(), timeout)
+    except asyncio.TimeoutError:
+        raise SystemExit(f"Recovery did not complete within {timeout}s")
+    elapsed = time.perf_counter() - started
+    recovered = dict(table)
+    await app.stop()
+    if recovered != expected:
+        raise SystemExit("Recovered table does not match the table written")
+    return {
+        "benchmark": "recovery",
+        "records": records,
+        "records_per_sec": round(records / elapsed, 1),
+    }
+
+
+async def benchmark(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    # Every run gets a broker of its own.
+    broker = f"e2e-{uuid4().hex}"
+    results = [
+        await bench_throughput(
+            f"{broker}-throughput", args.partitions, args.messages, args.timeout
+        ),
+        await bench_latency(
+            f"{broker}-latency",
+            args.partitions,
+            args.latency_messages,
+            args.timeout,
+        ),
+    ]
+    results.extend(
+        await bench_table(
+            f"{broker}-table",
+            args.partitions,
+            args.messages,
+            args.keys,
+            args.timeout,
+        )
+    )
+    return results
+
+
+def regressions(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    max_regression: float,
+) -> List[str]:
+    previous = {entry["benchmark"]: entry for entry in baseline}
+    found = []
+    for result in results:
+        before = previous.get(result["benchmark"])
+        if before is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in result or not before.get(metric):
+                continue
+            now, then = result[metric], before[metric]
+            ratio = then / now if higher_is_better else now / then
+            if ratio > max_regression:
+                found.append(
+                    f"{result['benchmark']} {metric}: {then} -> {now} "
+                    f"({ratio:.2f}x worse)"
+                )
+    return found
+
+
+def read_baseline(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--messages",
+        type=int,
+        default=50_000,
+        help="Messages sent by throughput/table benchmarks (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--latency-messages",
+        type=int,
+        default=5_000,
+        help="Messages sent by the latency benchmark (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--keys",
+        type=int,
+        default=1_000,
+        help="Distinct keys updated in the table (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=4,
+        help="Partitions of every topic (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=300.0,
+        help="Seconds a benchmark may take (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--baseline",
+        help="Output of an earlier run to compare the results to.",
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=DEFAULT_MAX_REGRESSION,
+        help="Fail if a result is this many times worse than the baseline "
+        "(default: %(default)s).",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    results = asyncio.run(benchmark(args))
+    for result in results:
+        print(json.dumps(result, sort_keys=True))
+    if args.baseline:
+        found = regressions(results, read_baseline(args.baseline), args.max_regression)
+        for regression in found:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if found:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
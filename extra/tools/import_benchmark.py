@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Measure import time of faust and worker autodiscovery.
+
+Every case is measured in a new Python process, so that
+nothing is imported already:
+
+- ``import_faust``: ``import faust``.
+- ``import_app``: ``from faust import App``.
+- ``discover_scan``: ``app.discover()`` of a generated project with
+  ``--modules`` modules, of which every ``--agent-every`` module
+  defines an agent, scanning every module.
+- ``discover_manifest``: as above, using a manifest written by
+  :meth:`faust.App.discovery_manifest` (:setting:`autodiscover_manifest`).
+
+Prints one JSON line per case, with the median time in milliseconds::
+
+    {"case": "import_faust", "ms": 4.1}
+
+With ``--budget CASE=MS`` the exit status is 1 if the case takes
+longer than that, so CI can catch regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+PROJECT = "importbench"
+
+APP_MODULE = f"""
+import faust
+
+app = faust.App("import-benchmark", autodiscover=True, origin={PROJECT!r})
+"""
+
+AGENT_MODULE = f"""
+from {PROJECT}.app import app
+
+
+@app.agent()
+async def process(stream):
+    async for value in stream:
+        yield value
+"""
+
+MODEL_MODULE = """
+import faust
+
+
+class Point(faust.Record):
+    x: int
+    y: int
+"""
+
+TIMED = """
+import json, sys, time
+started = time.perf_counter()
+{setup}
+{statement}
+print(json.dumps((time.perf_counter() - started) * 1000.0))
+"""
+
+DISCOVER_SETUP = f"""
+from {PROJECT}.app import app
+app.finalize()
+app.conf.autodiscover_manifest = {{manifest!r}}
+started = time.perf_counter()
+"""
+
+CASES: Mapping[str, Dict[str, str]] = {
+    "import_faust": {"setup": "", "statement": "import faust"},
+    "import_app": {"setup": "", "statement": "from faust import App"},
+    "discover_scan": {
+        "setup": DISCOVER_SETUP.format(manifest=None),
+        "statement": "app.discover()",
+    },
+    "discover_manifest": {
+        "setup": DISCOVER_SETUP.format(manifest="manifest.json"),
+        "statement": "app.discover()",
+    },
+}
+
+
+def write_project(root: Path, modules: int, agent_every: int) -> None:
+    package = root / PROJECT
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "app.py").write_text(APP_MODULE)
+    for i in range(modules):
+        source = AGENT_MODULE if i % agent_every == 0 else MODEL_MODULE
+        (package / f"module{i}.py").write_text(source)
+    run(
+        root,
+        f"from {PROJECT}.app import app\n"
+        "app.finalize()\n"
+        "app.discovery_manifest().write('manifest.json')\n",
+    )
+
+
+def run(root: Path, source: str) -> str:
+    env = dict(os.environ, PYTHONPATH=str(root))
+    return subprocess.run(
+        [sys.executable, "-c", source],
+        cwd=root,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def measure(root: Path, case: str, rounds: int) -> float:
+    source = TIMED.format(**CASES[case])
+    run(root, source)  # warm up: write bytecode
+    return statistics.median(
+        json.loads(run(root, source).splitlines()[-1]) for _ in range(rounds)
+    )
+
+
+def benchmark(modules: int, agent_every: int, rounds: int) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_project(root, modules, agent_every)
+        return [
+            {"case": case, "ms": round(measure(root, case, rounds), 1)}
+            for case in CASES
+        ]
+
+
+def parse_budget(value: str) -> Dict[str, float]:
+    case, sep, ms = value.partition("=")
+    if not sep or case not in CASES:
+        raise argparse.ArgumentTypeError(f"expected one of {list(CASES)}=MS")
+    return {case: float(ms)}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--modules",
+        type=int,
+        default=500,
+        help="Modules in generated project (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--agent-every",
+        type=int,
+        default=10,
+        help="Define an agent in every n-th module (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=5,
+        help="Processes to take the median of (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--budget",
+        type=parse_budget,
+        action="append",
+        default=[],
+        metavar="CASE=MS",
+        help="Fail if case takes longer than this (can be repeated).",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    results = benchmark(args.modules, args.agent_every, args.rounds)
+    for result in results:
+        print(json.dumps(result, sort_keys=True))
+    timings = {result["case"]: result["ms"] for result in results}
+    status = 0
+    for budget in args.budget:
+        for case, ms in budget.items():
+            if timings[case] > ms:
+                print(
+                    f"OVER BUDGET: {case} takes {timings[case]} ms "
+                    f"(budget: {ms} ms)",
+                    file=sys.stderr,
+                )
+                status = 1
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Measure how fast records are decoded from serialized bytes.
+
+Compares the compiled decoder used by :meth:`faust.Record.from_data`
+with the generic path of passing the deserialized data as keyword
+arguments to the generated ``__init__`` (what ``from_data`` did before),
+for a flat record and for a record with nested records.
+
+Both paths parse the same JSON payload on every iteration, and nested
+records are fully reconstructed by reading every nested field.
+Prints one JSON line per record type, with timings in nanoseconds per
+decoded record::
+
+    {"model": "flat", "compiled_ns": 2900.1, "generic_ns": 8200.5, ...}
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import faust
+from faust.models.record import Record
+
+
+class Point(faust.Record, namespace="bench.Point", serializer="json"):
+    x: int
+    y: int
+
+
+class Order(faust.Record, namespace="bench.Order", serializer="json"):
+    id: int
+    account_id: str
+    product: str
+    price: float
+    quantity: int
+    tags: List[str]
+    note: Optional[str] = None
+
+
+class Shipment(faust.Record, namespace="bench.Shipment", serializer="json"):
+    id: int
+    order: Order
+    origin: Point
+    route: List[Point]
+    stops: Dict[str, Point]
+
+
+def flat_record() -> Order:
+    return Order(
+        id=1,
+        account_id="acc-1",
+        product="widget",
+        price=9.99,
+        quantity=3,
+        tags=["a", "b"],
+    )
+
+
+def nested_record() -> Shipment:
+    return Shipment(
+        id=1,
+        order=flat_record(),
+        origin=Point(0, 0),
+        route=[Point(i, i) for i in range(8)],
+        stops={str(i): Point(i, -i) for i in range(4)},
+    )
+
+
+def touch_shipment(shipment: Any) -> None:
+    # nested fields are reconstructed on first access.
+    shipment.order
+    shipment.origin
+    shipment.route
+    shipment.stops
+
+
+def loads(model: Type[Record], payload: bytes) -> Callable[[], Any]:
+    def decode() -> Any:
+        return model.loads(payload)
+
+    return decode
+
+
+def measure(
+    decode: Callable[[], Any],
+    touch: Optional[Callable[[Any], None]],
+    iterations: int,
+    rounds: int,
+) -> float:
+    def run() -> None:
+        if touch is None:
+            for _ in range(iterations):
+                decode()
+        else:
+            for _ in range(iterations):
+                touch(decode())
+
+    run()  # warm up
+    samples = []
+    for _ in range(rounds):
+        gc.collect()
+        started = time.perf_counter_ns()
+        run()
+        samples.append((time.perf_counter_ns() - started) / iterations)
+    return statistics.median(samples)
+
+
+def benchmark(iterations: int, rounds: int) -> List[Dict[str, Any]]:
+    cases = [
+        ("flat", Order, flat_record(), None),
+        ("nested", Shipment, nested_record(), touch_shipment),
+    ]
+    results = []
+    for name, model, record, touch in cases:
+        payload = record.dumps()
+        assert model.loads(payload) == record
+        compiled_ns = measure(loads(model, payload), touch, iterations, rounds)
+        generic_ns = _measure_generic(model, payload, touch, iterations, rounds)
+        results.append(
+            {
+                "model": name,
+                "bytes": len(payload),
+                "compiled_ns": round(compiled_ns, 1),
+                "generic_ns": round(generic_ns, 1),
+                "speedup": round(generic_ns / compiled_ns, 2),
+            }
+        )
+    return results
+
+
+def _measure_generic(
+    model: Type[Record],
+    payload: bytes,
+    touch: Optional[Callable[[Any], None]],
+    iterations: int,
+    rounds: int,
+) -> float:
+    # Swap the compiled decoder of every record for the generic path,
+    # nested records included.
+    models = [Point, Order, Shipment]
+    saved = {m: m.__dict__["_decode_data"] for m in models}
+    try:
+        for m in models:
+            m._decode_data = classmethod(  # type: ignore
+                lambda cls, data: cls(**data, __strict__=False)
+            )
+        return measure(loads(model, payload), touch, iterations, rounds)
+    finally:
+        for m, decode_data in saved.items():
+            m._decode_data = decode_data  # type: ignore
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=20_000,
+        help="Records decoded per round (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=7,
+        help="Rounds to take the median of (default: %(default)s).",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    for result in benchmark(args.iterations, args.rounds):
+        print(json.dumps(result, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Measure handing messages over to the threaded producer.
+
+With :setting:`producer_threaded` enabled, messages produced by the
+app's event loop are handed over to the event loop of a producer
+thread.  This compares two ways of doing that:
+
+- ``run_coroutine_threadsafe``: an :class:`asyncio.Queue` on the
+  thread's loop, with :func:`asyncio.run_coroutine_threadsafe`
+  putting every message, and the thread getting them one by one
+  using :func:`asyncio.wait_for` (as the threaded producer used to).
+- ``threaded_event_queue``: :class:`faust.transport.producer.ThreadedEventQueue`,
+  waking up the thread once per burst of messages, and the thread
+  taking them in batches.
+
+The app loop puts ``--messages`` messages, in bursts of ``--burst``
+messages separated by a ``sleep(0)``, as a stream producing messages
+would.  Prints one JSON line per case, with the median time per message
+(from the first message being put to the last one being taken by the
+thread) in microseconds::
+
+    {"case": "threaded_event_queue", "us_per_message": 1.3}
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+
+from faust.transport.producer import ThreadedEventQueue
+
+#: Messages taken from the queue at a time by ``threaded_event_queue``.
+MAX_BATCH_MESSAGES = 1000
+
+
+class ProducerThread:
+    """Event loop running in a thread, consuming handed over messages."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def run(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def close(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+async def _make_queue() -> asyncio.Queue:
+    return asyncio.Queue()
+
+
+async def _make_event_queue() -> ThreadedEventQueue:
+    return ThreadedEventQueue(asyncio.get_running_loop())
+
+
+async def consume_queue(queue: asyncio.Queue, total: int) -> None:
+    received = 0
+    while received < total:
+        try:
+            await asyncio.wait_for(queue.get(), timeout=0.1)
+        except asyncio.TimeoutError:
+            continue
+        received += 1
+
+
+async def consume_event_queue(queue: ThreadedEventQueue, total: int) -> None:
+    received = 0
+    while received < total:
+        received += len(await queue.get_batch(MAX_BATCH_MESSAGES, timeout=0.1))
+
+
+async def produce(put: Callable[[int], Any], total: int, burst: int) -> None:
+    for i in range(total):
+        put(i)
+        if not i % burst:
+            await asyncio.sleep(0)
+
+
+async def run_case(case: str, total: int, burst: int) -> float:
+    thread = ProducerThread()
+    try:
+        put: Callable[[int], Any]
+        if case == "run_coroutine_threadsafe":
+            queue = thread.run(_make_queue()).result()
+            consumed = thread.run(consume_queue(queue, total))
+
+            def put(i: int) -> None:
+                asyncio.run_coroutine_threadsafe(queue.put(i), thread.loop)
+
+        else:
+            event_queue = thread.run(_make_event_queue()).result()
+            consumed = thread.run(consume_event_queue(event_queue, total))
+            put = event_queue.put
+        started = time.perf_counter()
+        await produce(put, total, burst)
+        await asyncio.wrap_future(consumed)
+        return (time.perf_counter() - started) / total * 1e6
+    finally:
+        thread.close()
+
+
+CASES = ["run_coroutine_threadsafe", "threaded_event_queue"]
+
+
+def benchmark(messages: int, burst: int, rounds: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "case": case,
+            "us_per_message": round(
+                statistics.median(
+                    asyncio.run(run_case(case, messages, burst)) for _ in range(rounds)
+                ),
+                2,
+            ),
+        }
+        for case in CASES
+    ]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--messages",
+        type=int,
+        default=100_000,
+        help="Messages to hand over (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=100,
+        help="Messages put between yields to the loop (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=5,
+        help="Runs to take the median of (default: %(default)s).",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    for result in benchmark(args.messages, args.burst, args.rounds):
+        print(json.dumps(result, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Measure the overhead of sensors for every event processed.
+
+Calls the hooks of :attr:`faust.App.sensors` made for every message
+a stream processes (message in, stream event in/out, a table get
+and set, and message out), with:
+
+- ``none``: no sensors installed.
+- ``monitor``: only the default :class:`~faust.sensors.Monitor`,
+  called directly by the delegate.
+- ``monitor_sampled``: as above with ``--sample-every`` given
+  to :setting:`sensor_sampling` for ``on_stream_event``.
+- ``monitor_and_sensor``: the Monitor and one other sensor,
+  so every hook goes through the generic path.
+
+Prints one JSON line per case, with timings in nanoseconds per event::
+
+    {"sensors": "monitor", "ns_per_event": 2400.3}
+
+With ``--budget-ns`` the exit status is 1 if the ``monitor`` case
+takes longer than that per event, so CI can catch regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Mapping, Optional
+from unittest.mock import Mock
+
+import faust
+from faust.sensors import Monitor, Sensor
+from faust.types import TP, Message
+
+TP1 = TP("bench", 0)
+
+
+class Agent: ...
+
+
+class Stream(SimpleNamespace):
+    # the Monitor keeps weak references to streams and agents.
+    __hash__ = object.__hash__
+
+
+class Table(SimpleNamespace): ...
+
+
+def new_app(sensors: List[Any], sampling: Mapping[str, int]) -> faust.App:
+    app = faust.App(
+        "sensor-benchmark",
+        web_enabled=False,
+        sensor_sampling=dict(sampling),
+    )
+    app.finalize()
+    for sensor in sensors:
+        app.sensors.add(sensor)
+    return app
+
+
+def measure(app: faust.App, iterations: int, rounds: int) -> float:
+    sensors = app.sensors
+    stream = Stream(task_owner=Agent())
+    event = Mock(name="event")
+    message = Message(
+        TP1.topic,
+        TP1.partition,
+        0,
+        time.time(),
+        0,
+        None,
+        b"key",
+        b"value",
+        None,
+        3,
+        5,
+        tp=TP1,
+    )
+    table = Table(name="table")
+
+    def run() -> None:
+        for offset in range(iterations):
+            sensors.on_message_in(TP1, offset, message)
+            state = sensors.on_stream_event_in(TP1, offset, stream, event)
+            sensors.on_table_get(table, "key")
+            sensors.on_table_set(table, "key", offset)
+            sensors.on_stream_event_out(TP1, offset, stream, event, state)
+            sensors.on_message_out(TP1, offset, message)
+
+    run()  # warm up
+    samples = []
+    for _ in range(rounds):
+        gc.collect()
+        started = time.perf_counter_ns()
+        run()
+        samples.append((time.perf_counter_ns() - started) / iterations)
+    return statistics.median(samples)
+
+
+def benchmark(iterations: int, rounds: int, sample_every: int) -> List[Dict[str, Any]]:
+    sampling = {"on_stream_event": sample_every}
+    cases = [
+        ("none", lambda: [], {}),
+        ("monitor", lambda: [Monitor()], {}),
+        ("monitor_sampled", lambda: [Monitor()], sampling),
+        ("monitor_and_sensor", lambda: [Monitor(), Sensor()], {}),
+    ]
+    results = []
+    for name, sensors, case_sampling in cases:
+        app = new_app(sensors(), case_sampling)
+        results.append(
+            {
+                "sensors": name,
+                "ns_per_event": round(measure(app, iterations, rounds), 1),
+            }
+        )
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=50_000,
+        help="Events processed per round (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=7,
+        help="Rounds to take the median of (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--sample-every",
+        type=int,
+        default=10,
+        help="Sampling used by the monitor_sampled case (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--budget-ns",
+        type=float,
+        help="Fail if the monitor case takes longer than this per event.",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    results = benchmark(args.iterations, args.rounds, args.sample_every)
+    for result in results:
+        print(json.dumps(result, sort_keys=True))
+    if args.budget_ns is not None:
+        (monitor,) = [r for r in results if r["sensors"] == "monitor"]
+        if monitor["ns_per_event"] > args.budget_ns:
+            print(
+                f"OVER BUDGET: monitor takes {monitor['ns_per_event']} ns/event "
+                f"(budget: {args.budget_ns} ns)",
+                file=sys.stderr,
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
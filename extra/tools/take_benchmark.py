@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Measure buffering a stream with :meth:`faust.Stream.take`.
+
+Feeds ``--messages`` events to a stream over an in-memory channel, in
+bursts of ``--burst`` events as the consumer delivers fetched records,
+and consumes them with:
+
+- ``aiter``: ``async for value in stream``, one value at a time
+  (the raw consume speed).
+- ``take``: ``stream.take(--max, within=--within)``.
+- ``take_events``: ``stream.take_events(--max, within=--within)``,
+  as used by tables buffering their updates.
+
+Prints one JSON line per case, with the median time per message (from
+the first event being delivered to the last one being received) in
+microseconds, and the number of batches received::
+
+    {"batches": 100, "case": "take", "us_per_message": 2.1}
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, cast
+
+import faust
+from faust.types import TP, ChannelT, EventT, Message, StreamT
+
+TP1 = TP("bench", 0)
+
+
+def new_app() -> faust.App:
+    app = faust.App("take-benchmark", web_enabled=False)
+    app.finalize()
+    app.flow_control.resume()
+    return app
+
+
+def new_events(app: faust.App, total: int) -> List[EventT]:
+    return [
+        app.create_event(
+            None,
+            offset,
+            None,
+            Message(
+                TP1.topic,
+                TP1.partition,
+                offset,
+                time.time(),
+                0,
+                None,
+                None,
+                b"value",
+                None,
+                tp=TP1,
+                generation_id=app.consumer_generation_id,
+            ),
+        )
+        for offset in range(total)
+    ]
+
+
+async def deliver(stream: StreamT, events: List[EventT], burst: int) -> None:
+    put = cast(ChannelT, stream.channel).put
+    for i, event in enumerate(events):
+        await put(event)
+        if not i % burst:
+            await asyncio.sleep(0)
+
+
+async def consume_aiter(stream: StreamT, args: argparse.Namespace) -> int:
+    received = 0
+    async for _ in stream:
+        received += 1
+        if received >= args.messages:
+            break
+    return received
+
+
+async def consume_take(stream: StreamT, args: argparse.Namespace) -> int:
+    batches = received = 0
+    async for values in stream.take(args.max, within=args.within):
+        batches += 1
+        received += len(values)
+        if received >= args.messages:
+            break
+    return batches
+
+
+async def consume_take_events(stream: StreamT, args: argparse.Namespace) -> int:
+    batches = received = 0
+    async for events in stream.take_events(args.max, within=args.within):
+        batches += 1
+        received += len(events)
+        if received >= args.messages:
+            break
+    return batches
+
+
+#: Case name -> coroutine consuming the stream, returning the number
+#: of batches received.
+CASES: Mapping[str, Callable[[StreamT, argparse.Namespace], Awaitable[int]]] = {
+    "aiter": consume_aiter,
+    "take": consume_take,
+    "take_events": consume_take_events,
+}
+
+
+async def run_case(case: str, args: argparse.Namespace) -> Dict[str, float]:
+    app = new_app()
+    events = new_events(app, args.messages)
+    stream = app.stream(app.channel(maxsize=args.burst * 4))
+    async with stream:
+        started = time.perf_counter()
+        delivering = asyncio.ensure_future(deliver(stream, events, args.burst))
+        batches = await CASES[case](stream, args)
+        elapsed = time.perf_counter() - started
+        await delivering
+    return {"us_per_message": elapsed / args.messages * 1e6, "batches": batches}
+
+
+def benchmark(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    for case in CASES:
+        runs = [asyncio.run(run_case(case, args)) for _ in range(args.rounds)]
+        results.append(
+            {
+                "case": case,
+                "us_per_message": round(
+                    statistics.median(r["us_per_message"] for r in runs), 2
+                ),
+                "batches": int(statistics.median(r["batches"] for r in runs)),
+            }
+        )
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--messages",
+        type=int,
+        default=100_000,
+        help="Messages to consume (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=500,
+        help="Messages delivered between yields to the loop (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--max",
+        type=int,
+        default=1000,
+        help="Max number of values buffered by take (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--within",
+        type=float,
+        default=1.0,
+        help="Seconds take waits for more values (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=5,
+        help="Runs to take the median of (default: %(default)s).",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    for result in benchmark(parse_args()):
+        print(json.dumps(result, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
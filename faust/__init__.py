@@ -153,6 +153,7 @@ if typing.TYPE_CHECKING:  # pragma: no cover
     from .sensors import Monitor, Sensor  # noqa: E402
     from .serializers import Codec, Schema  # noqa: E402
     from .streams import Stream, StreamT, current_event  # noqa: E402
+    from .tables.aggregates import AggregateTable  # noqa: E402
     from .tables.globaltable import GlobalTable  # noqa: E402
     from .tables.sets import SetGlobalTable, SetTable  # noqa: E402
     from .tables.table import Table  # noqa: E402
@@ -184,6 +185,7 @@ __all__ = [
     "Sensor",
     "SetTable",
     "SetGlobalTable",
+    "AggregateTable",
     "Codec",
     "Schema",
     "Service",
@@ -225,6 +227,7 @@ all_by_module: Mapping[str, Sequence[str]] = {
         "StreamT",
         "current_event",
     ],
+    "faust.tables.aggregates": ["AggregateTable"],
     "faust.tables.globaltable": ["GlobalTable"],
     "faust.tables.sets": ["SetTable", "SetGlobalTable"],
     "faust.tables.table": ["Table"],
@@ -35,7 +35,7 @@ from mode.utils.objects import canonshortname, qualname
 from mode.utils.text import shorten_fqdn
 from mode.utils.types.trees import NodeT
 
-from faust.exceptions import ImproperlyConfigured
+from faust.exceptions import ImproperlyConfigured, RPCError
 from faust.types import (
     TP,
     AppT,
@@ -726,6 +726,7 @@ class Agent(AgentT, Service):
                 headers = event.headers
                 reply_to: Optional[str] = None
                 correlation_id: Optional[str] = None
+                reply_url: Optional[str] = None
                 if isinstance(event.value, ReqRepRequest):
                     req: ReqRepRequest = event.value
                     reply_to = req.reply_to
@@ -737,9 +738,17 @@ class Agent(AgentT, Service):
                         correlation_id_bytes = headers.get("Faust-Ag-CorrelationId")
                         if correlation_id_bytes:
                             correlation_id = want_str(correlation_id_bytes)
+                if headers:
+                    reply_url_bytes = headers.get("Faust-Ag-ReplyUrl")
+                    if reply_url_bytes:
+                        reply_url = want_str(reply_url_bytes)
                 if reply_to is not None:
                     await self._reply(
-                        event.key, value, reply_to, cast(str, correlation_id)
+                        event.key,
+                        value,
+                        reply_to,
+                        cast(str, correlation_id),
+                        reply_url=reply_url,
                     )
             await self._delegate_to_sinks(value)
 
@@ -753,7 +762,13 @@ class Agent(AgentT, Service):
                 await maybe_async(cast(Callable, sink)(value))
 
     async def _reply(
-        self, key: Any, value: Any, reply_to: str, correlation_id: str
+        self,
+        key: Any,
+        value: Any,
+        reply_to: str,
+        correlation_id: str,
+        *,
+        reply_url: Optional[str] = None,
     ) -> None:
         assert reply_to
         response = self._response_class(value)(
@@ -761,12 +776,35 @@ class Agent(AgentT, Service):
             value=value,
             correlation_id=correlation_id,
         )
+        if reply_url and self.app.conf.web_rpc_enabled:
+            # send reply directly to the worker waiting for it,
+            # without waiting for the round trip.
+            self.add_future(self._reply_rpc(reply_url, reply_to, response))
+            return
         await self.app.send(
             reply_to,
             key=None,
             value=response,
         )
 
+    async def _reply_rpc(
+        self, reply_url: str, reply_to: str, response: ReqRepResponse
+    ) -> None:
+        try:
+            await self.app.rpc.call(reply_url, "agents.reply", response.dumps())
+        except RPCError as exc:
+            self.log.warning(
+                "Cannot send reply to %s, sending it to %r instead: %r",
+                reply_url,
+                reply_to,
+                exc,
+            )
+            await self.app.send(
+                reply_to,
+                key=None,
+                value=response,
+            )
+
     def _response_class(self, value: Any) -> Type[ReqRepResponse]:
         if isinstance(value, ModelT):
             return ModelReqRepResponse
@@ -815,7 +853,7 @@ class Agent(AgentT, Service):
             key=key,
             partition=partition,
             timestamp=timestamp,
-            headers=headers,
+            headers=self._reply_url_headers(headers),
             reply_to=reply_to or self.app.conf.reply_to,
             correlation_id=correlation_id,
             force=True,  # Send immediately, since we are waiting for result.
@@ -888,6 +926,18 @@ class Agent(AgentT, Service):
             )
             return req, open_headers
 
+    def _reply_url_headers(self, headers: Optional[HeadersArg]) -> Optional[HeadersArg]:
+        # Replies to requests we wait for ourselves are sent directly
+        # to this worker when RPC is enabled (see web_rpc_enabled).
+        if not self.app.conf.web_rpc_enabled:
+            return headers
+        open_headers = prepare_headers(headers or {})
+        merge_headers(
+            open_headers,
+            {"Faust-Ag-ReplyUrl": want_bytes(str(self.app.conf.canonical_url))},
+        )
+        return open_headers
+
     def _request_class(self, value: V) -> Type[ReqRepRequest]:
         if isinstance(value, ModelT):
             return ModelReqRepRequest
@@ -964,7 +1014,7 @@ class Agent(AgentT, Service):
         reply_to = self._get_strtopic(reply_to or self.app.conf.reply_to)
 
         # BarrierState is the promise that keeps track of pending results.
-        # It contains a list of individual ReplyPromises.
+        # It tracks the correlation ids of the replies it waits for.
         barrier = BarrierState(reply_to)
 
         async for _ in self._barrier_send(barrier, items, reply_to):
@@ -1039,19 +1089,25 @@ class Agent(AgentT, Service):
         # while trying to pop incoming results off.
         key: K
         value: V
+        app = cast(_App, self.app)
+        await app.maybe_start_client()
+        reply_consumer = app._reply_consumer
         async for key, value in aiter(items):  # type: ignore
             correlation_id = str(uuid4())
-            p = await self.ask_nowait(
-                key=key, value=value, reply_to=reply_to, correlation_id=correlation_id
+            await self.send(
+                key=key,
+                value=value,
+                headers=self._reply_url_headers(None),
+                reply_to=reply_to,
+                correlation_id=correlation_id,
             )
-            # add reply promise to the barrier
-            barrier.add(p)
-
-            # the ReplyConsumer will call the barrier whenever a new
-            # result comes in.
-            app = cast(_App, self.app)
-            await app.maybe_start_client()
-            await app._reply_consumer.add(p.correlation_id, barrier)
+            # the barrier is the only promise: no promise is created
+            # for the individual requests.
+            barrier.expect(correlation_id)
+
+            # the ReplyConsumer will call the barrier whenever new
+            # results come in.
+            await reply_consumer.add(correlation_id, barrier)
 
             yield correlation_id
 
@@ -1,9 +1,21 @@
 """Agent replies: waiting for replies, sending them, etc."""
 
 import asyncio
-from collections import defaultdict
-from typing import Any, AsyncIterator, MutableMapping, MutableSet, NamedTuple, Optional
-from weakref import WeakSet
+from collections import OrderedDict
+from time import monotonic
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    MutableMapping,
+    MutableSet,
+    NamedTuple,
+    Optional,
+    Sequence,
+    cast,
+)
 
 from mode import Service
 
@@ -49,6 +61,21 @@ class ReplyPromise(asyncio.Future):
         assert correlation_id == self.correlation_id
         self.set_result(value)
 
+    def fulfill_many(self, results: Sequence[ReplyTuple]) -> None:
+        """Fulfill promise with replies received together."""
+        for correlation_id, value in results:
+            if not self.done():
+                self.fulfill(correlation_id, value)
+
+    def fail(self, correlation_id: str, exc: BaseException) -> None:
+        """Fail promise: the reply will never be received."""
+        assert correlation_id == self.correlation_id
+        self.set_exception(exc)
+
+    def waiting_for(self) -> Iterable[str]:
+        """Return the correlation ids of the replies waited for."""
+        return (self.correlation_id,)
+
 
 class BarrierState(ReplyPromise):
     """State of pending/complete barrier.
@@ -69,14 +96,19 @@ class BarrierState(ReplyPromise):
     fulfilled: int = 0
 
     #: Internal queue where results are added to.
+    #: Unbounded, as :meth:`Agent.join` only consumes results
+    #: once all the requests have been sent.
     _results: asyncio.Queue
 
-    #: Set of pending replies that this barrier is composed of.
-    pending: MutableSet[ReplyPromise]
+    #: Correlation ids of the replies this barrier is still waiting for.
+    pending: MutableSet[str]
+
+    #: Set by :meth:`fail`, raised once the results are consumed.
+    _failure: Optional[BaseException] = None
 
     def __post_init__(self) -> None:
         self.pending = set()
-        self._results = asyncio.Queue(maxsize=1000)
+        self._results = asyncio.Queue()
 
     def _verify_correlation_id(self, correlation_id: str) -> None:
         pass  # barrier does not require a correlation id.
@@ -88,7 +120,14 @@ class BarrierState(ReplyPromise):
             You can only add promises before the barrier is finalized
             using :meth:`finalize`.
         """
-        self.pending.add(p)
+        self.expect(p.correlation_id)
+
+    def expect(self, correlation_id: str) -> None:
+        """Add reply to request having ``correlation_id`` to barrier.
+
+        Like :meth:`add`, without creating a promise for every request.
+        """
+        self.pending.add(correlation_id)
         self.size += 1
 
     def finalize(self) -> None:
@@ -99,7 +138,8 @@ class BarrierState(ReplyPromise):
         """
         self.total = self.size
         # The barrier may have been filled up already at this point,
-        if self.fulfilled >= self.total:
+        # or failed.
+        if self.fulfilled >= self.total and not self.done():
             self.set_result(True)
             self._results.put_nowait(None)  # always wake-up .iterate()
 
@@ -109,14 +149,36 @@ class BarrierState(ReplyPromise):
         Once all promises in this barrier is fulfilled, the barrier
         will be ready.
         """
-        # ReplyConsumer calls this whenever a new reply is received.
-        self._results.put_nowait(ReplyTuple(correlation_id, value))
-        self.fulfilled += 1
-        if self.total:
+        self.fulfill_many([ReplyTuple(correlation_id, value)])
+
+    def fulfill_many(self, results: Sequence[ReplyTuple]) -> None:
+        """Fulfill the promises of replies received together."""
+        # ReplyConsumer calls this whenever new replies are received.
+        put = self._results.put_nowait
+        discard = self.pending.discard
+        for result in results:
+            put(result)
+            discard(result.correlation_id)
+        self.fulfilled += len(results)
+        if self.total and not self.done():
             if self.fulfilled >= self.total:
                 self.set_result(True)
                 self._results.put_nowait(None)  # always wake-up .iterate()
 
+    def fail(self, correlation_id: str, exc: BaseException) -> None:
+        """Fail this barrier: the reply to one of its requests is lost.
+
+        Replies already received can still be iterated over,
+        after which :meth:`iterate` raises ``exc``.
+        """
+        self._failure = exc
+        self.set_exception(exc)
+        self._results.put_nowait(None)  # always wake-up .iterate()
+
+    def waiting_for(self) -> Iterable[str]:
+        """Return the correlation ids of the replies waited for."""
+        return self.pending
+
     def get_nowait(self) -> ReplyTuple:
         """Return next reply, or raise :exc:`asyncio.QueueEmpty`."""
         for _ in range(10):  # remove sentinels
@@ -142,17 +204,31 @@ class BarrierState(ReplyPromise):
             else:
                 if value is not None:
                     yield value
+        if self._failure is not None:
+            raise self._failure
 
 
 class ReplyConsumer(Service):
     """Consumer responsible for redelegation of replies received."""
 
-    _waiting: MutableMapping[str, MutableSet[ReplyPromise]]
+    #: Max number of replies fulfilled in one pass.
+    max_batch_size: int = 1000
+
+    #: Max interval between forgetting expired requests, in seconds.
+    expire_interval: float = 60.0
+
+    #: Correlation id -> promises waiting for the reply.
+    _waiting: Dict[str, List[ReplyPromise]]
+
+    #: Correlation id -> time the reply expires, in order of expiry.
+    _expires: OrderedDict[str, float]
+
     _fetchers: MutableMapping[str, Optional[asyncio.Future]]
 
     def __init__(self, app: AppT, **kwargs: Any) -> None:
         self.app = app
-        self._waiting = defaultdict(WeakSet)
+        self._waiting = {}
+        self._expires = OrderedDict()
         self._fetchers = {}
         super().__init__(**kwargs)
 
@@ -162,11 +238,41 @@ class ReplyConsumer(Service):
             await self._start_fetcher(self.app.conf.reply_to)
 
     async def add(self, correlation_id: str, promise: ReplyPromise) -> None:
-        """Register promise to start tracking when it arrives."""
+        """Register promise to start tracking when it arrives.
+
+        The promise is forgotten once done, e.g. when the request is
+        cancelled, and fails with :exc:`asyncio.TimeoutError` if no
+        reply is received within :setting:`reply_expires`.
+        """
+        if promise.done():
+            return
         reply_topic = promise.reply_to
+        # register first: replies sent directly to this worker
+        # (see :setting:`web_rpc_enabled`) may arrive before the
+        # fetcher has started.
+        promises = self._waiting.get(correlation_id)
+        if promises is None:
+            self._waiting[correlation_id] = [promise]
+            self._expires[correlation_id] = monotonic() + self.app.conf.reply_expires
+        elif promise not in promises:
+            promises.append(promise)
+        # a barrier is added once for every request: only call back once.
+        promise.remove_done_callback(self._on_promise_done)
+        promise.add_done_callback(self._on_promise_done)
         if reply_topic not in self._fetchers:
             await self._start_fetcher(reply_topic)
-        self._waiting[correlation_id].add(promise)
+
+    def _on_promise_done(self, promise: asyncio.Future) -> None:
+        # Forget the requests no longer waited for, so that
+        # abandoned requests are not kept until they expire.
+        waiting = self._waiting
+        for correlation_id in cast(ReplyPromise, promise).waiting_for():
+            promises = waiting.get(correlation_id)
+            if promises is not None and promise in promises:
+                promises.remove(promise)
+                if not promises:
+                    del waiting[correlation_id]
+                    self._expires.pop(correlation_id, None)
 
     async def _start_fetcher(self, topic_name: str) -> None:
         if topic_name not in self._fetchers:
@@ -181,9 +287,82 @@ class ReplyConsumer(Service):
             self._fetchers[topic_name] = self.add_future(self._drain_replies(topic))
 
     async def _drain_replies(self, channel: ChannelT) -> None:
-        async for reply in channel.stream():
-            for promise in self._waiting[reply.correlation_id]:
-                promise.fulfill(reply.correlation_id, maybe_model(reply.value))
+        stream = channel.stream()
+        replies: List[ReqRepResponse] = []
+        async for reply in stream:
+            replies.append(reply)
+            # fulfill the replies fetched together in one pass,
+            # once no more replies are buffered.
+            buffered = cast(ChannelT, stream.channel)
+            if len(replies) >= self.max_batch_size or buffered.empty():
+                self.fulfill_many(replies)
+                replies = []
+
+    def fulfill(self, reply: ReqRepResponse) -> bool:
+        """Fulfill the promises waiting for ``reply``.
+
+        Returns :const:`False` if no promise is waiting for it.
+        """
+        return bool(self.fulfill_many([reply]))
+
+    def fulfill_many(self, replies: Iterable[ReqRepResponse]) -> int:
+        """Fulfill the promises waiting for ``replies``.
+
+        Every promise is fulfilled once with all the replies it waits
+        for, so that a barrier of :meth:`@Agent.join` wakes up once
+        per batch.
+
+        The promises are forgotten once their reply is received:
+        a reply sent directly to this worker is also received from
+        the reply topic when the direct call failed after all.
+
+        Returns:
+            int: the number of replies promises were waiting for.
+        """
+        waiting = self._waiting
+        expires = self._expires
+        results: Dict[ReplyPromise, List[ReplyTuple]] = {}
+        found = 0
+        for reply in replies:
+            correlation_id = reply.correlation_id
+            promises = waiting.pop(correlation_id, None)
+            if promises is None:
+                continue
+            expires.pop(correlation_id, None)
+            found += 1
+            result = ReplyTuple(correlation_id, maybe_model(reply.value))
+            for promise in promises:
+                if not promise.done():
+                    results.setdefault(promise, []).append(result)
+        for promise, promise_results in results.items():
+            promise.fulfill_many(promise_results)
+        return found
+
+    @Service.task
+    async def _expire_waiting(self) -> None:
+        interval = min(self.app.conf.reply_expires, self.expire_interval)
+        async for _ in self.itertimer(interval, name="ReplyConsumer.expire"):
+            self._expire(monotonic())
+
+    def _expire(self, now: float) -> None:
+        # Replies are deleted from the reply topic after reply_expires,
+        # so fail the promises still waiting for them.
+        expires = self._expires
+        while expires:
+            correlation_id, expires_at = next(iter(expires.items()))
+            if expires_at > now:
+                break
+            del expires[correlation_id]
+            for promise in self._waiting.pop(correlation_id, ()):
+                if not promise.done():
+                    promise.fail(
+                        correlation_id,
+                        asyncio.TimeoutError(
+                            f"No reply to request {correlation_id!r} "
+                            f"within reply_expires="
+                            f"{self.app.conf.reply_expires}s"
+                        ),
+                    )
 
     def _reply_topic(self, topic: str) -> TopicT:
         return self.app.topic(
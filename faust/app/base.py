@@ -68,7 +68,7 @@ from faust.types.app import AppT, BootStrategyT, TaskArg, TracerT
 from faust.types.assignor import LeaderAssignorT, PartitionAssignorT
 from faust.types.codecs import CodecArg
 from faust.types.core import HeadersArg, K, V
-from faust.types.enums import ProcessingGuarantee
+from faust.types.enums import AssignmentWeight, ProcessingGuarantee
 from faust.types.events import EventT
 from faust.types.models import ModelArg
 from faust.types.router import RouterT
@@ -92,6 +92,7 @@ from faust.types.web import (
     Request,
     ResourceOptions,
     Response,
+    RPCClientT,
     ViewDecorator,
     ViewHandlerFun,
     Web,
@@ -110,6 +111,7 @@ from faust.web.cache import backends as cache_backends
 from faust.web.views import View
 
 from ._attached import Attachments
+from .manifest import DiscoveryManifest
 
 if typing.TYPE_CHECKING:  # pragma: no cover
     from faust.cli.base import AppCommand as _AppCommand
@@ -451,6 +453,8 @@ class App(AppT, Service):
 
     _http_client: Optional[HttpClientT] = None
 
+    _rpc: Optional[RPCClientT] = None
+
     _extra_services: List[Type[ServiceT]]
     _extra_service_instances: Optional[List[ServiceT]] = None
 
@@ -721,6 +725,10 @@ class App(AppT, Service):
             if not id:
                 raise ImproperlyConfigured("App requires an id!")
 
+    async def _maybe_close_rpc(self) -> None:
+        if self._rpc:
+            await self._rpc.close()
+
     async def _maybe_close_http_client(self) -> None:
         if self._http_client:
             await self._http_client.close()
@@ -745,12 +753,63 @@ class App(AppT, Service):
         *extra_modules: str,
         categories: Optional[Iterable[str]] = None,
         ignore: Iterable[Any] = SCAN_IGNORE,
+        use_manifest: bool = True,
     ) -> None:
-        """Discover decorators in packages."""
+        """Discover decorators in packages.
+
+        If the :setting:`autodiscover_manifest` file exists, and
+        ``use_manifest`` is true, only the modules listed in the
+        manifest are imported.
+        """
         # based on autodiscovery in Django,
         # but finds @app.agent decorators, and so on.
         if categories is None:
             categories = self.SCAN_CATEGORIES
+        modules = self._discovery_packages(extra_modules)
+        if modules:
+            if use_manifest and self._load_discovery_manifest(modules):
+                return
+            scanner = venusian.Scanner()
+            for name in modules:
+                try:
+                    module = importlib.import_module(name)
+                except ModuleNotFoundError:
+                    raise ModuleNotFoundError(
+                        f"Unknown module {name} in App.conf.autodiscover list"
+                    )
+                scanner.scan(
+                    module,
+                    ignore=ignore,
+                    categories=tuple(categories),
+                    onerror=self._on_autodiscovery_error,
+                )
+
+    def discovery_manifest(
+        self,
+        *extra_modules: str,
+        categories: Optional[Iterable[str]] = None,
+        ignore: Iterable[Any] = SCAN_IGNORE,
+    ) -> DiscoveryManifest:
+        """Scan packages and return manifest of everything found.
+
+        See :setting:`autodiscover_manifest`.
+        """
+        if categories is None:
+            categories = self.SCAN_CATEGORIES
+        self.discover(
+            *extra_modules,
+            categories=categories,
+            ignore=ignore,
+            use_manifest=False,
+        )
+        return DiscoveryManifest.collect(
+            self,
+            self._discovery_packages(extra_modules),
+            categories,
+            ignore,
+        )
+
+    def _discovery_packages(self, extra_modules: Iterable[str]) -> Set[str]:
         modules = set(self._discovery_modules())
         modules |= set(extra_modules)
         # Fixup-provided autodiscovery (e.g. the Django fixup scanning every
@@ -768,21 +827,24 @@ class App(AppT, Service):
         if self.conf.autodiscover is True:  # type: ignore[misc]
             for fixup in self.fixups:
                 modules |= set(fixup.autodiscover_modules())
-        if modules:
-            scanner = venusian.Scanner()
-            for name in modules:
-                try:
-                    module = importlib.import_module(name)
-                except ModuleNotFoundError:
-                    raise ModuleNotFoundError(
-                        f"Unknown module {name} in App.conf.autodiscover list"
-                    )
-                scanner.scan(
-                    module,
-                    ignore=ignore,
-                    categories=tuple(categories),
-                    onerror=self._on_autodiscovery_error,
-                )
+        return modules
+
+    def _load_discovery_manifest(self, packages: Set[str]) -> bool:
+        path = self.conf.autodiscover_manifest
+        if path is None or not path.exists():
+            return False
+        manifest = DiscoveryManifest.from_path(path)
+        if set(manifest.packages) != packages:
+            logger.warning(
+                "Autodiscovery manifest %s was written for packages %r, "
+                "not %r: scanning packages instead",
+                path,
+                sorted(manifest.packages),
+                sorted(packages),
+            )
+            return False
+        manifest.load(path)
+        return True
 
     def _on_autodiscovery_error(self, name: str) -> None:
         logger.warning(
@@ -1373,6 +1435,36 @@ class App(AppT, Service):
         )
         return cast(TableT, table.using_window(window) if window else table)
 
+    def AggregateTable(
+        self,
+        name: str,
+        *,
+        window: WindowT,
+        aggregate: str = "sum",
+        partitions: Optional[int] = None,
+        help: Optional[str] = None,
+        **kwargs: Any,
+    ) -> TableT:
+        """Table of numeric aggregates over a window.
+
+        See :class:`~faust.AggregateTable`.
+        """
+        return self.tables.add(
+            cast(
+                TableT,
+                self.conf.AggregateTable(  # type: ignore
+                    self,
+                    name=name,
+                    beacon=self.tables.beacon,
+                    window=window,
+                    aggregate=aggregate,
+                    partitions=partitions,
+                    help=help,
+                    **kwargs,
+                ),
+            )
+        )
+
     def SetGlobalTable(
         self,
         name: str,
@@ -1713,6 +1805,7 @@ class App(AppT, Service):
         # send shutdown signal
         await self.on_before_shutdown.send()
         await self._producer_flush(self.log)
+        await self._maybe_close_rpc()
         await self._maybe_close_http_client()
 
     async def _producer_flush(self, logger: Any) -> None:
@@ -1832,6 +1925,7 @@ class App(AppT, Service):
                         await T(consumer.transactions.on_partitions_revoked)(revoked)
                 else:
                     self.log.dev("ON P. REVOKED NOT COMMITTING: NO ASSIGNMENT")
+                T(self.assignor.on_partitions_revoked)(revoked)
                 on_timeout.info("+send signal: on_partitions_revoked")
                 await T(self.on_partitions_revoked.send)(revoked)
                 on_timeout.info("-send signal: on_partitions_revoked")
@@ -2146,6 +2240,9 @@ class App(AppT, Service):
                 Monitor,
                 self.conf.Monitor(loop=self.loop, beacon=self.beacon),  # type: ignore
             )
+            self._monitor.track_bytes_received = (
+                self.conf.consumer_assignment_weight == AssignmentWeight.BYTES
+            )
         return self._monitor
 
     @monitor.setter
@@ -2185,6 +2282,22 @@ class App(AppT, Service):
     def http_client(self, client: HttpClientT) -> None:
         self._http_client = client
 
+    @property
+    def rpc(self) -> RPCClientT:
+        """Remote procedure calls to other workers.
+
+        See :setting:`web_rpc_enabled`.
+        """
+        if self._rpc is None:
+            from faust.web.rpc import RPCClient
+
+            self._rpc = RPCClient(self)
+        return self._rpc
+
+    @rpc.setter
+    def rpc(self, rpc: RPCClientT) -> None:
+        self._rpc = rpc
+
     @cached_property
     def assignor(self) -> PartitionAssignorT:
         """Partition Assignor.
@@ -0,0 +1,174 @@
+"""Autodiscovery manifest.
+
+Autodiscovery imports every module in the packages it scans, which
+can take a long time for a large project.  The manifest records the
+modules where autodiscovery found decorated agents, pages, commands,
+services and tasks (including timers and crontabs), and tables,
+so that workers can import only those modules at startup.
+
+The manifest is written by :program:`faust discover --write-manifest`
+and used when the :setting:`autodiscover_manifest` setting is set.
+"""
+
+import importlib
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    Set,
+    Union,
+)
+
+from faust.exceptions import ImproperlyConfigured
+from faust.types import AppT
+from faust.utils import venusian
+
+__all__ = ["DiscoveryManifest", "CATEGORY_TABLE"]
+
+#: Version of the manifest file format.
+MANIFEST_VERSION = 1
+
+#: Category tables are recorded in, as tables are not decorators.
+CATEGORY_TABLE = "faust.table"
+
+E_STALE_MANIFEST = """
+Autodiscovery manifest {path} is out of date: {reason}.
+
+Please write it again using: faust -A {app} discover --write-manifest
+"""
+
+
+class DiscoveryManifest(NamedTuple):
+    """Modules and objects found by autodiscovery."""
+
+    #: Id of the app the manifest was written for.
+    app: str
+
+    #: Packages that were scanned.
+    packages: Sequence[str]
+
+    #: Modules to import, sorted by name.
+    modules: Sequence[str]
+
+    #: Mapping of category to ``"module:attribute"`` names found.
+    entries: Mapping[str, Sequence[str]]
+
+    @classmethod
+    def collect(
+        cls,
+        app: AppT,
+        packages: Iterable[str],
+        categories: Iterable[str],
+        ignore: Iterable[Any] = (),
+    ) -> "DiscoveryManifest":
+        """Collect manifest from modules already imported by discovery."""
+        packages = sorted(packages)
+        wanted = set(categories)
+        ignore = list(ignore)
+        tables = {id(table) for table in app.tables.values()}
+        found: Dict[str, Set[str]] = defaultdict(set)
+        modules: Set[str] = set()
+        for module_name, module in list(sys.modules.items()):
+            if module is None or not _in_packages(module_name, packages, ignore):
+                continue
+            for name, obj in list(vars(module).items()):
+                if id(obj) in tables:
+                    found_in = [CATEGORY_TABLE]
+                else:
+                    found_in = venusian.attached_categories(
+                        obj, module_name, name, wanted
+                    )
+                for category in found_in:
+                    found[category].add(f"{module_name}:{name}")
+                    modules.add(module_name)
+        return cls(
+            app=app.conf.id,
+            packages=packages,
+            modules=sorted(modules),
+            entries={category: sorted(found[category]) for category in sorted(found)},
+        )
+
+    @classmethod
+    def from_path(cls, path: Union[str, Path]) -> "DiscoveryManifest":
+        """Read manifest from file."""
+        data = json.loads(Path(path).read_text())
+        if data.get("version") != MANIFEST_VERSION:
+            raise ImproperlyConfigured(
+                E_STALE_MANIFEST.format(
+                    path=path,
+                    reason=f"unsupported version {data.get('version')!r}",
+                    app=data.get("app"),
+                )
+            )
+        return cls(
+            app=data["app"],
+            packages=data["packages"],
+            modules=data["modules"],
+            entries=data["entries"],
+        )
+
+    def write(self, path: Union[str, Path]) -> None:
+        """Write manifest to file."""
+        Path(path).write_text(json.dumps(self.asdict(), indent=2) + "\n")
+
+    def asdict(self) -> Mapping[str, Any]:
+        """Return manifest as JSON serializable dictionary."""
+        return {
+            "version": MANIFEST_VERSION,
+            "app": self.app,
+            "packages": list(self.packages),
+            "modules": list(self.modules),
+            "entries": {k: list(v) for k, v in self.entries.items()},
+        }
+
+    def load(self, path: Union[str, Path]) -> None:
+        """Import the modules in this manifest.
+
+        Raises:
+            ImproperlyConfigured: if a module or an object recorded in
+                the manifest no longer exists.
+        """
+        for module_name in self.modules:
+            try:
+                importlib.import_module(module_name)
+            except ModuleNotFoundError as exc:
+                if exc.name != module_name:
+                    raise
+                self._stale(path, f"module {module_name} not found")
+        for names in self.entries.values():
+            for entry in names:
+                module_name, _, name = entry.partition(":")
+                if not hasattr(sys.modules[module_name], name):
+                    self._stale(path, f"{entry} not found")
+
+    def _stale(self, path: Union[str, Path], reason: str) -> None:
+        raise ImproperlyConfigured(
+            E_STALE_MANIFEST.format(path=path, reason=reason, app=self.app)
+        )
+
+
+def _in_packages(module_name: str, packages: Sequence[str], ignore: List[Any]) -> bool:
+    for package in packages:
+        if module_name == package or module_name.startswith(package + "."):
+            return not _ignored(module_name, package, ignore)
+    return False
+
+
+def _ignored(module_name: str, package: str, ignore: List[Any]) -> bool:
+    # same rules as venusian.Scanner.scan(ignore=...)
+    for ign in ignore:
+        if isinstance(ign, str):
+            prefix = package + ign if ign.startswith(".") else ign
+            if module_name == prefix or module_name.startswith(prefix + "."):
+                return True
+        elif callable(ign) and ign(module_name):
+            return True
+    return False
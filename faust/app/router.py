@@ -1,10 +1,14 @@
 """Route messages to Faust nodes by partitioning."""
 
-from typing import Tuple
+import asyncio
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Iterable, List, Mapping, Tuple
 
+import aiohttp
+from mode.utils.compat import want_bytes
 from yarl import URL
 
-from faust.exceptions import SameNode
+from faust.exceptions import RPCError, SameNode
 from faust.types.app import AppT
 from faust.types.assignor import PartitionAssignorT
 from faust.types.core import K
@@ -12,8 +16,12 @@ from faust.types.router import HostToPartitionMap, RouterT
 from faust.types.tables import CollectionT
 from faust.types.topics import TopicT
 from faust.types.web import Request, Response, Web
+from faust.utils import json as _json
 from faust.web.exceptions import ServiceUnavailable
 
+#: Request headers describing the request body.
+BODY_HEADERS = frozenset({"content-length", "transfer-encoding"})
+
 
 class Router(RouterT):
     """Router for ``app.router``."""
@@ -31,6 +39,18 @@ class Router(RouterT):
         k = self._get_serialized_key(table, key)
         return self._assignor.key_store(topic, k)
 
+    def keys_by_store(
+        self, table_name: str, keys: Iterable[K]
+    ) -> Mapping[URL, List[K]]:
+        """Group keys by the URL of the web server hosting them in table."""
+        table = self._get_table(table_name)
+        topic = self._get_table_topic(table)
+        key_store = self._assignor.key_store
+        stores: Dict[URL, List[K]] = defaultdict(list)
+        for key in keys:
+            stores[key_store(topic, self._get_serialized_key(table, key))].append(key)
+        return stores
+
     def external_topic_key_store(self, topic: TopicT, key: K) -> URL:
         """Return the URL of web server that processes the key in a topics."""
         topic_name = topic.get_topic_name()
@@ -50,6 +70,16 @@ class Router(RouterT):
         topic = self._get_table_topic(table)
         return self._assignor.table_metadata(topic)
 
+    def table_hosts(self, table_name: str) -> List[URL]:
+        """Return the URLs of web servers hosting partitions of table."""
+        table = self._get_table(table_name)
+        topic = self._get_table_topic(table)
+        return sorted(
+            URL(host)
+            for host, partitions in self._assignor.table_metadata(topic).items()
+            if partitions.get(topic)
+        )
+
     def tables_metadata(self) -> HostToPartitionMap:
         """Return metadata stored for all tables in the partition assignor."""
         return self._assignor.tables_metadata()
@@ -83,12 +113,108 @@ class Router(RouterT):
         async with app.http_client.request(
             method=request.method, headers=request.headers, url=routed_url
         ) as response:
-            return web.text(
-                await response.text(),
+            return web.bytes(
+                await response.read(),
                 content_type=response.content_type,
                 status=response.status,
             )
 
+    def stream_req(
+        self, dest_url: URL, request: Request, query: Mapping[str, str]
+    ) -> AsyncIterator[bytes]:
+        """Forward GET request to another worker, iterating over response lines.
+
+        Arguments:
+            dest_url: URL of the worker to forward the request to.
+            request: The web request currently being served.
+            query: Query parameters of the forwarded request,
+                replacing those of the original request.
+
+        Raises:
+            SameNode: if ``dest_url`` is the URL of this worker.
+        """
+        host, port = self._urlident(dest_url)
+        if (host, port) == self._urlident(self.app.conf.canonical_url):
+            raise SameNode()
+        routed_url = request.url.with_host(host).with_port(int(port)).with_query(query)
+        return self._stream_lines(routed_url, request)
+
+    async def post_req(
+        self,
+        dest_url: URL,
+        request: Request,
+        body: bytes,
+        query: Mapping[str, str],
+    ) -> bytes:
+        """Forward POST request to another worker, returning the response body.
+
+        Arguments:
+            dest_url: URL of the worker to forward the request to.
+            request: The web request currently being served.
+            body: Body of the forwarded request.
+            query: Query parameters of the forwarded request,
+                replacing those of the original request.
+
+        Raises:
+            SameNode: if ``dest_url`` is the URL of this worker.
+            ServiceUnavailable: if the worker could not be reached,
+                or did not respond with success.
+        """
+        host, port = self._urlident(dest_url)
+        if (host, port) == self._urlident(self.app.conf.canonical_url):
+            raise SameNode()
+        routed_url = request.url.with_host(host).with_port(int(port)).with_query(query)
+        try:
+            async with self.app.http_client.post(
+                routed_url, headers=self._body_headers(request), data=body
+            ) as response:
+                response.raise_for_status()
+                return await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            raise ServiceUnavailable(url=str(dest_url), reason=repr(exc))
+
+    async def get_many_req(
+        self, dest_url: URL, table_name: str, keys: List[K], request: Request
+    ) -> bytes:
+        """Look up keys in table of another worker.
+
+        Uses a remote procedure call if :setting:`web_rpc_enabled`,
+        or forwards ``request`` to ``/table/{name}/_mget/`` otherwise.
+
+        Returns:
+            bytes: JSON object of the keys found, as returned by
+                the other worker.
+
+        Raises:
+            SameNode: if ``dest_url`` is the URL of this worker.
+            ServiceUnavailable: if the worker could not be reached,
+                or did not respond with success.
+        """
+        if not self.app.conf.web_rpc_enabled:
+            body = want_bytes(_json.dumps({"keys": keys}))
+            return await self.post_req(dest_url, request, body, {"local": "1"})
+        if self._urlident(dest_url) == self._urlident(self.app.conf.canonical_url):
+            raise SameNode()
+        payload = want_bytes(_json.dumps({"table": table_name, "keys": keys}))
+        try:
+            return await self.app.rpc.call(dest_url, "tables.get_many", payload)
+        except RPCError as exc:
+            raise ServiceUnavailable(url=str(dest_url), reason=repr(exc))
+
+    def _body_headers(self, request: Request) -> Mapping[str, str]:
+        # The body is replaced, so its length is no longer valid.
+        return {
+            key: value
+            for key, value in request.headers.items()
+            if key.lower() not in BODY_HEADERS
+        }
+
+    async def _stream_lines(self, url: URL, request: Request) -> AsyncIterator[bytes]:
+        async with self.app.http_client.get(url, headers=request.headers) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                yield line
+
     async def route_req(
         self, table_name: str, key: K, web: Web, request: Request
     ) -> Response:
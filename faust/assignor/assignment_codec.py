@@ -0,0 +1,402 @@
+"""Compact binary encoding of partition assignments.
+
+The leader sends every member of the group its own assignment, along
+with where every changelog and external topic partition went
+(:attr:`ClientMetadata.changelog_distribution` and
+:attr:`ClientMetadata.external_topic_distribution`), so that
+members can route table lookups and topic requests.
+Encoded as JSON, the distributions repeat every topic name once for
+every member owning partitions of it and every partition number in
+decimal, and are repeated in full in the assignment of every member.
+
+The compact encoding instead:
+
+- interns topic names and member URLs in a string table, referring
+  to them by index everywhere else.
+- encodes partition lists as sorted runs of consecutive partitions,
+  as the (varint) gap since the previous run and length of the run.
+- encodes the distributions once per rebalance, as a zlib compressed
+  block the leader appends to the assignment of every member as-is.
+  A topic where no partition has more than one owner (anything but
+  global tables) is stored as a vector of the owner of every partition,
+  taking one byte per partition for less than 255 members, rather
+  than as partition lists per member.  Otherwise a member owning the
+  same partitions as the member before it only refers back to them,
+  so global tables take a single partition list.
+
+Payloads start with :data:`MAGIC` followed by the format version,
+which neither JSON nor zlib compressed JSON ever start with, so
+:func:`loads_assignment` can still read the zlib compressed JSON
+assignments of leaders running older versions of Faust.
+"""
+
+import sys
+import zlib
+from array import array
+from itertools import groupby
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+from faust.types.assignor import HostToPartitionMap, TopicToPartitionMap
+
+from .client_assignment import ClientAssignment, ClientMetadata
+
+__all__ = [
+    "MAGIC",
+    "VERSION",
+    "dumps_distributions",
+    "dumps_assignment",
+    "loads_assignment",
+    "is_compact",
+]
+
+#: First bytes of a compact payload.
+MAGIC = b"\xfa\xca"
+
+#: Version of the compact format, stored after :data:`MAGIC`.
+VERSION = 1
+
+#: Distribution of a topic stored as partition lists per member.
+_BY_MEMBER = 0
+
+#: Distribution of a topic stored as owner of every partition.
+_BY_PARTITION = 1
+
+#: Partition list stored as runs of consecutive partitions.
+_RUNS = 0
+
+#: Partition list stored as array of 16-bit/32-bit partitions.
+_UINT16, _UINT32 = 1, 2
+
+_ARRAY_TYPECODES = {1: "B", 2: "H", 4: "I"}
+
+
+def _pack(width: int, values: Iterable[int]) -> bytes:
+    packed = array(_ARRAY_TYPECODES[width], values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(width: int, data: bytes) -> array:
+    unpacked = array(_ARRAY_TYPECODES[width])
+    unpacked.frombytes(data)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.buf = bytearray()
+        self.strings: Dict[str, int] = {}
+
+    def intern(self, s: str) -> int:
+        try:
+            return self.strings[s]
+        except KeyError:
+            index = self.strings[s] = len(self.strings)
+            return index
+
+    def varint(self, value: int) -> None:
+        buf = self.buf
+        while value > 0x7F:
+            buf.append((value & 0x7F) | 0x80)
+            value >>= 7
+        buf.append(value)
+
+    def string(self, s: str) -> None:
+        self.varint(self.intern(s))
+
+    def partitions(self, partitions: Iterable[int]) -> None:
+        # Header is count << 2 | kind, where kind is _RUNS, or
+        # _UINT16/_UINT32 for an array of partitions.  Scattered partitions,
+        # as most assignments are, go into arrays: the same size,
+        # but unpacked in C rather than a varint at a time.
+        ordered = sorted(set(partitions))
+        runs: List[List[int]] = []
+        for partition in ordered:
+            if runs and partition == runs[-1][1]:
+                runs[-1][1] += 1
+            else:
+                runs.append([partition, partition + 1])
+        if len(runs) * 2 > len(ordered):
+            kind = _UINT16 if ordered[-1] <= 0xFFFF else _UINT32
+            self.varint(len(ordered) << 2 | kind)
+            self.buf += _pack(kind * 2, ordered)
+            return
+        self.varint(len(runs) << 2 | _RUNS)
+        end = 0
+        for start, stop in runs:
+            self.varint(start - end)
+            self.varint(stop - start)
+            end = stop
+
+    def topic_map(self, topics: TopicToPartitionMap) -> None:
+        self.varint(len(topics))
+        for topic, partitions in topics.items():
+            self.string(topic)
+            self.partitions(partitions)
+
+    def getvalue(self) -> bytes:
+        # Prepend the string table, as it is only known at the end.
+        table = _Writer()
+        table.varint(len(self.strings))
+        for s in self.strings:  # dicts keep insertion (= index) order
+            encoded = s.encode()
+            table.varint(len(encoded))
+            table.buf += encoded
+        return bytes(table.buf + self.buf)
+
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+        count = self.varint()
+        strings: List[str] = []
+        for _ in range(count):
+            size = self.varint()
+            strings.append(data[self.pos : self.pos + size].decode())
+            self.pos += size
+        self.strings = strings
+
+    def varint(self) -> int:
+        value, self.pos = _varint_at(self.data, self.pos)
+        return value
+
+    def string(self) -> str:
+        return self.strings[self.varint()]
+
+    def partitions(self) -> List[int]:
+        header = self.varint()
+        count, kind = header >> 2, header & 0b11
+        if kind != _RUNS:
+            width = kind * 2
+            return _unpack(width, self.take(count * width)).tolist()
+        partitions: List[int] = []
+        end = 0
+        for _ in range(count):
+            start = end + self.varint()
+            end = start + self.varint()
+            partitions.extend(range(start, end))
+        return partitions
+
+    def topic_map(self) -> TopicToPartitionMap:
+        return {self.string(): self.partitions() for _ in range(self.varint())}
+
+    def take(self, size: int) -> bytes:
+        chunk = self.data[self.pos : self.pos + size]
+        self.pos += size
+        return chunk
+
+
+def is_compact(data: bytes) -> bool:
+    """Return :const:`True` if payload is in the compact format."""
+    return data[: len(MAGIC)] == MAGIC
+
+
+def dumps_distributions(
+    changelog_distribution: HostToPartitionMap,
+    external_topic_distribution: HostToPartitionMap,
+) -> bytes:
+    """Encode distributions, to be passed to :func:`dumps_assignment`.
+
+    The distributions are the same for every member of the group,
+    so the leader should only encode them once per rebalance.
+    """
+    writer = _Writer()
+    hosts = list(dict.fromkeys([*changelog_distribution, *external_topic_distribution]))
+    writer.varint(len(hosts))
+    for host in hosts:
+        writer.string(host)
+    host_index = {host: index for index, host in enumerate(hosts)}
+    for distribution in (changelog_distribution, external_topic_distribution):
+        _write_distribution(writer, distribution, hosts, host_index)
+    return zlib.compress(writer.getvalue())
+
+
+def _write_distribution(
+    writer: _Writer,
+    distribution: HostToPartitionMap,
+    hosts: Sequence[str],
+    host_index: Mapping[str, int],
+) -> None:
+    by_topic: MutableMapping[str, List[Tuple[int, Sequence[int]]]] = {}
+    writer.varint(len(distribution))
+    for host, topics in distribution.items():
+        writer.varint(host_index[host])
+        for topic, partitions in topics.items():
+            by_topic.setdefault(topic, []).append((host_index[host], partitions))
+    writer.varint(len(by_topic))
+    for topic, owners in by_topic.items():
+        writer.string(topic)
+        vector = _owner_vector(owners, len(hosts))
+        if vector is not None:
+            width, vector_bytes = vector
+            writer.buf.append(_BY_PARTITION)
+            # members listing the topic without any partitions of it
+            empty = [
+                owner for owner, owned_partitions in owners if not owned_partitions
+            ]
+            writer.varint(len(empty))
+            for owner in empty:
+                writer.varint(owner)
+            writer.varint(width)
+            writer.varint(len(vector_bytes) // width)
+            writer.buf += vector_bytes
+        else:
+            writer.buf.append(_BY_MEMBER)
+            writer.varint(len(owners))
+            previous: Optional[List[int]] = None
+            for owner, owned_partitions in owners:
+                # low bit set: same partitions as the previous member,
+                # as every member has of global table changelogs.
+                current = sorted(set(owned_partitions))
+                if current == previous:
+                    writer.varint(owner << 1 | 1)
+                else:
+                    writer.varint(owner << 1)
+                    writer.partitions(current)
+                previous = current
+
+
+def _owner_vector(
+    owners: Sequence[Tuple[int, Sequence[int]]], num_hosts: int
+) -> Optional[Tuple[int, bytes]]:
+    # Owner of every partition as array of host index + 1 (0 = no owner),
+    # or None if any partition has multiple owners, or
+    # the topic is so sparsely assigned partition lists are smaller.
+    num_partitions = 1 + max(
+        (max(partitions) for _, partitions in owners if partitions), default=-1
+    )
+    num_owned = sum(len(partitions) for _, partitions in owners)
+    if num_owned < num_partitions // 2:
+        return None
+    width = 1 if num_hosts < 0xFF else 2 if num_hosts < 0xFFFF else 4
+    vector = [0] * num_partitions
+    for host, partitions in owners:
+        for partition in partitions:
+            if vector[partition]:
+                return None
+            vector[partition] = host + 1
+    return width, _pack(width, vector)
+
+
+def _read_distributions(data: bytes) -> Tuple[HostToPartitionMap, HostToPartitionMap]:
+    reader = _Reader(zlib.decompress(data))
+    hosts = [reader.string() for _ in range(reader.varint())]
+    changelog_distribution = _read_distribution(reader, hosts)
+    external_topic_distribution = _read_distribution(reader, hosts)
+    return changelog_distribution, external_topic_distribution
+
+
+def _read_distribution(reader: _Reader, hosts: Sequence[str]) -> HostToPartitionMap:
+    distribution: HostToPartitionMap = {
+        hosts[reader.varint()]: {} for _ in range(reader.varint())
+    }
+    for _ in range(reader.varint()):
+        topic = reader.string()
+        mode = reader.take(1)[0]
+        if mode == _BY_PARTITION:
+            for _ in range(reader.varint()):
+                distribution[hosts[reader.varint()]][topic] = []
+            width = reader.varint()
+            vector = _unpack(width, reader.take(reader.varint() * width))
+            # stable sort: partitions of every owner stay in order
+            owner_of = vector.__getitem__
+            by_owner = sorted(range(len(vector)), key=owner_of)
+            for owner, owned in groupby(by_owner, owner_of):
+                if owner:
+                    distribution[hosts[owner - 1]][topic] = list(owned)
+        elif mode == _BY_MEMBER:
+            partitions: List[int] = []
+            for _ in range(reader.varint()):
+                owner = reader.varint()
+                partitions = list(partitions) if owner & 1 else reader.partitions()
+                distribution[hosts[owner >> 1]][topic] = partitions
+        else:
+            raise ValueError(f"Unknown distribution encoding: {mode!r}")
+    return distribution
+
+
+def dumps_assignment(
+    assignment: ClientAssignment,
+    url: str,
+    topic_groups: Mapping[str, int],
+    distributions: bytes,
+) -> bytes:
+    """Encode the assignment of a member in the compact format.
+
+    Arguments:
+        assignment: Partitions assigned to the member.
+        url: Web URL of the member.
+        topic_groups: Topic to copartitioned group mapping.
+        distributions: Distributions of the group, as
+            encoded by :func:`dumps_distributions`.
+    """
+    writer = _Writer()
+    writer.string(url)
+    writer.topic_map(assignment.actives)
+    writer.topic_map(assignment.standbys)
+    writer.varint(len(topic_groups))
+    for topic, group in topic_groups.items():
+        writer.string(topic)
+        writer.varint(group)
+    body = writer.getvalue()
+    header = _Writer()
+    header.buf += MAGIC
+    header.varint(VERSION)
+    header.varint(len(body))
+    return bytes(header.buf) + body + distributions
+
+
+def loads_assignment(data: bytes) -> ClientMetadata:
+    """Decode assignment sent to this member by the group leader.
+
+    Accepts both the compact format, and the zlib compressed JSON
+    sent by older versions of Faust.
+    """
+    if not is_compact(data):
+        return cast(ClientMetadata, ClientMetadata.loads(zlib.decompress(data)))
+    version = data[len(MAGIC)]
+    if version != VERSION:
+        raise ValueError(f"Unknown assignment format version: {version!r}")
+    size, offset = _varint_at(data, len(MAGIC) + 1)
+    body = data[offset : offset + size]
+    changelog_distribution, external_topic_distribution = _read_distributions(
+        data[offset + size :]
+    )
+    reader = _Reader(body)
+    url = reader.string()
+    assignment = ClientAssignment(
+        actives=reader.topic_map(), standbys=reader.topic_map()
+    )
+    topic_groups = {reader.string(): reader.varint() for _ in range(reader.varint())}
+    return ClientMetadata(
+        assignment=assignment,
+        url=url,
+        changelog_distribution=changelog_distribution,
+        external_topic_distribution=external_topic_distribution,
+        topic_groups=topic_groups,
+    )
+
+
+def _varint_at(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
@@ -5,7 +5,11 @@ from typing import List, Mapping, MutableMapping, Optional, Sequence, Set, Tuple
 
 from faust.models import Record
 from faust.types import TP
-from faust.types.assignor import HostToPartitionMap
+from faust.types.assignor import (
+    HostToPartitionMap,
+    TopicToPartitionOffsets,
+    TopicToPartitionWeights,
+)
 from faust.types.tables import TableManagerT
 
 R_COPART_ASSIGNMENT = """
@@ -152,7 +156,13 @@ class ClientMetadata(
     changelog_distribution: HostToPartitionMap
     external_topic_distribution: HostToPartitionMap = cast(HostToPartitionMap, {})
     topic_groups: Mapping[str, int] = cast(Mapping[str, int], None)
+    partition_weights: TopicToPartitionWeights = cast(TopicToPartitionWeights, None)
+    changelog_offsets: TopicToPartitionOffsets = cast(TopicToPartitionOffsets, None)
 
     def __post_init__(self) -> None:
         if self.topic_groups is None:
             self.topic_groups = {}
+        if self.partition_weights is None:
+            self.partition_weights = {}
+        if self.changelog_offsets is None:
+            self.changelog_offsets = {}
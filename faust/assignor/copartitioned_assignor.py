@@ -1,12 +1,26 @@
 """Copartitioned Assignor."""
 
 from itertools import cycle
-from math import ceil, floor
-from typing import Counter, Iterable, Iterator, MutableMapping, Optional, Sequence, Set
+from math import ceil, floor, inf
+from typing import (
+    Counter,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+)
 
 from .client_assignment import CopartitionedAssignment
 
-__all__ = ["CopartitionedAssignor"]
+__all__ = ["RecoveryCosts", "CopartitionedAssignor"]
+
+#: Number of changelog messages each client would need to recover
+#: to serve a partition (partition -> client -> cost).
+#: Clients without any local state for the partition are not included.
+RecoveryCosts = Mapping[int, Mapping[str, int]]
 
 
 class CopartitionedAssignor:
@@ -16,8 +30,10 @@ class CopartitionedAssignor:
 
     The assignment is sticky which uses the following heuristics:
 
-    - Maintain existing assignments as long as within max_capacity for each client
-    - Assign actives to standbys when possible (within max_capacity)
+    - Maintain existing assignments as long as within max_capacity for each client,
+      releasing first those another client has more recent local state for
+    - Assign actives to the client with the least changelog to recover,
+      then to standbys when possible (within max_capacity)
     - Assign in order to fill max_capacity of the clients
 
     We optimize for not over utilizing resources instead of under-utilizing
@@ -34,6 +50,7 @@ class CopartitionedAssignor:
     num_partitions: int
     replicas: int
     topics: Set[str]
+    recovery_costs: RecoveryCosts
 
     _num_clients: int
     _client_assignments: MutableMapping[str, CopartitionedAssignment]
@@ -45,6 +62,7 @@ class CopartitionedAssignor:
         num_partitions: int,
         replicas: int,
         capacity: Optional[int] = None,
+        recovery_costs: Optional[RecoveryCosts] = None,
     ) -> None:
         self._num_clients = len(cluster_asgn)
         assert self._num_clients, "Should assign to at least 1 client"
@@ -61,6 +79,7 @@ class CopartitionedAssignor:
             else capacity
         )
         self.topics = set(topics)
+        self.recovery_costs = recovery_costs or {}
 
         assert (
             self.max_capacity * self._num_clients >= self.num_partitions
@@ -81,12 +100,41 @@ class CopartitionedAssignor:
             )
             else self.max_capacity
         )
-        for copartitioned in self._client_assignments.values():
+        receivers = {
+            client
+            for client, copartitioned in self._client_assignments.items()
+            if len(copartitioned.actives) < capacity
+        }
+        for client, copartitioned in self._client_assignments.items():
+            self._release_to_warmer(client, copartitioned, capacity, receivers)
             copartitioned.unassign_extras(capacity, self.replicas)
         self._assign(active=True)
         self._assign(active=False)
         return self._client_assignments
 
+    def _release_to_warmer(
+        self,
+        client: str,
+        assignment: CopartitionedAssignment,
+        capacity: int,
+        receivers: Set[str],
+    ) -> None:
+        # When over capacity, give up the actives that one of the clients
+        # with room to spare can recover with the least extra work
+        # compared to keeping them.
+        extras = len(assignment.actives) - capacity
+        if extras <= 0 or not self.recovery_costs:
+            return
+
+        def penalty(partition: int) -> float:
+            costs = self.recovery_costs.get(partition, {})
+            others = (cost for other, cost in costs.items() if other in receivers)
+            return min(others, default=inf) - costs.get(client, 0)
+
+        released = sorted(assignment.actives, key=lambda p: (penalty(p), p))
+        for partition in released[:extras]:
+            assignment.unassign_partition(partition, active=True)
+
     def _all_assigned(self, active: bool) -> bool:
         assigned_counts = self._assigned_partition_counts(active)
         total_assigns = self._total_assigns_per_partition(active)
@@ -174,6 +222,21 @@ class CopartitionedAssignor:
                 return assignment
         return None
 
+    def _find_warmest(
+        self, partition: int, active: bool
+    ) -> Optional[CopartitionedAssignment]:
+        # The client with local state needing the least recovery
+        costs = self.recovery_costs.get(partition)
+        if not costs:
+            return None
+        for client in sorted(costs, key=lambda c: (costs[c], c)):
+            assignment = self._client_assignments.get(client)
+            if assignment is not None and self._can_assign(
+                assignment, partition, active
+            ):
+                return assignment
+        return None
+
     def _find_round_robin_assignable(
         self,
         partition: int,
@@ -191,7 +254,8 @@ class CopartitionedAssignor:
         # We do round robin assignment as follows:
         # - Sort the candidate clients by the number of partitions already assigned,
         #   to improve the overall balance of the assignment process
-        # - For actives, we first try to assign to a standby
+        # - We first try the client with the most recent local state
+        # - For actives, we then try to assign to a standby
         # - For standby, we offset the start for round robin to evenly
         # distribute standbys for colocated actives
         # - We do round robin over the sorted clients
@@ -215,12 +279,17 @@ class CopartitionedAssignor:
         while unassigned:
             partition = unassigned.pop(0)
 
-            assign_to = None
+            # Recovering from local state is cheaper than from scratch
+            assign_to = self._find_warmest(partition, active)
 
             if active:
-                # For actives we first try to find a standby to assign to
-                assign_to = self._find_promotable_standby(partition, candidates)
-                if assign_to is not None:
+                # For actives we then try to find a standby to assign to
+                assign_to = assign_to or self._find_promotable_standby(
+                    partition, candidates
+                )
+                if assign_to is not None and assign_to.partition_assigned(
+                    partition, active=False
+                ):
                     # Unassign standby which will be promoted
                     assign_to.unassign_partition(partition, active=False)
             else:
@@ -229,8 +298,6 @@ class CopartitionedAssignor:
                 for _ in range(partition):
                     next(candidates)
 
-            assert assign_to is None or active
-
             assign_to = assign_to or self._find_round_robin_assignable(
                 partition, candidates, active
             )
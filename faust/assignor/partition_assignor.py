@@ -3,7 +3,17 @@
 import socket
 import zlib
 from collections import defaultdict
-from typing import Iterable, List, Mapping, MutableMapping, Sequence, Set, cast
+from typing import (
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 from aiokafka.cluster import ClusterMetadata
 from aiokafka.coordinator.assignors.abstract import AbstractPartitionAssignor
@@ -16,16 +26,26 @@ from yarl import URL
 
 from faust.types.app import AppT
 from faust.types.assignor import (
+    AssignedPartitions,
     HostToPartitionMap,
     PartitionAssignorT,
     TopicToPartitionMap,
+    TopicToPartitionOffsets,
+    TopicToPartitionWeights,
 )
+from faust.types.enums import AssignmentWeight
 from faust.types.tables import TableManagerT
 from faust.types.tuples import TP
 
-from .client_assignment import ClientAssignment, ClientMetadata
+from . import assignment_codec
+from .client_assignment import (
+    ClientAssignment,
+    ClientMetadata,
+    CopartitionedAssignment,
+)
 from .cluster_assignment import ClusterAssignment
-from .copartitioned_assignor import CopartitionedAssignor
+from .copartitioned_assignor import CopartitionedAssignor, RecoveryCosts
+from .weighted_assignor import PartitionWeights, WeightedCopartitionedAssignor
 
 __all__ = [
     "MemberAssignmentMapping",
@@ -43,6 +63,11 @@ MemberSubscriptionMapping = MutableMapping[str, List[str]]
 ClientMetadataMapping = MutableMapping[str, ClientMetadata]
 ClientAssignmentMapping = MutableMapping[str, ClientAssignment]
 CopartitionedGroups = MutableMapping[int, Iterable[Set[str]]]
+CopartitionedAssignorT = Union[CopartitionedAssignor, WeightedCopartitionedAssignor]
+
+#: Members from this assignor version on understand the compact
+#: assignment format of :mod:`faust.assignor.assignment_codec`.
+COMPACT_ASSIGNMENT_VERSION = 5
 
 logger = get_logger(__name__)
 
@@ -62,11 +87,12 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):  # type:
     _member_urls: MutableMapping[str, str]
     _changelog_distribution: HostToPartitionMap
     _external_topic_distribution: HostToPartitionMap
-    _active_tps: Set[TP]
-    _standby_tps: Set[TP]
+    _active_tps: AssignedPartitions
+    _standby_tps: AssignedPartitions
     _tps_url: MutableMapping[TP, str]
     _external_tps_url: MutableMapping[TP, str]
     _topic_groups: MutableMapping[str, int]
+    _changelog_offsets: TopicToPartitionOffsets
 
     def __init__(self, app: AppT, replicas: int = 0) -> None:
         AbstractPartitionAssignor.__init__(self)
@@ -79,9 +105,10 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):  # type:
         self._member_urls = {}
         self._tps_url = {}
         self._external_tps_url = {}
-        self._active_tps = set()
-        self._standby_tps = set()
+        self._active_tps = AssignedPartitions()
+        self._standby_tps = AssignedPartitions()
         self._topic_groups = {}
+        self._changelog_offsets = {}
 
     def group_for_topic(self, topic: str) -> int:
         return self._topic_groups[topic]
@@ -116,33 +143,89 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):  # type:
 
     @property
     def _metadata(self) -> ClientMetadata:
+        # The leader has no use for the distributions we got from the
+        # previous assignment, so we leave them out: they would grow
+        # the JoinGroup request with every member and partition.
+        # Still JSON, as the leader may run an older version of Faust.
         return ClientMetadata(
             assignment=self._assignment,
             url=str(self._url),
-            changelog_distribution=self.changelog_distribution,
-            external_topic_distribution=self.external_topic_distribution,
+            changelog_distribution={},
+            external_topic_distribution={},
             topic_groups=self._topic_groups,
+            partition_weights=self._local_partition_weights(),
+            changelog_offsets=self._changelog_offsets,
         )
 
+    def _local_partition_weights(self) -> TopicToPartitionWeights:
+        weighting = self.app.conf.consumer_assignment_weight
+        if weighting == AssignmentWeight.NONE:
+            return {}
+        monitor = self.app.monitor
+        tp_weights: Mapping[TP, float]
+        if weighting == AssignmentWeight.BYTES:
+            tp_weights = monitor.tp_bytes_s
+        else:
+            tp_weights = {**monitor.tp_lag_at_rebalance, **monitor.tp_lags()}
+        weights: TopicToPartitionWeights = defaultdict(list)
+        for tp in sorted(self._assignment.active_tps):
+            weight = tp_weights.get(tp)
+            if weight is not None:
+                weights[tp.topic].append((tp.partition, float(weight)))
+        return dict(weights)
+
+    def _local_changelog_offsets(self) -> TopicToPartitionOffsets:
+        # Tells the leader how much table state we already have on disk,
+        # so partitions can go where there is the least to recover.
+        # Global tables are recovered in full by every worker anyway.
+        offsets: TopicToPartitionOffsets = {}
+        for table in self._table_manager.data.values():
+            if not table.is_global:
+                persisted = table.persisted_offsets()
+                if persisted:
+                    offsets[table._changelog_topic_name()] = sorted(persisted.items())
+        return offsets
+
+    def on_partitions_revoked(self, revoked: Set[TP]) -> None:
+        """Call when partitions are revoked, before joining the group.
+
+        Reads the changelog offsets sent to the group leader, as that
+        can open RocksDB databases: too slow to do in :meth:`metadata`,
+        while the group is waiting for us to join.
+        """
+        self._changelog_offsets = self._local_changelog_offsets()
+
     @property
     def _url(self) -> URL:
         return self.app.conf.canonical_url
 
     def on_assignment(self, assignment: ConsumerProtocolMemberMetadata) -> None:
-        metadata = cast(
-            ClientMetadata, ClientMetadata.loads(self._decompress(assignment.user_data))
-        )
+        metadata = assignment_codec.loads_assignment(assignment.user_data)
         self._assignment = metadata.assignment
         self._topic_groups = dict(metadata.topic_groups)
-        self._active_tps = self._assignment.active_tps
-        self._standby_tps = self._assignment.standby_tps
+        generation = self._active_tps.generation + 1
+        self._active_tps = AssignedPartitions(
+            self._assignment.active_tps, generation=generation
+        )
+        self._standby_tps = AssignedPartitions(
+            self._assignment.standby_tps, generation=generation
+        )
         self.changelog_distribution = metadata.changelog_distribution
         self.external_topic_distribution = metadata.external_topic_distribution
-        a = sorted(assignment.assignment)
-        b = sorted(self._assignment.kafka_protocol_assignment(self._table_manager))
+        # Partitions are sorted by the compact assignment format.
+        a = self._sorted_protocol_assignment(assignment.assignment)
+        b = self._sorted_protocol_assignment(
+            self._assignment.kafka_protocol_assignment(self._table_manager)
+        )
         assert a == b, f"{a!r} != {b!r}"
         assert metadata.url == str(self._url)
 
+    @classmethod
+    def _sorted_protocol_assignment(
+        cls, assignment: Iterable[Tuple[str, Iterable[int]]]
+    ) -> List[Tuple[str, List[int]]]:
+        return sorted((topic, sorted(partitions)) for topic, partitions in assignment)
+
     def metadata(self, topics: Set[str]) -> ConsumerProtocolMemberMetadata:
         return ConsumerProtocolMemberMetadata(
             self.version, list(topics), self._metadata.dumps()
@@ -284,11 +367,8 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):  # type:
                 assert len(topics) > 0 and num_partitions > 0
                 # Get assignment for unique copartitioned group
                 assgn = cluster_assgn.copartitioned_assignments(topics)
-                assignor = CopartitionedAssignor(
-                    topics=topics,
-                    cluster_asgn=assgn,
-                    num_partitions=num_partitions,
-                    replicas=self.replicas,
+                assignor = self._copartitioned_assignor(
+                    topics, assgn, num_partitions, clients_metadata
                 )
                 # Update client assignments for copartitioned group
                 for client, copart_assn in assignor.get_assignment().items():
@@ -306,9 +386,83 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):  # type:
             changelog_distribution,
             external_topic_distribution,
             topic_to_group_id,
+            member_metadata,
         )
         return res
 
+    def _copartitioned_assignor(
+        self,
+        topics: Set[str],
+        assgn: MutableMapping[str, CopartitionedAssignment],
+        num_partitions: int,
+        clients_metadata: ClientMetadataMapping,
+    ) -> CopartitionedAssignorT:
+        recovery_costs = self._recovery_costs(topics, clients_metadata)
+        if self.app.conf.consumer_assignment_weight != AssignmentWeight.NONE:
+            return WeightedCopartitionedAssignor(
+                topics=topics,
+                cluster_asgn=assgn,
+                num_partitions=num_partitions,
+                replicas=self.replicas,
+                weights=self._group_partition_weights(topics, clients_metadata),
+                recovery_costs=recovery_costs,
+            )
+        return CopartitionedAssignor(
+            topics=topics,
+            cluster_asgn=assgn,
+            num_partitions=num_partitions,
+            replicas=self.replicas,
+            recovery_costs=recovery_costs,
+        )
+
+    @classmethod
+    def _recovery_costs(
+        cls, topics: Set[str], clients_metadata: ClientMetadataMapping
+    ) -> RecoveryCosts:
+        # The number of changelog messages each client would have to read
+        # to bring a partition of the group up to date, measured against
+        # the most recent offset any client has persisted.  A changelog
+        # the client has no state for costs the full best offset.
+        # Clients with no state at all for a partition are left out.
+        client_offsets: MutableMapping[str, MutableMapping[TP, int]] = {}
+        best: MutableMapping[int, MutableMapping[str, int]] = defaultdict(dict)
+        for client, metadata in clients_metadata.items():
+            for topic, offsets in metadata.changelog_offsets.items():
+                if topic in topics:
+                    for partition, offset in offsets:
+                        client_offsets.setdefault(client, {})[
+                            TP(topic, partition)
+                        ] = offset
+                        best_offsets = best[partition]
+                        best_offsets[topic] = max(offset, best_offsets.get(topic, -1))
+        costs: MutableMapping[int, MutableMapping[str, int]] = defaultdict(dict)
+        for client, tp_offsets in client_offsets.items():
+            for partition in {tp.partition for tp in tp_offsets}:
+                costs[partition][client] = sum(
+                    best_offset - tp_offsets.get(TP(topic, partition), -1)
+                    for topic, best_offset in best[partition].items()
+                )
+        return costs
+
+    @classmethod
+    def _group_partition_weights(
+        cls, topics: Set[str], clients_metadata: ClientMetadataMapping
+    ) -> PartitionWeights:
+        # A partition of a copartitioned group weighs the sum of its
+        # topics. Should two members report the same TP (e.g. a zombie)
+        # we take the larger figure.
+        by_tp: MutableMapping[TP, float] = {}
+        for metadata in clients_metadata.values():
+            for topic, weights in metadata.partition_weights.items():
+                if topic in topics:
+                    for partition, weight in weights:
+                        tp = TP(topic, partition)
+                        by_tp[tp] = max(weight, by_tp.get(tp, 0.0))
+        group_weights: MutableMapping[int, float] = defaultdict(float)
+        for tp, weight in by_tp.items():
+            group_weights[tp.partition] += weight
+        return group_weights
+
     def _global_table_standby_assignments(
         self,
         assignments: ClientAssignmentMapping,
@@ -353,31 +507,53 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):  # type:
         cl_distribution: HostToPartitionMap,
         tp_distribution: HostToPartitionMap,
         topic_groups: Mapping[str, int],
+        member_metadata: MemberMetadataMapping,
     ) -> MemberAssignmentMapping:
+        distributions = assignment_codec.dumps_distributions(
+            cl_distribution, tp_distribution
+        )
         return {
             client: ConsumerProtocolMemberAssignment(
                 self.version,
                 sorted(assignment.kafka_protocol_assignment(self._table_manager)),
-                self._compress(
-                    ClientMetadata(
-                        assignment=assignment,
-                        url=self._member_urls[client],
-                        changelog_distribution=cl_distribution,
-                        external_topic_distribution=tp_distribution,
-                        topic_groups=topic_groups,
-                    ).dumps(),
+                self._dumps_assignment(
+                    member_metadata[client].version,
+                    assignment,
+                    self._member_urls[client],
+                    cl_distribution,
+                    tp_distribution,
+                    topic_groups,
+                    distributions,
                 ),
             )
             for client, assignment in assignments.items()
         }
 
     @classmethod
-    def _compress(cls, raw: bytes) -> bytes:
-        return zlib.compress(raw)
-
-    @classmethod
-    def _decompress(cls, compressed: bytes) -> bytes:
-        return zlib.decompress(compressed)
+    def _dumps_assignment(
+        cls,
+        member_version: int,
+        assignment: ClientAssignment,
+        url: str,
+        cl_distribution: HostToPartitionMap,
+        tp_distribution: HostToPartitionMap,
+        topic_groups: Mapping[str, int],
+        distributions: bytes,
+    ) -> bytes:
+        if member_version >= COMPACT_ASSIGNMENT_VERSION:
+            return assignment_codec.dumps_assignment(
+                assignment, url, topic_groups, distributions
+            )
+        # Member runs an older version of Faust, expecting compressed JSON.
+        return zlib.compress(
+            ClientMetadata(
+                assignment=assignment,
+                url=url,
+                changelog_distribution=cl_distribution,
+                external_topic_distribution=tp_distribution,
+                topic_groups=topic_groups,
+            ).dumps()
+        )
 
     @classmethod
     def _topics_filtered(
@@ -425,21 +601,13 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):  # type:
 
     @property
     def version(self) -> int:
-        return 4
+        return COMPACT_ASSIGNMENT_VERSION
 
-    def assigned_standbys(self) -> Set[TP]:
-        return {
-            TP(topic, partition)
-            for topic, partitions in self._assignment.standbys.items()
-            for partition in partitions
-        }
+    def assigned_standbys(self) -> AssignedPartitions:
+        return self._standby_tps
 
-    def assigned_actives(self) -> Set[TP]:
-        return {
-            TP(topic, partition)
-            for topic, partitions in self._assignment.actives.items()
-            for partition in partitions
-        }
+    def assigned_actives(self) -> AssignedPartitions:
+        return self._active_tps
 
     def table_metadata(self, topic: str) -> HostToPartitionMap:
         return {
@@ -0,0 +1,285 @@
+"""Weighted Copartitioned Assignor."""
+
+import heapq
+import math
+from collections import defaultdict
+from typing import Iterable, List, Mapping, MutableMapping, Optional, Set, Tuple
+
+from .client_assignment import CopartitionedAssignment
+from .copartitioned_assignor import RecoveryCosts
+
+__all__ = ["PartitionWeights", "WeightedCopartitionedAssignor"]
+
+#: Load of each partition in a copartitioned group.
+PartitionWeights = Mapping[int, float]
+
+#: Fraction a client may exceed its fair share of the load
+#: before we start moving its partitions elsewhere.
+DEFAULT_TOLERANCE = 0.1
+
+
+class WeightedCopartitionedAssignor:
+    """Copartitioned assignor balancing partition weights.
+
+    Where :class:`~faust.assignor.copartitioned_assignor.CopartitionedAssignor`
+    balances the *number* of partitions each client gets, this assignor
+    balances the sum of their weights (bytes/s, lag, ...), so that a client
+    with one hot partition can be given fewer partitions than the rest.
+
+    All copartitioned topics must have the same number of partitions.
+
+    The assignment is sticky which uses the following heuristics:
+
+    - Maintain existing actives unless the client is loaded more than
+      ``tolerance`` above its fair share (``total weight / num clients``),
+      in which case the partitions that get it back under the limit
+      while moving the least weight are released.
+    - Assign released and new partitions in order of decreasing weight,
+      preferring the client with the least changelog to recover
+      (see ``recovery_costs``) or a standby of the partition if that
+      keeps it within the limit, and otherwise the least loaded client.
+    - Maintain existing standbys, and place missing ones on the client
+      with the least to recover, or the least standby load, that does
+      not already hold the partition.
+
+    Partitions missing from ``weights`` are given the mean weight of
+    the known partitions (or ``1.0`` if none are known), which makes the
+    assignor degrade to plain count balancing when no client reports load.
+    """
+
+    num_partitions: int
+    replicas: int
+    tolerance: float
+    topics: Set[str]
+    weights: MutableMapping[int, float]
+    recovery_costs: RecoveryCosts
+
+    _num_clients: int
+    _client_assignments: MutableMapping[str, CopartitionedAssignment]
+
+    def __init__(
+        self,
+        topics: Iterable[str],
+        cluster_asgn: MutableMapping[str, CopartitionedAssignment],
+        num_partitions: int,
+        replicas: int,
+        weights: Optional[PartitionWeights] = None,
+        tolerance: float = DEFAULT_TOLERANCE,
+        recovery_costs: Optional[RecoveryCosts] = None,
+    ) -> None:
+        self._num_clients = len(cluster_asgn)
+        assert self._num_clients, "Should assign to at least 1 client"
+        self.num_partitions = num_partitions
+        self.replicas = min(replicas, self._num_clients - 1)
+        self.tolerance = tolerance
+        self.topics = set(topics)
+        self.weights = self._complete_weights(weights or {})
+        self.recovery_costs = recovery_costs or {}
+        self._client_assignments = cluster_asgn
+
+    def _complete_weights(
+        self, weights: PartitionWeights
+    ) -> MutableMapping[int, float]:
+        known = [
+            max(weight, 0.0)
+            for partition, weight in weights.items()
+            if 0 <= partition < self.num_partitions
+        ]
+        default = sum(known) / len(known) if known and sum(known) else 1.0
+        completed = {
+            partition: max(weights.get(partition, default), 0.0)
+            for partition in range(self.num_partitions)
+        }
+        if not any(completed.values()):
+            # every reported partition is idle: fall back to counting.
+            completed = dict.fromkeys(completed, 1.0)
+        return completed
+
+    @property
+    def total_weight(self) -> float:
+        return sum(self.weights.values())
+
+    @property
+    def fair_share(self) -> float:
+        return self.total_weight / self._num_clients
+
+    @property
+    def max_load(self) -> float:
+        return self.fair_share * (1.0 + self.tolerance)
+
+    def load(self, assignment: CopartitionedAssignment, active: bool) -> float:
+        """Return the sum of weights of partitions assigned to client."""
+        weights = self.weights
+        return sum(weights[p] for p in assignment.get_assigned_partitions(active))
+
+    def get_assignment(self) -> MutableMapping[str, CopartitionedAssignment]:
+        self._discard_invalid()
+        self._assign_actives()
+        self._assign_standbys()
+        return self._client_assignments
+
+    def _clients(self) -> List[str]:
+        # Sorted so the result does not depend on member metadata order.
+        return sorted(self._client_assignments)
+
+    def _discard_invalid(self) -> None:
+        # Out-of-range partitions (topic shrunk/recreated) and duplicate
+        # actives (zombies) are dropped, the first client keeps the partition.
+        seen: Set[int] = set()
+        for client in self._clients():
+            assignment = self._client_assignments[client]
+            for partition in sorted(assignment.actives):
+                if partition >= self.num_partitions or partition in seen:
+                    assignment.unassign_partition(partition, active=True)
+                else:
+                    seen.add(partition)
+            for partition in sorted(assignment.standbys):
+                if partition >= self.num_partitions:
+                    assignment.unassign_partition(partition, active=False)
+            assignment.validate()
+
+    def _assign_actives(self) -> None:
+        max_load = self.max_load
+        unassigned = set(range(self.num_partitions))
+        for client in self._clients():
+            assignment = self._client_assignments[client]
+            self._shed_load(assignment, max_load, active=True)
+            unassigned.difference_update(assignment.actives)
+
+        loads = {
+            client: self.load(assignment, active=True)
+            for client, assignment in self._client_assignments.items()
+        }
+        standby_holders: MutableMapping[int, List[str]] = defaultdict(list)
+        for client in self._clients():
+            for partition in self._client_assignments[client].standbys:
+                standby_holders[partition].append(client)
+        # Least loaded first, then fewest partitions, then by name.
+        heap = [
+            (loads[client], assignment.num_assigned(active=True), client)
+            for client, assignment in self._client_assignments.items()
+        ]
+        heapq.heapify(heap)
+        for partition in sorted(unassigned, key=lambda p: (-self.weights[p], p)):
+            weight = self.weights[partition]
+            warm = self._warm_client(
+                partition, standby_holders[partition], loads, max_load, active=True
+            )
+            client = warm or self._pop_least_loaded(heap, loads)
+            assignment = self._client_assignments[client]
+            if assignment.partition_assigned(partition, active=False):
+                assignment.promote_standby_to_active(partition)
+            else:
+                assignment.assign_partition(partition, active=True)
+            loads[client] += weight
+            heapq.heappush(
+                heap, (loads[client], assignment.num_assigned(active=True), client)
+            )
+
+    @classmethod
+    def _pop_least_loaded(
+        cls, heap: List[Tuple[float, int, str]], loads: Mapping[str, float]
+    ) -> str:
+        # Entries are not removed when a client's load changes,
+        # so skip the ones that are out of date.
+        while True:
+            load, _, client = heapq.heappop(heap)
+            if load == loads[client]:
+                return client
+
+    def _warm_client(
+        self,
+        partition: int,
+        holders: Iterable[str],
+        loads: Mapping[str, float],
+        max_load: float,
+        active: bool,
+    ) -> Optional[str]:
+        # Standby holders and clients reporting local state for the
+        # partition, least recovery first, if it keeps them within the
+        # limit (an idle client can always take it).
+        weight = self.weights[partition]
+        costs = self.recovery_costs.get(partition, {})
+        candidates = [
+            client
+            for client in {*holders, *costs}
+            if client in loads
+            and (loads[client] + weight <= max_load or not loads[client])
+            and self._client_assignments[client].can_assign(partition, active)
+        ]
+        if candidates:
+            return min(candidates, key=lambda c: (costs.get(c, math.inf), loads[c], c))
+        return None
+
+    def _shed_load(
+        self, assignment: CopartitionedAssignment, max_load: float, active: bool
+    ) -> None:
+        load = self.load(assignment, active)
+        # The heaviest partition always stays: moving it would only
+        # overload somebody else, so the others make room around it.
+        candidates = sorted(
+            assignment.get_assigned_partitions(active),
+            key=lambda p: (self.weights[p], p),
+        )[:-1]
+        while load > max_load and candidates:
+            excess = load - max_load
+            # Release the lightest partition that alone removes the excess,
+            # or the heaviest candidate if none does.
+            victim = next(
+                (p for p in candidates if self.weights[p] >= excess), candidates[-1]
+            )
+            candidates.remove(victim)
+            assignment.unassign_partition(victim, active)
+            load -= self.weights[victim]
+
+    def _assign_standbys(self) -> None:
+        if not self.replicas:
+            for assignment in self._client_assignments.values():
+                assignment.standbys.clear()
+            return
+        counts: MutableMapping[int, int] = dict.fromkeys(range(self.num_partitions), 0)
+        for client in self._clients():
+            assignment = self._client_assignments[client]
+            for partition in sorted(assignment.standbys):
+                if counts[partition] >= self.replicas:
+                    assignment.unassign_partition(partition, active=False)
+                else:
+                    counts[partition] += 1
+
+        loads = {
+            client: self.load(assignment, active=False)
+            for client, assignment in self._client_assignments.items()
+        }
+        heap = [
+            (loads[client], assignment.num_assigned(active=False), client)
+            for client, assignment in self._client_assignments.items()
+        ]
+        heapq.heapify(heap)
+        max_load = self.max_load * self.replicas
+        for partition in sorted(counts, key=lambda p: (-self.weights[p], p)):
+            skipped = []
+            for _ in range(self.replicas - counts[partition]):
+                warm = self._warm_client(partition, (), loads, max_load, active=False)
+                client = warm or self._pop_least_loaded(heap, loads)
+                assignment = self._client_assignments[client]
+                # Clients already holding the partition are put back
+                # once it has all its replicas.
+                while not assignment.can_assign(partition, active=False):
+                    skipped.append(client)
+                    client = self._pop_least_loaded(heap, loads)
+                    assignment = self._client_assignments[client]
+                assignment.assign_partition(partition, active=False)
+                loads[client] += self.weights[partition]
+                heapq.heappush(
+                    heap,
+                    (loads[client], assignment.num_assigned(active=False), client),
+                )
+            for client in skipped:
+                heapq.heappush(
+                    heap,
+                    (
+                        loads[client],
+                        self._client_assignments[client].num_assigned(active=False),
+                        client,
+                    ),
+                )
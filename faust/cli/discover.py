@@ -0,0 +1,69 @@
+"""Program ``faust discover`` used to list and record autodiscovery."""
+
+from pathlib import Path
+from typing import Optional
+
+from .base import AppCommand, option
+
+__all__ = ["discover"]
+
+
+class discover(AppCommand):
+    """List everything found by autodiscovery, or write manifest.
+
+    With ``--write-manifest`` the manifest used by the
+    :setting:`autodiscover_manifest` setting is written, so that
+    workers do not need to scan packages at startup.
+    """
+
+    title = "Autodiscovery"
+    headers = ["category", "name"]
+
+    options = [
+        option(
+            "--write-manifest",
+            is_flag=True,
+            default=False,
+            help="Write autodiscovery manifest.",
+        ),
+        option(
+            "--manifest",
+            default=None,
+            help="Manifest path (default: autodiscover_manifest setting).",
+        ),
+    ]
+
+    async def run(self, write_manifest: bool, manifest: Optional[str]) -> None:
+        """Scan packages, and list what was found or write the manifest."""
+        found = self.app.discovery_manifest()
+        if write_manifest:
+            path = self.manifest_path(manifest)
+            found.write(path)
+            self.say(
+                f"Wrote {len(found.modules)} modules to "
+                f"autodiscovery manifest {path}"
+            )
+        else:
+            self.say(
+                self.tabulate(
+                    [
+                        [category, self.abbreviate_fqdn(name)]
+                        for category, names in found.entries.items()
+                        for name in names
+                    ],
+                    headers=self.headers,
+                    title=self.title,
+                )
+            )
+
+    def manifest_path(self, manifest: Optional[str]) -> Path:
+        """Return path of manifest to write."""
+        if manifest is not None:
+            return Path(manifest)
+        path = self.app.conf.autodiscover_manifest
+        if path is None:
+            raise self.UsageError(
+                "Please set the autodiscover_manifest setting, "
+                "or specify the path using --manifest"
+            )
+        return path
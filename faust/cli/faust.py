@@ -5,6 +5,7 @@ from .agents import agents
 from .base import call_command, cli
 from .clean_versions import clean_versions
 from .completion import completion
+from .discover import discover
 from .livecheck import livecheck
 from .model import model
 from .models import models
@@ -19,6 +20,7 @@ __all__ = [
     "clean_versions",
     "cli",
     "completion",
+    "discover",
     "livecheck",
     "model",
     "models",
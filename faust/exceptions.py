@@ -17,6 +17,7 @@ __all__ = [
     "KeyDecodeError",
     "ValueDecodeError",
     "SameNode",
+    "RPCError",
     "ProducerSendError",
     "ConsumerNotStarted",
     "PartitionsMismatch",
@@ -99,6 +100,10 @@ class SameNode(FaustPredicate):
     """Exception raised by router when data is located on same node."""
 
 
+class RPCError(FaustError):
+    """Remote procedure call to another worker failed."""
+
+
 class ProducerSendError(FaustError):
     """Error while sending attached messages prior to commit."""
 
@@ -1,8 +1,14 @@
 """Join strategies."""
 
-from typing import Any, Optional, Tuple
+from collections import defaultdict
+from itertools import islice
+from typing import Any, ClassVar, Dict, List, Optional, Set, Tuple, cast
+from weakref import WeakSet
 
-from .types import EventT, FieldDescriptorT, JoinableT, JoinT
+from .exceptions import Skip
+from .types import ChannelT, EventT, FieldDescriptorT, JoinableT, JoinT
+from .types.stores import StoreT
+from .types.tables import TableT
 
 __all__ = [
     "Join",
@@ -10,8 +16,13 @@ __all__ = [
     "LeftJoin",
     "InnerJoin",
     "OuterJoin",
+    "TableJoin",
+    "LeftTableJoin",
 ]
 
+#: Value cached for keys not found in the table.
+MISSING = object()
+
 
 class Join(JoinT):
     """Base class for join strategies."""
@@ -49,3 +60,139 @@ class InnerJoin(Join):
 
 class OuterJoin(Join):
     """Outer-join strategy."""
+
+
+class TableJoin(Join):
+    """Inner join of stream values with table values, by key.
+
+    Every value is joined with the value in the table at the key of the
+    event, or at the ``on`` field of the value.  The joined stream
+    yields ``(value, table_value)`` tuples, and skips values with no
+    key in the table.
+
+    The keys of the events already fetched for the stream are
+    read from the table together (see
+    :meth:`~faust.types.stores.StoreT.get_many`), and kept until
+    those events are processed, so that most events do not read
+    from the table storage at all.  Keys changed in the table
+    in the meantime are read again.
+    """
+
+    #: Skip values with no key in the table.
+    inner: ClassVar[bool] = True
+
+    #: Max number of fetched events to read the keys of at once.
+    max_prefetch: int = 10_000
+
+    table: TableT
+    on: Optional[FieldDescriptorT]
+
+    def __init__(
+        self,
+        *,
+        stream: JoinableT,
+        table: TableT,
+        on: Optional[FieldDescriptorT] = None,
+    ) -> None:
+        super().__init__(stream=stream, fields=() if on is None else (on,))
+        self.table = table
+        self.on = on
+        self._cache: Dict[Any, Any] = {}
+        self._remaining = 0
+        table_joins = getattr(table, "_joins", None)
+        if table_joins is not None:
+            cast(WeakSet, table_joins).add(self)
+
+    async def process(self, value: Any) -> Any:
+        """Join value with the table value at its key."""
+        event = _current_event()
+        key = self._key_of(event, value)
+        if self._remaining <= 0:
+            self._prefetch(event, key)
+        elif key not in self._cache:
+            self._read(self._partition_of(event), [key])
+        self._remaining -= 1
+        table_value = self._cache[key]
+        if table_value is MISSING:
+            if self.inner:
+                raise Skip()
+            table_value = None
+        return value, table_value
+
+    def forget(self, key: Any) -> None:
+        """Forget value cached for key, as it changed in the table."""
+        self._cache.pop(key, None)
+
+    def _prefetch(self, event: Optional[EventT], key: Any) -> None:
+        self._cache.clear()
+        keys: Dict[Optional[int], Set[Any]] = defaultdict(set)
+        keys[self._partition_of(event)].add(key)
+        pending = self._pending_events()
+        key_of = self._key_of
+        partition_of = self._partition_of
+        for pending_event in pending:
+            try:
+                pending_key = key_of(pending_event, pending_event.value)
+                keys[partition_of(pending_event)].add(pending_key)
+            except (AttributeError, TypeError):
+                # value changed by stream processors: read when processed.
+                pass
+        for partition, partition_keys in keys.items():
+            self._read(partition, partition_keys)
+        self._remaining = 1 + len(pending)
+
+    def _read(self, partition: Optional[int], keys: Any) -> None:
+        found = cast(StoreT, self.table.data).get_many(keys, partition=partition)
+        cache = self._cache
+        on_key_get = self.table.on_key_get
+        for key in keys:
+            cache[key] = found.get(key, MISSING)
+            on_key_get(key)
+
+    def _pending_events(self) -> List[EventT]:
+        channel = cast(Any, self.stream).channel
+        if not isinstance(channel, ChannelT):
+            return []
+        # XXX peeks at the events buffered by asyncio.Queue.
+        buffered = cast(Any, channel.queue)._queue
+        return [
+            event
+            for event in islice(buffered, self.max_prefetch)
+            if isinstance(event, EventT)
+        ]
+
+    def _key_of(self, event: Optional[EventT], value: Any) -> Any:
+        if self.on is not None:
+            return self.on.getattr(value)
+        if event is None:
+            raise TypeError("Cannot join value without event key")
+        return event.key
+
+    def _partition_of(self, event: Optional[EventT]) -> Optional[int]:
+        table = self.table
+        if event is None or table.is_global or table.use_partitioner:
+            return None
+        return event.message.partition
+
+    def __eq__(self, other: Any) -> bool:
+        return super().__eq__(other) and other.table is self.table
+
+    def __hash__(self) -> int:
+        return object.__hash__(self)
+
+
+class LeftTableJoin(TableJoin):
+    """Left join of stream values with table values, by key.
+
+    As :class:`TableJoin`, but values with no key in the table are
+    joined with :const:`None`.
+    """
+
+    inner = False
+
+
+def _current_event() -> Optional[EventT]:
+    # faust.streams imports this module.
+    from .streams import current_event
+
+    return current_event()
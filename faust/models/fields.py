@@ -309,6 +309,21 @@ class FieldDescriptor(  # type: ignore[misc,valid-type]
     ) -> Optional[T]:
         return cast(T, value)
 
+    def decodes_as_is(self) -> bool:
+        """Return :const:`True` if deserialized values are used unchanged.
+
+        Compiled model decoders store the value of such fields
+        directly, without going through :meth:`to_python`
+        and :meth:`__set__`.
+        """
+        cls = type(self)
+        if self.coerce or self.tag or cls.prepare_value not in _COERCING_PREPARE:
+            return False
+        # lazily coerced fields are converted on first access instead.
+        return self.lazy_coercion or (
+            self._to_python is None and cls.to_python is FieldDescriptor.to_python
+        )
+
     def _copy_descriptors(self, typ: Optional[Type] = None) -> None:
         if typ is not None and _is_concrete_model(typ):
             typ._contribute_field_descriptors(self, typ._options, parent=self)
@@ -595,6 +610,20 @@ class BytesField(CharField[bytes]):
             return value
 
 
+#: ``prepare_value`` implementations that only change values when coercing.
+_COERCING_PREPARE = frozenset(
+    {
+        FieldDescriptor.prepare_value,
+        BooleanField.prepare_value,
+        IntegerField.prepare_value,
+        FloatField.prepare_value,
+        DecimalField.prepare_value,
+        StringField.prepare_value,
+        DatetimeField.prepare_value,
+        BytesField.prepare_value,
+    }
+)
+
 TYPE_TO_FIELD = {
     bool: BooleanField,
     int: IntegerField,
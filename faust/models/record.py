@@ -32,7 +32,7 @@ from faust.types.models import (
 )
 from faust.utils import codegen
 
-from .base import Model
+from .base import Model, registry
 from .fields import FieldDescriptor, field_for_type
 from .tags import Tag
 
@@ -191,6 +191,7 @@ class Record(Model, abstract=True):  # type: ignore
         cls.asdict.faust_generated = True  # type: ignore
 
         cls._input_translate_fields = cls._BUILD_input_translate_fields()
+        cls._decode_data = cls._BUILD_decode_data()  # type: ignore
 
     @classmethod
     def _contribute_field_descriptors(
@@ -301,13 +302,36 @@ class Record(Model, abstract=True):  # type: ignore
         cls, data: Mapping, *, preferred_type: Optional[Type[ModelT]] = None
     ) -> "Record":
         """Create model object from Python dictionary."""
-        # check for blessed key to see if another model should be used.
-        if hasattr(data, "__is_model__"):
-            return cast(Record, data)
-        else:
+        if data.__class__ is not dict:
+            if hasattr(data, "__is_model__"):
+                return cast(Record, data)
+            # check for blessed key to see if another model should be used.
             self_cls = cls._maybe_namespace(data, preferred_type=preferred_type)
+            cls._input_translate_fields(data)
+            return (self_cls or cls)(**data, __strict__=False)
+        target = cls._decode_target(data, preferred_type)
         cls._input_translate_fields(data)
-        return (self_cls or cls)(**data, __strict__=False)
+        return target._decode_data(data)
+
+    @classmethod
+    def _decode_target(
+        cls, data: Mapping, preferred_type: Optional[Type[ModelT]]
+    ) -> Type["Record"]:
+        try:
+            ns = data[cls._blessed_key]["ns"]
+        except (KeyError, TypeError):
+            return cls
+        # Data is usually tagged with the namespace of the model
+        # decoding it, which is always allowed.
+        if registry.get(ns) is cls:
+            return cls
+        self_cls = cls._maybe_namespace(data, preferred_type=preferred_type)
+        return cast(Type[Record], self_cls or cls)
+
+    @classmethod
+    def _decode_data(cls, data: Mapping) -> "Record":
+        # replaced by _BUILD_decode_data for every concrete record.
+        return cls(**data, __strict__=False)
 
     def __init__(
         self,
@@ -509,6 +533,137 @@ class Record(Model, abstract=True):  # type: ignore
             locals={},
         )
 
+    @classmethod
+    def _BUILD_decode_data(cls) -> Callable[[Mapping], "Record"]:
+        # Generate function creating the model from deserialized data,
+        # doing what ``__init__(**data, __strict__=False)`` does but
+        # without passing the data as arguments, and skipping the field
+        # descriptors of fields that use the value as-is.
+        #
+        # The general template that we will be generating is
+        #
+        #    def __outer__(Model):
+        #       __required__ = frozenset({{ required fields }})
+        #       {% for field in fields_with_defaults %}
+        #       _default_{{ field }}_ = __defaults__["{{ field }}"]
+        #       {% endfor %}
+        #       {% for field in converted_fields %}
+        #       _set_{{ field }}_ = __descr__["{{ field }}"].__set__
+        #       _init_{{ field }}_ = __descr__["{{ field }}"].to_python
+        #       {% endfor %}
+        #
+        #       def _decode_data(data):
+        #           if not __required__ <= data.keys():
+        #               # let __init__ raise the error for missing fields.
+        #               return Model(**data, __strict__=False)
+        #           self = __new__(Model)
+        #           __dict__ = self.__dict__
+        #           __dict__["__evaluated_fields__"] = set()
+        #           __dict__.update(data)
+        #           __dict__.pop("__faust", None)
+        #           {% for field in fields %}
+        #           {% if CONVERTED_FIELD(field) %}
+        #           value = __dict__.get("{{ field }}")
+        #           _set_{{ field }}_(self, _init_{{ field }}_(value))
+        #           {% elif OPTIONAL_FIELD(field) %}
+        #           if __dict__.get("{{ field }}") is None:
+        #               __dict__["{{ field }}"] = _default_{{ field }}_
+        #           {% endif %}
+        #           {% endfor %}
+        #           self.__post_init__()
+        #           return self
+        #       return _decode_data
+        #
+        # Converted fields that are optional use the default instead
+        # when the value is None, like ``__init__`` does.
+        options = cls._options
+        optional = options.optionalset
+        descriptors = options.descriptors
+        fields = list(options.fieldpos.values())
+
+        closures: Dict[str, str] = {
+            "__defaults__": "Model._options.defaults",
+            "__descr__": "Model._options.descriptors",
+            "__new__": "Model.__new__",
+            "__required__": repr(
+                frozenset(field for field in fields if field not in optional)
+            ),
+        }
+        if "__init__" in cls.__dict__:
+            # a custom __init__ must be called to create instances.
+            return codegen.build_closure(
+                "__outer__",
+                codegen.build_closure_source(
+                    name="_decode_data",
+                    args=["data"],
+                    body=["return Model(**data, __strict__=False)"],
+                    closures={},
+                    outer_args=["Model"],
+                ),
+                cls,
+                globals={},
+                locals={},
+            )
+        body = [
+            "if not __required__ <= data.keys():",
+            "    return Model(**data, __strict__=False)",
+            "self = __new__(Model)",
+            "__dict__ = self.__dict__",
+            '__dict__["__evaluated_fields__"] = set()',
+            "__dict__.update(data)",
+            f"__dict__.pop({cls._blessed_key!r}, None)",
+        ]
+        for field in fields:
+            descriptor = descriptors[field]
+            if field in optional:
+                default_var = f"_default_{field}_"
+                closures[default_var] = f'__defaults__["{field}"]'
+            if descriptor.decodes_as_is():
+                if field in optional:
+                    body.extend(
+                        [
+                            f"if __dict__.get({field!r}) is None:",
+                            f"    __dict__[{field!r}] = {default_var}",
+                        ]
+                    )
+                continue
+            set_var = f"_set_{field}_"
+            closures[set_var] = f'__descr__["{field}"].__set__'
+            if descriptor.lazy_coercion:
+                getval = "value"  # converted on first access
+            else:
+                init_var = f"_init_{field}_"
+                closures[init_var] = f'__descr__["{field}"].to_python'
+                getval = f"{init_var}(value)"
+            body.append(f"value = __dict__.get({field!r})")
+            if field in optional:
+                body.append(
+                    f"{set_var}(self, {getval} "
+                    f"if value is not None else {default_var})"
+                )
+            else:
+                body.append(f"{set_var}(self, {getval})")
+        if hasattr(cls, "__post_init__"):
+            body.append("self.__post_init__()")
+        if options.validation:
+            body.append("self.validate_or_raise()")
+        body.append("return self")
+
+        sourcecode = codegen.build_closure_source(
+            name="_decode_data",
+            args=["data"],
+            body=body,
+            closures=closures,
+            outer_args=["Model"],
+        )
+        return codegen.build_closure(
+            "__outer__",
+            sourcecode,
+            cls,
+            globals={},
+            locals={},
+        )
+
     @classmethod
     def _BUILD_hash(cls) -> Callable[[], None]:
         return codegen.HashMethod(
@@ -0,0 +1,102 @@
+"""Local aggregation of metrics for statsd-like sensors."""
+
+import random
+from typing import Dict, Hashable, List, NamedTuple, Tuple
+
+__all__ = ["MetricAggregator", "MetricSnapshot", "TimingSamples"]
+
+#: Maximum number of timings kept for a metric and label set
+#: between flushes.
+DEFAULT_MAX_TIMING_SAMPLES = 100
+
+#: Metric name and label set.
+MetricKey = Tuple[str, Hashable]
+
+
+class TimingSamples:
+    """Timings of a metric and label set recorded since the last flush.
+
+    When more than ``max_samples`` timings are recorded a uniform
+    random sample of them is kept, while ``count`` is always exact.
+    """
+
+    __slots__ = ("count", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.samples: List[float] = []
+
+    @property
+    def capped(self) -> bool:
+        """Return :const:`True` if timings were left out of the sample."""
+        return self.count > len(self.samples)
+
+    def add(self, value: float, max_samples: int) -> None:
+        self.count += 1
+        samples = self.samples
+        if len(samples) < max_samples:
+            samples.append(value)
+        else:
+            # reservoir sampling
+            index = random.randrange(self.count)
+            if index < max_samples:
+                samples[index] = value
+
+
+class MetricSnapshot(NamedTuple):
+    """Metrics aggregated since the last flush."""
+
+    #: Sum of counter increments (decrements are negative).
+    counters: Dict[MetricKey, float]
+
+    #: Last value of each gauge.
+    gauges: Dict[MetricKey, float]
+
+    #: Timings recorded.
+    timings: Dict[MetricKey, TimingSamples]
+
+
+class MetricAggregator:
+    """Aggregate metrics locally, so they can be sent in batches.
+
+    Metrics are kept per metric name and label set, where the label
+    set can be any hashable object: typically labels formatted once
+    and cached by the sensor.
+    """
+
+    def __init__(self, max_timing_samples: int = DEFAULT_MAX_TIMING_SAMPLES) -> None:
+        self.max_timing_samples = max_timing_samples
+        self.counters: Dict[MetricKey, float] = {}
+        self.gauges: Dict[MetricKey, float] = {}
+        self.timings: Dict[MetricKey, TimingSamples] = {}
+
+    def increment(self, metric: str, value: float = 1, labels: Hashable = None) -> None:
+        """Increment counter."""
+        key = (metric, labels)
+        counters = self.counters
+        counters[key] = counters.get(key, 0) + value
+
+    def decrement(self, metric: str, value: float = 1, labels: Hashable = None) -> None:
+        """Decrement counter."""
+        self.increment(metric, -value, labels)
+
+    def gauge(self, metric: str, value: float, labels: Hashable = None) -> None:
+        """Set gauge value."""
+        self.gauges[(metric, labels)] = value
+
+    def timing(self, metric: str, value: float, labels: Hashable = None) -> None:
+        """Record timing."""
+        key = (metric, labels)
+        samples = self.timings.get(key)
+        if samples is None:
+            samples = self.timings[key] = TimingSamples()
+        samples.add(value, self.max_timing_samples)
+
+    def drain(self) -> MetricSnapshot:
+        """Return metrics aggregated so far, and start over."""
+        snapshot = MetricSnapshot(self.counters, self.gauges, self.timings)
+        self.counters, self.gauges, self.timings = {}, {}, {}
+        return snapshot
+
+    def __bool__(self) -> bool:
+        return bool(self.counters or self.gauges or self.timings)
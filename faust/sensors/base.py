@@ -1,7 +1,7 @@
 """Base-interface for sensors."""
 
 from time import monotonic
-from typing import Any, Dict, Iterator, Mapping, Optional, Set
+from typing import Any, Dict, Iterator, Mapping, Optional, Set, Tuple
 
 from mode import Service
 
@@ -14,6 +14,15 @@ from faust.types.tuples import TP, Message, PendingMessage, RecordMetadata
 
 __all__ = ["Sensor", "SensorDelegate"]
 
+#: Hooks that can be sampled using the :setting:`sensor_sampling` setting.
+#: Only the timing of the event/send is sampled by the Monitor (and its
+#: subclasses): the hooks are always called, so counters are exact.
+SAMPLED_HOOKS = frozenset({"on_stream_event", "on_send"})
+
+
+class _SensorStates(dict):
+    """Mapping of sensor to the state it returned from a start hook."""
+
 
 class Sensor(SensorT, Service):
     """Base class for sensors.
@@ -26,6 +35,19 @@ class Sensor(SensorT, Service):
         """Message received by a consumer."""
         ...
 
+    def on_messages_in(self, tp: TP, offsets: Tuple[int, int], count: int) -> None:
+        """Batch of messages fetched by a consumer.
+
+        Called once for every topic partition in a batch fetched,
+        before :meth:`on_message_in` is called for each message.
+
+        Arguments:
+            tp: Topic partition the messages were fetched from.
+            offsets: The first and last offset in the batch.
+            count: Number of messages in the batch.
+        """
+        ...
+
     def on_stream_event_in(
         self, tp: TP, offset: int, stream: StreamT, event: EventT
     ) -> Optional[Dict]:
@@ -94,13 +116,23 @@ class Sensor(SensorT, Service):
     def on_send_completed(
         self, producer: ProducerT, state: Any, metadata: RecordMetadata
     ) -> None:
-        """Message successfully sent."""
+        """Message successfully sent.
+
+        A :class:`~faust.sensors.Monitor` is passed :const:`None` as
+        ``state`` when it does not time the send
+        (see :setting:`sensor_sampling`).
+        """
         ...
 
     def on_send_error(
         self, producer: ProducerT, exc: BaseException, state: Any
     ) -> None:
-        """Error while sending message."""
+        """Error while sending message.
+
+        A :class:`~faust.sensors.Monitor` is passed :const:`None` as
+        ``state`` when it does not time the send
+        (see :setting:`sensor_sampling`).
+        """
         ...
 
     def on_assignment_start(self, assignor: PartitionAssignorT) -> Dict:
@@ -151,35 +183,115 @@ class Sensor(SensorT, Service):
 
     def on_threaded_producer_buffer_processed(self, app: AppT, size: int) -> None: ...
 
+    def on_consumer_prefetch(
+        self, consumer: ConsumerT, depth: int, wait_time: float
+    ) -> None:
+        """Consumer took batch of records fetched ahead of processing."""
+        ...
+
     def asdict(self) -> Mapping:
         """Convert sensor state to dictionary."""
         return {}
 
 
 class SensorDelegate(SensorDelegateT):
-    """A class that delegates sensor methods to a list of sensors."""
+    """A class that delegates sensor methods to a list of sensors.
+
+    When the only sensor is the app :class:`~faust.sensors.Monitor`
+    the hooks called for every message, event and table operation call
+    it directly, and its state is returned as-is instead of in a
+    mapping from sensor to state.  The :setting:`sensor_sampling`
+    setting can make only 1 in N events and sends be timed.
+    """
 
     _sensors: Set[SensorT]
 
+    #: The only sensor, when that is a Monitor (see :meth:`_compile`).
+    _monitor: Optional[SensorT] = None
+
+    #: The last Monitor to be called directly, that the states
+    #: returned before the sensor set changed belong to.
+    _last_monitor: Optional[SensorT] = None
+
+    #: The sensors that are Monitors, timing events and sends.
+    _timing_sensors: Tuple[SensorT, ...] = ()
+
     def __init__(self, app: AppT) -> None:
         self.app = app
         self._sensors = set()
+        self._sample_every: Dict[str, int] = dict.fromkeys(SAMPLED_HOOKS, 1)
+        self._sample_calls: Dict[str, int] = dict.fromkeys(SAMPLED_HOOKS, 0)
 
     def add(self, sensor: SensorT) -> None:
         """Add sensor."""
         # connect beacons
         sensor.beacon = self.app.beacon.new(sensor)
         self._sensors.add(sensor)
+        self._compile()
 
     def remove(self, sensor: SensorT) -> None:
         """Remove sensor."""
         self._sensors.remove(sensor)
+        self._compile()
+
+    def _compile(self) -> None:
+        # Sensors may be added while events are being processed, so the
+        # hooks at the end of an event/send/commit accept the state
+        # returned by either the fast or the generic path.
+        from .monitor import Monitor
+
+        monitor: Optional[SensorT] = None
+        if len(self._sensors) == 1:
+            (sensor,) = self._sensors
+            if isinstance(sensor, Monitor):
+                monitor = sensor
+        self._monitor = monitor
+        if monitor is not None:
+            self._last_monitor = monitor
+        self._timing_sensors = tuple(
+            sensor for sensor in self._sensors if isinstance(sensor, Monitor)
+        )
+        if self.app.finalized:
+            for hook, every in self.app.conf.sensor_sampling.items():
+                if hook not in SAMPLED_HOOKS:
+                    raise ValueError(
+                        f"Cannot sample sensor hook {hook!r}: "
+                        f"must be one of {sorted(SAMPLED_HOOKS)!r}"
+                    )
+                self._sample_every[hook] = max(int(every), 1)
+
+    def _sampled_out(self, hook: str, every: int) -> bool:
+        calls = self._sample_calls[hook] = self._sample_calls[hook] + 1
+        return bool(calls % every)
+
+    def _monitor_state(self, state: Any) -> Any:
+        # state returned by the generic path, before the sensor set
+        # changed to only the Monitor.
+        if isinstance(state, _SensorStates):
+            return state.get(self._monitor)
+        return state
+
+    def _sensor_states(self, state: Any) -> Mapping:
+        if isinstance(state, _SensorStates):
+            return state
+        # state returned by the fast path, before the sensor set changed.
+        if state is None or self._last_monitor is None:
+            return {}
+        return {self._last_monitor: state}
 
     def __iter__(self) -> Iterator:
         return iter(self._sensors)
 
+    def on_messages_in(self, tp: TP, offsets: Tuple[int, int], count: int) -> None:
+        """Call when a batch of messages is fetched for a topic partition."""
+        for sensor in self._sensors:
+            sensor.on_messages_in(tp, offsets, count)
+
     def on_message_in(self, tp: TP, offset: int, message: Message) -> None:
         """Call before message is delegated to streams."""
+        if self._monitor is not None:
+            self._monitor.on_message_in(tp, offset, message)
+            return
         for sensor in self._sensors:
             sensor.on_message_in(tp, offset, message)
 
@@ -187,10 +299,24 @@ class SensorDelegate(SensorDelegateT):
         self, tp: TP, offset: int, stream: StreamT, event: EventT
     ) -> Optional[Dict]:
         """Call when stream starts processing an event."""
-        return {
-            sensor: sensor.on_stream_event_in(tp, offset, stream, event)
+        every = self._sample_every["on_stream_event"]
+        sampled_out = every > 1 and self._sampled_out("on_stream_event", every)
+        if self._monitor is not None:
+            state = self._monitor.on_stream_event_in(tp, offset, stream, event)
+            if sampled_out and state is not None:
+                state["time_in"] = None
+            return state
+        states = _SensorStates(
+            (sensor, sensor.on_stream_event_in(tp, offset, stream, event))
             for sensor in self._sensors
-        }
+        )
+        if sampled_out:
+            # the Monitors do not time an event without a start time.
+            for sensor in self._timing_sensors:
+                sensor_state = states[sensor]
+                if sensor_state is not None:
+                    sensor_state["time_in"] = None
+        return states
 
     def on_stream_event_out(
         self,
@@ -201,11 +327,14 @@ class SensorDelegate(SensorDelegateT):
         state: Optional[Dict] = None,
     ) -> None:
         """Call when stream is done processing an event."""
-        sensor_state = state or {}
-        for sensor in self._sensors:
-            sensor.on_stream_event_out(
-                tp, offset, stream, event, sensor_state.get(sensor)
+        if self._monitor is not None:
+            self._monitor.on_stream_event_out(
+                tp, offset, stream, event, self._monitor_state(state)
             )
+            return
+        states = self._sensor_states(state)
+        for sensor in self._sensors:
+            sensor.on_stream_event_out(tp, offset, stream, event, states.get(sensor))
 
     def on_topic_buffer_full(self, tp: TP) -> None:
         """Call when conductor topic buffer is full and has to wait."""
@@ -214,37 +343,58 @@ class SensorDelegate(SensorDelegateT):
 
     def on_message_out(self, tp: TP, offset: int, message: Message) -> None:
         """Call when message is fully acknowledged and can be committed."""
+        if self._monitor is not None:
+            self._monitor.on_message_out(tp, offset, message)
+            return
         for sensor in self._sensors:
             sensor.on_message_out(tp, offset, message)
 
     def on_table_get(self, table: CollectionT, key: Any) -> None:
         """Call when value in table is retrieved."""
+        if self._monitor is not None:
+            self._monitor.on_table_get(table, key)
+            return
         for sensor in self._sensors:
             sensor.on_table_get(table, key)
 
     def on_table_set(self, table: CollectionT, key: Any, value: Any) -> None:
         """Call when new value for key in table is set."""
+        if self._monitor is not None:
+            self._monitor.on_table_set(table, key, value)
+            return
         for sensor in self._sensors:
             sensor.on_table_set(table, key, value)
 
     def on_table_del(self, table: CollectionT, key: Any) -> None:
         """Call when key in a table is deleted."""
+        if self._monitor is not None:
+            self._monitor.on_table_del(table, key)
+            return
         for sensor in self._sensors:
             sensor.on_table_del(table, key)
 
     def on_commit_initiated(self, consumer: ConsumerT) -> Any:
         """Call when consumer commit offset operation starts."""
+        if self._monitor is not None:
+            return self._monitor.on_commit_initiated(consumer)
         # This returns arbitrary state, so we return a map from sensor->state.
-        return {
-            sensor: sensor.on_commit_initiated(consumer) for sensor in self._sensors
-        }
+        return _SensorStates(
+            (sensor, sensor.on_commit_initiated(consumer)) for sensor in self._sensors
+        )
 
     def on_commit_completed(self, consumer: ConsumerT, state: Any) -> None:
         """Call when consumer commit offset operation completed."""
+        if self._monitor is not None:
+            state = self._monitor_state(state)
+            if state is not None:
+                self._monitor.on_commit_completed(consumer, state)
+            return
         # state is now a mapping from sensor->state, so
         # make sure to correct the correct state to each sensor.
+        states = self._sensor_states(state)
         for sensor in self._sensors:
-            sensor.on_commit_completed(consumer, state[sensor])
+            if sensor in states:
+                sensor.on_commit_completed(consumer, states[sensor])
 
     def on_send_initiated(
         self,
@@ -255,24 +405,51 @@ class SensorDelegate(SensorDelegateT):
         valsize: int,
     ) -> Any:
         """Call when message added to producer buffer."""
-        return {
-            sensor: sensor.on_send_initiated(producer, topic, message, keysize, valsize)
+        every = self._sample_every["on_send"]
+        sampled_out = every > 1 and self._sampled_out("on_send", every)
+        if self._monitor is not None:
+            state = self._monitor.on_send_initiated(
+                producer, topic, message, keysize, valsize
+            )
+            return None if sampled_out else state
+        states = _SensorStates(
+            (
+                sensor,
+                sensor.on_send_initiated(producer, topic, message, keysize, valsize),
+            )
             for sensor in self._sensors
-        }
+        )
+        if sampled_out:
+            # the Monitors do not time a send without a start time.
+            for sensor in self._timing_sensors:
+                states[sensor] = None
+        return states
 
     def on_send_completed(
         self, producer: ProducerT, state: Any, metadata: RecordMetadata
     ) -> None:
         """Call when producer finished sending message."""
+        if self._monitor is not None:
+            self._monitor.on_send_completed(
+                producer, self._monitor_state(state), metadata
+            )
+            return
+        states = self._sensor_states(state)
         for sensor in self._sensors:
-            sensor.on_send_completed(producer, state[sensor], metadata)
+            if sensor in states:
+                sensor.on_send_completed(producer, states[sensor], metadata)
 
     def on_send_error(
         self, producer: ProducerT, exc: BaseException, state: Any
     ) -> None:
         """Call when producer was unable to publish message."""
+        if self._monitor is not None:
+            self._monitor.on_send_error(producer, exc, self._monitor_state(state))
+            return
+        states = self._sensor_states(state)
         for sensor in self._sensors:
-            sensor.on_send_error(producer, exc, state[sensor])
+            if sensor in states:
+                sensor.on_send_error(producer, exc, states[sensor])
 
     def on_assignment_start(self, assignor: PartitionAssignorT) -> Dict:
         """Partition assignor is starting to assign partitions."""
@@ -334,5 +511,16 @@ class SensorDelegate(SensorDelegateT):
         for sensor in self._sensors:
             sensor.on_threaded_producer_buffer_processed(app=app, size=size)
 
+    def on_consumer_prefetch(
+        self, consumer: ConsumerT, depth: int, wait_time: float
+    ) -> None:
+        """Call when consumer takes batch of records fetched ahead.
+
+        ``depth`` is the number of batches still fetched ahead, and
+        ``wait_time`` the time in seconds spent waiting for the batch.
+        """
+        for sensor in self._sensors:
+            sensor.on_consumer_prefetch(consumer, depth, wait_time)
+
     def __repr__(self) -> str:
         return f"<{type(self).__name__}: {self._sensors!r}>"
@@ -1,12 +1,16 @@
 """Monitor using datadog."""
 
 import re
-from typing import Any, Dict, List, Optional, cast
+import weakref
+from typing import Any, Dict, List, MutableMapping, Optional, Tuple, cast
 
+from mode import Service
 from mode.utils.objects import cached_property
+from mode.utils.times import Seconds, want_seconds
 
 from faust import web
 from faust.exceptions import ImproperlyConfigured
+from faust.sensors.aggregator import DEFAULT_MAX_TIMING_SAMPLES, MetricAggregator
 from faust.sensors.monitor import Monitor, TPOffsetMapping
 from faust.types import (
     TP,
@@ -32,6 +36,9 @@ except ImportError:  # pragma: no cover
 
 __all__ = ["DatadogMonitor"]
 
+#: Tags of a metric, formatted once and cached by :class:`DatadogMonitor`.
+Tags = Optional[Tuple[str, ...]]
+
 
 class DatadogStatsClient:
     """Statsd compliant datadog client."""
@@ -132,11 +139,24 @@ class DatadogMonitor(Monitor):
 
     This sensor, records statistics to datadog agents along
     with computing metrics for the stats server
+
+    Metrics are aggregated locally and sent in batched packets
+    every ``flush_interval`` seconds: counters are summed, gauges
+    keep the last value, and at most ``max_timing_samples`` timings
+    are sent for every metric and set of tags.  When more were
+    recorded, the random sample kept is sent with rate 1, and the
+    number of timings recorded as the ``<metric>_count`` counter.
+
+    The p50/p95/p99/max of the latency sketches kept by the Monitor,
+    over the last :attr:`~faust.sensors.Monitor.latency_window` seconds,
+    are sent as gauges in ms (e.g. ``send_latency_p99``), whenever new
+    latencies were recorded.
     """
 
     host: str
     port: int
     prefix: str
+    flush_interval: float
 
     def __init__(
         self,
@@ -144,16 +164,27 @@ class DatadogMonitor(Monitor):
         port: int = 8125,
         prefix: str = "faust-app",
         rate: float = 1.0,
+        flush_interval: Seconds = 1.0,
+        max_timing_samples: int = DEFAULT_MAX_TIMING_SAMPLES,
         **kwargs: Any,
     ) -> None:
         self.host = host
         self.port = port
         self.prefix = prefix
         self.rate = rate
+        self.flush_interval = want_seconds(flush_interval)
         if datadog is None:
             raise ImproperlyConfigured(
                 f'{type(self).__name__} requires "pip install datadog".'
             )
+        self.metrics = MetricAggregator(max_timing_samples=max_timing_samples)
+        self._tp_tags: Dict[TP, Tags] = {}
+        self._topic_tags: Dict[str, Tags] = {}
+        self._table_tags: Dict[str, Tags] = {}
+        self._stream_tags: MutableMapping[StreamT, Dict[TP, Tags]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._latency_totals: Dict[str, int] = {}
         super().__init__(**kwargs)
 
     def _new_datadog_stats_client(self) -> DatadogStatsClient:
@@ -161,26 +192,94 @@ class DatadogMonitor(Monitor):
             host=self.host, port=self.port, prefix=self.prefix, rate=self.rate
         )
 
+    @Service.task
+    async def _flusher(self) -> None:
+        async for sleep_time in self.itertimer(
+            self.flush_interval, name="DatadogMonitor.flush"
+        ):
+            self.flush()
+
+    async def on_stop(self) -> None:
+        """Call when the sensor stops."""
+        self.flush()
+
+    def flush(self) -> None:
+        """Send metrics aggregated since the last flush."""
+        self._gauge_latency_quantiles()
+        if not self.metrics:
+            return
+        counters, gauges, timings = self.metrics.drain()
+        client = self.client.client
+        client.open_buffer()
+        try:
+            # counters and gauges are exact, so are never sampled.
+            for (metric, tags), value in counters.items():
+                if value:
+                    client.increment(
+                        metric, value=value, tags=self._tag_list(tags), sample_rate=1
+                    )
+            for (metric, tags), value in gauges.items():
+                client.gauge(
+                    metric, value=value, tags=self._tag_list(tags), sample_rate=1
+                )
+            rate = self.rate
+            for (metric, tags), timing in timings.items():
+                tag_list = self._tag_list(tags)
+                if timing.capped:
+                    # The server would scale the sample by rate, not by the
+                    # share of timings kept, so it is sent unsampled along
+                    # with the number of timings recorded.
+                    for value in timing.samples:
+                        client.timing(metric, value=value, tags=tag_list, sample_rate=1)
+                    client.increment(
+                        f"{metric}_count",
+                        value=timing.count,
+                        tags=tag_list,
+                        sample_rate=1,
+                    )
+                else:
+                    for value in timing.samples:
+                        client.timing(
+                            metric, value=value, tags=tag_list, sample_rate=rate
+                        )
+        finally:
+            client.close_buffer()
+
+    def _gauge_latency_quantiles(self) -> None:
+        # Quantiles of the latency sketches kept by the Monitor,
+        # e.g. send_latency_p99, sent when new latencies were recorded.
+        totals = self._latency_totals
+        for series, sketch in self.latency_sketches().items():
+            if sketch.total == totals.get(series, 0) or not sketch:
+                continue
+            totals[series] = sketch.total
+            for key, value in sketch.asdict().items():
+                if key != "count":
+                    self.metrics.gauge(f"{series}_{key}", self.secs_to_ms(value))
+
+    def _tag_list(self, tags: Any) -> Optional[List[str]]:
+        return list(tags) if tags else None
+
     def on_message_in(self, tp: TP, offset: int, message: Message) -> None:
         """Call before message is delegated to streams."""
         super().on_message_in(tp, offset, message)
-        labels = self._format_label(tp)
-        self.client.increment("messages_received", labels=labels)
-        self.client.increment("messages_active", labels=labels)
-        self.client.increment(
-            "topic_messages_received",
-            labels={"topic": tp.topic},
+        tags = self._tp_tags_for(tp)
+        metrics = self.metrics
+        metrics.increment("messages_received", labels=tags)
+        metrics.increment("messages_active", labels=tags)
+        metrics.increment(
+            "topic_messages_received", labels=self._topic_tags_for(tp.topic)
         )
-        self.client.gauge("read_offset", offset, labels=labels)
+        metrics.gauge("read_offset", offset, labels=tags)
 
     def on_stream_event_in(
         self, tp: TP, offset: int, stream: StreamT, event: EventT
     ) -> Optional[Dict]:
         """Call when stream starts processing an event."""
         state = super().on_stream_event_in(tp, offset, stream, event)
-        labels = self._format_label(tp, stream)
-        self.client.increment("events", labels=labels)
-        self.client.increment("events_active", labels=labels)
+        tags = self._stream_tags_for(tp, stream)
+        self.metrics.increment("events", labels=tags)
+        self.metrics.increment("events_active", labels=tags)
         return state
 
     def on_stream_event_out(
@@ -193,48 +292,48 @@ class DatadogMonitor(Monitor):
     ) -> None:
         """Call when stream is done processing an event."""
         super().on_stream_event_out(tp, offset, stream, event, state)
-        labels = self._format_label(tp, stream)
-        self.client.decrement("events_active", labels=labels)
-        if state is not None:
-            self.client.timing(
+        tags = self._stream_tags_for(tp, stream)
+        self.metrics.decrement("events_active", labels=tags)
+        if state is not None and state["time_total"] is not None:
+            self.metrics.timing(
                 "events_runtime",
-                self.secs_to_ms(self.events_runtime[-1]),
-                labels=labels,
+                self.secs_to_ms(cast(float, self.events_runtime.last)),
+                labels=tags,
             )
 
     def on_message_out(self, tp: TP, offset: int, message: Message) -> None:
         """Call when message is fully acknowledged and can be committed."""
         super().on_message_out(tp, offset, message)
-        self.client.decrement("messages_active", labels=self._format_label(tp))
+        self.metrics.decrement("messages_active", labels=self._tp_tags_for(tp))
 
     def on_table_get(self, table: CollectionT, key: Any) -> None:
         """Call when value in table is retrieved."""
         super().on_table_get(table, key)
-        self.client.increment(
+        self.metrics.increment(
             "table_keys_retrieved",
-            labels=self._format_label(table=table),
+            labels=self._table_tags_for(table),
         )
 
     def on_table_set(self, table: CollectionT, key: Any, value: Any) -> None:
         """Call when new value for key in table is set."""
         super().on_table_set(table, key, value)
-        self.client.increment(
+        self.metrics.increment(
             "table_keys_updated",
-            labels=self._format_label(table=table),
+            labels=self._table_tags_for(table),
         )
 
     def on_table_del(self, table: CollectionT, key: Any) -> None:
         """Call when key in a table is deleted."""
         super().on_table_del(table, key)
-        self.client.increment(
+        self.metrics.increment(
             "table_keys_deleted",
-            labels=self._format_label(table=table),
+            labels=self._table_tags_for(table),
         )
 
     def on_commit_completed(self, consumer: ConsumerT, state: Any) -> None:
         """Call when consumer commit offset operation completed."""
         super().on_commit_completed(consumer, state)
-        self.client.timing(
+        self.metrics.timing(
             "commit_latency",
             self.ms_since(cast(float, state)),
         )
@@ -248,9 +347,9 @@ class DatadogMonitor(Monitor):
         valsize: int,
     ) -> Any:
         """Call when message added to producer buffer."""
-        self.client.increment(
+        self.metrics.increment(
             "topic_messages_sent",
-            labels={"topic": topic},
+            labels=self._topic_tags_for(topic),
         )
         return super().on_send_initiated(producer, topic, message, keysize, valsize)
 
@@ -259,30 +358,32 @@ class DatadogMonitor(Monitor):
     ) -> None:
         """Call when producer finished sending message."""
         super().on_send_completed(producer, state, metadata)
-        self.client.increment("messages_sent")
-        self.client.timing(
-            "send_latency",
-            self.ms_since(cast(float, state)),
-        )
+        self.metrics.increment("messages_sent")
+        if state is not None:
+            self.metrics.timing(
+                "send_latency",
+                self.ms_since(cast(float, state)),
+            )
 
     def on_send_error(
         self, producer: ProducerT, exc: BaseException, state: Any
     ) -> None:
         """Call when producer was unable to publish message."""
         super().on_send_error(producer, exc, state)
-        self.client.increment("messages_send_failed")
-        self.client.timing(
-            "send_latency_for_error",
-            self.ms_since(cast(float, state)),
-        )
+        self.metrics.increment("messages_send_failed")
+        if state is not None:
+            self.metrics.timing(
+                "send_latency_for_error",
+                self.ms_since(cast(float, state)),
+            )
 
     def on_assignment_error(
         self, assignor: PartitionAssignorT, state: Dict, exc: BaseException
     ) -> None:
         """Partition assignor did not complete assignor due to error."""
         super().on_assignment_error(assignor, state, exc)
-        self.client.increment("assignments_error")
-        self.client.timing(
+        self.metrics.increment("assignments_error")
+        self.metrics.timing(
             "assignment_latency",
             self.ms_since(state["time_start"]),
         )
@@ -292,8 +393,8 @@ class DatadogMonitor(Monitor):
     ) -> None:
         """Partition assignor completed assignment."""
         super().on_assignment_completed(assignor, state)
-        self.client.increment("assignments_complete")
-        self.client.timing(
+        self.metrics.increment("assignments_complete")
+        self.metrics.timing(
             "assignment_latency",
             self.ms_since(state["time_start"]),
         )
@@ -301,39 +402,39 @@ class DatadogMonitor(Monitor):
     def on_rebalance_start(self, app: AppT) -> Dict:
         """Cluster rebalance in progress."""
         state = super().on_rebalance_start(app)
-        self.client.increment("rebalances")
+        self.metrics.increment("rebalances")
         return state
 
     def on_rebalance_return(self, app: AppT, state: Dict) -> None:
         """Consumer replied assignment is done to broker."""
         super().on_rebalance_return(app, state)
-        self.client.decrement("rebalances")
-        self.client.increment("rebalances_recovering")
-        self.client.timing(
+        self.metrics.decrement("rebalances")
+        self.metrics.increment("rebalances_recovering")
+        self.metrics.timing(
             "rebalance_return_latency", self.ms_since(state["time_return"])
         )
 
     def on_rebalance_end(self, app: AppT, state: Dict) -> None:
         """Cluster rebalance fully completed (including recovery)."""
         super().on_rebalance_end(app, state)
-        self.client.decrement("rebalances_recovering")
-        self.client.timing("rebalance_end_latency", self.ms_since(state["time_end"]))
+        self.metrics.decrement("rebalances_recovering")
+        self.metrics.timing("rebalance_end_latency", self.ms_since(state["time_end"]))
 
     def count(self, metric_name: str, count: int = 1) -> None:
         """Count metric by name."""
         super().count(metric_name, count=count)
-        self.client.increment(metric_name, value=count)
+        self.metrics.increment(metric_name, value=count)
 
     def on_tp_commit(self, tp_offsets: TPOffsetMapping) -> None:
         """Call when offset in topic partition is committed."""
         super().on_tp_commit(tp_offsets)
         for tp, offset in tp_offsets.items():
-            self.client.gauge("committed_offset", offset, labels=self._format_label(tp))
+            self.metrics.gauge("committed_offset", offset, labels=self._tp_tags_for(tp))
 
     def track_tp_end_offset(self, tp: TP, offset: int) -> None:
         """Track new topic partition end offset for monitoring lags."""
         super().track_tp_end_offset(tp, offset)
-        self.client.gauge("end_offset", offset, labels=self._format_label(tp))
+        self.metrics.gauge("end_offset", offset, labels=self._tp_tags_for(tp))
 
     def on_web_request_end(
         self,
@@ -347,11 +448,57 @@ class DatadogMonitor(Monitor):
         """Web server finished working on request."""
         super().on_web_request_end(app, request, response, state, view=view)
         status_code = int(state["status_code"])
-        self.client.increment(f"http_status_code.{status_code}")
-        self.client.timing("http_response_latency", self.ms_since(state["time_end"]))
+        self.metrics.increment(f"http_status_code.{status_code}")
+        self.metrics.timing("http_response_latency", self.ms_since(state["time_end"]))
 
     def on_threaded_producer_buffer_processed(self, app: AppT, size: int) -> None:
-        self.client.gauge(metric="threaded_producer_buffer", value=size)
+        self.metrics.gauge("threaded_producer_buffer", size)
+
+    def on_consumer_prefetch(
+        self, consumer: ConsumerT, depth: int, wait_time: float
+    ) -> None:
+        """Call when consumer takes batch of records fetched ahead."""
+        super().on_consumer_prefetch(consumer, depth, wait_time)
+        self.metrics.gauge("consumer_prefetch_depth", depth)
+        self.metrics.timing("consumer_prefetch_wait", self.secs_to_ms(wait_time))
+
+    def _tp_tags_for(self, tp: TP) -> Tags:
+        try:
+            return self._tp_tags[tp]
+        except KeyError:
+            tags = self._tp_tags[tp] = self._tags(self._format_label(tp))
+            return tags
+
+    def _topic_tags_for(self, topic: str) -> Tags:
+        try:
+            return self._topic_tags[topic]
+        except KeyError:
+            tags = self._topic_tags[topic] = self._tags({"topic": topic})
+            return tags
+
+    def _stream_tags_for(self, tp: TP, stream: StreamT) -> Tags:
+        try:
+            by_tp = self._stream_tags[stream]
+        except KeyError:
+            by_tp = self._stream_tags[stream] = {}
+        try:
+            return by_tp[tp]
+        except KeyError:
+            tags = by_tp[tp] = self._tags(self._format_label(tp, stream))
+            return tags
+
+    def _table_tags_for(self, table: CollectionT) -> Tags:
+        try:
+            return self._table_tags[table.name]
+        except KeyError:
+            tags = self._table_tags[table.name] = self._tags(
+                self._format_label(table=table)
+            )
+            return tags
+
+    def _tags(self, labels: Dict) -> Tags:
+        encoded = self.client._encode_labels(labels)
+        return tuple(encoded) if encoded else None
 
     def _format_label(
         self,
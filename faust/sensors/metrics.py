@@ -1,31 +1,12 @@
 """Framework-neutral worker performance metrics."""
 
-from typing import Any, Iterable, Mapping, MutableMapping, Optional
+from typing import Any, Mapping, MutableMapping
 
 from faust.types import AppT
 
 __all__ = ["performance_metrics"]
 
 
-def _percentile(values: Iterable[float], percentile: float) -> Optional[float]:
-    """Return the nearest-rank percentile, or None when there is no data."""
-    ordered = sorted(values)
-    if not ordered:
-        return None
-    index = int(round(percentile * (len(ordered) - 1)))
-    return ordered[index]
-
-
-def _summarize(values: Iterable[float]) -> Mapping[str, Optional[float]]:
-    ordered = list(values)
-    return {
-        "count": len(ordered),
-        "p50": _percentile(ordered, 0.50),
-        "p95": _percentile(ordered, 0.95),
-        "max": max(ordered) if ordered else None,
-    }
-
-
 def _lag(read: Mapping, end: Mapping) -> Any:
     """Return consumer lag per partition and across all partitions."""
     lag: MutableMapping[str, MutableMapping[int, int]] = {}
@@ -69,12 +50,14 @@ def performance_metrics(app: AppT) -> Mapping[str, Any]:
         },
         "latency": {
             "events_runtime_avg": monitor.events_runtime_avg,
-            "commit_latency": _summarize(monitor.commit_latency),
-            "send_latency": _summarize(monitor.send_latency),
-            "assignment_latency": _summarize(monitor.assignment_latency),
+            "events_runtime": monitor.events_runtime.asdict(),
+            "commit_latency": monitor.commit_latency.asdict(),
+            "send_latency": monitor.send_latency.asdict(),
+            "assignment_latency": monitor.assignment_latency.asdict(),
             "rebalance_return_avg": monitor.rebalance_return_avg,
             "rebalance_end_avg": monitor.rebalance_end_avg,
             "http_response_latency_avg": monitor.http_response_latency_avg,
+            "http_response_latency": monitor.http_response_latency.asdict(),
         },
         "consumer": {
             "lag_total": lag_total,
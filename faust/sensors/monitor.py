@@ -2,17 +2,16 @@
 
 import asyncio
 import re
+import warnings
 import weakref
-from collections import deque
 from http import HTTPStatus
-from statistics import median
 from time import monotonic
 from typing import (
     Any,
     Callable,
     Counter,
-    Deque,
     Dict,
+    Iterable,
     Mapping,
     MutableMapping,
     Optional,
@@ -31,13 +30,28 @@ from faust.types.transports import ConsumerT, ProducerT
 from faust.types.tuples import TP, Message, PendingMessage, RecordMetadata
 
 from .base import Sensor
+from .sketch import DEFAULT_RELATIVE_ACCURACY, WindowedLatencySketch
 
 __all__ = ["TableState", "Monitor"]
 
+#: Latency series recorded by the monitor, see :meth:`Monitor.latency_sketches`.
+LATENCY_SERIES = (
+    "events_runtime",
+    "commit_latency",
+    "send_latency",
+    "assignment_latency",
+    "rebalance_return_latency",
+    "rebalance_end_latency",
+    "http_response_latency",
+    "prefetch_wait_latency",
+)
+
 MAX_AVG_HISTORY = 100
 MAX_COMMIT_LATENCY_HISTORY = 30
 MAX_SEND_LATENCY_HISTORY = 30
 MAX_ASSIGNMENT_LATENCY_HISTORY = 30
+LATENCY_WINDOW = 60
+BYTES_RATE_SMOOTHING = 0.2
 
 TPOffsetMapping = MutableMapping[TP, int]
 PartitionOffsetMapping = MutableMapping[int, int]
@@ -94,20 +108,39 @@ class Monitor(Sensor, KeywordReduce):
 
     This is the default sensor, recording statistics about
     events, etc.
+
+    Latencies are recorded in
+    :class:`~faust.sensors.sketch.WindowedLatencySketch` quantile
+    sketches, using fixed memory, covering the last
+    :attr:`latency_window` seconds.
     """
 
-    #: Max number of total run time values to keep to build average.
+    #: Relative accuracy of the quantiles of latency sketches.
+    latency_relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY
+
+    #: Number of seconds latency quantiles and medians are computed over.
+    latency_window: int = LATENCY_WINDOW
+
+    #: Deprecated: ignored, see :attr:`latency_window`.
     max_avg_history: int = MAX_AVG_HISTORY
 
-    #: Max number of commit latency numbers to keep.
+    #: Deprecated: ignored, see :attr:`latency_window`.
     max_commit_latency_history: int = MAX_COMMIT_LATENCY_HISTORY
 
-    #: Max number of send latency numbers to keep.
+    #: Deprecated: ignored, see :attr:`latency_window`.
     max_send_latency_history: int = MAX_SEND_LATENCY_HISTORY
 
-    #: Max number of assignment latency numbers to keep.
+    #: Deprecated: ignored, see :attr:`latency_window`.
     max_assignment_latency_history: int = MAX_ASSIGNMENT_LATENCY_HISTORY
 
+    #: Smoothing factor for the per-partition bytes/s moving average.
+    bytes_rate_smoothing: float = BYTES_RATE_SMOOTHING
+
+    #: Count bytes received by TopicPartition (:attr:`tp_bytes_received`
+    #: and :attr:`tp_bytes_s`).  Enabled by the app when partitions are
+    #: weighted by bytes/s (:setting:`consumer_assignment_weight`).
+    track_bytes_received: bool = False
+
     #: Mapping of tables
     tables: MutableMapping[str, TableState] = cast(
         MutableMapping[str, TableState], None
@@ -146,20 +179,21 @@ class Monitor(Sensor, KeywordReduce):
     #: Count of events processed by task
     events_by_task: Counter[str] = cast(Counter[str], None)
 
-    #: Average event runtime over the last second.
+    #: Median event runtime in the last :attr:`latency_window` seconds,
+    #: updated every second.
     events_runtime_avg: float = 0.0
 
-    #: Deque of run times used for averages
-    events_runtime: Deque[float] = cast(Deque[float], None)
+    #: Sketch of event run times.
+    events_runtime: WindowedLatencySketch = cast(WindowedLatencySketch, None)
 
-    #: Deque of commit latency values
-    commit_latency: Deque[float] = cast(Deque[float], None)
+    #: Sketch of commit latencies.
+    commit_latency: WindowedLatencySketch = cast(WindowedLatencySketch, None)
 
-    #: Deque of send latency values
-    send_latency: Deque[float] = cast(Deque[float], None)
+    #: Sketch of send latencies.
+    send_latency: WindowedLatencySketch = cast(WindowedLatencySketch, None)
 
-    #: Deque of assignment latency values.
-    assignment_latency: Deque[float] = cast(Deque[float], None)
+    #: Sketch of assignment latencies.
+    assignment_latency: WindowedLatencySketch = cast(WindowedLatencySketch, None)
 
     #: Counter of times a topics buffer was full
     topic_buffer_full: Counter[TP] = cast(Counter[TP], None)
@@ -176,6 +210,16 @@ class Monitor(Sensor, KeywordReduce):
     #: Log end offsets by TopicPartition
     tp_end_offsets: TPOffsetMapping = cast(TPOffsetMapping, None)
 
+    #: Number of bytes received in total by TopicPartition
+    tp_bytes_received: Counter[TP] = cast(Counter[TP], None)
+
+    #: Moving average of bytes received per second by TopicPartition
+    tp_bytes_s: MutableMapping[TP, float] = cast(MutableMapping[TP, float], None)
+
+    #: Consumer lag by TopicPartition as it was when the last rebalance
+    #: started (the offsets above are reset by rebalancing).
+    tp_lag_at_rebalance: TPOffsetMapping = cast(TPOffsetMapping, None)
+
     #: Number of produce operations that ended in error.
     send_errors = 0
 
@@ -188,27 +232,34 @@ class Monitor(Sensor, KeywordReduce):
     #: Number of rebalances seen by this worker.
     rebalances = 0
 
-    #: Deque of previous n rebalance return latencies.
-    rebalance_return_latency: Deque[float] = cast(Deque[float], None)
+    #: Sketch of rebalance return latencies.
+    rebalance_return_latency: WindowedLatencySketch = cast(WindowedLatencySketch, None)
 
-    #: Deque of previous n rebalance end latencies.
-    rebalance_end_latency: Deque[float] = cast(Deque[float], None)
+    #: Sketch of rebalance end latencies.
+    rebalance_end_latency: WindowedLatencySketch = cast(WindowedLatencySketch, None)
 
-    #: Average rebalance return latency.
+    #: Median rebalance return latency.
     rebalance_return_avg: float = 0.0
 
-    #: Average rebalance end latency.
+    #: Median rebalance end latency.
     rebalance_end_avg: float = 0.0
 
     #: Counter of returned HTTP status codes.
     http_response_codes: Counter[HTTPStatus] = cast(Counter[HTTPStatus], None)
 
-    #: Deque of previous n HTTP request->response latencies.
-    http_response_latency: Deque[float] = cast(Deque[float], None)
+    #: Sketch of HTTP request->response latencies.
+    http_response_latency: WindowedLatencySketch = cast(WindowedLatencySketch, None)
 
-    #: Average request->response latency.
+    #: Median request->response latency.
     http_response_latency_avg: float = 0.0
 
+    #: Number of batches of records the consumer fetched ahead
+    #: (see :setting:`consumer_prefetch_batches`).
+    consumer_prefetch_depth: int = 0
+
+    #: Sketch of time the consumer waited for batches fetched ahead.
+    prefetch_wait_latency: WindowedLatencySketch = cast(WindowedLatencySketch, None)
+
     stream_inbound_time: Dict[TP, float] = cast(Dict[TP, float], None)
 
     # Lookup for names to streams to reduce __repr__ overhead
@@ -237,50 +288,53 @@ class Monitor(Sensor, KeywordReduce):
         events_total: int = 0,
         events_by_stream: Optional[Counter[StreamT]] = None,
         events_by_task: Optional[Counter[asyncio.Task]] = None,
-        events_runtime: Optional[Deque[float]] = None,
-        commit_latency: Optional[Deque[float]] = None,
-        send_latency: Optional[Deque[float]] = None,
-        assignment_latency: Optional[Deque[float]] = None,
+        events_runtime: Optional[Iterable[float]] = None,
+        commit_latency: Optional[Iterable[float]] = None,
+        send_latency: Optional[Iterable[float]] = None,
+        assignment_latency: Optional[Iterable[float]] = None,
         events_s: int = 0,
         messages_s: int = 0,
         events_runtime_avg: float = 0.0,
         topic_buffer_full: Optional[Counter[TP]] = None,
         rebalances: Optional[int] = None,
-        rebalance_return_latency: Optional[Deque[float]] = None,
-        rebalance_end_latency: Optional[Deque[float]] = None,
+        rebalance_return_latency: Optional[Iterable[float]] = None,
+        rebalance_end_latency: Optional[Iterable[float]] = None,
         rebalance_return_avg: float = 0.0,
         rebalance_end_avg: float = 0.0,
         time: Callable[[], float] = monotonic,
         http_response_codes: Optional[Counter[HTTPStatus]] = None,
-        http_response_latency: Optional[Deque[float]] = None,
+        http_response_latency: Optional[Iterable[float]] = None,
         http_response_latency_avg: float = 0.0,
+        prefetch_wait_latency: Optional[Iterable[float]] = None,
+        latency_relative_accuracy: Optional[float] = None,
+        latency_window: Optional[int] = None,
         **kwargs: Any,
     ) -> None:
         if max_avg_history is not None:
+            self._warn_history_deprecated("max_avg_history")
             self.max_avg_history = max_avg_history
         if max_commit_latency_history is not None:
+            self._warn_history_deprecated("max_commit_latency_history")
             self.max_commit_latency_history = max_commit_latency_history
         if max_send_latency_history is not None:
+            self._warn_history_deprecated("max_send_latency_history")
             self.max_send_latency_history = max_send_latency_history
         if max_assignment_latency_history is not None:
+            self._warn_history_deprecated("max_assignment_latency_history")
             self.max_assignment_latency_history = max_assignment_latency_history
         if rebalances is not None:
             self.rebalances = rebalances
+        if latency_relative_accuracy is not None:
+            self.latency_relative_accuracy = latency_relative_accuracy
+        if latency_window is not None:
+            self.latency_window = latency_window
 
         self.tables = {} if tables is None else tables
-        self.commit_latency = deque(
-            commit_latency or [], maxlen=self.max_commit_latency_history
-        )
-        self.send_latency = deque(send_latency or [], self.max_send_latency_history)
-        self.assignment_latency = deque(
-            assignment_latency or [], maxlen=self.max_assignment_latency_history
-        )
-        self.rebalance_return_latency = deque(
-            rebalance_return_latency or [], maxlen=self.max_avg_history
-        )
-        self.rebalance_end_latency = deque(
-            rebalance_end_latency or [], maxlen=self.max_avg_history
-        )
+        self.commit_latency = self._new_sketch(commit_latency)
+        self.send_latency = self._new_sketch(send_latency)
+        self.assignment_latency = self._new_sketch(assignment_latency)
+        self.rebalance_return_latency = self._new_sketch(rebalance_return_latency)
+        self.rebalance_end_latency = self._new_sketch(rebalance_end_latency)
         self.rebalance_return_avg = rebalance_return_avg
         self.rebalance_end_avg = rebalance_end_avg
 
@@ -297,21 +351,25 @@ class Monitor(Sensor, KeywordReduce):
         self.events_by_stream = Counter()
         self.events_s = events_s
         self.events_runtime_avg = events_runtime_avg
-        self.events_runtime = deque(events_runtime or [], maxlen=self.max_avg_history)
+        self.events_runtime = self._new_sketch(events_runtime)
         self.topic_buffer_full = Counter()
         self.time: Callable[[], float] = time
 
         self.http_response_codes = Counter()
-        self.http_response_latency = deque(
-            http_response_latency or [], maxlen=self.max_avg_history
-        )
+        self.http_response_latency = self._new_sketch(http_response_latency)
         self.http_response_latency_avg = http_response_latency_avg
 
+        self.prefetch_wait_latency = self._new_sketch(prefetch_wait_latency)
+
         self.metric_counts = Counter()
 
         self.tp_committed_offsets = {}
         self.tp_read_offsets = {}
         self.tp_end_offsets = {}
+        self.tp_bytes_received = Counter()
+        self.tp_bytes_s = {}
+        self._tp_bytes_prev: Counter[TP] = Counter()
+        self.tp_lag_at_rebalance = {}
 
         self.stream_inbound_time = {}
 
@@ -320,6 +378,34 @@ class Monitor(Sensor, KeywordReduce):
 
         Service.__init__(self, **kwargs)
 
+    def _warn_history_deprecated(self, name: str) -> None:
+        # we use UserWarning because DeprecationWarning is silenced
+        # by default.
+        warnings.warn(
+            UserWarning(
+                f"Monitor argument {name} is deprecated and ignored: "
+                f"latencies are kept for the last latency_window seconds."
+            ),
+            stacklevel=3,
+        )
+
+    def _new_sketch(self, values: Optional[Iterable[float]]) -> WindowedLatencySketch:
+        if isinstance(values, WindowedLatencySketch):
+            return values
+        return WindowedLatencySketch(
+            values,
+            window=self.latency_window,
+            relative_accuracy=self.latency_relative_accuracy,
+        )
+
+    def latency_sketches(self) -> Mapping[str, WindowedLatencySketch]:
+        """Return mapping of latency series name to its sketch.
+
+        Latencies are in seconds, recorded in the last
+        :attr:`latency_window` seconds.
+        """
+        return {name: getattr(self, name) for name in LATENCY_SERIES}
+
     def secs_since(self, start_time: float) -> float:
         """Given timestamp start, return number of seconds since that time."""
         return self.time() - start_time
@@ -345,9 +431,9 @@ class Monitor(Sensor, KeywordReduce):
     def _sample(
         self, prev_event_total: int, prev_message_total: int
     ) -> Tuple[int, int]:
-        # Update average event runtime.
+        # Update median event runtime.
         if self.events_runtime:
-            self.events_runtime_avg = median(self.events_runtime)
+            self.events_runtime_avg = self._median(self.events_runtime)
 
         # Update events/s
         self.events_s, prev_event_total = (
@@ -362,16 +448,35 @@ class Monitor(Sensor, KeywordReduce):
         )
 
         if self.rebalance_return_latency:
-            self.rebalance_return_avg = median(self.rebalance_return_latency)
+            self.rebalance_return_avg = self._median(self.rebalance_return_latency)
 
         if self.rebalance_end_latency:
-            self.rebalance_end_avg = median(self.rebalance_end_latency)
+            self.rebalance_end_avg = self._median(self.rebalance_end_latency)
 
         if self.http_response_latency:
-            self.http_response_latency_avg = median(self.http_response_latency)
+            self.http_response_latency_avg = self._median(self.http_response_latency)
+
+        self._sample_tp_bytes()
+
+        # Called once a second, so the windows cover latency_window seconds.
+        for sketch in self.latency_sketches().values():
+            sketch.rotate()
 
         return prev_event_total, prev_message_total
 
+    def _median(self, sketch: WindowedLatencySketch) -> float:
+        return cast(float, sketch.quantile(0.5))
+
+    def _sample_tp_bytes(self) -> None:
+        # Called once a second, so the delta is the rate in bytes/s.
+        smoothing = self.bytes_rate_smoothing
+        prev = self._tp_bytes_prev
+        rates = self.tp_bytes_s
+        for tp, total in self.tp_bytes_received.items():
+            current = total - prev[tp]
+            rates[tp] = smoothing * current + (1.0 - smoothing) * rates.get(tp, 0.0)
+            prev[tp] = total
+
     def asdict(self) -> Mapping:
         """Return monitor state as dictionary."""
         return {
@@ -385,12 +490,13 @@ class Monitor(Sensor, KeywordReduce):
             "events_total": self.events_total,
             "events_s": self.events_s,
             "events_runtime_avg": self.events_runtime_avg,
+            "events_runtime": self.events_runtime.asdict(),
             "events_by_task": self._events_by_task_dict(),
             "events_by_stream": self._events_by_stream_dict(),
-            "commit_latency": self.commit_latency,
-            "send_latency": self.send_latency,
+            "commit_latency": self.commit_latency.asdict(),
+            "send_latency": self.send_latency.asdict(),
             "send_errors": self.send_errors,
-            "assignment_latency": self.assignment_latency,
+            "assignment_latency": self.assignment_latency.asdict(),
             "assignments_completed": self.assignments_completed,
             "assignments_failed": self.assignments_failed,
             "topic_buffer_full": self._topic_buffer_full_dict(),
@@ -400,13 +506,15 @@ class Monitor(Sensor, KeywordReduce):
             "topic_read_offsets": self._tp_read_offsets_dict(),
             "topic_end_offsets": self._tp_end_offsets_dict(),
             "rebalances": self.rebalances,
-            "rebalance_return_latency": self.rebalance_return_latency,
-            "rebalance_end_latency": self.rebalance_end_latency,
+            "rebalance_return_latency": self.rebalance_return_latency.asdict(),
+            "rebalance_end_latency": self.rebalance_end_latency.asdict(),
             "rebalance_return_avg": self.rebalance_return_avg,
             "rebalance_end_avg": self.rebalance_end_avg,
             "http_response_codes": self._http_response_codes_dict(),
-            "http_response_latency": self.http_response_latency,
+            "http_response_latency": self.http_response_latency.asdict(),
             "http_response_latency_avg": self.http_response_latency_avg,
+            "consumer_prefetch_depth": self.consumer_prefetch_depth,
+            "prefetch_wait_latency": self.prefetch_wait_latency.asdict(),
         }
 
     def _events_by_stream_dict(self) -> MutableMapping[str, int]:
@@ -450,6 +558,11 @@ class Monitor(Sensor, KeywordReduce):
         self.messages_active += 1
         self.messages_received_by_topic[tp.topic] += 1
         self.tp_read_offsets[tp] = offset
+        if self.track_bytes_received:
+            # aiokafka gives -1 as the size of a null key or value.
+            key_size = max(message.serialized_key_size, 0)
+            value_size = max(message.serialized_value_size, 0)
+            self.tp_bytes_received[tp] += key_size + value_size
         message.time_in = self.time()
 
     def on_stream_event_in(
@@ -460,20 +573,19 @@ class Monitor(Sensor, KeywordReduce):
         self.stream_inbound_time[tp] = monotonic()
 
         # Performance wise it is better to only stringify stream once.
-        if stream in self.stream_lookup:
+        try:
             stream_lookup_key = self.stream_lookup[stream]
-        else:
+        except KeyError:
             stream_lookup_key = self.stream_lookup[stream] = str(stream)
 
         self.events_by_stream[stream_lookup_key] += 1
 
         # Same thing for tasks
-        if stream.task_owner in self.task_lookup:
-            task_lookup_key = self.task_lookup[stream.task_owner]
-        else:
-            task_lookup_key = self.task_lookup[stream.task_owner] = str(
-                stream.task_owner
-            )
+        task_owner = stream.task_owner
+        try:
+            task_lookup_key = self.task_lookup[task_owner]
+        except KeyError:
+            task_lookup_key = self.task_lookup[task_owner] = str(task_owner)
 
         self.events_by_task[task_lookup_key] += 1
         self.events_active += 1
@@ -491,17 +603,22 @@ class Monitor(Sensor, KeywordReduce):
         event: EventT,
         state: Optional[Dict] = None,
     ) -> None:
-        """Call when stream is done processing an event."""
+        """Call when stream is done processing an event.
+
+        The event is not timed when ``state["time_in"]`` is
+        :const:`None` (see :setting:`sensor_sampling`).
+        """
         if state is not None:
-            time_out = self.time()
-            time_in = state["time_in"]
-            time_total = time_out - time_in
             self.events_active -= 1
-            state.update(
-                time_out=time_out,
-                time_total=time_total,
-            )
-            self.events_runtime.append(time_total)
+            time_in = state["time_in"]
+            if time_in is not None:
+                time_out = self.time()
+                time_total = time_out - time_in
+                state.update(
+                    time_out=time_out,
+                    time_total=time_total,
+                )
+                self.events_runtime.append(time_total)
 
     def on_topic_buffer_full(self, tp: TP) -> None:
         """Call when conductor topic buffer is full and has to wait."""
@@ -560,8 +677,8 @@ class Monitor(Sensor, KeywordReduce):
         self, producer: ProducerT, state: Any, metadata: RecordMetadata
     ) -> None:
         """Call when producer finished sending message."""
-        latency = self.time() - cast(float, state)
-        self.send_latency.append(latency)
+        if state is not None:
+            self.send_latency.append(self.time() - state)
 
     def on_send_error(
         self, producer: ProducerT, exc: BaseException, state: Any
@@ -581,6 +698,15 @@ class Monitor(Sensor, KeywordReduce):
         """Track new topic partition end offset for monitoring lags."""
         self.tp_end_offsets[tp] = offset
 
+    def tp_lags(self) -> TPOffsetMapping:
+        """Return current consumer lag by topic partition."""
+        read_offsets = self.tp_read_offsets
+        return {
+            tp: max(end_offset - read_offsets[tp], 0)
+            for tp, end_offset in self.tp_end_offsets.items()
+            if tp in read_offsets
+        }
+
     def on_assignment_start(self, assignor: PartitionAssignorT) -> Dict:
         """Partition assignor is starting to assign partitions."""
         return {"time_start": self.time()}
@@ -604,6 +730,11 @@ class Monitor(Sensor, KeywordReduce):
     def on_rebalance_start(self, app: AppT) -> Dict:
         """Cluster rebalance in progress."""
         self.rebalances = app.rebalancing_count
+        lags = self.tp_lags()
+        if lags:
+            # Keep the previous figures if a rebalance interrupts recovery
+            # before any offsets were tracked again.
+            self.tp_lag_at_rebalance = lags
         self._clear_topic_related_sensors()
         return {"time_start": self.time()}
 
@@ -661,6 +792,13 @@ class Monitor(Sensor, KeywordReduce):
     def on_threaded_producer_buffer_processed(self, app: AppT, size: int) -> None:
         pass
 
+    def on_consumer_prefetch(
+        self, consumer: ConsumerT, depth: int, wait_time: float
+    ) -> None:
+        """Call when consumer takes batch of records fetched ahead."""
+        self.consumer_prefetch_depth = depth
+        self.prefetch_wait_latency.append(wait_time)
+
     def _normalize(
         self,
         name: str,
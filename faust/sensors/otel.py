@@ -115,12 +115,14 @@ class OTelMetrics:
     rebalance_return_latency: Histogram
     rebalance_end_latency: Histogram
     http_latency: Histogram
+    prefetch_wait: Histogram
 
     #: Synchronous gauges for last-known values (``.set``).
     offset_read: Gauge
     offset_committed: Gauge
     offset_end: Gauge
     producer_buffer: Gauge
+    prefetch_depth: Gauge
 
     def __init__(self, meter: Meter) -> None:
         self.meter = meter
@@ -227,6 +229,11 @@ class OTelMetrics:
             unit="ms",
             description="Web request handling latency.",
         )
+        self.prefetch_wait = meter.create_histogram(
+            "faust.consumer.prefetch_wait",
+            unit="ms",
+            description="Time spent waiting for records fetched ahead.",
+        )
 
         self.offset_read = meter.create_gauge(
             "faust.offset.read",
@@ -248,6 +255,11 @@ class OTelMetrics:
             unit="1",
             description="Size of the threaded producer send buffer.",
         )
+        self.prefetch_depth = meter.create_gauge(
+            "faust.consumer.prefetch_depth",
+            unit="1",
+            description="Batches of records fetched ahead of processing.",
+        )
 
 
 class OpenTelemetryMonitor(Monitor):
@@ -333,9 +345,9 @@ class OpenTelemetryMonitor(Monitor):
         super().on_stream_event_out(tp, offset, stream, event, state)
         attrs = self._tp_attrs(tp, stream)
         self.metrics.events_active.add(-1, attrs)
-        if state is not None:
+        if state is not None and state["time_total"] is not None:
             self.metrics.events_runtime.record(
-                self.secs_to_ms(self.events_runtime[-1]), attrs
+                self.secs_to_ms(cast(float, self.events_runtime.last)), attrs
             )
 
     # -- Tables -------------------------------------------------------------
@@ -364,7 +376,8 @@ class OpenTelemetryMonitor(Monitor):
         super().on_send_completed(producer, state, metadata)
         attrs = {"topic": metadata.topic} if metadata.topic is not None else {}
         self.metrics.messages_sent.add(1, attrs)
-        self.metrics.send_latency.record(self.ms_since(cast(float, state)))
+        if state is not None:
+            self.metrics.send_latency.record(self.ms_since(cast(float, state)))
 
     def on_send_error(
         self, producer: ProducerT, exc: BaseException, state: Any
@@ -372,7 +385,8 @@ class OpenTelemetryMonitor(Monitor):
         """Call when producer was unable to publish message."""
         super().on_send_error(producer, exc, state)
         self.metrics.messages_send_errors.add(1)
-        self.metrics.send_error_latency.record(self.ms_since(cast(float, state)))
+        if state is not None:
+            self.metrics.send_error_latency.record(self.ms_since(cast(float, state)))
 
     # -- Assignments --------------------------------------------------------
 
@@ -461,6 +475,14 @@ class OpenTelemetryMonitor(Monitor):
         super().on_threaded_producer_buffer_processed(app, size)
         self.metrics.producer_buffer.set(size)
 
+    def on_consumer_prefetch(
+        self, consumer: ConsumerT, depth: int, wait_time: float
+    ) -> None:
+        """Call when consumer takes batch of records fetched ahead."""
+        super().on_consumer_prefetch(consumer, depth, wait_time)
+        self.metrics.prefetch_depth.set(depth)
+        self.metrics.prefetch_wait.record(self.secs_to_ms(wait_time))
+
     # -- Custom counters ----------------------------------------------------
 
     def count(self, metric_name: str, count: int = 1) -> None:
@@ -1,7 +1,8 @@
 """Monitor using Prometheus."""
 
 import typing
-from typing import Any, NamedTuple, Optional, cast
+import weakref
+from typing import Any, Dict, MutableMapping, NamedTuple, Optional, Set, cast
 
 from aiohttp.web import Response
 
@@ -69,11 +70,17 @@ MS_LATENCY_BUCKETS = (
 )
 
 
+#: Quantiles of every latency sketch exported by
+#: :meth:`PrometheusMonitor.update_latency_quantiles` (1.0 is the max).
+LATENCY_QUANTILES = (0.5, 0.95, 0.99, 1.0)
+
+
 def setup_prometheus_sensors(
     app: AppT,
     pattern: str = "/metrics",
     registry: CollectorRegistry = REGISTRY,
     name_prefix: Optional[str] = None,
+    latency_sample_every: int = 1,
 ) -> None:
     """
     A utility function which sets up prometheus and attaches the config to the app.
@@ -82,6 +89,8 @@ def setup_prometheus_sensors(
     @param pattern: the url pattern for prometheus
     @param registry: the prometheus registry
     @param name_prefix: the name prefix. Defaults to the app name
+    @param latency_sample_every: observe the event runtime and producer
+        send latency histograms for only 1 in this many events.
     @return: None
     """
     if prometheus_client is None:
@@ -94,11 +103,14 @@ def setup_prometheus_sensors(
     name_prefix = name_prefix.replace("-", "_").replace(".", "_")
 
     faust_metrics = FaustMetrics.create(registry, name_prefix)
-    app.monitor = PrometheusMonitor(metrics=faust_metrics)
+    monitor = app.monitor = PrometheusMonitor(
+        metrics=faust_metrics, latency_sample_every=latency_sample_every
+    )
 
     @app.page(pattern)
     async def metrics_handler(self: web.View, request: web.Request) -> web.Response:
         headers = {"Content-Type": CONTENT_TYPE_LATEST}
+        monitor.update_latency_quantiles()
 
         return cast(
             web.Response,
@@ -150,6 +162,13 @@ class FaustMetrics(NamedTuple):
     topic_partition_offset_commited: Gauge
     consumer_commit_latency: Histogram
 
+    # Records fetched ahead of processing
+    consumer_prefetch_depth: Gauge
+    consumer_prefetch_wait: Histogram
+
+    # Quantiles of the latency sketches kept by the Monitor
+    latency_quantiles: Gauge
+
     @classmethod
     def create(cls, registry: CollectorRegistry, app_name: str) -> "FaustMetrics":
         messages_received = Counter(
@@ -290,6 +309,23 @@ class FaustMetrics(NamedTuple):
             registry=registry,
             buckets=MS_LATENCY_BUCKETS,
         )
+        consumer_prefetch_depth = Gauge(
+            f"{app_name}_consumer_prefetch_depth",
+            "Batches of records fetched ahead of processing",
+            registry=registry,
+        )
+        consumer_prefetch_wait = Histogram(
+            f"{app_name}_consumer_prefetch_wait",
+            "Time waiting for records fetched ahead in ms",
+            registry=registry,
+            buckets=MS_LATENCY_BUCKETS,
+        )
+        latency_quantiles = Gauge(
+            f"{app_name}_latency_quantile_ms",
+            "Latency quantiles in ms over the last Monitor.latency_window seconds",
+            ["series", "quantile"],
+            registry=registry,
+        )
         return cls(
             messages_received=messages_received,
             active_messages=active_messages,
@@ -319,6 +355,9 @@ class FaustMetrics(NamedTuple):
             topic_partition_end_offset=topic_partition_end_offset,
             topic_partition_offset_commited=topic_partition_offset_commited,
             consumer_commit_latency=consumer_commit_latency,
+            consumer_prefetch_depth=consumer_prefetch_depth,
+            consumer_prefetch_wait=consumer_prefetch_wait,
+            latency_quantiles=latency_quantiles,
         )
 
     def clear_topic_related_metrics(self) -> None:
@@ -359,6 +398,20 @@ class FaustMetrics(NamedTuple):
                 metric.remove(topic)
 
 
+class _TPChildren(NamedTuple):
+    # Labelled metrics of a topic partition, see PrometheusMonitor._tp_children.
+    messages_received: Counter
+    read_offset: Gauge
+    committed_offset: Gauge
+    end_offset: Gauge
+
+
+class _TableChildren(NamedTuple):
+    keys_retrieved: Counter
+    keys_updated: Counter
+    keys_deleted: Counter
+
+
 class PrometheusMonitor(Monitor):
     """
     Prometheus Faust Sensor.
@@ -372,6 +425,15 @@ class PrometheusMonitor(Monitor):
 
         app = faust.App('example', broker='kafka://')
         setup_prometheus_sensors(app, pattern='/metrics', 'example_app_name')
+
+    The labelled metrics of every topic partition, stream and table
+    are resolved once and cached (the topic partition ones until the
+    next rebalance). With ``latency_sample_every=N`` the event runtime
+    and producer send latency histograms only observe 1 in N events.
+
+    The quantiles of the latency sketches kept by the Monitor, over
+    the last :attr:`~faust.sensors.Monitor.latency_window` seconds, are
+    exported as the ``latency_quantile_ms`` gauge when scraped.
     """
 
     ERROR = "error"
@@ -380,20 +442,83 @@ class PrometheusMonitor(Monitor):
     KEYS_UPDATED = "keys_updated"
     KEYS_DELETED = "keys_deleted"
 
-    def __init__(self, metrics: FaustMetrics, **kwargs: Any) -> None:
+    def __init__(
+        self, metrics: FaustMetrics, latency_sample_every: int = 1, **kwargs: Any
+    ) -> None:
         super().__init__(**kwargs)
         self._metrics = metrics
+        self.latency_sample_every = max(latency_sample_every, 1)
+        self._events_unsampled = 0
+        self._sends_unsampled = 0
+        self._tp_children: Dict[TP, _TPChildren] = {}
+        self._topic_sent_children: Dict[str, Counter] = {}
+        self._table_children: Dict[str, _TableChildren] = {}
+        # series exported by update_latency_quantiles.
+        self._quantile_series: Set[str] = set()
+        self._stream_children: MutableMapping[StreamT, Counter] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _tp_children_for(self, tp: TP) -> _TPChildren:
+        try:
+            return self._tp_children[tp]
+        except KeyError:
+            metrics = self._metrics
+            topic, partition = tp
+            children = self._tp_children[tp] = _TPChildren(
+                messages_received=metrics.messages_received_per_topics.labels(
+                    topic=topic
+                ),
+                read_offset=metrics.messages_received_per_topics_partition.labels(
+                    topic=topic, partition=partition
+                ),
+                committed_offset=metrics.topic_partition_offset_commited.labels(
+                    topic=topic, partition=partition
+                ),
+                end_offset=metrics.topic_partition_end_offset.labels(
+                    topic=topic, partition=partition
+                ),
+            )
+            return children
+
+    def _stream_children_for(self, stream: StreamT) -> Counter:
+        try:
+            return self._stream_children[stream]
+        except KeyError:
+            child = self._stream_children[stream] = (
+                self._metrics.total_events_per_stream.labels(
+                    stream=f"stream.{self._stream_label(stream)}.events"
+                )
+            )
+            return child
+
+    def _table_children_for(self, table: CollectionT) -> _TableChildren:
+        try:
+            return self._table_children[table.name]
+        except KeyError:
+            operations = self._metrics.table_operations
+            label = f"table.{table.name}"
+            children = self._table_children[table.name] = _TableChildren(
+                keys_retrieved=operations.labels(
+                    table=label, operation=self.KEYS_RETRIEVED
+                ),
+                keys_updated=operations.labels(
+                    table=label, operation=self.KEYS_UPDATED
+                ),
+                keys_deleted=operations.labels(
+                    table=label, operation=self.KEYS_DELETED
+                ),
+            )
+            return children
 
     def on_message_in(self, tp: TP, offset: int, message: Message) -> None:
         """Call before message is delegated to streams."""
         super().on_message_in(tp, offset, message)
-
+        children = self._tp_children_for(tp)
         self._metrics.messages_received.inc()
         self._metrics.active_messages.inc()
-        self._metrics.messages_received_per_topics.labels(topic=tp.topic).inc()
-        self._metrics.messages_received_per_topics_partition.labels(
-            topic=tp.topic, partition=tp.partition
-        ).set(offset)
+        children.messages_received.inc()
+        children.read_offset.set(offset)
 
     def on_stream_event_in(
         self, tp: TP, offset: int, stream: StreamT, event: EventT
@@ -402,9 +527,7 @@ class PrometheusMonitor(Monitor):
         state = super().on_stream_event_in(tp, offset, stream, event)
         self._metrics.total_events.inc()
         self._metrics.total_active_events.inc()
-        self._metrics.total_events_per_stream.labels(
-            stream=f"stream.{self._stream_label(stream)}.events"
-        ).inc()
+        self._stream_children_for(stream).inc()
 
         return state
 
@@ -428,10 +551,13 @@ class PrometheusMonitor(Monitor):
         """Call when stream is done processing an event."""
         super().on_stream_event_out(tp, offset, stream, event, state)
         self._metrics.total_active_events.dec()
-        if state is not None:
-            self._metrics.events_runtime_latency.observe(
-                self.secs_to_ms(self.events_runtime[-1])
-            )
+        if state is not None and state["time_total"] is not None:
+            self._events_unsampled += 1
+            if self._events_unsampled >= self.latency_sample_every:
+                self._events_unsampled = 0
+                self._metrics.events_runtime_latency.observe(
+                    self.secs_to_ms(cast(float, self.events_runtime.last))
+                )
 
     def on_message_out(self, tp: TP, offset: int, message: Message) -> None:
         """Call when message is fully acknowledged and can be committed."""
@@ -441,25 +567,19 @@ class PrometheusMonitor(Monitor):
     def on_table_get(self, table: CollectionT, key: typing.Any) -> None:
         """Call when value in table is retrieved."""
         super().on_table_get(table, key)
-        self._metrics.table_operations.labels(
-            table=f"table.{table.name}", operation=self.KEYS_RETRIEVED
-        ).inc()
+        self._table_children_for(table).keys_retrieved.inc()
 
     def on_table_set(
         self, table: CollectionT, key: typing.Any, value: typing.Any
     ) -> None:
         """Call when new value for key in table is set."""
         super().on_table_set(table, key, value)
-        self._metrics.table_operations.labels(
-            table=f"table.{table.name}", operation=self.KEYS_UPDATED
-        ).inc()
+        self._table_children_for(table).keys_updated.inc()
 
     def on_table_del(self, table: CollectionT, key: typing.Any) -> None:
         """Call when key in a table is deleted."""
         super().on_table_del(table, key)
-        self._metrics.table_operations.labels(
-            table=f"table.{table.name}", operation=self.KEYS_DELETED
-        ).inc()
+        self._table_children_for(table).keys_deleted.inc()
 
     def on_commit_completed(self, consumer: ConsumerT, state: typing.Any) -> None:
         """Call when consumer commit offset operation completed."""
@@ -468,6 +588,14 @@ class PrometheusMonitor(Monitor):
             self.ms_since(typing.cast(float, state))
         )
 
+    def on_consumer_prefetch(
+        self, consumer: ConsumerT, depth: int, wait_time: float
+    ) -> None:
+        """Call when consumer takes batch of records fetched ahead."""
+        super().on_consumer_prefetch(consumer, depth, wait_time)
+        self._metrics.consumer_prefetch_depth.set(depth)
+        self._metrics.consumer_prefetch_wait.observe(self.secs_to_ms(wait_time))
+
     def on_send_initiated(
         self,
         producer: ProducerT,
@@ -477,7 +605,13 @@ class PrometheusMonitor(Monitor):
         valsize: int,
     ) -> typing.Any:
         """Call when message added to producer buffer."""
-        self._metrics.topic_messages_sent.labels(topic=f"topic.{topic}").inc()
+        try:
+            child = self._topic_sent_children[topic]
+        except KeyError:
+            child = self._topic_sent_children[topic] = (
+                self._metrics.topic_messages_sent.labels(topic=f"topic.{topic}")
+            )
+        child.inc()
 
         return super().on_send_initiated(producer, topic, message, keysize, valsize)
 
@@ -487,9 +621,14 @@ class PrometheusMonitor(Monitor):
         """Call when producer finished sending message."""
         super().on_send_completed(producer, state, metadata)
         self._metrics.total_sent_messages.inc()
-        self._metrics.producer_send_latency.observe(
-            self.ms_since(typing.cast(float, state))
-        )
+        if state is None:
+            return
+        self._sends_unsampled += 1
+        if self._sends_unsampled >= self.latency_sample_every:
+            self._sends_unsampled = 0
+            self._metrics.producer_send_latency.observe(
+                self.ms_since(typing.cast(float, state))
+            )
 
     def on_send_error(
         self, producer: ProducerT, exc: BaseException, state: typing.Any
@@ -497,9 +636,10 @@ class PrometheusMonitor(Monitor):
         """Call when producer was unable to publish message."""
         super().on_send_error(producer, exc, state)
         self._metrics.total_error_messages_sent.inc()
-        self._metrics.producer_error_send_latency.observe(
-            self.ms_since(typing.cast(float, state))
-        )
+        if state is not None:
+            self._metrics.producer_error_send_latency.observe(
+                self.ms_since(typing.cast(float, state))
+            )
 
     def on_assignment_error(
         self, assignor: PartitionAssignorT, state: typing.Dict, exc: BaseException
@@ -550,16 +690,12 @@ class PrometheusMonitor(Monitor):
         """Call when offset in topic partition is committed."""
         super().on_tp_commit(tp_offsets)
         for tp, offset in tp_offsets.items():
-            self._metrics.topic_partition_offset_commited.labels(
-                topic=tp.topic, partition=tp.partition
-            ).set(offset)
+            self._tp_children_for(tp).committed_offset.set(offset)
 
     def track_tp_end_offset(self, tp: TP, offset: int) -> None:
         """Track new topic partition end offset for monitoring lags."""
         super().track_tp_end_offset(tp, offset)
-        self._metrics.topic_partition_end_offset.labels(
-            topic=tp.topic, partition=tp.partition
-        ).set(offset)
+        self._tp_children_for(tp).end_offset.set(offset)
 
     def on_web_request_end(
         self,
@@ -576,8 +712,34 @@ class PrometheusMonitor(Monitor):
         self._metrics.http_status_codes.labels(status_code=status_code).inc()
         self._metrics.http_latency.observe(self.ms_since(state["time_end"]))
 
+    def update_latency_quantiles(self) -> None:
+        """Set the latency quantile gauges from the latency sketches.
+
+        Called when the metrics are scraped.
+        """
+        gauge = self._metrics.latency_quantiles
+        exported = self._quantile_series
+        for series, sketch in self.latency_sketches().items():
+            if not sketch:
+                # nothing recorded in the window: stop exporting
+                # the quantiles of older latencies.
+                if series in exported:
+                    exported.discard(series)
+                    for quantile in LATENCY_QUANTILES:
+                        gauge.remove(series, str(quantile))
+                continue
+            exported.add(series)
+            values = sketch.quantiles(LATENCY_QUANTILES)
+            for quantile, value in zip(LATENCY_QUANTILES, values):
+                gauge.labels(series=series, quantile=str(quantile)).set(
+                    self.secs_to_ms(cast(float, value))
+                )
+
     def _clear_partition_related_metrics(self) -> None:
         self._metrics.clear_topic_related_metrics()
+        # the cached children were removed from the metrics.
+        self._tp_children.clear()
+        self._topic_sent_children.clear()
         self.tp_committed_offsets.clear()
         self.tp_read_offsets.clear()
         self.tp_end_offsets.clear()
@@ -0,0 +1,307 @@
+"""Quantile sketches for latency series recorded by sensors."""
+
+import math
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Sequence
+
+__all__ = ["LatencySketch", "WindowedLatencySketch"]
+
+#: Relative error of the quantiles returned by :class:`LatencySketch`.
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+#: Maximum number of buckets kept by :class:`LatencySketch`.
+#: With 1% relative accuracy 2048 buckets cover values from
+#: a nanosecond to well over a day without losing any accuracy.
+DEFAULT_MAX_BUCKETS = 2048
+
+#: Values smaller than this are counted as zero.
+MIN_INDEXABLE_VALUE = 1e-9
+
+#: Quantiles summarized by :meth:`LatencySketch.asdict`.
+SUMMARY_QUANTILES: Sequence[float] = (0.5, 0.95, 0.99)
+
+#: Number of intervals covered by :class:`WindowedLatencySketch`.
+DEFAULT_WINDOW = 60
+
+
+class LatencySketch:
+    """Mergeable quantile sketch of a latency series, in fixed memory.
+
+    Values are counted in logarithmically sized buckets (as in DDSketch),
+    so that every quantile returned is within ``relative_accuracy``
+    of the exact value, recording a value takes constant time,
+    and two sketches with the same accuracy can be merged.
+
+    The most recent value is kept as :attr:`last`, and
+    the exact :attr:`min` and :attr:`max` are kept too.
+
+    When more than ``max_buckets`` buckets are needed the lowest buckets
+    are collapsed together, so only the accuracy of the lowest values
+    is lost.
+    """
+
+    __slots__ = (
+        "relative_accuracy",
+        "max_buckets",
+        "count",
+        "sum",
+        "min",
+        "max",
+        "last",
+        "_gamma",
+        "_log_gamma",
+        "_buckets",
+        "_zero_count",
+    )
+
+    def __init__(
+        self,
+        values: Optional[Iterable[float]] = None,
+        *,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        max_buckets: int = DEFAULT_MAX_BUCKETS,
+    ) -> None:
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last: Optional[float] = None
+        if values is not None:
+            self.extend(values)
+
+    def append(self, value: float) -> None:
+        """Record value."""
+        self.count += 1
+        self.sum += value
+        self.last = value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value < MIN_INDEXABLE_VALUE:
+            self._zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self._buckets
+        try:
+            buckets[key] += 1
+        except KeyError:
+            buckets[key] = 1
+            if len(buckets) > self.max_buckets:
+                self._collapse()
+
+    def extend(self, values: Iterable[float]) -> None:
+        """Record all values."""
+        for value in values:
+            self.append(value)
+
+    def merge(self, other: "LatencySketch") -> None:
+        """Add the values recorded by another sketch to this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        if not other.count:
+            return
+        buckets = self._buckets
+        for key, count in other._buckets.items():
+            buckets[key] = buckets.get(key, 0) + count
+        while len(buckets) > self.max_buckets:
+            self._collapse()
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.last = other.last
+
+    def _collapse(self) -> None:
+        # Move the lowest bucket into the next one.
+        buckets = self._buckets
+        lowest, second = sorted(buckets)[:2]
+        buckets[second] += buckets.pop(lowest)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the value at quantile ``q`` (0.0-1.0).
+
+        Returns :const:`None` if no values were recorded.
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Iterable[float]) -> Sequence[Optional[float]]:
+        """Return the values at every quantile in ``qs``."""
+        qs = list(qs)
+        if not self.count:
+            return [None] * len(qs)
+        results = self._values_at_ranks(
+            # nearest rank of every quantile.
+            [round(min(max(q, 0.0), 1.0) * (self.count - 1)) for q in qs]
+        )
+        for i, q in enumerate(qs):
+            # the exact min/max are known.
+            if q <= 0.0:
+                results[i] = self.min
+            elif q >= 1.0:
+                results[i] = self.max
+        return results
+
+    def _values_at_ranks(self, ranks: Sequence[int]) -> List[Optional[float]]:
+        results: List[Optional[float]] = [None] * len(ranks)
+        pending = iter(sorted((rank, i) for i, rank in enumerate(ranks)))
+        rank, i = next(pending)
+        seen = self._zero_count
+        while rank < seen:
+            results[i] = max(self.min, 0.0)
+            try:
+                rank, i = next(pending)
+            except StopIteration:
+                return results
+        gamma = self._gamma
+        buckets = self._buckets
+        for key in sorted(buckets):
+            seen += buckets[key]
+            if seen > rank:
+                # clamp to the exact min/max, more accurate at the edges.
+                value = min(max(2.0 * gamma**key / (gamma + 1.0), self.min), self.max)
+                while seen > rank:
+                    results[i] = value
+                    try:
+                        rank, i = next(pending)
+                    except StopIteration:
+                        return results
+        return results  # pragma: no cover
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Return the mean of all values, or :const:`None` if empty."""
+        return self.sum / self.count if self.count else None
+
+    def asdict(self) -> Mapping[str, Any]:
+        """Summarize sketch as dictionary of count, quantiles and max."""
+        summary: Dict[str, Any] = {"count": self.count}
+        for q, value in zip(SUMMARY_QUANTILES, self.quantiles(SUMMARY_QUANTILES)):
+            summary[f"p{round(q * 100)}"] = value
+        summary["max"] = self.max if self.count else None
+        return summary
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return bool(self.count)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {self.asdict()!r}>"
+
+
+class WindowedLatencySketch:
+    """Quantile sketch of the latencies recorded in the last intervals.
+
+    Values are recorded in one :class:`LatencySketch` per interval,
+    and the sketches of the last ``window`` intervals are merged
+    when queried, so quantiles follow the current latencies instead
+    of every value recorded since the sketch was created.
+
+    A new interval is started by calling :meth:`rotate`
+    (:class:`~faust.sensors.monitor.Monitor` does so every second).
+
+    The most recent value is kept as :attr:`last`, and the number of
+    values recorded since the sketch was created as :attr:`total`.
+    """
+
+    def __init__(
+        self,
+        values: Optional[Iterable[float]] = None,
+        *,
+        window: int = DEFAULT_WINDOW,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        max_buckets: int = DEFAULT_MAX_BUCKETS,
+    ) -> None:
+        if window < 1:
+            raise ValueError("window must be at least one interval")
+        self.window = window
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.total = 0
+        self.last: Optional[float] = None
+        self._intervals: Deque[LatencySketch] = deque(maxlen=window)
+        self._current = self._new_interval()
+        # merged sketch of the intervals before the current one.
+        self._previous: Optional[LatencySketch] = None
+        if values is not None:
+            self.extend(values)
+
+    def _new_interval(self) -> LatencySketch:
+        sketch = LatencySketch(
+            relative_accuracy=self.relative_accuracy, max_buckets=self.max_buckets
+        )
+        self._intervals.append(sketch)
+        return sketch
+
+    def append(self, value: float) -> None:
+        """Record value in the current interval."""
+        self._current.append(value)
+        self.total += 1
+        self.last = value
+
+    def extend(self, values: Iterable[float]) -> None:
+        """Record all values in the current interval."""
+        for value in values:
+            self.append(value)
+
+    def rotate(self) -> None:
+        """Start a new interval, forgetting the oldest one if the window is full."""
+        self._current = self._new_interval()
+        self._previous = None
+
+    def merged(self) -> LatencySketch:
+        """Return sketch of the values recorded in the window."""
+        previous = self._previous
+        if previous is None:
+            previous = self._previous = LatencySketch(
+                relative_accuracy=self.relative_accuracy, max_buckets=self.max_buckets
+            )
+            for sketch in islice(self._intervals, len(self._intervals) - 1):
+                previous.merge(sketch)
+        merged = LatencySketch(
+            relative_accuracy=self.relative_accuracy, max_buckets=self.max_buckets
+        )
+        merged.merge(previous)
+        merged.merge(self._current)
+        return merged
+
+    @property
+    def count(self) -> int:
+        """Return the number of values recorded in the window."""
+        return sum(sketch.count for sketch in self._intervals)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the value at quantile ``q`` (0.0-1.0) in the window.
+
+        Returns :const:`None` if no values were recorded in the window.
+        """
+        return self.merged().quantile(q)
+
+    def quantiles(self, qs: Iterable[float]) -> Sequence[Optional[float]]:
+        """Return the values at every quantile in ``qs`` in the window."""
+        return self.merged().quantiles(qs)
+
+    def asdict(self) -> Mapping[str, Any]:
+        """Summarize the window as dictionary of count, quantiles and max."""
+        return self.merged().asdict()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return any(sketch.count for sketch in self._intervals)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}: {self.asdict()!r}>"
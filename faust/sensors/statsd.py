@@ -1,9 +1,12 @@
 """Monitor using Statsd."""
 
 import typing
-from typing import Any, Dict, Optional, cast
+import weakref
+from typing import Any, Dict, MutableMapping, Optional, Tuple, cast
 
+from mode import Service
 from mode.utils.objects import cached_property
+from mode.utils.times import Seconds, want_seconds
 
 from faust import web
 from faust.exceptions import ImproperlyConfigured
@@ -20,6 +23,7 @@ from faust.types import (
 from faust.types.assignor import PartitionAssignorT
 from faust.types.transports import ConsumerT, ProducerT
 
+from .aggregator import DEFAULT_MAX_TIMING_SAMPLES, MetricAggregator
 from .monitor import Monitor, TPOffsetMapping
 
 try:
@@ -42,11 +46,19 @@ class StatsdMonitor(Monitor):
 
     This sensor, records statistics to Statsd along with computing metrics
     for the stats server
+
+    Metrics are aggregated locally and sent in batched packets
+    every ``flush_interval`` seconds: counters are summed, gauges
+    keep the last value, and at most ``max_timing_samples`` timings
+    are sent for every metric.  When more were recorded, the random
+    sample kept is sent with rate 1, and the number of timings recorded
+    as the ``<metric>_count`` counter.
     """
 
     host: str
     port: int
     prefix: str
+    flush_interval: float
 
     def __init__(
         self,
@@ -54,41 +66,95 @@ class StatsdMonitor(Monitor):
         port: int = 8125,
         prefix: str = "faust-app",
         rate: float = 1.0,
+        flush_interval: Seconds = 1.0,
+        max_timing_samples: int = DEFAULT_MAX_TIMING_SAMPLES,
         **kwargs: Any,
     ) -> None:
         self.host = host
         self.port = port
         self.prefix = prefix
         self.rate = rate
+        self.flush_interval = want_seconds(flush_interval)
         if statsd is None:
             raise ImproperlyConfigured("StatsMonitor requires `pip install statsd`.")
+        self.metrics = MetricAggregator(max_timing_samples=max_timing_samples)
+        # metric names are formatted once per topic partition/stream/table.
+        self._tp_names: Dict[TP, Tuple[str, str, str, str]] = {}
+        self._topic_sent_names: Dict[str, str] = {}
+        self._table_names: Dict[str, Tuple[str, str, str]] = {}
+        self._stream_names: MutableMapping[StreamT, str] = weakref.WeakKeyDictionary()
         super().__init__(**kwargs)
 
     def _new_statsd_client(self) -> StatsClient:
         return statsd.StatsClient(host=self.host, port=self.port, prefix=self.prefix)
 
+    @Service.task
+    async def _flusher(self) -> None:
+        async for sleep_time in self.itertimer(
+            self.flush_interval, name="StatsdMonitor.flush"
+        ):
+            self.flush()
+
+    async def on_stop(self) -> None:
+        """Call when the sensor stops."""
+        self.flush()
+
+    def flush(self) -> None:
+        """Send metrics aggregated since the last flush."""
+        if not self.metrics:
+            return
+        counters, gauges, timings = self.metrics.drain()
+        pipe = self.client.pipeline()
+        # counters and gauges are exact, so are never sampled.
+        for (metric, _), value in counters.items():
+            if value:
+                pipe.incr(metric, count=value)
+        for (metric, _), value in gauges.items():
+            pipe.gauge(metric, value)
+        rate = self.rate
+        for (metric, _), timing in timings.items():
+            if timing.capped:
+                # The server would scale the sample by rate, not by the
+                # share of timings kept, so it is sent unsampled along
+                # with the number of timings recorded.
+                for value in timing.samples:
+                    pipe.timing(metric, value, rate=1)
+                pipe.incr(f"{metric}_count", count=timing.count)
+            else:
+                for value in timing.samples:
+                    pipe.timing(metric, value, rate=rate)
+        pipe.send()
+
     def on_message_in(self, tp: TP, offset: int, message: Message) -> None:
         """Call before message is delegated to streams."""
         super().on_message_in(tp, offset, message)
-
-        self.client.incr("messages_received", rate=self.rate)
-        self.client.incr("messages_active", rate=self.rate)
-        self.client.incr(f"topic.{tp.topic}.messages_received", rate=self.rate)
-        self.client.gauge(f"read_offset.{tp.topic}.{tp.partition}", offset)
+        received, read_offset, _, _ = self._tp_names_for(tp)
+        metrics = self.metrics
+        metrics.increment("messages_received")
+        metrics.increment("messages_active")
+        metrics.increment(received)
+        metrics.gauge(read_offset, offset)
 
     def on_stream_event_in(
         self, tp: TP, offset: int, stream: StreamT, event: EventT
     ) -> Optional[Dict]:
         """Call when stream starts processing an event."""
         state = super().on_stream_event_in(tp, offset, stream, event)
-        self.client.incr("events", rate=self.rate)
-        self.client.incr(
-            f"stream.{self._stream_label(stream)}.events",
-            rate=self.rate,
-        )
-        self.client.incr("events_active", rate=self.rate)
+        metrics = self.metrics
+        metrics.increment("events")
+        metrics.increment(self._stream_events_name(stream))
+        metrics.increment("events_active")
         return state
 
+    def _stream_events_name(self, stream: StreamT) -> str:
+        try:
+            return self._stream_names[stream]
+        except KeyError:
+            name = self._stream_names[stream] = (
+                f"stream.{self._stream_label(stream)}.events"
+            )
+            return name
+
     def _stream_label(self, stream: StreamT) -> str:
         return (
             self._normalize(
@@ -98,6 +164,31 @@ class StatsdMonitor(Monitor):
             .lower()
         )
 
+    def _tp_names_for(self, tp: TP) -> Tuple[str, str, str, str]:
+        try:
+            return self._tp_names[tp]
+        except KeyError:
+            topic, partition = tp
+            names = self._tp_names[tp] = (
+                f"topic.{topic}.messages_received",
+                f"read_offset.{topic}.{partition}",
+                f"committed_offset.{topic}.{partition}",
+                f"end_offset.{topic}.{partition}",
+            )
+            return names
+
+    def _table_names_for(self, table: CollectionT) -> Tuple[str, str, str]:
+        try:
+            return self._table_names[table.name]
+        except KeyError:
+            name = table.name
+            names = self._table_names[name] = (
+                f"table.{name}.keys_retrieved",
+                f"table.{name}.keys_updated",
+                f"table.{name}.keys_deleted",
+            )
+            return names
+
     def on_stream_event_out(
         self,
         tp: TP,
@@ -108,40 +199,37 @@ class StatsdMonitor(Monitor):
     ) -> None:
         """Call when stream is done processing an event."""
         super().on_stream_event_out(tp, offset, stream, event, state)
-        self.client.decr("events_active", rate=self.rate)
-        if state is not None:
-            self.client.timing(
+        self.metrics.decrement("events_active")
+        if state is not None and state["time_total"] is not None:
+            self.metrics.timing(
                 "events_runtime",
-                self.secs_to_ms(self.events_runtime[-1]),
-                rate=self.rate,
+                self.secs_to_ms(cast(float, self.events_runtime.last)),
             )
 
     def on_message_out(self, tp: TP, offset: int, message: Message) -> None:
         """Call when message is fully acknowledged and can be committed."""
         super().on_message_out(tp, offset, message)
-        self.client.decr("messages_active", rate=self.rate)
+        self.metrics.decrement("messages_active")
 
     def on_table_get(self, table: CollectionT, key: Any) -> None:
         """Call when value in table is retrieved."""
         super().on_table_get(table, key)
-        self.client.incr(f"table.{table.name}.keys_retrieved", rate=self.rate)
+        self.metrics.increment(self._table_names_for(table)[0])
 
     def on_table_set(self, table: CollectionT, key: Any, value: Any) -> None:
         """Call when new value for key in table is set."""
         super().on_table_set(table, key, value)
-        self.client.incr(f"table.{table.name}.keys_updated", rate=self.rate)
+        self.metrics.increment(self._table_names_for(table)[1])
 
     def on_table_del(self, table: CollectionT, key: Any) -> None:
         """Call when key in a table is deleted."""
         super().on_table_del(table, key)
-        self.client.incr(f"table.{table.name}.keys_deleted", rate=self.rate)
+        self.metrics.increment(self._table_names_for(table)[2])
 
     def on_commit_completed(self, consumer: ConsumerT, state: Any) -> None:
         """Call when consumer commit offset operation completed."""
         super().on_commit_completed(consumer, state)
-        self.client.timing(
-            "commit_latency", self.ms_since(cast(float, state)), rate=self.rate
-        )
+        self.metrics.timing("commit_latency", self.ms_since(cast(float, state)))
 
     def on_send_initiated(
         self,
@@ -152,7 +240,11 @@ class StatsdMonitor(Monitor):
         valsize: int,
     ) -> Any:
         """Call when message added to producer buffer."""
-        self.client.incr(f"topic.{topic}.messages_sent", rate=self.rate)
+        try:
+            name = self._topic_sent_names[topic]
+        except KeyError:
+            name = self._topic_sent_names[topic] = f"topic.{topic}.messages_sent"
+        self.metrics.increment(name)
         return super().on_send_initiated(producer, topic, message, keysize, valsize)
 
     def on_send_completed(
@@ -160,83 +252,81 @@ class StatsdMonitor(Monitor):
     ) -> None:
         """Call when producer finished sending message."""
         super().on_send_completed(producer, state, metadata)
-        self.client.incr("messages_sent", rate=self.rate)
-        self.client.timing(
-            "send_latency", self.ms_since(cast(float, state)), rate=self.rate
-        )
+        self.metrics.increment("messages_sent")
+        if state is not None:
+            self.metrics.timing("send_latency", self.ms_since(cast(float, state)))
 
     def on_send_error(
         self, producer: ProducerT, exc: BaseException, state: Any
     ) -> None:
         """Call when producer was unable to publish message."""
         super().on_send_error(producer, exc, state)
-        self.client.incr("messages_sent_error", rate=self.rate)
-        self.client.timing(
-            "send_latency_for_error", self.ms_since(cast(float, state)), rate=self.rate
-        )
+        self.metrics.increment("messages_sent_error")
+        if state is not None:
+            self.metrics.timing(
+                "send_latency_for_error", self.ms_since(cast(float, state))
+            )
 
     def on_assignment_error(
         self, assignor: PartitionAssignorT, state: Dict, exc: BaseException
     ) -> None:
         """Partition assignor did not complete assignor due to error."""
         super().on_assignment_error(assignor, state, exc)
-        self.client.incr("assignments_error", rate=self.rate)
-        self.client.timing(
-            "assignment_latency", self.ms_since(state["time_start"]), rate=self.rate
-        )
+        self.metrics.increment("assignments_error")
+        self.metrics.timing("assignment_latency", self.ms_since(state["time_start"]))
 
     def on_assignment_completed(
         self, assignor: PartitionAssignorT, state: Dict
     ) -> None:
         """Partition assignor completed assignment."""
         super().on_assignment_completed(assignor, state)
-        self.client.incr("assignments_complete", rate=self.rate)
-        self.client.timing(
-            "assignment_latency", self.ms_since(state["time_start"]), rate=self.rate
-        )
+        self.metrics.increment("assignments_complete")
+        self.metrics.timing("assignment_latency", self.ms_since(state["time_start"]))
 
     def on_rebalance_start(self, app: AppT) -> Dict:
         """Cluster rebalance in progress."""
         state = super().on_rebalance_start(app)
-        self.client.incr("rebalances", rate=self.rate)
+        self.metrics.increment("rebalances")
         return state
 
     def on_rebalance_return(self, app: AppT, state: Dict) -> None:
         """Consumer replied assignment is done to broker."""
         super().on_rebalance_return(app, state)
-        self.client.decr("rebalances", rate=self.rate)
-        self.client.incr("rebalances_recovering", rate=self.rate)
-        self.client.timing(
-            "rebalance_return_latency",
-            self.ms_since(state["time_return"]),
-            rate=self.rate,
+        self.metrics.decrement("rebalances")
+        self.metrics.increment("rebalances_recovering")
+        self.metrics.timing(
+            "rebalance_return_latency", self.ms_since(state["time_return"])
         )
 
     def on_rebalance_end(self, app: AppT, state: Dict) -> None:
         """Cluster rebalance fully completed (including recovery)."""
         super().on_rebalance_end(app, state)
-        self.client.decr("rebalances_recovering", rate=self.rate)
-        self.client.timing(
-            "rebalance_end_latency", self.ms_since(state["time_end"]), rate=self.rate
-        )
+        self.metrics.decrement("rebalances_recovering")
+        self.metrics.timing("rebalance_end_latency", self.ms_since(state["time_end"]))
+
+    def on_consumer_prefetch(
+        self, consumer: ConsumerT, depth: int, wait_time: float
+    ) -> None:
+        """Call when consumer takes batch of records fetched ahead."""
+        super().on_consumer_prefetch(consumer, depth, wait_time)
+        self.metrics.gauge("consumer_prefetch_depth", depth)
+        self.metrics.timing("consumer_prefetch_wait", self.secs_to_ms(wait_time))
 
     def count(self, metric_name: str, count: int = 1) -> None:
         """Count metric by name."""
         super().count(metric_name, count=count)
-        self.client.incr(metric_name, count=count, rate=self.rate)
+        self.metrics.increment(metric_name, value=count)
 
     def on_tp_commit(self, tp_offsets: TPOffsetMapping) -> None:
         """Call when offset in topic partition is committed."""
         super().on_tp_commit(tp_offsets)
         for tp, offset in tp_offsets.items():
-            metric_name = f"committed_offset.{tp.topic}.{tp.partition}"
-            self.client.gauge(metric_name, offset)
+            self.metrics.gauge(self._tp_names_for(tp)[2], offset)
 
     def track_tp_end_offset(self, tp: TP, offset: int) -> None:
         """Track new topic partition end offset for monitoring lags."""
         super().track_tp_end_offset(tp, offset)
-        metric_name = f"end_offset.{tp.topic}.{tp.partition}"
-        self.client.gauge(metric_name, offset)
+        self.metrics.gauge(self._tp_names_for(tp)[3], offset)
 
     def on_web_request_end(
         self,
@@ -250,10 +340,8 @@ class StatsdMonitor(Monitor):
         """Web server finished working on request."""
         super().on_web_request_end(app, request, response, state, view=view)
         status_code = int(state["status_code"])
-        self.client.incr(f"http_status_code.{status_code}", rate=self.rate)
-        self.client.timing(
-            "http_response_latency", self.ms_since(state["time_end"]), rate=self.rate
-        )
+        self.metrics.increment(f"http_status_code.{status_code}")
+        self.metrics.timing("http_response_latency", self.ms_since(state["time_end"]))
 
     @cached_property
     def client(self) -> StatsClient:
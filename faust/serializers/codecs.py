@@ -203,10 +203,9 @@ from faust.exceptions import ImproperlyConfigured, SecurityWarning
 from faust.types.codecs import CodecArg, CodecT
 from faust.utils import json as _json
 
-try:
-    import yaml as _yaml
-except ImportError:  # pragma: no cover
-    _yaml = cast(ModuleType, None)  # noqa
+#: :pypi:`PyYAML` is imported the first time the yaml codec is used,
+#: as it takes a while to import.  :const:`None` if not installed.
+_yaml: Optional[ModuleType] = cast(ModuleType, ...)
 
 
 __all__ = [
@@ -293,7 +292,8 @@ class json(Codec):
     """:mod:`json` serializer."""
 
     def _loads(self, s: bytes) -> Any:
-        return _json.loads(want_str(s))
+        # both orjson and json parse bytes without decoding to str first.
+        return _json.loads(s)
 
     def _dumps(self, s: Any) -> bytes:
         return want_bytes(_json.dumps(s))
@@ -303,14 +303,22 @@ class yaml(Codec):
     """:pypi:`PyYAML` serializer."""
 
     def _loads(self, s: bytes) -> Any:
-        if _yaml is None:
-            raise ImproperlyConfigured("Missing yaml: pip install PyYAML")
-        return _yaml.safe_load(want_str(s))
+        return _import_yaml().safe_load(want_str(s))
 
     def _dumps(self, s: Any) -> bytes:
-        if _yaml is None:
-            raise ImproperlyConfigured("Missing yaml: pip install PyYAML")
-        return want_bytes(_yaml.safe_dump(s))
+        return want_bytes(_import_yaml().safe_dump(s))
+
+
+def _import_yaml() -> ModuleType:
+    global _yaml
+    if _yaml is ...:
+        try:
+            import yaml as _yaml
+        except ImportError:  # pragma: no cover
+            _yaml = None
+    if _yaml is None:
+        raise ImproperlyConfigured("Missing yaml: pip install PyYAML")
+    return _yaml
 
 
 #: Warning shown whenever the unrestricted pickle codec is configured
@@ -1,17 +1,35 @@
 """Aerospike storage."""
 
+import asyncio
+import itertools
+import threading
 import time
 import typing
-from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 try:  # pragma: no cover
     import aerospike
 except ImportError:  # pragma: no cover
     aerospike = None  # noqa
 
+from mode.utils.collections import LRUCache
 from yarl import URL
 
 from faust.stores import base
+from faust.streams import current_event
 from faust.types import TP, AppT, CollectionT
 
 if typing.TYPE_CHECKING:  # pragma: no cover
@@ -35,14 +53,51 @@ else:
 
 aerospike_client: Client = None
 
+#: Default number of threads making Aerospike calls for
+#: :meth:`AeroSpikeStore.get_async` and ``write_behind`` stores.
+DEFAULT_IO_THREADS = 8
+
+#: Batch read result code for a record that does not exist.
+RESULT_RECORD_NOT_FOUND = 2
+
+_ReadWaiters = Tuple[Optional[int], List["asyncio.Future[Optional[bytes]]"]]
+
 
 class AeroSpikeStore(base.SerializedStore):
-    """Aerospike table storage."""
+    """Aerospike table storage.
+
+    Every table access is a blocking call to the Aerospike cluster by
+    default. The following options make the store faster:
+
+    ``near_cache_size``
+        Keep up to this many records of the partitions this worker
+        owns in memory, so repeated reads do not need a round trip.
+        Only keys in the same partition as the event being processed
+        are cached (never for global tables), and entries of revoked
+        partitions are dropped on rebalance.
+
+    ``write_behind``
+        Send writes and deletes from a thread pool without waiting for
+        them. Writes to the same key are applied in order, and all
+        pending writes complete before offsets are committed.
+
+    ``io_threads``
+        Number of threads used for ``write_behind`` and for the
+        batched reads done by :meth:`get_async`.
+
+    Example::
+
+        app.Table(..., options={'near_cache_size': 100_000,
+                                'write_behind': True})
+    """
 
     client: Client
     namespace: str
     ttl: int
     policies: Optional[typing.Mapping[str, Any]]
+    near_cache_size: int
+    write_behind: bool
+    io_threads: int
     BIN_KEY = "value_key"
     USERNAME_KEY: str = "user"
     HOSTS_KEY: str = "hosts"
@@ -51,6 +106,17 @@ class AeroSpikeStore(base.SerializedStore):
     TTL_KEY: str = "ttl"
     POLICIES_KEY: str = "policies"
     CLIENT_OPTIONS_KEY: str = "client"
+    NEAR_CACHE_SIZE_KEY: str = "near_cache_size"
+    WRITE_BEHIND_KEY: str = "write_behind"
+    IO_THREADS_KEY: str = "io_threads"
+
+    _near_cache: LRUCache[bytes, Tuple[Optional[int], Optional[bytes]]]
+    _pending_writes: Dict[bytes, Tuple[int, Optional[bytes]]]
+    _pending_reads: Dict[bytes, _ReadWaiters]
+    _inflight_writes: Set[Future]
+    _writers: List[ThreadPoolExecutor]
+    _reader: Optional[ThreadPoolExecutor] = None
+    _read_task: Optional[asyncio.Future] = None
 
     def __init__(
         self,
@@ -71,11 +137,22 @@ class AeroSpikeStore(base.SerializedStore):
             self.namespace = options.get(self.NAMESPACE_KEY, "")  # type: ignore[union-attr]  # noqa: E501
             self.ttl = options.get(self.TTL_KEY, aerospike.TTL_NEVER_EXPIRE)  # type: ignore[union-attr]  # noqa: E501
             self.policies = options.get(self.POLICIES_KEY, None)  # type: ignore[union-attr]  # noqa: E501
+            self.near_cache_size = options.get(self.NEAR_CACHE_SIZE_KEY, 0)  # type: ignore[union-attr]  # noqa: E501
+            self.write_behind = options.get(self.WRITE_BEHIND_KEY, False)  # type: ignore[union-attr]  # noqa: E501
+            self.io_threads = options.get(self.IO_THREADS_KEY, DEFAULT_IO_THREADS)  # type: ignore[union-attr]  # noqa: E501
             table.use_partitioner = True
         except Exception as ex:
             self.logger.error(f"Error configuring aerospike client {ex}")
             raise ex
         super().__init__(url, app, table, **kwargs)
+        self._near_cache = LRUCache(limit=self.near_cache_size)
+        self._pending_writes = {}
+        self._pending_reads = {}
+        self._write_seq = itertools.count()
+        self._writes_issued = 0
+        self._inflight_writes = set()
+        self._inflight_lock = threading.Lock()
+        self._writers = []
 
     @staticmethod
     def get_aerospike_client(aerospike_config: typing.Mapping[str, Any]) -> Client:
@@ -110,14 +187,19 @@ class AeroSpikeStore(base.SerializedStore):
         # errors are silenced rather than the code split up.  ``str-bytes-safe``
         # below is a consequence of the same lie: mypy still believes ``key`` is
         # ``bytes`` in the handlers, where it actually holds a tuple.
+        found, value = self._get_local(key)
+        if found:
+            return value
+        store_key, partition = key, self._cache_partition(key)
         key = (self.namespace, self.table_name, key)  # type: ignore[assignment]
         fun = self.client.get
         try:
             key, meta, bins = self.aerospike_fun_call_with_retry(fun=fun, key=key)
-            if bins:
-                return bins[self.BIN_KEY]
-            return None
+            value = bins[self.BIN_KEY] if bins else None
+            self._cache(store_key, value, partition)
+            return value
         except aerospike.exception.RecordNotFound as ex:
+            self._cache(store_key, None, partition)
             self.log.debug(f"key not found {key} exception {ex}")  # type: ignore[str-bytes-safe]  # noqa: E501
             raise KeyError(f"key not found {key}")  # type: ignore[str-bytes-safe]
         except Exception as ex:
@@ -127,6 +209,7 @@ class AeroSpikeStore(base.SerializedStore):
             raise ex
 
     def _set(self, key: bytes, value: Optional[bytes]) -> None:
+        store_key = key
         try:
             fun = self.client.put
             # XXX ``key`` is declared ``bytes`` but rebound to the
@@ -138,8 +221,8 @@ class AeroSpikeStore(base.SerializedStore):
             # still believes ``key`` is ``bytes`` where it holds a tuple.
             key = (self.namespace, self.table_name, key)  # type: ignore[assignment]
             vt = {self.BIN_KEY: value}
-            self.aerospike_fun_call_with_retry(
-                fun=fun,
+            call = partial(
+                fun,
                 key=key,
                 bins=vt,
                 meta={"ttl": self.ttl},
@@ -148,6 +231,11 @@ class AeroSpikeStore(base.SerializedStore):
                     "key": aerospike.POLICY_KEY_SEND,
                 },
             )
+            if self.write_behind:
+                self._write_behind(store_key, value, call)
+            else:
+                self.aerospike_fun_call_with_retry(fun=call)
+                self._cache(store_key, value, self._cache_partition(store_key))
 
         except Exception as ex:
             self.log.error(
@@ -164,9 +252,17 @@ class AeroSpikeStore(base.SerializedStore):
             # silenced rather than hoisted into a separate variable.  The
             # ``str-bytes-safe`` ignores below follow from the same lie: mypy
             # still believes ``key`` is ``bytes`` where it holds a tuple.
+            store_key = key
             key = (self.namespace, self.table_name, key)  # type: ignore[assignment]
+            if self.write_behind:
+                self._write_behind(
+                    store_key, None, partial(self._remove_existing, key=key)
+                )
+                return
             self.aerospike_fun_call_with_retry(fun=self.client.remove, key=key)
+            self._cache(store_key, None, self._cache_partition(store_key))
         except aerospike.exception.RecordNotFound as ex:
+            self._cache(store_key, None, self._cache_partition(store_key))
             self.log.debug(
                 f"Error in delete for table {self.table_name} exception {ex} key {key}"  # type: ignore[str-bytes-safe]  # noqa: E501
             )
@@ -250,6 +346,9 @@ class AeroSpikeStore(base.SerializedStore):
                 # silenced rather than the construction hoisted out.  The
                 # ``str-bytes-safe`` ignore below follows from the same lie:
                 # mypy still believes ``key`` is ``bytes`` in that handler.
+                found, value = self._get_local(key)
+                if found:
+                    return value is not None
                 key = (self.namespace, self.table_name, key)  # type: ignore[assignment]  # noqa: E501
                 key, meta = self.aerospike_fun_call_with_retry(
                     fun=self.client.exists, key=key
@@ -293,6 +392,15 @@ class AeroSpikeStore(base.SerializedStore):
         self, fun: Callable[..., Any], *args: Any, **kwargs: Any
     ) -> Any:
         """Call function and retry until Aerospike throws exception."""
+        return self._call_with_retry(self.app._crash, fun, *args, **kwargs)
+
+    def _call_with_retry(
+        self,
+        crash: Callable[[BaseException], None],
+        fun: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
         f_tries = self.app.conf.aerospike_retries_on_exception
         f_delay = self.app.conf.aerospike_sleep_seconds_between_retries_on_exception
         while f_tries > 1:
@@ -314,11 +422,207 @@ class AeroSpikeStore(base.SerializedStore):
                 f"exception {ex} after retries"
             )
             if self.app.conf.crash_app_on_aerospike_exception:
-                self.app._crash(
-                    ex
-                )  # crash the app to prevent the offset from progressing
+                crash(ex)  # crash the app to prevent the offset from progressing
             raise ex
 
+    def _crash_threadsafe(self, exc: BaseException) -> None:
+        self.app.loop.call_soon_threadsafe(self.app._crash, exc)
+
+    def _cache_partition(self, key: bytes) -> Optional[int]:
+        # The table uses the partitioner, so a key is only cached when it
+        # is in the partition of the event being processed: other workers
+        # do not write it while that partition is assigned to us, and its
+        # entry is dropped when the partition is revoked.
+        if self.near_cache_size and not self.table.is_global:
+            event = current_event()
+            if event is not None:
+                partition = event.message.partition
+                if self._key_partition(key) == partition:
+                    return partition
+        return None
+
+    def _key_partition(self, key: bytes) -> Optional[int]:
+        topic = self.table.changelog_topic.get_topic_name()
+        try:
+            return self.app.producer.key_partition(topic, key).partition
+        except Exception:
+            # e.g. no metadata for the changelog topic yet: not cached.
+            return None
+
+    def _cache(
+        self, key: bytes, value: Optional[bytes], partition: Optional[int]
+    ) -> None:
+        if partition is not None:
+            self._near_cache[key] = (partition, value)
+        elif self.near_cache_size:
+            self._near_cache.pop(key, None)
+
+    def _get_local(self, key: bytes) -> Tuple[bool, Optional[bytes]]:
+        # Pending write-behind values first, then the near-cache.
+        pending = self._pending_writes.get(key)
+        if pending is not None:
+            return True, pending[1]
+        cached = self._near_cache.get(key)
+        if cached is not None:
+            return True, cached[1]
+        return False, None
+
+    def _write_behind(
+        self, key: bytes, value: Optional[bytes], call: Callable[[], Any]
+    ) -> None:
+        seq = next(self._write_seq)
+        self._writes_issued += 1
+        self._cache(key, value, self._cache_partition(key))
+        with self._inflight_lock:
+            self._pending_writes[key] = (seq, value)
+            # Writes of a key always go to the same single-threaded
+            # executor, so they are applied in the order issued.
+            future = self._writer_for(key).submit(
+                self._call_with_retry, self._crash_threadsafe, call
+            )
+            self._inflight_writes.add(future)
+        future.add_done_callback(partial(self._on_write_done, key, seq))
+
+    def _on_write_done(self, key: bytes, seq: int, future: Future) -> None:
+        # Called from the writer thread.
+        with self._inflight_lock:
+            pending = self._pending_writes.get(key)
+            if pending is not None and pending[0] == seq:
+                del self._pending_writes[key]
+            if future.exception() is None:
+                # failed writes are kept for flush() to raise.
+                self._inflight_writes.discard(future)
+
+    def _writer_for(self, key: bytes) -> ThreadPoolExecutor:
+        if not self._writers:
+            self._writers = [
+                ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"aerospike-{self.table_name}"
+                )
+                for _ in range(max(self.io_threads, 1))
+            ]
+        return self._writers[zlib.crc32(key) % len(self._writers)]
+
+    def _remove_existing(self, key: Any) -> None:
+        try:
+            self.client.remove(key=key)
+        except aerospike.exception.RecordNotFound:
+            pass
+
+    async def flush(self) -> None:
+        """Wait for all writes made with ``write_behind`` to complete.
+
+        Raises the error of the first write that failed.
+        """
+        with self._inflight_lock:
+            futures, self._inflight_writes = self._inflight_writes, set()
+        if futures:
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+
+    async def get_async(self, key: Any) -> Any:
+        """Return the value for key, or :const:`None` if missing.
+
+        Unlike ``table[key]`` this does not block the event loop:
+        lookups made by all coroutines in the same iteration of the
+        event loop are sent to Aerospike as a single ``batch_read``
+        call on a thread.
+        """
+        raw_key = self._encode_key(key)
+        found, value = self._get_local(raw_key)
+        if not found:
+            loop = asyncio.get_running_loop()
+            waiter: "asyncio.Future[Optional[bytes]]" = loop.create_future()
+            partition, waiters = self._pending_reads.setdefault(
+                raw_key, (self._cache_partition(raw_key), [])
+            )
+            waiters.append(waiter)
+            if self._read_task is None:
+                self._read_task = asyncio.ensure_future(self._batch_read())
+            value = await waiter
+        return None if value is None else self._decode_value(value)
+
+    async def _batch_read(self) -> None:
+        # Let the other lookups made in this loop iteration join the batch.
+        await asyncio.sleep(0)
+        reads, self._pending_reads = self._pending_reads, {}
+        self._read_task = None
+        writes_issued = self._writes_issued
+        keys = list(reads)
+        if self._reader is None:
+            self._reader = ThreadPoolExecutor(
+                max_workers=max(self.io_threads, 1),
+                thread_name_prefix=f"aerospike-{self.table_name}",
+            )
+        try:
+            records = await asyncio.get_running_loop().run_in_executor(
+                self._reader,
+                partial(
+                    self._call_with_retry,
+                    self._crash_threadsafe,
+                    self.client.batch_read,
+                    [(self.namespace, self.table_name, key) for key in keys],
+                ),
+            )
+        except Exception as exc:
+            self.log.error(
+                f"FaustAerospikeException Error in batch read "
+                f"for table {self.table_name} exception {exc}"
+            )
+            for _, waiters in reads.values():
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(exc)
+            return
+        for key, record in zip(keys, records.batch_records):
+            partition, waiters = reads[key]
+            result: Any
+            if record.result == 0:
+                bins = record.record[2] if record.record else None
+                result = bins[self.BIN_KEY] if bins else None
+            elif record.result == RESULT_RECORD_NOT_FOUND:
+                result = None
+            else:
+                result = KeyError(
+                    f"batch read of {key!r} failed with result {record.result}"
+                )
+            if not isinstance(result, Exception) and (
+                writes_issued == self._writes_issued
+            ):
+                # Nothing written since the batch was sent, so still current.
+                self._cache(key, result, partition)
+            for waiter in waiters:
+                if not waiter.done():
+                    if isinstance(result, Exception):
+                        waiter.set_exception(result)
+                    else:
+                        waiter.set_result(result)
+
+    async def on_rebalance(
+        self,
+        assigned: Set[TP],
+        revoked: Set[TP],
+        newly_assigned: Set[TP],
+        generation_id: int = 0,
+    ) -> None:
+        """Flush pending writes and forget the cached revoked partitions."""
+        await self.flush()
+        topics = self.table.changelog_topic.topics
+        partitions = {tp.partition for tp in revoked if tp.topic in topics}
+        if partitions and self._near_cache:
+            for key, (partition, _) in list(self._near_cache.items()):
+                if partition in partitions:
+                    del self._near_cache[key]
+
+    async def on_stop(self) -> None:
+        """Wait for pending writes and stop the I/O threads."""
+        try:
+            await self.flush()
+        finally:
+            for executor in [*self._writers, self._reader]:
+                if executor is not None:
+                    executor.shutdown(wait=False)
+            self._writers, self._reader = [], None
+
     async def backup_partition(
         self, tp: Union[TP, int], flush: bool = True, purge: bool = False, keep: int = 1
     ) -> None:
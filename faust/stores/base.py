@@ -2,13 +2,18 @@
 
 import abc
 from collections.abc import ItemsView, KeysView, ValuesView
+from contextlib import suppress
+from operator import itemgetter
 from typing import (
     Any,
     Callable,
+    Dict,
     Iterable,
     Iterator,
+    List,
     Mapping,
     Optional,
+    Sequence,
     Set,
     Tuple,
     Union,
@@ -19,7 +24,7 @@ from mode import Service
 from yarl import URL
 
 from faust.types import TP, AppT, CodecArg, CollectionT, EventT, ModelArg, StoreT
-from faust.types.stores import KT, VT
+from faust.types.stores import KT, VT, ScanCursor, ScanPredicate
 
 __all__ = ["Store", "SerializedStore"]
 
@@ -63,6 +68,70 @@ class Store(StoreT[KT, VT], Service):
         """Set the persisted offset for this topic and partition."""
         ...
 
+    def persisted_offsets(self) -> Mapping[int, int]:
+        """Return the persisted offset of every partition stored locally."""
+        return {}
+
+    async def flush(self) -> None:
+        """Wait for writes not yet applied to the store."""
+        ...
+
+    def get_many(
+        self, keys: Iterable[KT], *, partition: Optional[int] = None
+    ) -> Mapping[KT, VT]:
+        """Return the values of keys found in the store.
+
+        Arguments:
+            keys: Keys to look up.
+            partition: Table partition the keys are in, if known,
+                for stores keeping partitions apart.
+        """
+        found: Dict[KT, VT] = {}
+        for key in keys:
+            with suppress(KeyError):
+                found[key] = self[key]
+        return found
+
+    def scan(
+        self,
+        *,
+        start: Optional[bytes] = None,
+        stop: Optional[bytes] = None,
+        after: Optional[ScanCursor] = None,
+        predicate: Optional[ScanPredicate] = None,
+    ) -> Iterator[Tuple[ScanCursor, KT, VT]]:
+        """Iterate over items in order of partition and serialized key.
+
+        Arguments:
+            start: Only keys serialized to this or greater.
+            stop: Only keys serialized to less than this.
+            after: Resume scan after this position.
+            predicate: Only items this returns true for, called with
+                serialized key and value.
+
+        Yields:
+            ``(position, key, value)`` tuples, where position can be
+            passed as ``after`` to resume the scan.
+
+        Notes:
+            This generic version encodes and sorts every item, stores
+            keeping items sorted by key should override it.
+        """
+        rows = []
+        for key, value in self.items():
+            position = (self._scan_partition(key), self._encode_key(key))
+            if _scan_includes(position, start, stop, after) and (
+                predicate is None
+                or predicate(position[1], self._encode_value(value) or b"")
+            ):
+                rows.append((position, key, value))
+        rows.sort(key=itemgetter(0))
+        yield from rows
+
+    def _scan_partition(self, key: KT) -> int:
+        # Stores that do not keep keys by partition scan them as one.
+        return 0
+
     async def need_active_standby_for(self, tp: TP) -> bool:
         """Return :const:`True` if we have a copy of standby from elsewhere."""
         return True
@@ -118,6 +187,20 @@ class Store(StoreT[KT, VT], Service):
         return f"{type(self).__name__}: {self.url}"
 
 
+def _scan_includes(
+    position: ScanCursor,
+    start: Optional[bytes],
+    stop: Optional[bytes],
+    after: Optional[ScanCursor],
+) -> bool:
+    key = position[1]
+    return (
+        (start is None or key >= start)
+        and (stop is None or key < stop)
+        and (after is None or position > after)
+    )
+
+
 class _SerializedStoreKeysView(KeysView):
     def __init__(self, store: "SerializedStore") -> None:
         self._mapping = store
@@ -183,6 +266,46 @@ class SerializedStore(Store[KT, VT]):
     def _clear(self) -> None:  # pragma: no cover
         ...
 
+    def _get_many(
+        self, keys: Sequence[bytes], partition: Optional[int]
+    ) -> List[Optional[bytes]]:
+        # Stores that can read several keys at once override this.
+        return [self._get(key) for key in keys]
+
+    def get_many(
+        self, keys: Iterable[KT], *, partition: Optional[int] = None
+    ) -> Mapping[KT, VT]:
+        """Return the values of keys found in the store, in one read."""
+        keys = list(keys)
+        values = self._get_many([self._encode_key(key) for key in keys], partition)
+        return {
+            key: self._decode_value(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def scan(
+        self,
+        *,
+        start: Optional[bytes] = None,
+        stop: Optional[bytes] = None,
+        after: Optional[ScanCursor] = None,
+        predicate: Optional[ScanPredicate] = None,
+    ) -> Iterator[Tuple[ScanCursor, KT, VT]]:
+        """Iterate over items in order of partition and serialized key.
+
+        Only items matching the predicate are decoded.
+        See :meth:`Store.scan`.
+        """
+        rows = sorted(
+            ((0, key), value)
+            for key, value in self._iteritems()
+            if _scan_includes((0, key), start, stop, after)
+            and (predicate is None or predicate(key, value))
+        )
+        for position, value in rows:
+            yield position, self._decode_key(position[1]), self._decode_value(value)
+
     def apply_changelog_batch(
         self,
         batch: Iterable[EventT],
@@ -69,6 +69,10 @@ class Store(base.Store, base.StoreT[KT, VT]):
             self.data.pop(k, None)
             self._key_partition.pop(k, None)
 
+    def _scan_partition(self, key: KT) -> int:
+        # Only known for keys recovered from the changelog.
+        return self._key_partition.get(key, 0)
+
     def persisted_offset(self, tp: TP) -> Optional[int]:
         """Return the persisted offset.
 
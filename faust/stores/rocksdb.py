@@ -9,6 +9,7 @@ import tempfile
 import typing
 from collections import defaultdict
 from contextlib import suppress
+from operator import itemgetter
 from pathlib import Path
 from typing import (
     Any,
@@ -17,10 +18,12 @@ from typing import (
     Dict,
     Iterable,
     Iterator,
+    List,
     Mapping,
     MutableMapping,
     NamedTuple,
     Optional,
+    Sequence,
     Set,
     Tuple,
     Type,
@@ -34,6 +37,7 @@ from yarl import URL
 from faust.exceptions import ImproperlyConfigured
 from faust.streams import current_event
 from faust.types import TP, AppT, CollectionT, EventT
+from faust.types.stores import ScanCursor, ScanPredicate
 from faust.utils import platforms
 
 from . import base
@@ -155,6 +159,21 @@ class RocksDBOptions:
         else:
             return rocksdb.DB(str(path), self.as_options(), read_only=read_only)
 
+    def open_for_reading(self, path: Path) -> DB:
+        """Open existing RocksDB database without taking the write lock."""
+        if self.use_rocksdict:
+            db = DB(
+                str(path),
+                options=self.as_options(),
+                access_type=rocksdict.AccessType.read_only(
+                    error_if_log_file_exist=False
+                ),
+            )
+            db.set_read_options(rocksdict.ReadOptions())
+            return db
+        else:
+            return rocksdb.DB(str(path), self.as_options(), read_only=True)
+
     def as_options(self) -> Options:
         """Return :class:`rocksdb.Options` object using this configuration."""
         if self.use_rocksdict:
@@ -231,6 +250,7 @@ class Store(base.SerializedStore):
     rocksdb_options: RocksDBOptions
 
     _dbs: MutableMapping[int, DB]
+    _closed_offsets: MutableMapping[int, Optional[int]]
     _key_index: LRUCache[bytes, int]
     rebalance_ack: bool
     db_lock: asyncio.Lock
@@ -286,6 +306,7 @@ class Store(base.SerializedStore):
             key_index_size = app.conf.table_key_index_size
         self.key_index_size = key_index_size
         self._dbs = {}
+        self._closed_offsets = {}
         self._key_index = LRUCache(limit=self.key_index_size)
         self.db_lock = asyncio.Lock()
         self.rebalance_ack = False
@@ -388,11 +409,65 @@ class Store(base.SerializedStore):
 
         See :meth:`set_persisted_offset`.
         """
-        offset = self._db_for_partition(tp.partition).get(self.offset_key)
+        return self._offset_in_db(self._db_for_partition(tp.partition))
+
+    def _offset_in_db(self, db: DB) -> Optional[int]:
+        offset = db.get(self.offset_key)
         if offset is not None:
             return int(offset)
         return None
 
+    def persisted_offsets(self) -> Mapping[int, int]:
+        """Return the last persisted offset of every partition on disk.
+
+        This includes partitions we are not currently serving, so that
+        the worker can tell the group leader what state it already has
+        locally (see :meth:`PartitionAssignor._local_changelog_offsets`).
+
+        Databases that are not open are opened read-only once
+        and the offset remembered until the partition is opened again.
+        """
+        offsets: Dict[int, int] = {}
+        for partition in sorted(self._partitions_on_disk() | set(self._dbs)):
+            db = self._dbs.get(partition)
+            if db is not None:
+                offset = self._offset_in_db(db)
+            elif partition in self._closed_offsets:
+                offset = self._closed_offsets[partition]
+            else:
+                offset = self._closed_offsets[partition] = self._offset_on_disk(
+                    partition
+                )
+            if offset is not None:
+                offsets[partition] = offset
+        return offsets
+
+    def _offset_on_disk(self, partition: int) -> Optional[int]:
+        try:
+            db = self.rocksdb_options.open_for_reading(self.partition_path(partition))
+            return self._offset_in_db(db)
+        except Exception as exc:
+            # Only used as a hint for partition assignment,
+            # so an unreadable database is just treated as empty.
+            self.log.warning(
+                "Cannot read persisted offset of partition %r: %r", partition, exc
+            )
+            return None
+
+    def _partitions_on_disk(self) -> Set[int]:
+        # Partition databases are named as in :meth:`partition_path`.
+        p = self.path / self.basename
+        directory, prefix = p.parent, f"{p.name}-"
+        partitions: Set[int] = set()
+        with suppress(FileNotFoundError, NotADirectoryError):
+            for entry in directory.iterdir():
+                name = entry.name
+                if name.startswith(prefix) and name.endswith(".db"):
+                    suffix = name[len(prefix) : -len(".db")]
+                    if suffix.isdigit() and entry.is_dir():
+                        partitions.add(int(suffix))
+        return partitions
+
     def set_persisted_offset(self, tp: TP, offset: int) -> None:
         """Set the last persisted offset for this table.
 
@@ -506,19 +581,40 @@ class Store(base.SerializedStore):
                 self._key_index[key] = partition
             return value
         else:
-            dbvalue = self._get_bucket_for_key(key)
-            if dbvalue is None:
-                return None
-            db, value = dbvalue
+            return self._get_from_any_partition(key)
 
-            if value is None:
-                if self.use_rocksdict:
-                    key_may_exist = db.key_may_exist(key)
-                else:
-                    key_may_exist = db.key_may_exist(key)[0]
-                if key_may_exist:
-                    return db.get(key)
-            return value
+    def _get_from_any_partition(self, key: bytes) -> Optional[bytes]:
+        dbvalue = self._get_bucket_for_key(key)
+        if dbvalue is None:
+            return None
+        db, value = dbvalue
+
+        if value is None:
+            if self.use_rocksdict:
+                key_may_exist = db.key_may_exist(key)
+            else:
+                key_may_exist = db.key_may_exist(key)[0]
+            if key_may_exist:
+                return db.get(key)
+        return value
+
+    def _get_many(
+        self, keys: Sequence[bytes], partition: Optional[int]
+    ) -> List[Optional[bytes]]:
+        if partition is None or self.table.is_global or self.table.use_partitioner:
+            return [self._get_from_any_partition(key) for key in keys]
+        db = self._db_for_partition(partition)
+        values: List[Optional[bytes]]
+        if self.use_rocksdict:
+            values = db.get(list(keys))
+        else:
+            found = db.multi_get(list(keys))
+            values = [found.get(key) for key in keys]
+        key_index = self._key_index
+        for key, value in zip(keys, values):
+            if value is not None:
+                key_index[key] = partition
+        return values
 
     def _get_bucket_for_key(self, key: bytes) -> Optional[_DBValueTuple]:
         dbs: Iterable[PartitionDB]
@@ -569,6 +665,8 @@ class Store(base.SerializedStore):
         self.logger.info("Closing rocksdb on stop")
         # for db in self._dbs.values():
         #     db.close()
+        for partition in self._dbs:
+            self._closed_offsets.pop(partition, None)
         self._dbs.clear()
         gc.collect()
 
@@ -584,6 +682,7 @@ class Store(base.SerializedStore):
             if tp.topic in table.changelog_topic.topics:
                 db = self._dbs.pop(tp.partition, None)
                 if db is not None:
+                    self._closed_offsets[tp.partition] = self._offset_in_db(db)
                     self.logger.info(f"closing db {tp.topic} partition {tp.partition}")
                     # db.close()
         gc.collect()
@@ -677,6 +776,10 @@ class Store(base.SerializedStore):
             return self._dbs.values()
 
     def _dbs_for_actives(self) -> Iterator[DB]:
+        for _, db in self._partition_dbs_for_actives():
+            yield db
+
+    def _partition_dbs_for_actives(self) -> Iterator[Tuple[int, DB]]:
         actives = self.app.assignor.assigned_actives()
         # `changelog_topic_name` is a property of the concrete
         # `faust.tables.base.Collection`, but is missing from the
@@ -684,11 +787,10 @@ class Store(base.SerializedStore):
         # `_changelog_topic_name()` method).
         topic = self.table.changelog_topic_name  # type: ignore[attr-defined]
         for partition, db in self._dbs.items():
-            tp = TP(topic=topic, partition=partition)
             # for global tables, keys from all
             # partitions are available.
-            if tp in actives or self.table.is_global:
-                yield db
+            if self.table.is_global or actives.has_partition(topic, partition):
+                yield partition, db
 
     def _size(self) -> int:
         return sum(self._size1(db) for db in self._dbs_for_actives())
@@ -715,6 +817,61 @@ class Store(base.SerializedStore):
             if key != self.offset_key:
                 yield key, value
 
+    def _visible_items_from(
+        self, db: DB, key: Optional[bytes]
+    ) -> Iterator[Tuple[bytes, bytes]]:
+        # Items in key order, starting at the first key >= key.
+        if self.use_rocksdict:
+            it = db.items(from_key=key) if key is not None else db.items()
+        else:
+            it = db.iteritems()  # noqa: B301
+            if key is not None:
+                it.seek(key)
+            else:
+                it.seek_to_first()
+        for k, value in it:
+            if k != self.offset_key:
+                yield k, value
+
+    def scan(
+        self,
+        *,
+        start: Optional[bytes] = None,
+        stop: Optional[bytes] = None,
+        after: Optional[ScanCursor] = None,
+        predicate: Optional[ScanPredicate] = None,
+    ) -> Iterator[Tuple[ScanCursor, Any, Any]]:
+        """Iterate over items in order of partition and serialized key.
+
+        Seeks to ``start`` in the database of every active partition,
+        and only decodes items matching the predicate.
+        See :meth:`faust.stores.base.Store.scan`.
+        """
+        for partition, db in sorted(
+            self._partition_dbs_for_actives(), key=itemgetter(0)
+        ):
+            seek = start
+            skip = None
+            if after is not None:
+                after_partition, skip = after
+                if partition < after_partition:
+                    continue
+                if partition > after_partition:
+                    skip = None
+                elif seek is None or skip > seek:
+                    seek = skip
+            for key, value in self._visible_items_from(db, seek):
+                if stop is not None and key >= stop:
+                    break
+                if key == skip:
+                    continue
+                if predicate is None or predicate(key, value):
+                    yield (
+                        (partition, key),
+                        self._decode_key(key),
+                        self._decode_value(value),
+                    )
+
     def _visible_values(self, db: DB) -> Iterator[bytes]:
         for _, value in self._visible_items(db):
             yield value
@@ -745,6 +902,7 @@ class Store(base.SerializedStore):
             in Kafka will not be affected.
         """
         self._dbs.clear()
+        self._closed_offsets.clear()
         self._key_index.clear()
         with suppress(FileNotFoundError):
             shutil.rmtree(self.path.absolute())
@@ -5,7 +5,7 @@ import os
 import reprlib
 import typing
 import weakref
-from asyncio import CancelledError
+from contextlib import aclosing, suppress
 from contextvars import ContextVar
 from functools import wraps
 from typing import (
@@ -33,7 +33,7 @@ from typing import (
 
 from mode import Seconds, Service, get_logger, shortlabel, want_seconds
 from mode.utils.aiter import aenumerate, aiter
-from mode.utils.futures import current_task, maybe_async, notify
+from mode.utils.futures import current_task, maybe_async
 from mode.utils.queues import ThrowableQueue
 from mode.utils.types.trees import NodeT
 
@@ -52,6 +52,7 @@ from .types.streams import (
     T_co,
     T_contra,
 )
+from .types.tables import TableT
 from .types.topics import ChannelT
 from .types.tuples import Message
 
@@ -103,14 +104,14 @@ _BufferAgenFun = TypeVar(
 def _tracks_buffer_agen(fun: _BufferAgenFun) -> _BufferAgenFun:
     """Register buffering generators (``take()`` and friends) on the stream.
 
-    The cleanup for these generators -- acking consumed events, restoring
-    ``enable_acks`` and detaching the buffering processor -- lives in
-    ``finally`` blocks that only run once the generator is finalized.  When a
-    caller abandons the generator (``break`` inside ``async for``), CPython's
-    reference counting finalizes it right away, but PyPy defers finalization
-    to the next major GC cycle, which may never come.  Tracking every
-    generator in a WeakSet lets ``Stream.on_stop`` close leftovers
-    explicitly, making cleanup deterministic on any interpreter.
+    The cleanup for these generators -- acking consumed events and restoring
+    ``enable_acks`` -- lives in ``finally`` blocks that only run once the
+    generator is finalized.  When a caller abandons the generator (``break``
+    inside ``async for``), CPython's reference counting finalizes it right
+    away, but PyPy defers finalization to the next major GC cycle, which may
+    never come.  Tracking every generator in a WeakSet lets
+    ``Stream.on_stop`` close leftovers explicitly, making cleanup
+    deterministic on any interpreter.
     """
 
     @wraps(fun)
@@ -136,6 +137,55 @@ _LinkedListDirectionFwd = _LinkedListDirection("_next", lambda n: n._next)
 _LinkedListDirectionBwd = _LinkedListDirection("_prev", lambda n: n._prev)
 
 
+class _TakeDeadline:
+    """Deadline of the batch being buffered by :meth:`Stream.take`.
+
+    Wakes up the buffer waiting for more values when it expires,
+    so that a batch needs one timer however many times it waits.
+    """
+
+    __slots__ = ("expired", "waiter", "_timer")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, timeout: float) -> None:
+        self.expired = False
+        self.waiter: Optional[asyncio.Future] = None
+        self._timer = loop.call_later(timeout, self._expire)
+
+    def _expire(self) -> None:
+        self.expired = True
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    def cancel(self) -> None:
+        self._timer.cancel()
+
+
+async def _wait_for_put(
+    loop: asyncio.AbstractEventLoop, queue: ThrowableQueue, deadline: _TakeDeadline
+) -> None:
+    # This inlines asyncio.Queue.get, without taking the value
+    # and returning early when the deadline expires.
+    getters = queue._getters  # type: ignore[attr-defined]
+    waiter = deadline.waiter = loop.create_future()
+    getters.append(waiter)
+    try:
+        await waiter
+    except BaseException:
+        waiter.cancel()
+        with suppress(ValueError):
+            getters.remove(waiter)
+        if not queue.empty() and not waiter.cancelled():
+            # woken up by a put, so wake up the next getter instead.
+            queue._wakeup_next(getters)  # type: ignore[attr-defined]
+        raise
+    finally:
+        deadline.waiter = None
+    if deadline.expired:
+        # woken up by the deadline, so still waiting for a put.
+        with suppress(ValueError):
+            getters.remove(waiter)
+
+
 class Stream(StreamT[T_co], Service):
     """A stream: async iterator processing events in channels/topics."""
 
@@ -360,97 +410,23 @@ class Stream(StreamT[T_co], Service):
                 number of messages are received within the specified number of
                 seconds then we flush the buffer immediately.
             within: Timeout for when we give up waiting for another value,
-                and process the values we have.
+                and process the values we have, counted from the first
+                value in the buffer.
                 Warning: If there's no timeout (i.e. `timeout=None`),
                 the agent is likely to stall and block buffered events for an
                 unreasonable length of time(!).
         """
-        buffer: List[T_co] = []
-        events: List[EventT] = []
-        buffer_add = buffer.append
-        event_add = events.append
-        buffer_size = buffer.__len__
-        buffer_full = asyncio.Event()
-        buffer_consumed = asyncio.Event()
-        timeout = want_seconds(within) if within else None
         stream_enable_acks: bool = self.enable_acks
-
-        buffer_consuming: Optional[asyncio.Future] = None
-
-        channel_it = aiter(self.channel)
-
-        # We add this processor to populate the buffer, and the stream
-        # is passively consumed in the background (enable_passive below).
-        async def add_to_buffer(value: T) -> T:
-            try:
-                # buffer_consuming is set when consuming buffer after timeout.
-                nonlocal buffer_consuming
-                if buffer_consuming is not None:
-                    try:
-                        await buffer_consuming
-                    finally:
-                        buffer_consuming = None
-                buffer_add(cast(T_co, value))
-                event = self.current_event
-                if event is None:
-                    raise RuntimeError("Take buffer found current_event is None")
-                event_add(event)
-                if buffer_size() >= max_:
-                    # signal that the buffer is full and should be emptied.
-                    buffer_full.set()
-                    # strict wait for buffer to be consumed after buffer full.
-                    # If max is 1000, we are not allowed to return 1001 values.
-                    buffer_consumed.clear()
-                    # mode types the waitable as ``mode.utils.locks.Event``,
-                    # but Service.wait_first accepts anything with an
-                    # awaitable ``.wait()`` -- asyncio.Event included.
-                    await self.wait(buffer_consumed)  # type: ignore[arg-type]
-            except CancelledError:  # pragma: no cover
-                raise
-            except Exception as exc:
-                self.log.exception("Error adding to take buffer: %r", exc)
-                await self.crash(exc)
-            return value
-
         # Disable acks to ensure this method acks manually
         # events only after they are consumed by the user
         self.enable_acks = False
-
-        self.add_processor(add_to_buffer)
-        self._enable_passive(cast(ChannelT, channel_it))
         try:
-            while not self.should_stop:
-                # wait until buffer full, or timeout.
-                # Same mode annotation gap as in add_to_buffer above, plus
-                # ``timeout: Seconds`` omitting the ``None`` that is mode's
-                # own default and its "wait forever" value.
-                await self.wait_for_stopped(
-                    buffer_full, timeout=timeout  # type: ignore[arg-type]
-                )
-                if buffer:
-                    # make sure background thread does not add new items to
-                    # buffer while we read.
-                    buffer_consuming = self.loop.create_future()
-                    try:
-                        yield list(buffer)
-                    finally:
-                        buffer.clear()
-                        for event in events:
-                            await self.ack(event)
-                        events.clear()
-                        # allow writing to buffer again
-                        notify(buffer_consuming)
-                        buffer_full.clear()
-                        buffer_consumed.set()
-                else:  # pragma: no cover
-                    pass
-            else:  # pragma: no cover
-                pass
-
+            async with aclosing(self._take_batches(max_, within)) as batches:
+                async for values, _ in batches:
+                    yield cast(Sequence[T_co], values)
         finally:
             # Restore last behaviour of "enable_acks"
             self.enable_acks = stream_enable_acks
-            self._processors.remove(add_to_buffer)
 
     @_tracks_buffer_agen
     async def take_events(
@@ -462,97 +438,23 @@ class Stream(StreamT[T_co], Service):
                 number of messages are received within the specified number of
                 seconds then we flush the buffer immediately.
             within: Timeout for when we give up waiting for another value,
-                and process the values we have.
+                and process the values we have, counted from the first
+                value in the buffer.
                 Warning: If there's no timeout (i.e. `timeout=None`),
                 the agent is likely to stall and block buffered events for an
                 unreasonable length of time(!).
         """
-        buffer: List[T_co] = []
-        events: List[EventT] = []
-        buffer_add = buffer.append
-        event_add = events.append
-        buffer_size = buffer.__len__
-        buffer_full = asyncio.Event()
-        buffer_consumed = asyncio.Event()
-        timeout = want_seconds(within) if within else None
         stream_enable_acks: bool = self.enable_acks
-
-        buffer_consuming: Optional[asyncio.Future] = None
-
-        channel_it = aiter(self.channel)
-
-        # We add this processor to populate the buffer, and the stream
-        # is passively consumed in the background (enable_passive below).
-        async def add_to_buffer(value: T) -> T:
-            try:
-                # buffer_consuming is set when consuming buffer after timeout.
-                nonlocal buffer_consuming
-                if buffer_consuming is not None:
-                    try:
-                        await buffer_consuming
-                    finally:
-                        buffer_consuming = None
-                buffer_add(cast(T_co, value))
-                event = self.current_event
-                if event is None:
-                    raise RuntimeError("Take buffer found current_event is None")
-                event_add(event)
-                if buffer_size() >= max_:
-                    # signal that the buffer is full and should be emptied.
-                    buffer_full.set()
-                    # strict wait for buffer to be consumed after buffer full.
-                    # If max is 1000, we are not allowed to return 1001 values.
-                    buffer_consumed.clear()
-                    # mode types the waitable as ``mode.utils.locks.Event``,
-                    # but Service.wait_first accepts anything with an
-                    # awaitable ``.wait()`` -- asyncio.Event included.
-                    await self.wait(buffer_consumed)  # type: ignore[arg-type]
-            except CancelledError:  # pragma: no cover
-                raise
-            except Exception as exc:
-                self.log.exception("Error adding to take buffer: %r", exc)
-                await self.crash(exc)
-            return value
-
         # Disable acks to ensure this method acks manually
         # events only after they are consumed by the user
         self.enable_acks = False
-
-        self.add_processor(add_to_buffer)
-        self._enable_passive(cast(ChannelT, channel_it))
         try:
-            while not self.should_stop:
-                # wait until buffer full, or timeout.
-                # Same mode annotation gap as in add_to_buffer above, plus
-                # ``timeout: Seconds`` omitting the ``None`` that is mode's
-                # own default and its "wait forever" value.
-                await self.wait_for_stopped(
-                    buffer_full, timeout=timeout  # type: ignore[arg-type]
-                )
-                if buffer:
-                    # make sure background thread does not add new items to
-                    # buffer while we read.
-                    buffer_consuming = self.loop.create_future()
-                    try:
-                        yield list(events)
-                    finally:
-                        buffer.clear()
-                        for event in events:
-                            await self.ack(event)
-                        events.clear()
-                        # allow writing to buffer again
-                        notify(buffer_consuming)
-                        buffer_full.clear()
-                        buffer_consumed.set()
-                else:  # pragma: no cover
-                    pass
-            else:  # pragma: no cover
-                pass
-
+            async with aclosing(self._take_batches(max_, within)) as batches:
+                async for _, events in batches:
+                    yield events
         finally:
             # Restore last behaviour of "enable_acks"
             self.enable_acks = stream_enable_acks
-            self._processors.remove(add_to_buffer)
 
     @_tracks_buffer_agen
     async def take_with_timestamp(
@@ -566,110 +468,191 @@ class Stream(StreamT[T_co], Service):
                 number of messages are received within the specified number of
                 seconds then we flush the buffer immediately.
             within: Timeout for when we give up waiting for another value,
-                and process the values we have.
+                and process the values we have, counted from the first
+                value in the buffer.
                 Warning: If there's no timeout (i.e. `timeout=None`),
                 the agent is likely to stall and block buffered events for an
                 unreasonable length of time(!).
             timestamp_field_name: the name of the field containing kafka timestamp,
                 that is going to be added to the value
         """
-        buffer: List[T_co] = []
-        events: List[EventT] = []
-        buffer_add = buffer.append
-        event_add = events.append
-        buffer_size = buffer.__len__
-        buffer_full = asyncio.Event()
-        buffer_consumed = asyncio.Event()
-        timeout = want_seconds(within) if within else None
         stream_enable_acks: bool = self.enable_acks
+        # Disable acks to ensure this method acks manually
+        # events only after they are consumed by the user
+        self.enable_acks = False
+        try:
+            async with aclosing(self._take_batches(max_, within)) as batches:
+                async for values, events in batches:
+                    if timestamp_field_name:
+                        for value, event in zip(values, events):
+                            if isinstance(value, dict):
+                                value[timestamp_field_name] = event.message.timestamp
+                    yield cast(Sequence[T_co], values)
+        finally:
+            # Restore last behaviour of "enable_acks"
+            self.enable_acks = stream_enable_acks
 
-        buffer_consuming: Optional[asyncio.Future] = None
+    @_tracks_buffer_agen
+    async def _take_batches(
+        self, max_: int, within: Seconds, *, ack: bool = True
+    ) -> AsyncGenerator[Tuple[List[Any], List[EventT]], None]:
+        # Batching version of _py_aiter used by take() and friends,
+        # yielding the values and the events of a batch.
+        #
+        # Values already queued in the channel are taken in one go,
+        # without a round trip through the event loop for each one.
+        # The batch is yielded when it has max_ values, or `within`
+        # seconds after its first value (one timer per batch), and its
+        # events are acked all at once when the next batch is requested.
+        self._finalized = True
+        started_by_aiter = await self.maybe_start()
+        on_merge = self.on_merge
 
-        channel_it = aiter(self.channel)
+        channel = self.channel
+        chan_queue: Optional[ThrowableQueue]
+        if isinstance(channel, ChannelT):
+            chan_queue = cast(ChannelT, channel).queue
+            chan_queue_empty = chan_queue.empty
+            chan_errors = chan_queue._errors
+            chan_quick_get = chan_queue.get_nowait
+        else:
+            chan_queue = None
+            chan_queue_empty = cast(Callable, None)
+            chan_errors = cast(Deque, None)
+            chan_quick_get = cast(Callable, None)
+        chan_slow_get = channel.__anext__
+        processors = self._processors
+        on_stream_event_in = self._on_stream_event_in
 
-        # We add this processor to populate the buffer, and the stream
-        # is passively consumed in the background (enable_passive below).
-        async def add_to_buffer(value: T) -> T:
-            try:
-                # buffer_consuming is set when consuming buffer after timeout.
-                nonlocal buffer_consuming
-                if buffer_consuming is not None:
-                    try:
-                        await buffer_consuming
-                    finally:
-                        buffer_consuming = None
-                event = self.current_event
-                if isinstance(value, dict) and timestamp_field_name:
-                    # XXX ``self.current_event`` is Optional, and this reads
-                    # ``event.message`` *before* the ``event is None`` guard
-                    # below: with no current event a dict value dies with
-                    # AttributeError here instead of the intended RuntimeError.
-                    value[timestamp_field_name] = (
-                        event.message.timestamp  # type: ignore[union-attr]
-                    )
-                # XXX ``buffer_add`` also runs before the guard, so a non-dict
-                # value is appended to ``buffer`` and then the RuntimeError
-                # fires, leaving ``buffer`` and ``events`` skewed by one entry.
-                buffer_add(cast(T_co, value))
-                if event is None:
-                    raise RuntimeError("Take buffer found current_event is None")
-                event_add(event)
-                if buffer_size() >= max_:
-                    # signal that the buffer is full and should be emptied.
-                    buffer_full.set()
-                    # strict wait for buffer to be consumed after buffer full.
-                    # If max is 1000, we are not allowed to return 1001 values.
-                    buffer_consumed.clear()
-                    # mode types the waitable as ``mode.utils.locks.Event``,
-                    # but Service.wait_first accepts anything with an
-                    # awaitable ``.wait()`` -- asyncio.Event included.
-                    await self.wait(buffer_consumed)  # type: ignore[arg-type]
-            except CancelledError:  # pragma: no cover
-                raise
-            except Exception as exc:
-                self.log.exception("Error adding to take buffer: %r", exc)
-                await self.crash(exc)
-            return value
+        # localize global variables
+        create_ref = weakref.ref
+        _maybe_async = maybe_async
+        event_cls = EventT
+        _current_event_contextvar = _current_event
 
-        # Disable acks to ensure this method acks manually
-        # events only after they are consumed by the user
-        self.enable_acks = False
+        consumer: ConsumerT = self.app.consumer
+        add_unacked: Callable[[Message], None] = consumer.unacked.add
+        acking_topics: Set[str] = self.app.topics.acking_topics
+        flow_control_is_active = self.app.flow_control.is_active
+        on_message_in = self._on_message_in
+        ack_events = self._ack_events
+        sleep = asyncio.sleep
+        trace = self.app.trace
+        _shortlabel = shortlabel
+        loop = self.loop
+        timeout = want_seconds(within) if within else None
 
-        self.add_processor(add_to_buffer)
-        self._enable_passive(cast(ChannelT, channel_it))
         try:
-            while not self.should_stop:
-                # wait until buffer full, or timeout.
-                # Same mode annotation gap as in add_to_buffer above, plus
-                # ``timeout: Seconds`` omitting the ``None`` that is mode's
-                # own default and its "wait forever" value.
-                await self.wait_for_stopped(
-                    buffer_full, timeout=timeout  # type: ignore[arg-type]
-                )
-                if buffer:
-                    # make sure background thread does not add new items to
-                    # buffer while we read.
-                    buffer_consuming = self.loop.create_future()
+            exhausted = False
+            while not exhausted and not self.should_stop:
+                values: List[Any] = []
+                events: List[EventT] = []
+                states: List[Any] = []
+                deadline: Optional[_TakeDeadline] = None
+                await sleep(0)
+                try:
+                    while deadline is None or not deadline.expired:
+                        # get message from channel, taking what is already
+                        # queued without waiting (see _py_aiter).
+                        channel_value: Any
+                        if chan_queue is not None:
+                            if chan_errors:
+                                raise chan_errors.popleft()
+                            if not chan_queue_empty():
+                                channel_value = chan_quick_get()
+                            elif deadline is None:
+                                channel_value = await chan_slow_get()
+                            else:
+                                await _wait_for_put(loop, chan_queue, deadline)
+                                continue
+                        else:
+                            try:
+                                channel_value = await chan_slow_get()
+                            except StopAsyncIteration:
+                                exhausted = True
+                                break
+
+                        if not isinstance(channel_value, event_cls):
+                            exc = RuntimeError(
+                                "Take buffer found value without event: "
+                                f"{channel_value!r}"
+                            )
+                            self.log.error("Error adding to take buffer: %r", exc)
+                            await self.crash(exc)
+                            return
+                        event = channel_value
+                        message = event.message
+                        tp = message.tp
+                        offset = message.offset
+                        if (
+                            not flow_control_is_active()
+                            or message.generation_id != self.app.consumer_generation_id
+                        ):
+                            ack_events((event,), (None,))
+                            continue
+                        if message.topic in acking_topics and not message.tracked:
+                            message.tracked = True
+                            # This inlines Consumer.track_message(message)
+                            add_unacked(message)
+                            on_message_in(tp, offset, message)
+                        state = on_stream_event_in(tp, offset, self, event)
+                        _current_event_contextvar.set(create_ref(event))
+                        self.current_event = event
+
+                        # reduce using processors
+                        value: Any = event.value
+                        try:
+                            for processor in processors:
+                                with trace(f"processor-{_shortlabel(processor)}"):
+                                    value = await _maybe_async(processor(value))
+                            value = await on_merge(value)
+                        except Skip:
+                            # We want to ack the filtered message
+                            # otherwise the lag would increase
+                            ack_events((event,), (state,))
+                            continue
+                        finally:
+                            self.current_event = None
+
+                        values.append(value)
+                        events.append(event)
+                        states.append(state)
+                        if len(values) >= max_:
+                            break
+                        if deadline is None and timeout is not None:
+                            deadline = _TakeDeadline(loop, timeout)
+                finally:
+                    if deadline is not None:
+                        deadline.cancel()
+
+                if values:
+                    self.events_total += len(values)
+                    self._set_current_event(events[-1])
                     try:
-                        yield list(buffer)
+                        yield values, events
                     finally:
-                        buffer.clear()
-                        for event in events:
-                            await self.ack(event)
-                        events.clear()
-                        # allow writing to buffer again
-                        notify(buffer_consuming)
-                        buffer_full.clear()
-                        buffer_consumed.set()
-                else:  # pragma: no cover
-                    pass
-            else:  # pragma: no cover
-                pass
-
+                        self.current_event = None
+                        if ack:
+                            ack_events(events, states)
         finally:
-            # Restore last behaviour of "enable_acks"
-            self.enable_acks = stream_enable_acks
-            self._processors.remove(add_to_buffer)
+            self._channel_stop_iteration(channel)
+            if started_by_aiter:
+                await self.stop()
+                self.service_reset()
+
+    def _ack_events(self, events: Sequence[EventT], states: Sequence[Any]) -> None:
+        # This inlines self.ack for a batch of events, passing on
+        # the sensor state returned by on_stream_event_in.
+        on_stream_event_out = self._on_stream_event_out
+        on_message_out = self._on_message_out
+        for event, state in zip(events, states):
+            last_stream_to_ack = event.ack()
+            message = event.message
+            tp = message.tp
+            offset = message.offset
+            on_stream_event_out(tp, offset, self, event, state)
+            if last_stream_to_ack:
+                on_message_out(tp, offset, message)
 
     def enumerate(self, start: int = 0) -> AsyncIterable[Tuple[int, T_co]]:
         """Enumerate values received on this stream.
@@ -689,104 +672,26 @@ class Stream(StreamT[T_co], Service):
              number of messages are received within the specified number of
              seconds then we flush the buffer immediately.
         :param within: Timeout for when we give up waiting for another value,
-             and process the values we have.
+             and process the values we have, counted from the first
+             value in the buffer.
              Warning: If there's no timeout (i.e. `timeout=None`),
              the agent is likely to stall and block buffered events for an
              unreasonable length of time(!).
         """
-        buffer: List[T_co] = []
-        events: List[EventT] = []
-        buffer_add = buffer.append
-        event_add = events.append
-        buffer_size = buffer.__len__
-        buffer_full = asyncio.Event()
-        buffer_consumed = asyncio.Event()
-        timeout = want_seconds(within) if within else None
         stream_enable_acks: bool = self.enable_acks
-
-        buffer_consuming: Optional[asyncio.Future] = None
-
-        channel_it = aiter(self.channel)
-
-        # We add this processor to populate the buffer, and the stream
-        # is passively consumed in the background (enable_passive below).
-        async def add_to_buffer(value: T) -> T:
-            try:
-                # buffer_consuming is set when consuming buffer
-                # after timeout.
-                nonlocal buffer_consuming
-                if buffer_consuming is not None:
-                    try:
-                        await buffer_consuming
-                    finally:
-                        buffer_consuming = None
-
-                # We want to save events instead of values to allow for manual ack
-                event = self.current_event
-                buffer_add(cast(T_co, event))
-                if event is None:
-                    raise RuntimeError("Take buffer found current_event is None")
-
-                event_add(event)
-                if buffer_size() >= max_:
-                    # signal that the buffer is full and should be emptied.
-                    buffer_full.set()
-                    # strict wait for buffer to be consumed after buffer
-                    # full.
-                    # If max is 1000, we are not allowed to return 1001
-                    # values.
-                    buffer_consumed.clear()
-                    # mode types the waitable as ``mode.utils.locks.Event``,
-                    # but Service.wait_first accepts anything with an
-                    # awaitable ``.wait()`` -- asyncio.Event included.
-                    await self.wait(buffer_consumed)  # type: ignore[arg-type]
-            except CancelledError:  # pragma: no cover
-                raise
-            except Exception as exc:
-                self.log.exception("Error adding to take buffer: %r", exc)
-                await self.crash(exc)
-            return value
-
         # Disable acks to ensure this method acks manually
         # events only after they are consumed by the user
         self.enable_acks = False
-
-        self.add_processor(add_to_buffer)
-        self._enable_passive(cast(ChannelT, channel_it))
         try:
-            while not self.should_stop:
-                # wait until buffer full, or timeout.
-                # Same mode annotation gap as in add_to_buffer above, plus
-                # ``timeout: Seconds`` omitting the ``None`` that is mode's
-                # own default and its "wait forever" value.
-                await self.wait_for_stopped(
-                    buffer_full, timeout=timeout  # type: ignore[arg-type]
-                )
-                if buffer:
-                    # make sure background thread does not add new items to
-                    # buffer while we read.
-                    buffer_consuming = self.loop.create_future()
-                    try:
-                        yield list(buffer)
-                    finally:
-                        buffer.clear()
-                        # code change: We want to manually ack
-                        # for event in events:
-                        #     await self.ack(event)
-                        events.clear()
-                        # allow writing to buffer again
-                        notify(buffer_consuming)
-                        buffer_full.clear()
-                        buffer_consumed.set()
-                else:  # pragma: no cover
-                    pass
-            else:  # pragma: no cover
-                pass
-
+            batches = self._take_batches(max_, within, ack=False)
+            async with aclosing(batches):
+                # We want to yield events instead of values to allow for
+                # manual ack
+                async for _, events in batches:
+                    yield cast(Sequence[T_co], events)
         finally:
             # Restore last behaviour of "enable_acks"
             self.enable_acks = stream_enable_acks
-            self._processors.remove(add_to_buffer)
 
     def through(self, channel: Union[str, ChannelT]) -> StreamT:
         """Forward values to in this stream to channel.
@@ -1084,22 +989,67 @@ class Stream(StreamT[T_co], Service):
         """Remove as node in a joined stream."""
         await self.stop()
 
-    def join(self, *fields: FieldDescriptorT) -> StreamT:
-        """Create stream where events are joined."""
-        return self._join(joins.RightJoin(stream=self, fields=fields))
+    def join(
+        self,
+        *fields: Union[FieldDescriptorT, JoinableT],
+        on: Optional[FieldDescriptorT] = None,
+    ) -> StreamT:
+        """Create stream where events are joined.
 
-    def left_join(self, *fields: FieldDescriptorT) -> StreamT:
-        """Create stream where events are joined by LEFT JOIN."""
-        return self._join(joins.LeftJoin(stream=self, fields=fields))
+        Joining a table, as in ``stream.join(table, on=Order.account_id)``,
+        creates a stream of ``(value, table_value)`` tuples, skipping
+        values with no key in the table (see :class:`~faust.joins.TableJoin`).
+        Without ``on`` the table is looked up by event key.
+        """
+        table = self._joined_table(fields)
+        if table is not None:
+            return self._join(joins.TableJoin(stream=self, table=table, on=on))
+        return self._join(joins.RightJoin(stream=self, fields=self._fields(fields)))
 
-    def inner_join(self, *fields: FieldDescriptorT) -> StreamT:
+    def left_join(
+        self,
+        *fields: Union[FieldDescriptorT, JoinableT],
+        on: Optional[FieldDescriptorT] = None,
+    ) -> StreamT:
+        """Create stream where events are joined by LEFT JOIN.
+
+        Joining a table, values with no key in the table are joined
+        with :const:`None` (see :class:`~faust.joins.LeftTableJoin`).
+        """
+        table = self._joined_table(fields)
+        if table is not None:
+            return self._join(joins.LeftTableJoin(stream=self, table=table, on=on))
+        return self._join(joins.LeftJoin(stream=self, fields=self._fields(fields)))
+
+    def inner_join(
+        self,
+        *fields: Union[FieldDescriptorT, JoinableT],
+        on: Optional[FieldDescriptorT] = None,
+    ) -> StreamT:
         """Create stream where events are joined by INNER JOIN."""
-        return self._join(joins.InnerJoin(stream=self, fields=fields))
+        table = self._joined_table(fields)
+        if table is not None:
+            return self._join(joins.TableJoin(stream=self, table=table, on=on))
+        return self._join(joins.InnerJoin(stream=self, fields=self._fields(fields)))
 
     def outer_join(self, *fields: FieldDescriptorT) -> StreamT:
         """Create stream where events are joined by OUTER JOIN."""
         return self._join(joins.OuterJoin(stream=self, fields=fields))
 
+    def _joined_table(
+        self, fields: Tuple[Union[FieldDescriptorT, JoinableT], ...]
+    ) -> Optional[TableT]:
+        if fields and isinstance(fields[0], TableT):
+            if len(fields) > 1:
+                raise TypeError("Stream can only be joined with one table")
+            return fields[0]
+        return None
+
+    def _fields(
+        self, fields: Tuple[Union[FieldDescriptorT, JoinableT], ...]
+    ) -> Tuple[FieldDescriptorT, ...]:
+        return cast(Tuple[FieldDescriptorT, ...], fields)
+
     def _join(self, join_strategy: JoinT) -> StreamT:
         return self.clone(join_strategy=join_strategy)
 
@@ -1129,13 +1079,15 @@ class Stream(StreamT[T_co], Service):
 
     async def on_stop(self) -> None:
         """Signal that the stream is stopping."""
+        # CPython schedules ``aclose()`` for generators abandoned by the
+        # caller as soon as they are unreferenced: let those run first.
+        await asyncio.sleep(0)
         # Close any buffering generator (take() and friends) the caller
-        # abandoned, so their ``finally`` blocks -- acking consumed events,
-        # restoring ``enable_acks`` and detaching the buffering processor --
-        # run deterministically now instead of whenever the interpreter
-        # finalizes the generator (which on PyPy waits for a GC cycle that
-        # may never come).  ``aclose()`` on an exhausted generator is a
-        # harmless no-op.
+        # abandoned, so their ``finally`` blocks -- acking consumed events
+        # and restoring ``enable_acks`` -- run deterministically now
+        # instead of whenever the interpreter finalizes the generator
+        # (which on PyPy waits for a GC cycle that may never come).
+        # ``aclose()`` on an exhausted generator is a harmless no-op.
         for agen in list(self._active_agens):
             try:
                 await agen.aclose()
@@ -0,0 +1,699 @@
+"""Numeric windowed aggregates stored in NumPy arrays.
+
+A windowed :class:`~faust.Table` keeps every ``(key, window)`` pair as
+a separate value, and every event updates each window it falls into
+one at a time.  :class:`AggregateTable` instead divides time into
+*panes* of the window step, and keeps the aggregates of a partition
+in NumPy arrays with a row for every key and a column for every pane.
+
+Batches of events are applied with a single scatter operation
+(:func:`numpy.add.at` and friends) per array, a window is computed
+from the panes it covers when read, and the changelog receives one
+compact snapshot of the panes of every changed key when offsets
+are committed.
+
+Requires :pypi:`numpy`: ``pip install "faust-streaming[numpy]"``.
+"""
+
+import struct
+import time
+from collections import defaultdict
+from collections.abc import ItemsView, KeysView, ValuesView
+from math import ceil
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+
+from faust.exceptions import ImproperlyConfigured
+from faust.stores.base import Store
+from faust.streams import current_event
+from faust.types import TP, AppT, EventT
+from faust.types.tables import KT, WindowWrapperT
+from faust.types.windows import WindowRange, WindowRange_from_start, WindowT
+from faust.windows import HoppingWindow
+
+from .table import Table
+
+try:
+    import numpy
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # pragma: no cover
+    # XXX module doubles as "is the optional extra installed?" sentinel,
+    # see the same pattern in faust.sensors.prometheus.
+    numpy = None  # type: ignore[assignment]
+
+__all__ = ["AggregateTable", "AggregateStore", "PaneGrid"]
+
+#: Arrays kept for every aggregate function.
+#: The pane count is always kept, to tell empty panes apart.
+AGGREGATES: Mapping[str, Tuple[str, ...]] = {
+    "count": ("count",),
+    "sum": ("count", "sum"),
+    "mean": ("count", "sum"),
+    "min": ("count", "min"),
+    "max": ("count", "max"),
+}
+
+#: Value of a cell in an empty pane, for every array.
+INITIAL: Mapping[str, float] = {
+    "count": 0.0,
+    "sum": 0.0,
+    "min": float("inf"),
+    "max": float("-inf"),
+}
+
+#: Version of the changelog snapshot format.
+SNAPSHOT_VERSION = 1
+
+#: Snapshot header: version, first pane, number of panes.
+SNAPSHOT_HEADER = struct.Struct("<Bqi")
+
+E_NUMPY_MISSING = 'AggregateTable requires `pip install "faust-streaming[numpy]"`.'
+
+E_UNSUPPORTED_WINDOW = """\
+AggregateTable {name!r} requires a hopping or tumbling window \
+with expiry, and a window size that is a multiple of the step, \
+not {window!r}.\
+"""
+
+
+class PaneGrid:
+    """Aggregates of one table partition, as arrays of keys × panes.
+
+    Pane ``p`` holds the aggregates of events with timestamps in
+    ``[p * step, (p + 1) * step)``.  The grid holds the latest
+    :attr:`columns` panes, reusing the column of a pane for the pane
+    ``columns`` steps later, so moving on in time never copies data.
+
+    Keys with no events in any pane left are removed when the grid
+    moves on, and recorded in :attr:`removed` until the next
+    :meth:`AggregateStore.flush`.
+    """
+
+    aggregate: str
+    fields: Tuple[str, ...]
+    columns: int
+    last_pane: Optional[int]
+    index: Dict[Any, int]
+    keys: List[Any]
+    arrays: Dict[str, Any]
+
+    #: Rows changed since the last flush.
+    dirty: Set[int]
+
+    #: Keys removed since the last flush.
+    removed: Set[Any]
+
+    def __init__(self, aggregate: str, columns: int, rows: int = 64) -> None:
+        self.aggregate = aggregate
+        self.fields = fields = AGGREGATES[aggregate]
+        self.columns = columns
+        self.last_pane = None
+        self.index = {}
+        self.keys = []
+        self._free: List[int] = []
+        self.arrays = {
+            field: numpy.full((rows, columns), INITIAL[field]) for field in fields
+        }
+        self.dirty = set()
+        self.removed = set()
+
+    @property
+    def first_pane(self) -> int:
+        """Return the oldest pane kept in the grid."""
+        assert self.last_pane is not None
+        return self.last_pane - self.columns + 1
+
+    def update(self, keys: Sequence[Any], values: Any, panes: Any) -> int:
+        """Add values to the panes of keys.
+
+        Returns:
+            int: number of values dropped, for being older than
+                the oldest pane kept.
+        """
+        values = numpy.asarray(values, dtype=numpy.float64)
+        panes = numpy.asarray(panes, dtype=numpy.int64)
+        if not len(panes):
+            return 0
+        self.advance(int(panes.max()))
+        live = panes >= self.first_pane
+        dropped = len(panes) - int(numpy.count_nonzero(live))
+        if dropped:
+            keys = [key for key, keep in zip(keys, live) if keep]
+            values, panes = values[live], panes[live]
+        rows = self._rows(keys)
+        at = (rows, panes % self.columns)
+        arrays = self.arrays
+        numpy.add.at(arrays["count"], at, 1.0)
+        if "sum" in arrays:
+            numpy.add.at(arrays["sum"], at, values)
+        if "min" in arrays:
+            numpy.minimum.at(arrays["min"], at, values)
+        if "max" in arrays:
+            numpy.maximum.at(arrays["max"], at, values)
+        self.dirty.update(rows.tolist())
+        return dropped
+
+    def advance(self, pane: int, *, record: bool = True) -> None:
+        """Move on to pane, clearing the panes that expire.
+
+        Keys left without events are added to :attr:`removed`,
+        unless ``record`` is false.
+        """
+        last_pane = self.last_pane
+        if last_pane is None:
+            self.last_pane = pane
+            return
+        if pane <= last_pane:
+            return
+        self.last_pane = pane
+        expired = min(pane - last_pane, self.columns)
+        columns = (numpy.arange(pane - expired + 1, pane + 1)) % self.columns
+        for field, array in self.arrays.items():
+            array[:, columns] = INITIAL[field]
+        self._remove_empty(record)
+
+    def window(self, key: Any, start_pane: int, panes: int) -> Optional[float]:
+        """Return aggregate of ``panes`` panes of key from ``start_pane``.
+
+        Returns :const:`None` if there are no events in those panes.
+        """
+        row = self.index.get(key)
+        if row is None:
+            return None
+        first = max(start_pane, self.first_pane)
+        last = min(start_pane + panes - 1, cast(int, self.last_pane))
+        if first > last:
+            return None
+        columns = numpy.arange(first, last + 1) % self.columns
+        cells = {field: array[row, columns] for field, array in self.arrays.items()}
+        return self._reduce(cells, axis=None)
+
+    def windows(self, key: Any, panes: int) -> Dict[int, float]:
+        """Return aggregates of windows of key by their first pane.
+
+        Every window starting at a pane kept in the grid, and having
+        events in any of its ``panes`` panes, is included.
+        """
+        row = self.index[key]
+        ordered = numpy.arange(self.first_pane, cast(int, self.last_pane) + 1)
+        columns = ordered % self.columns
+        cells = {
+            field: sliding_window_view(
+                numpy.concatenate(
+                    (array[row, columns], numpy.full(panes - 1, INITIAL[field]))
+                ),
+                panes,
+            )
+            for field, array in self.arrays.items()
+        }
+        values = self._reduce(cells, axis=-1)
+        present = cells["count"].sum(axis=-1) > 0
+        return dict(zip(ordered[present].tolist(), values[present].tolist()))
+
+    def _reduce(self, cells: Mapping[str, Any], axis: Optional[int]) -> Any:
+        count = cells["count"].sum(axis=axis)
+        if "min" in cells:
+            value = cells["min"].min(axis=axis)
+        elif "max" in cells:
+            value = cells["max"].max(axis=axis)
+        elif "sum" in cells:
+            value = cells["sum"].sum(axis=axis)
+            if self.aggregate == "mean":
+                value = value / numpy.maximum(count, 1.0)
+        else:
+            value = count
+        if axis is None:
+            return float(value) if count else None
+        return value
+
+    def snapshot(self, key: Any) -> Optional[bytes]:
+        """Return compact changelog value for the panes of key.
+
+        The value is a :data:`SNAPSHOT_HEADER` followed by the cells
+        of every array from the first to the last pane having events,
+        as little-endian doubles.  Returns :const:`None` if the key
+        has no events.
+        """
+        row = self.index.get(key)
+        if row is None:
+            return None
+        ordered = numpy.arange(self.first_pane, cast(int, self.last_pane) + 1)
+        columns = ordered % self.columns
+        present = numpy.flatnonzero(self.arrays["count"][row, columns])
+        if not len(present):
+            return None
+        columns = columns[present[0] : present[-1] + 1]
+        header = SNAPSHOT_HEADER.pack(
+            SNAPSHOT_VERSION, int(ordered[present[0]]), len(columns)
+        )
+        return header + b"".join(
+            self.arrays[field][row, columns].astype("<f8").tobytes()
+            for field in self.fields
+        )
+
+    def restore(self, key: Any, value: Optional[bytes]) -> None:
+        """Replace the panes of key with changelog snapshot."""
+        if value is None:
+            self._remove(key)
+            return
+        version, start, panes = SNAPSHOT_HEADER.unpack_from(value)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unknown aggregate snapshot version: {version}")
+        cells = numpy.frombuffer(
+            value, dtype="<f8", offset=SNAPSHOT_HEADER.size
+        ).reshape(len(self.fields), panes)
+        self.advance(start + panes - 1, record=False)
+        skip = max(self.first_pane - start, 0)
+        if skip >= panes:
+            self._remove(key)
+            return
+        row = int(self._rows([key])[0])
+        columns = numpy.arange(start + skip, start + panes) % self.columns
+        for i, field in enumerate(self.fields):
+            array = self.arrays[field]
+            array[row] = INITIAL[field]
+            array[row, columns] = cells[i, skip:]
+
+    def _rows(self, keys: Sequence[Any]) -> Any:
+        index = self.index
+        add = self._add_key
+        return numpy.fromiter(
+            (index[key] if key in index else add(key) for key in keys),
+            dtype=numpy.int64,
+            count=len(keys),
+        )
+
+    def _add_key(self, key: Any) -> int:
+        if self._free:
+            row = self._free.pop()
+            self.keys[row] = key
+        else:
+            row = len(self.keys)
+            self.keys.append(key)
+            capacity = len(self.arrays["count"])
+            if row >= capacity:
+                for field, array in self.arrays.items():
+                    grown = numpy.full((capacity * 2, self.columns), INITIAL[field])
+                    grown[:capacity] = array
+                    self.arrays[field] = grown
+        self.index[key] = row
+        self.removed.discard(key)
+        return row
+
+    def _remove(self, key: Any) -> None:
+        row = self.index.pop(key, None)
+        if row is not None:
+            self._free_row(row)
+
+    def _free_row(self, row: int) -> None:
+        for field, array in self.arrays.items():
+            array[row] = INITIAL[field]
+        self.keys[row] = None
+        self._free.append(row)
+        self.dirty.discard(row)
+
+    def _remove_empty(self, record: bool) -> None:
+        rows = len(self.keys)
+        empty = numpy.flatnonzero(~self.arrays["count"][:rows].any(axis=1))
+        free = set(self._free)
+        for row in empty.tolist():
+            if row not in free:
+                key = self.keys[row]
+                del self.index[key]
+                self._free_row(row)
+                if record:
+                    self.removed.add(key)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.index
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+class AggregateStore(Store):
+    """In-memory store of :class:`AggregateTable` partitions.
+
+    The store is not persisted to disk: state is recovered from the
+    changelog topic at startup, as with the ``memory://`` store.
+    """
+
+    table: "AggregateTable"
+    grids: Dict[int, PaneGrid]
+
+    def __init__(self, table: "AggregateTable", **kwargs: Any) -> None:
+        super().__init__(
+            "memory://",
+            table.app,
+            table,
+            key_type=table.key_type,
+            key_serializer=table.key_serializer,
+            value_serializer=table.value_serializer,
+            **kwargs,
+        )
+        self.grids = {}
+
+    def grid(self, partition: int) -> PaneGrid:
+        """Return aggregates of table partition."""
+        grid = self.grids.get(partition)
+        if grid is None:
+            table = self.table
+            grid = self.grids[partition] = PaneGrid(table.aggregate, table.columns)
+        return grid
+
+    def apply(
+        self, partition: int, keys: Sequence[Any], values: Any, timestamps: Any
+    ) -> int:
+        """Add values to the windows of keys at timestamps.
+
+        Returns:
+            int: number of values dropped, for being older than
+                the window expiry.
+        """
+        panes = numpy.floor_divide(
+            numpy.asarray(timestamps, dtype=numpy.float64), self.table.step
+        )
+        return self.grid(partition).update(keys, values, panes)
+
+    def _grid_of(self, key: Any) -> Optional[PaneGrid]:
+        for grid in self.grids.values():
+            if key in grid:
+                return grid
+        return None
+
+    def window(self, key: Any, start_pane: int) -> Optional[float]:
+        """Return aggregate of the window of key starting at pane."""
+        grid = self._grid_of(key)
+        if grid is None:
+            return None
+        return grid.window(key, start_pane, self.table.panes_per_window)
+
+    async def flush(self) -> None:
+        """Send snapshots of keys changed to the changelog topic.
+
+        Called before committing offsets, so that the changelog holds
+        the state of every event committed.
+        """
+        send = self.table.send_changelog
+        for partition, grid in self.grids.items():
+            removed, grid.removed = grid.removed, set()
+            for key in removed:
+                send(partition, key, None)
+            dirty, grid.dirty = grid.dirty, set()
+            keys = grid.keys
+            for row in dirty:
+                key = keys[row]
+                send(partition, key, grid.snapshot(key))
+
+    def apply_changelog_batch(
+        self,
+        batch: Iterable[EventT],
+        to_key: Callable[[Any], Any],
+        to_value: Callable[[Any], Any],
+    ) -> None:
+        """Apply batch of changelog snapshots to local state."""
+        for event in batch:
+            key = to_key(event.key)
+            self.grid(event.message.partition).restore(key, event.message.value)
+
+    async def on_recovery_completed(
+        self, active_tps: Set[TP], standby_tps: Set[TP]
+    ) -> None:
+        """Drop partitions no longer assigned."""
+        partitions = {tp.partition for tp in active_tps | standby_tps}
+        for partition in list(self.grids):
+            if partition not in partitions:
+                del self.grids[partition]
+
+    def persisted_offset(self, tp: TP) -> Optional[int]:
+        """Return the persisted offset.
+
+        This always returns :const:`None`, as the store is in-memory.
+        """
+        return None
+
+    def reset_state(self) -> None:
+        """Remove local state."""
+        self.clear()
+
+    def __getitem__(self, key: Any) -> Dict[WindowRange, float]:
+        grid = self._grid_of(key)
+        if grid is None:
+            raise KeyError(key)
+        table = self.table
+        step, size = table.step, table.window_size
+        return {
+            WindowRange_from_start(pane * step, size): value
+            for pane, value in grid.windows(key, table.panes_per_window).items()
+        }
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        raise NotImplementedError("AggregateTable: cannot set key")
+
+    def __delitem__(self, key: Any) -> None:
+        raise NotImplementedError("AggregateTable: cannot del key")
+
+    def __iter__(self) -> Iterator[Any]:
+        for grid in self.grids.values():
+            yield from grid
+
+    def __len__(self) -> int:
+        return sum(len(grid) for grid in self.grids.values())
+
+    def __contains__(self, key: object) -> bool:
+        return self._grid_of(key) is not None
+
+    def keys(self) -> KeysView:
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        return ItemsView(self)
+
+    def clear(self) -> None:
+        self.grids.clear()
+
+    async def backup_partition(
+        self,
+        tp: Union[TP, int],
+        flush: bool = True,
+        purge: bool = False,
+        keep: int = 1,
+    ) -> None:
+        """Backup partition from this store.
+
+        This does nothing, as the aggregates are kept in memory.
+        """
+        ...
+
+    def restore_backup(
+        self,
+        tp: Union[TP, int],
+        latest: bool = True,
+        backup_id: int = 0,
+    ) -> None:
+        """Restore partition backup from this store.
+
+        This does nothing, as the aggregates are kept in memory.
+        """
+        ...
+
+
+class AggregateTable(Table[KT, Dict[WindowRange, float]]):
+    """Table of numeric aggregates over a hopping or tumbling window.
+
+    The aggregate function is one of ``"count"``, ``"sum"``,
+    ``"mean"``, ``"min"`` and ``"max"``, and the window must have
+    an expiry: panes older than that are dropped.
+
+    Values are added with :meth:`add`, or in batches with
+    :meth:`add_many` and :meth:`add_events`, which is where
+    the table is fast:
+
+    .. sourcecode:: python
+
+        latency = app.AggregateTable(
+            "latency",
+            window=faust.HoppingWindow(60, 10, expires=600),
+            aggregate="mean",
+        )
+
+        @app.agent(requests)
+        async def process(stream):
+            async for events in stream.take_events(10_000, within=1.0):
+                latency.add_events(events, value=lambda r: r.latency)
+
+    ``table[key]`` returns the aggregate of every window of the key
+    with events, by window range, and :meth:`current` returns that of
+    the latest window containing a timestamp.
+    """
+
+    aggregate: str
+    step: float
+    window_size: float
+    panes_per_window: int
+    columns: int
+
+    _changelog_compacting = True
+    _changelog_deleting = True
+
+    def __init__(self, app: AppT, *, aggregate: str = "sum", **kwargs: Any) -> None:
+        if numpy is None:
+            raise ImproperlyConfigured(E_NUMPY_MISSING)
+        if aggregate not in AGGREGATES:
+            raise ImproperlyConfigured(
+                f"Unknown aggregate {aggregate!r}: expected one of {list(AGGREGATES)}"
+            )
+        super().__init__(app, **kwargs)
+        self.aggregate = aggregate
+        window = self.window
+        if (
+            not isinstance(window, HoppingWindow)
+            or not window.expires
+            or window.size % window.step
+        ):
+            raise ImproperlyConfigured(
+                E_UNSUPPORTED_WINDOW.format(name=self.name, window=window)
+            )
+        self.step = window.step
+        self.window_size = window.size
+        self.panes_per_window = round(window.size / window.step)
+        self.columns = self.panes_per_window + ceil(window.expires / window.step)
+        # changelog values are snapshots encoded by the table.
+        self.value_serializer = "raw"
+
+    def info(self) -> Mapping[str, Any]:
+        """Return table attributes as dictionary."""
+        return {**super().info(), "aggregate": self.aggregate}
+
+    def _new_store(self) -> AggregateStore:
+        return AggregateStore(self)
+
+    @property
+    def store(self) -> AggregateStore:
+        """Return the store keeping table aggregates."""
+        return cast(AggregateStore, self.data)
+
+    def using_window(
+        self, window: WindowT, *, key_index: bool = False
+    ) -> WindowWrapperT:
+        """Not supported: the window is set when creating the table."""
+        raise NotImplementedError(
+            f"{type(self).__name__}: window must be set when creating the table"
+        )
+
+    def add(
+        self,
+        key: KT,
+        value: float,
+        *,
+        timestamp: Optional[float] = None,
+        event: Optional[EventT] = None,
+    ) -> None:
+        """Add value to the windows of key.
+
+        The timestamp defaults to that of the event being processed.
+        """
+        event = self._event(event)
+        if timestamp is None:
+            timestamp = event.message.timestamp
+        self._update(event.message.partition, [key], [value], [timestamp])
+
+    def add_many(
+        self,
+        keys: Sequence[KT],
+        values: Any,
+        timestamps: Any,
+        *,
+        partition: Optional[int] = None,
+    ) -> None:
+        """Add values to the windows of keys at timestamps.
+
+        Values and timestamps can be sequences or NumPy arrays.
+        They are added to the table partition given, which defaults
+        to the partition of the event being processed.
+        """
+        if partition is None:
+            partition = self._event(None).message.partition
+        self._update(partition, keys, values, timestamps)
+
+    def add_events(
+        self,
+        events: Iterable[EventT],
+        *,
+        key: Optional[Callable[[Any], KT]] = None,
+        value: Optional[Callable[[Any], float]] = None,
+    ) -> None:
+        """Add batch of events to the table.
+
+        Every event is added to the table partition of the event,
+        at the time of the event, using the key and value of the event,
+        or the result of calling ``key`` and ``value`` with the event
+        value when provided.
+
+        Use with :meth:`~faust.Stream.take_events` to apply
+        batches of events at once.
+        """
+        batches: Dict[int, Tuple[List, List, List]] = defaultdict(lambda: ([], [], []))
+        for event in events:
+            keys, values, timestamps = batches[event.message.partition]
+            keys.append(event.key if key is None else key(event.value))
+            values.append(event.value if value is None else value(event.value))
+            timestamps.append(event.message.timestamp)
+        for partition, (keys, values, timestamps) in batches.items():
+            self._update(partition, keys, values, timestamps)
+
+    def current(self, key: KT, timestamp: Optional[float] = None) -> Optional[float]:
+        """Return aggregate of the latest window of key containing timestamp.
+
+        The timestamp defaults to that of the event being processed,
+        or the current time outside of a stream.  Returns :const:`None`
+        if there are no events in the window.
+        """
+        if timestamp is None:
+            event = current_event()
+            timestamp = event.message.timestamp if event is not None else time.time()
+        window = cast(WindowT, self.window)
+        start, _ = window.current(timestamp)
+        return self.store.window(key, round(start / self.step))
+
+    def _update(
+        self, partition: int, keys: Sequence[Any], values: Any, timestamps: Any
+    ) -> None:
+        to_key = self._to_key
+        dropped = self.store.apply(
+            partition, [to_key(key) for key in keys], values, timestamps
+        )
+        if dropped:
+            self.log.dev("Dropped %r values older than window expiry", dropped)
+
+    def _event(self, event: Optional[EventT]) -> EventT:
+        if event is None:
+            event = current_event()
+            if event is None:
+                raise RuntimeError("Cannot modify table outside of agent/stream.")
+        return event
+
+    def __setitem__(self, key: KT, value: Any) -> None:
+        raise NotImplementedError(f"{type(self).__name__}: cannot set key")
+
+    def __delitem__(self, key: KT) -> None:
+        raise NotImplementedError(f"{type(self).__name__}: cannot del key")
@@ -1,6 +1,8 @@
 """Base class Collection for Table and future data structures."""
 
 import abc
+import base64
+import struct
 import time
 from collections import defaultdict
 from contextlib import suppress
@@ -23,6 +25,7 @@ from typing import (
     cast,
     no_type_check,
 )
+from weakref import WeakSet
 
 from mode import Seconds, Service
 from mode.utils.futures import maybe_async
@@ -44,13 +47,14 @@ from faust.types import (
     TopicT,
 )
 from faust.types.models import ModelArg, ModelT
-from faust.types.stores import StoreT
+from faust.types.stores import ScanCursor, ScanPredicate, StoreT
 from faust.types.streams import JoinableT, StreamT
 from faust.types.tables import (
     ChangelogEventCallback,
     CollectionT,
     RecoverCallback,
     RelativeHandler,
+    ScanBatch,
     WindowCloseCallback,
 )
 from faust.types.windows import WindowRange, WindowT
@@ -69,6 +73,34 @@ by configuring Kafka correctly.
 """
 
 
+_SCAN_CURSOR_PARTITION = struct.Struct(">I")
+
+
+def _encode_scan_cursor(position: ScanCursor) -> str:
+    partition, key = position
+    token = base64.urlsafe_b64encode(_SCAN_CURSOR_PARTITION.pack(partition) + key)
+    return token.rstrip(b"=").decode()
+
+
+def _decode_scan_cursor(cursor: str) -> ScanCursor:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid scan cursor: {cursor!r}") from exc
+    if len(data) < _SCAN_CURSOR_PARTITION.size:
+        raise ValueError(f"Invalid scan cursor: {cursor!r}")
+    (partition,) = _SCAN_CURSOR_PARTITION.unpack_from(data)
+    return partition, data[_SCAN_CURSOR_PARTITION.size :]
+
+
+def _prefix_stop(prefix: bytes) -> Optional[bytes]:
+    # Smallest key greater than all keys starting with prefix.
+    prefix = prefix.rstrip(b"\xff")
+    if not prefix:
+        return None
+    return prefix[:-1] + bytes([prefix[-1] + 1])
+
+
 class Collection(Service, CollectionT):
     """Base class for changelog-backed data structures stored in Kafka."""
 
@@ -80,6 +112,7 @@ class Collection(Service, CollectionT):
     _partition_timestamps: MutableMapping[int, List[float]]
     _partition_latest_timestamp: MutableMapping[int, float]
     _recover_callbacks: MutableSet[RecoverCallback]
+    _joins: "WeakSet[joins.TableJoin]"
     _data: Optional[StoreT] = None
     _changelog_compacting: Optional[bool] = True
     _changelog_deleting: Optional[bool] = None
@@ -170,6 +203,9 @@ class Collection(Service, CollectionT):
         self._partition_latest_timestamp = defaultdict(int)
 
         self._recover_callbacks = set(recover_callbacks or [])
+
+        # Stream joins caching values of this table (see joins.TableJoin).
+        self._joins = WeakSet()
         if on_recover:
             self.on_recover(on_recover)
 
@@ -255,6 +291,10 @@ class Collection(Service, CollectionT):
         """Return the last persisted offset for topic partition."""
         return self.data.persisted_offset(tp)
 
+    def persisted_offsets(self) -> Mapping[int, int]:
+        """Return the persisted offset of every partition stored locally."""
+        return self.data.persisted_offsets()
+
     async def need_active_standby_for(self, tp: TP) -> bool:
         """Return :const:`False` if we have access to partition data."""
         return await self.data.need_active_standby_for(tp)
@@ -263,6 +303,73 @@ class Collection(Service, CollectionT):
         """Reset local state."""
         self.data.reset_state()
 
+    def scan(
+        self,
+        *,
+        start: Optional[bytes] = None,
+        stop: Optional[bytes] = None,
+        prefix: Optional[bytes] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 1000,
+        predicate: Optional[ScanPredicate] = None,
+    ) -> Iterator[ScanBatch]:
+        """Iterate over the items stored locally, in batches.
+
+        Items are ordered by partition, then by serialized key,
+        and bounds are given as serialized keys.
+
+        Arguments:
+            start: Only keys serialized to this or greater.
+            stop: Only keys serialized to less than this.
+            prefix: Only keys serialized to start with this.
+            cursor: Resume scan from the cursor of a previous batch.
+            limit: Stop after this many items.
+            batch_size: Maximum number of items in a batch.
+            predicate: Only items this returns true for, called
+                with serialized key and value.  Items not matching
+                are not deserialized.
+
+        Yields:
+            :class:`~faust.types.tables.ScanBatch` tuples.  The last
+            batch has a :const:`None` cursor, unless the scan stopped
+            because of ``limit``.
+
+        Raises:
+            ValueError: if the cursor is invalid, or
+                ``limit`` or ``batch_size`` is less than one.
+
+        Notes:
+            Cursors refer to the partitions assigned to this worker,
+            and are only valid until the next rebalance.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1")
+        if prefix is not None:
+            start = prefix if start is None else max(start, prefix)
+            prefix_stop = _prefix_stop(prefix)
+            if prefix_stop is not None:
+                stop = prefix_stop if stop is None else min(stop, prefix_stop)
+        after = _decode_scan_cursor(cursor) if cursor is not None else None
+        batch: List[Tuple[Any, Any]] = []
+        count = 0
+        last = after
+        for position, key, value in self.data.scan(
+            start=start, stop=stop, after=after, predicate=predicate
+        ):
+            if count == limit or len(batch) >= batch_size:
+                assert last is not None
+                yield ScanBatch(batch, _encode_scan_cursor(last))
+                if count == limit:
+                    return
+                batch = []
+            batch.append((key, value))
+            count += 1
+            last = position
+        yield ScanBatch(batch, None)
+
     def send_changelog(
         self,
         partition: Optional[int],
@@ -77,6 +77,15 @@ class TableManager(Service, TableManagerT):
         for tp in offsets:
             self.on_commit_tp(tp)
 
+    async def flush(self) -> None:
+        """Wait for table stores to apply all writes.
+
+        Called before committing offsets, for stores that write
+        asynchronously (e.g. Aerospike with ``write_behind``).
+        """
+        for table in self.values():
+            await table.data.flush()
+
     def on_commit_tp(self, tp: TP) -> None:
         """Call when committing source topic partition used by this table."""
         entry = self._pending_persisted_offsets.get(tp)
@@ -11,9 +11,12 @@ from typing import (
     ClassVar,
     Dict,
     Iterable,
+    List,
+    Mapping,
     MutableMapping,
     Optional,
     Set,
+    Tuple,
     Type,
     Union,
 )
@@ -57,9 +60,24 @@ class ChangeloggedObject:
         """Apply event in changelog topic to local table state."""
         ...
 
+    def apply_changelog_events(self, events: Iterable[Tuple[int, Any]]) -> None:
+        """Apply several changelog events for this key, in order.
+
+        Subclasses can override this to fold the events into a single
+        change to their state.
+        """
+        for operation, value in events:
+            self.apply_changelog_event(operation, value)
+
 
 class ChangeloggedObjectManager(Store):
-    """Store of changelogged objects."""
+    """Store of changelogged objects.
+
+    Modified objects are written to the underlying storage once per
+    commit (see :meth:`flush`) rather than on every change, and offsets
+    of changelog events sent in the meantime are only persisted after
+    the objects are, so storage never falls behind its persisted offset.
+    """
 
     ValueType: ClassVar[Type[ChangeloggedObject]]
 
@@ -67,18 +85,43 @@ class ChangeloggedObjectManager(Store):
     data: MutableMapping
 
     _storage: Optional[StoreT] = None
+    _dirty: Set[Any]
+    _pending_offsets: Dict[TP, int]
 
     def __init__(self, table: Table, **kwargs: Any) -> None:
         self.table = table
         self.table_name = self.table.name
         self.data = {}
+        self._dirty = set()
+        self._pending_offsets = {}
         Service.__init__(self, loop=table.loop, **kwargs)
 
-    def send_changelog_event(self, key: Any, operation: int, value: Any) -> None:
-        """Send changelog event to the tables changelog topic."""
-        event = current_event()
+    def send_changelog_event(
+        self,
+        key: Any,
+        operation: int,
+        value: Any,
+        *,
+        event: Optional[EventT] = None,
+    ) -> None:
+        """Send changelog event to the tables changelog topic.
+
+        The event is sent to the changelog partition of ``event``,
+        or of the event currently being processed if not provided.
+        """
+        if event is None:
+            event = current_event()
         self.table._send_changelog(event, (operation, key), value)
-        self.storage[key] = self[key].as_stored_value()
+        self._dirty.add(key)
+
+    def _write_dirty(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        storage = self.storage
+        for key in dirty:
+            storage[key] = self[key].as_stored_value()
+        pending, self._pending_offsets = self._pending_offsets, {}
+        for tp, offset in pending.items():
+            storage.set_persisted_offset(tp, offset)
 
     def __getitem__(self, key: Any) -> ChangeloggedObject:
         if key in self.data:
@@ -100,13 +143,32 @@ class ChangeloggedObjectManager(Store):
         """Call when the changelogged object manager starts."""
         await self.add_runtime_dependency(self.storage)
 
+    async def on_stop(self) -> None:
+        """Call when the changelogged object manager stops."""
+        self._write_dirty()
+
     def persisted_offset(self, tp: TP) -> Optional[int]:
         """Get the last persisted offset for changelog topic partition."""
+        if tp in self._pending_offsets:
+            return self._pending_offsets[tp]
         return self.storage.persisted_offset(tp)
 
     def set_persisted_offset(self, tp: TP, offset: int) -> None:
         """Set the last persisted offset for changelog topic partition."""
-        self.storage.set_persisted_offset(tp, offset)
+        if self._dirty:
+            # wait for the objects changed so far to be written.
+            self._pending_offsets[tp] = offset
+        else:
+            self.storage.set_persisted_offset(tp, offset)
+
+    def persisted_offsets(self) -> Mapping[int, int]:
+        """Get the last persisted offset of every local changelog partition."""
+        return self.storage.persisted_offsets()
+
+    async def flush(self) -> None:
+        """Write modified objects, and wait for the underlying storage."""
+        self._write_dirty()
+        await self.storage.flush()
 
     # XXX This override is signature-incompatible with StoreT.on_rebalance /
     # Store.on_rebalance, which take (assigned, revoked, newly_assigned,
@@ -125,6 +187,7 @@ class ChangeloggedObjectManager(Store):
         # XXX Same defect on the forwarding side: `table` is passed as the
         # `assigned` argument of the underlying store and every later argument
         # is shifted by one.
+        self._write_dirty()
         await self.storage.on_rebalance(
             table,  # type: ignore[arg-type]
             assigned,
@@ -146,6 +209,8 @@ class ChangeloggedObjectManager(Store):
     def reset_state(self) -> None:
         """Reset table local state."""
         # delegate to underlying RocksDB store.
+        self._dirty.clear()
+        self._pending_offsets.clear()
         self.storage.reset_state()
 
     @property
@@ -163,8 +228,13 @@ class ChangeloggedObjectManager(Store):
         to_key: Callable[[Any], Any],
         to_value: Callable[[Any], Any],
     ) -> None:
-        """Apply batch of changelog events to local state."""
+        """Apply batch of changelog events to local state.
+
+        Events are grouped by key, so that every object is changed
+        and written to storage once per batch.
+        """
         tp_offsets: Dict[TP, int] = {}
+        key_events: Dict[Any, List[Tuple[int, Any]]] = {}
         for event in batch:
             tp, offset = event.message.tp, event.message.offset
             tp_offsets[tp] = (
@@ -177,11 +247,29 @@ class ChangeloggedObjectManager(Store):
             operation, key = event.key
             key = to_key(key)
             value: Any = to_value(event.value)
-            self[key].apply_changelog_event(operation, value)
+            key_events.setdefault(key, []).append((operation, value))
+
+        storage = self.storage
+        for key, events in key_events.items():
+            obj = self._recovered_object(key)
+            obj.apply_changelog_events(events)
+            storage[key] = obj.as_stored_value()
+            self._dirty.discard(key)
 
         for tp, offset in tp_offsets.items():
             self.set_persisted_offset(tp, offset)
 
+    def _recovered_object(self, key: Any) -> ChangeloggedObject:
+        # Changelog events are applied on top of what is already in
+        # storage, which is not loaded until recovery completes.
+        if key in self.data:
+            return self.data[key]
+        obj = self[key]
+        stored = self.storage.get(key)
+        if stored is not None:
+            obj.sync_from_storage(stored)
+        return obj
+
     async def backup_partition(
         self,
         tp: Union[TP, int],
@@ -10,13 +10,16 @@ from typing import (
     Iterable,
     Iterator,
     List,
+    Mapping,
     Optional,
+    Sequence,
     Set,
+    Tuple,
     Type,
     cast,
 )
 
-from mode import Service
+from mode import Seconds, Service
 from mode.utils.collections import ManagedUserSet
 from mode.utils.objects import cached_property
 from yarl import URL
@@ -36,6 +39,54 @@ OPERATION_ADD: int = 0x1
 OPERATION_DISCARD: int = 0x2
 OPERATION_UPDATE: int = 0xF
 
+#: Sets of at least this many integers are stored as runs
+#: of consecutive members (see :func:`pack_members`).
+PACK_THRESHOLD: int = 64
+
+#: Key identifying packed members in a stored value.
+PACKED_RUNS_KEY: str = "__int_runs__"
+
+
+def pack_members(members: Set) -> Any:
+    """Return compact stored representation of a set.
+
+    Large sets of integers are stored as ``{"__int_runs__": runs}``,
+    where ``runs`` is a flat list of ``(gap, length)`` pairs describing
+    the sorted members as runs of consecutive integers, each run starting
+    ``gap`` after the end of the previous one (the first from zero).
+    Dense ids compress to a few numbers, and sparse ids still serialize
+    to far fewer digits than the members themselves.
+
+    Other sets are returned as-is.
+    """
+    if len(members) < PACK_THRESHOLD or not all(type(m) is int for m in members):
+        return members
+    runs: List[int] = []
+    ordered = sorted(members)
+    previous_end = 0
+    start = end = ordered[0]
+    for member in ordered:
+        if member != end:
+            runs.extend((start - previous_end, end - start))
+            previous_end, start = end, member
+        end = member + 1
+    runs.extend((start - previous_end, end - start))
+    return {PACKED_RUNS_KEY: runs}
+
+
+def unpack_members(value: Any) -> Set:
+    """Return set from stored representation, see :func:`pack_members`."""
+    if isinstance(value, Mapping) and PACKED_RUNS_KEY in value:
+        members: Set[int] = set()
+        runs = value[PACKED_RUNS_KEY]
+        end = 0
+        for i in range(0, len(runs), 2):
+            start = end + runs[i]
+            end = start + runs[i + 1]
+            members.update(range(start, end))
+        return members
+    return set(value)
+
 
 class SetWindowSet(wrappers.WindowSet):
     """A windowed set."""
@@ -75,6 +126,20 @@ class ChangeloggedSet(ChangeloggedObject, ManagedUserSet[VT]):
     def __post_init__(self) -> None:
         self.data = set()
 
+    def apply_delta(
+        self,
+        added: Set[VT],
+        removed: Set[VT],
+        *,
+        event: Optional[EventT] = None,
+    ) -> None:
+        """Add and remove members, sending a single changelog event."""
+        self.data |= added
+        self.data -= removed
+        self.manager.send_changelog_event(
+            self.key, OPERATION_UPDATE, [added, removed], event=event
+        )
+
     def on_add(self, value: VT) -> None:
         self.manager.send_changelog_event(self.key, OPERATION_ADD, value)
 
@@ -90,10 +155,10 @@ class ChangeloggedSet(ChangeloggedObject, ManagedUserSet[VT]):
         )
 
     def sync_from_storage(self, value: Any) -> None:
-        self.data = set(value)
+        self.data = unpack_members(value)
 
     def as_stored_value(self) -> Any:
-        return self.data
+        return pack_members(self.data)
 
     def __iter__(self) -> Iterator[VT]:
         return iter(self.data)
@@ -115,6 +180,99 @@ class ChangeloggedSet(ChangeloggedObject, ManagedUserSet[VT]):
                 f"Unknown operation {operation}: key={self.key!r}"
             )
 
+    def apply_changelog_events(self, events: Iterable[Tuple[int, Any]]) -> None:
+        added: Set = set()
+        removed: Set = set()
+        for operation, value in events:
+            if operation == OPERATION_ADD:
+                removed.discard(value)
+                added.add(value)
+            elif operation == OPERATION_DISCARD:
+                added.discard(value)
+                removed.add(value)
+            elif operation == OPERATION_UPDATE:
+                members_added, members_removed = map(set, value)
+                removed -= members_added
+                added |= members_added
+                added -= members_removed
+                removed |= members_removed
+            else:
+                raise NotImplementedError(
+                    f"Unknown operation {operation}: key={self.key!r}"
+                )
+        self.data |= added
+        self.data -= removed
+
+
+class SetDelta(Generic[VT]):
+    """Net change to a :class:`ChangeloggedSet` from several operations.
+
+    Supports the operations of the set table manager without modifying
+    the set, so that they can be applied with :meth:`commit` as a single
+    changelog event.
+    """
+
+    target: ChangeloggedSet[VT]
+    added: Set[VT]
+    removed: Set[VT]
+
+    def __init__(self, target: ChangeloggedSet[VT]) -> None:
+        self.target = target
+        # invariant: added members are not in the set, removed ones are.
+        self.added = set()
+        self.removed = set()
+
+    def __contains__(self, member: Any) -> bool:
+        if member in self.added:
+            return True
+        return member not in self.removed and member in self.target.data
+
+    def __iter__(self) -> Iterator[VT]:
+        yield from self.added
+        removed = self.removed
+        for member in self.target.data:
+            if member not in removed:
+                yield member
+
+    def add(self, member: VT) -> None:
+        self.removed.discard(member)
+        if member not in self.target.data:
+            self.added.add(member)
+
+    def discard(self, member: VT) -> None:
+        self.added.discard(member)
+        if member in self.target.data:
+            self.removed.add(member)
+
+    def update(self, members: Iterable[VT]) -> None:
+        for member in members:
+            self.add(member)
+
+    def difference_update(self, members: Iterable[VT]) -> None:
+        for member in members:
+            self.discard(member)
+
+    def clear(self) -> None:
+        self.added.clear()
+        self.removed = set(self.target.data)
+
+    def intersection_update(self, members: Iterable[VT]) -> None:
+        keep = set(members)
+        self.difference_update([m for m in self if m not in keep])
+
+    def symmetric_difference_update(self, members: Iterable[VT]) -> None:
+        for member in set(members):
+            if member in self:
+                self.discard(member)
+            else:
+                self.add(member)
+
+    def commit(self, event: Optional[EventT] = None) -> None:
+        """Apply the change to the set, if there is any."""
+        if self.added or self.removed:
+            self.target.apply_delta(self.added, self.removed, event=event)
+            self.added, self.removed = set(), set()
+
 
 class ChangeloggedSetManager(ChangeloggedObjectManager):
     """Store that maintains a dictionary of sets."""
@@ -155,14 +313,25 @@ class SetTableManager(Service, Generic[KT, VT]):
 
     The manager methods can be used from HTTP views and other agents
     to safely route set operations to the correct worker.
+
+    Operations are processed in batches of up to :attr:`batch_size`
+    (waiting at most :attr:`batch_timeout` seconds for a batch to fill),
+    and the operations on a set in the same batch are sent to the
+    changelog as a single change.
     """
 
     app: AppT
     set_table: "SetTable[KT, VT]"
     enabled: bool
 
+    #: Max number of operations applied at once.
+    batch_size: int = 1000
+
+    #: Max time to wait for a batch of operations to fill.
+    batch_timeout: Seconds = 0.1
+
     agent: Optional[AgentT]
-    actions: Dict[SetAction, Callable[[KT, List[VT]], None]]
+    actions: Dict[SetAction, Callable[[SetDelta[VT], List[VT]], None]]
 
     def __init__(self, set_table: "SetTable[KT, VT]", **kwargs: Any) -> None:
         super().__init__(**kwargs)
@@ -209,20 +378,22 @@ class SetTableManager(Service, Generic[KT, VT]):
         """
         await self._send_operation(SetAction.SYMDIFF, key, members)
 
-    def _update(self, key: KT, members: List[VT]) -> None:
-        self.set_table[key].update(set(members))
+    def _update(self, delta: SetDelta[VT], members: List[VT]) -> None:
+        delta.update(members)
 
-    def _difference_update(self, key: KT, members: List[VT]) -> None:
-        self.set_table[key].difference_update(set(members))
+    def _difference_update(self, delta: SetDelta[VT], members: List[VT]) -> None:
+        delta.difference_update(members)
 
-    def _clear(self, key: KT, members: List[VT]) -> None:
-        self.set_table[key].clear()
+    def _clear(self, delta: SetDelta[VT], members: List[VT]) -> None:
+        delta.clear()
 
-    def _intersection_update(self, key: KT, members: List[VT]) -> None:
-        self.set_table[key].intersection_update(set(members))
+    def _intersection_update(self, delta: SetDelta[VT], members: List[VT]) -> None:
+        delta.intersection_update(members)
 
-    def _symmetric_difference_update(self, key: KT, members: List[VT]) -> None:
-        self.set_table[key].symmetric_difference_update(set(members))
+    def _symmetric_difference_update(
+        self, delta: SetDelta[VT], members: List[VT]
+    ) -> None:
+        delta.symmetric_difference_update(members)
 
     async def _send_operation(
         self, action: SetAction, key: KT, members: Iterable[VT]
@@ -243,17 +414,35 @@ class SetTableManager(Service, Generic[KT, VT]):
         )(self._modify_set)
 
     async def _modify_set(self, stream: StreamT[SetManagerOperation]) -> None:
+        async for events in stream.take_events(
+            self.batch_size, within=self.batch_timeout
+        ):
+            self._apply_batch(events)
+
+    def _apply_batch(self, events: Sequence[EventT]) -> None:
         actions = self.actions
         _maybe_model = maybe_model
-        async for set_key, set_operation in stream.items():
+        deltas: Dict[KT, SetDelta[VT]] = {}
+        # changes are sent to the changelog partition of the last
+        # event for the key (all events for a key share a partition).
+        sources: Dict[KT, EventT] = {}
+        for event in events:
+            set_key = cast(KT, event.key)
+            set_operation = cast(SetManagerOperation, event.value)
             try:
                 action = SetAction(set_operation.action)
             except ValueError:
                 self.log.exception("Unknown set operation: %r", set_operation.action)
             else:
+                delta = deltas.get(set_key)
+                if delta is None:
+                    delta = deltas[set_key] = SetDelta(self.set_table[set_key])
                 members = [_maybe_model(m) for m in set_operation.members]
                 handler = actions[action]
-                handler(set_key, members)
+                handler(delta, members)
+                sources[set_key] = event
+        for set_key, delta in deltas.items():
+            delta.commit(event=sources[set_key])
 
     @cached_property
     def topic(self) -> TopicT:
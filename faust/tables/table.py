@@ -1,6 +1,7 @@
 """Table (key/value changelog stream)."""
 
-from typing import Any, ClassVar, Optional, Type
+from collections import defaultdict
+from typing import Any, ClassVar, Dict, Iterable, List, Mapping, Optional, Type
 
 from mode import Seconds
 
@@ -64,6 +65,34 @@ class Table(TableT[KT, VT], Collection):
             return self.default()
         raise KeyError(key)
 
+    def get_many(self, keys: Iterable[KT]) -> Mapping[KT, VT]:
+        """Return the values of keys found in this table.
+
+        Unlike ``table[key]``, keys missing from the table are left out
+        instead of taking the default value.  Keys are read together,
+        partition by partition (using a single multi-get with the
+        RocksDB store), so they should all be stored by this worker.
+        """
+        keys = list(keys)
+        for key in keys:
+            self.on_key_get(key)
+        if self.is_global:
+            return self.data.get_many(keys)
+        found: Dict[KT, VT] = {}
+        for partition, partition_keys in self._keys_by_partition(keys).items():
+            found.update(self.data.get_many(partition_keys, partition=partition))
+        return found
+
+    def _keys_by_partition(self, keys: Iterable[KT]) -> Mapping[int, List[KT]]:
+        topic = self.changelog_topic
+        topic_name = topic.get_topic_name()
+        key_partition = self.app.producer.key_partition
+        partitions: Dict[int, List[KT]] = defaultdict(list)
+        for key in keys:
+            serialized = topic.prepare_key(key, None)[0]
+            partitions[key_partition(topic_name, serialized).partition].append(key)
+        return partitions
+
     def _has_key(self, key: KT) -> bool:
         return key in self
 
@@ -89,6 +118,8 @@ class Table(TableT[KT, VT], Collection):
         assert partition is not None
         self._maybe_set_key_ttl(key, partition)
         self._sensor_on_set(self, key, value)
+        if self._joins:
+            self._forget_joined(key)
 
     def on_key_del(self, key: KT) -> None:
         """Call when a key in this table is removed."""
@@ -99,6 +130,12 @@ class Table(TableT[KT, VT], Collection):
         assert partition is not None
         self._maybe_del_key_ttl(key, partition)
         self._sensor_on_del(self, key)
+        if self._joins:
+            self._forget_joined(key)
+
+    def _forget_joined(self, key: KT) -> None:
+        for join in self._joins:
+            join.forget(key)
 
     def on_clear(self) -> None:
         """Call when the table is cleared."""
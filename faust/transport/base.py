@@ -27,7 +27,12 @@ from faust.types.transports import (
 )
 
 from .conductor import Conductor
-from .consumer import Consumer, Fetcher, TransactionManager
+from .consumer import (
+    Consumer,
+    Fetcher,
+    TransactionManager,
+    WorkerTransactionManager,
+)
 from .producer import Producer
 
 __all__ = ["Conductor", "Consumer", "Fetcher", "Producer", "Transport"]
@@ -47,6 +52,11 @@ class Transport(TransportT):
     TransactionManager: ClassVar[Type[TransactionManagerT]]
     TransactionManager = TransactionManager
 
+    #: Transaction manager used when :setting:`transaction_per_worker`
+    #: is enabled.
+    WorkerTransactionManager: ClassVar[Type[TransactionManagerT]]
+    WorkerTransactionManager = WorkerTransactionManager
+
     Conductor: ClassVar[Type[ConductorT]]
     Conductor = Conductor
 
@@ -96,7 +106,12 @@ class Transport(TransportT):
         self, consumer: ConsumerT, producer: ProducerT, **kwargs: Any
     ) -> TransactionManagerT:
         """Create new transaction manager."""
-        return self.TransactionManager(
+        TransactionManager = (
+            self.WorkerTransactionManager
+            if self.app.conf.transaction_per_worker
+            else self.TransactionManager
+        )
+        return TransactionManager(
             self,
             consumer=consumer,
             producer=producer,
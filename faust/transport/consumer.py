@@ -49,13 +49,15 @@ import asyncio
 import gc
 import typing
 from asyncio import Event
-from collections import defaultdict
+from collections import defaultdict, deque
+from functools import partial
 from time import monotonic
 from typing import (
     Any,
     AsyncIterator,
     Awaitable,
     ClassVar,
+    Deque,
     Dict,
     Iterable,
     Iterator,
@@ -77,6 +79,7 @@ from intervaltree import IntervalTree
 from mode import Service, ServiceT, flight_recorder, get_logger
 from mode.threads import MethodQueue, QueueServiceThread
 from mode.utils.futures import notify
+from mode.utils.objects import cached_property
 from mode.utils.text import pluralize
 from mode.utils.times import Seconds
 
@@ -121,6 +124,25 @@ logger = get_logger(__name__)
 RecordMap = Mapping[TP, List[Any]]
 
 
+class PrefetchedBatch(NamedTuple):
+    """Batch of records fetched ahead of processing."""
+
+    records: RecordMap
+    active_partitions: Optional[Set[TP]]
+
+    #: Size of serialized keys and values in the batch.
+    size: int
+
+
+def records_size(records: RecordMap) -> int:
+    """Return the size of serialized keys and values in records."""
+    return sum(
+        max(record.serialized_key_size, 0) + max(record.serialized_value_size, 0)
+        for tp_records in records.values()
+        for record in tp_records
+    )
+
+
 class TopicPartitionGroup(NamedTuple):
     """Tuple of ``(topic, partition, group)``."""
 
@@ -390,6 +412,98 @@ class TransactionManager(Service, TransactionManagerT):
         return self.producer.supports_headers()
 
 
+class WorkerTransactionManager(TransactionManager):
+    """Manage a single producer transaction for the worker.
+
+    Used instead of :class:`TransactionManager` when the
+    :setting:`transaction_per_worker` setting is enabled: all messages
+    are sent by one transactional producer, in one transaction covering
+    every partition assigned to the worker, that is committed together
+    with the offsets of all partitions.
+    """
+
+    transactional_id_format = "{group_id}-{url.host}-{url.port}"
+
+    #: Set while the transaction of the worker is started.
+    _in_transaction: bool = False
+
+    @cached_property
+    def transactional_id(self) -> str:
+        """Transactional id of the worker's producer."""
+        return self.transactional_id_format.format(
+            group_id=self.app.conf.id,
+            url=self.app.conf.canonical_url,
+        )
+
+    async def on_partitions_revoked(self, revoked: Set[TP]) -> None:
+        """Call when the cluster is rebalancing and partitions are revoked.
+
+        The transaction includes messages for the revoked partitions,
+        so it is committed while the partitions are still assigned.
+        """
+        T = traced_from_parent_span()
+        await T(self.flush)()
+        if self._in_transaction:
+            committed = await T(self.consumer.commit)(start_new_transaction=False)
+            if not committed:
+                # No new offsets: commit the messages sent anyway.
+                await T(self.producer.commit_transaction)(self.transactional_id)
+            self._in_transaction = False
+
+    async def on_rebalance(
+        self, assigned: Set[TP], revoked: Set[TP], newly_assigned: Set[TP]
+    ) -> None:
+        """Call when the cluster is rebalancing."""
+        if not self._in_transaction and self._tps_to_active_tpgs(assigned):
+            T = traced_from_parent_span()
+            self.log.info(
+                "Starting transaction %r for %r assigned %s...",
+                self.transactional_id,
+                len(assigned),
+                pluralize(len(assigned), "partition"),
+            )
+            await T(self.producer.maybe_begin_transaction)(self.transactional_id)
+            self._in_transaction = True
+
+    async def send(
+        self,
+        topic: str,
+        key: Optional[bytes],
+        value: Optional[bytes],
+        partition: Optional[int],
+        timestamp: Optional[float],
+        headers: Optional[HeadersArg],
+        *,
+        transactional_id: Optional[str] = None,
+    ) -> Awaitable[RecordMetadata]:
+        """Schedule message to be sent by producer."""
+        return await self.producer.send(
+            topic,
+            key,
+            value,
+            self.consumer.key_partition(topic, key, partition),
+            timestamp,
+            headers,
+            transactional_id=self.transactional_id,
+        )
+
+    async def commit(
+        self, offsets: Mapping[TP, int], start_new_transaction: bool = True
+    ) -> bool:
+        """Commit offsets for partitions."""
+        if offsets:
+            try:
+                await self.producer.commit_transactions(
+                    {self.transactional_id: offsets},
+                    self.app.conf.id,
+                    start_new_transaction=start_new_transaction,
+                )
+            except ProducerFenced as pf:
+                logger.warning(f"ProducerFenced {pf}")
+                await self.app.crash(pf)
+        return True
+
+
 class Consumer(Service, ConsumerT):
     """Base Consumer."""
 
@@ -443,6 +557,28 @@ class Consumer(Service, ConsumerT):
     _paused_partitions: Set[TP]
     _buffered_partitions: Set[TP]
 
+    #: Batches of records fetched ahead of processing
+    #: (see :setting:`consumer_prefetch_batches`).
+    _prefetched: Deque[PrefetchedBatch]
+    _prefetched_bytes: int = 0
+    _prefetch_fut: Optional[asyncio.Future] = None
+
+    #: Held while fetching ahead, so that seeking waits for the records
+    #: being fetched before throwing them away.
+    _prefetch_lock: asyncio.Lock
+
+    #: Incremented every time batches fetched ahead are thrown away,
+    #: so that a fetch in progress knows its records are stale.
+    _prefetch_epoch: int = 0
+
+    #: Set when records fetched ahead were thrown away,
+    #: and the consumer did not seek since.
+    _prefetch_needs_seek: bool = False
+
+    #: Offset to seek to for partitions paused after their records
+    #: were fetched ahead.
+    _prefetch_rewind: Dict[TP, int]
+
     flow_active: bool = True
     can_resume_flow: Event
     suspend_flow: Event
@@ -469,7 +605,8 @@ class Consumer(Service, ConsumerT):
         self._on_partitions_revoked = on_partitions_revoked
         self._on_partitions_assigned = on_partitions_assigned
         self._commit_every = self.app.conf.broker_commit_every
-        self.scheduler = self.app.conf.ConsumerScheduler()  # type: ignore
+        scheduler_cls = self.app.conf.ConsumerScheduler
+        self.scheduler = scheduler_cls.for_consumer(self)  # type: ignore
         self.commit_interval = commit_interval or self.app.conf.broker_commit_interval
         self.commit_livelock_soft_timeout = (
             commit_livelock_soft_timeout
@@ -490,6 +627,11 @@ class Consumer(Service, ConsumerT):
         self.suspend_flow = Event()
         self.not_waiting_next_records = Event()
         self.not_waiting_next_records.set()
+        self._prefetch_batches = self.app.conf.consumer_prefetch_batches
+        self._prefetch_max_bytes = self.app.conf.consumer_prefetch_max_bytes
+        self._prefetched = deque()
+        self._prefetch_lock = asyncio.Lock()
+        self._prefetch_rewind = {}
         self._reset_state()
         super().__init__(loop=loop, **kwargs)
         # Every concrete transport provides ``create_transaction_manager``
@@ -523,6 +665,8 @@ class Consumer(Service, ConsumerT):
         self.not_waiting_next_records.set()
         self.flow_active = True
         self._time_start = monotonic()
+        self._discard_prefetched()
+        self._prefetch_rewind.clear()
 
     async def on_restart(self) -> None:
         """Call when the consumer is restarted."""
@@ -565,7 +709,12 @@ class Consumer(Service, ConsumerT):
     async def perform_seek(self) -> None:
         """Seek all partitions to their current committed position."""
         read_offset = self._read_offset
-        _committed_offsets = await self.seek_to_committed()
+        async with self._prefetch_lock:
+            # records fetched ahead are fetched again from the new position.
+            self._discard_prefetched()
+            self._prefetch_rewind.clear()
+            self._prefetch_needs_seek = False
+            _committed_offsets = await self.seek_to_committed()
         read_offset.update(
             {
                 tp: offset if offset is not None and offset >= 0 else None
@@ -587,10 +736,14 @@ class Consumer(Service, ConsumerT):
     async def seek(self, partition: TP, offset: int) -> None:
         """Seek partition to specific offset."""
         self.log.dev("SEEK %r -> %r", partition, offset)
-        # reset livelock detection
-        await self._seek(partition, offset)
+        tp = ensure_TP(partition)
+        async with self._prefetch_lock:
+            self._discard_prefetched_partitions({tp})
+            self._prefetch_rewind.pop(tp, None)
+            # reset livelock detection
+            await self._seek(partition, offset)
         # set new read offset so we will reread messages
-        self._read_offset[ensure_TP(partition)] = offset if offset else None
+        self._read_offset[tp] = offset if offset else None
 
     @abc.abstractmethod
     async def _seek(self, partition: TP, offset: int) -> None: ...
@@ -600,6 +753,7 @@ class Consumer(Service, ConsumerT):
         self.flow_active = False
         self.can_resume_flow.clear()
         self.suspend_flow.set()
+        self._discard_prefetched()
 
     def resume_flow(self) -> None:
         """Allow consumer to process messages."""
@@ -624,6 +778,7 @@ class Consumer(Service, ConsumerT):
         tpset = ensure_TPset(tps)
         self._get_active_partitions().difference_update(tpset)
         self._paused_partitions.update(tpset)
+        self._discard_prefetched_partitions(tpset, rewind=True)
 
     def resume_partitions(self, tps: Iterable[TP]) -> None:
         """Resume fetching from partitions."""
@@ -653,6 +808,9 @@ class Consumer(Service, ConsumerT):
             if self._active_partitions is not None:
                 self._active_partitions.difference_update(revoked)
             self._paused_partitions.difference_update(revoked)
+            self._discard_prefetched()
+            for tp in revoked:
+                self._prefetch_rewind.pop(tp, None)
             # Remove the revoked partitions from local data structures
             for tp in revoked:
                 self._gap.pop(tp, None)
@@ -673,6 +831,9 @@ class Consumer(Service, ConsumerT):
         with span:
             # remove recently revoked tps from set of paused tps.
             self._paused_partitions.intersection_update(assigned)
+            # assigned partitions start from their committed offsets.
+            self._discard_prefetched()
+            self._prefetch_rewind.clear()
             # cache set of assigned partitions
             self._set_active_tps(assigned)
             # start callback chain of assigned callbacks.
@@ -736,32 +897,38 @@ class Consumer(Service, ConsumerT):
         #
         # We solve this by going round-robin through each topic.
 
-        records, active_partitions = await self._wait_next_records(timeout)
+        records, active_partitions = await self._next_records(timeout)
         generation_id = self.app.consumer_generation_id
         if records is None or self.should_stop:
             return
 
-        records_it = self.scheduler.iterate(records)
+        # The scheduler delivers slices of records from the same partition
+        # (single records for the default strategy), so the partition
+        # only needs to be checked once per slice.
+        slices = self.scheduler.iterate_slices(records)
         to_message = self._to_message  # localize
+        app = self.app
         if self.flow_active:
-            for tp, record in records_it:
-                if not self.flow_active:
-                    break
-                new_generation_id = self.app.consumer_generation_id
-                if new_generation_id != generation_id:
-                    self.log.dev(
-                        "Generation id changed from %r to %r. Cancelling getmany.",
-                        generation_id,
-                        new_generation_id,
-                    )
-                    break
-                if (
+            self._on_records_fetched(records, active_partitions)
+            for tp, tp_records in slices:
+                if not (
                     active_partitions is None
                     or tp in active_partitions
                     or tp in self._buffered_partitions
                 ):
-                    highwater_mark = self.highwater(tp)
-                    self.app.monitor.track_tp_end_offset(tp, highwater_mark)
+                    continue
+                for record in tp_records:
+                    if not self.flow_active:
+                        return
+                    new_generation_id = app.consumer_generation_id
+                    if new_generation_id != generation_id:
+                        self.log.dev(
+                            "Generation id changed from %r to %r. "
+                            "Cancelling getmany.",
+                            generation_id,
+                            new_generation_id,
+                        )
+                        return
                     # convert timestamp to seconds from int milliseconds.
                     yield tp, to_message(tp, record)
         else:
@@ -773,6 +940,160 @@ class Consumer(Service, ConsumerT):
             except Exception as ex:
                 self.log.warning(f"exception performing seek when flow not active {ex}")
 
+    def _on_records_fetched(
+        self, records: RecordMap, active_partitions: Optional[Set[TP]]
+    ) -> None:
+        # Sensors are told about the batch once per topic partition,
+        # instead of for every message in it.
+        on_messages_in = self.app.sensors.on_messages_in
+        track_tp_end_offset = self.app.monitor.track_tp_end_offset
+        buffered_partitions = self._buffered_partitions
+        for tp, tp_records in records.items():
+            if tp_records and (
+                active_partitions is None
+                or tp in active_partitions
+                or tp in buffered_partitions
+            ):
+                track_tp_end_offset(tp, self.highwater(tp))
+                on_messages_in(
+                    tp,
+                    (tp_records[0].offset, tp_records[-1].offset),
+                    len(tp_records),
+                )
+
+    async def _next_records(
+        self, timeout: float
+    ) -> Tuple[Optional[RecordMap], Optional[Set[TP]]]:
+        if not self._prefetch_batches:
+            return await self._wait_next_records(timeout)
+        if self._prefetch_needs_seek:
+            # records fetched ahead were thrown away: fetch them again.
+            await self.perform_seek()
+        prefetched = self._prefetched
+        time_start = monotonic()
+        fut = self._prefetch_fut
+        if fut is not None and fut.done():
+            self._prefetch_fut = None
+            fut.result()  # raise error from fetching ahead
+            fut = None
+        if not prefetched:
+            if fut is None:
+                fut = self._start_prefetch(timeout)
+            await fut
+        wait_time = monotonic() - time_start
+        if not prefetched:
+            return {}, None
+        batch = prefetched.popleft()
+        self._prefetched_bytes -= batch.size
+        self._maybe_prefetch(timeout)
+        self.app.sensors.on_consumer_prefetch(self, len(prefetched), wait_time)
+        return batch.records, batch.active_partitions
+
+    def _maybe_prefetch(self, timeout: float) -> None:
+        fut = self._prefetch_fut
+        if (
+            (fut is None or (fut.done() and fut.exception() is None))
+            and len(self._prefetched) < self._prefetch_batches
+            and self._prefetched_bytes < self._prefetch_max_bytes
+            and not self.should_stop
+        ):
+            self._start_prefetch(timeout)
+
+    def _start_prefetch(self, timeout: float) -> asyncio.Future:
+        fut = self._prefetch_fut = asyncio.ensure_future(self._prefetch(timeout))
+        fut.add_done_callback(partial(self._on_prefetched, timeout))
+        return fut
+
+    def _on_prefetched(self, timeout: float, fut: asyncio.Future) -> None:
+        # keep fetching ahead until there are enough batches, errors are
+        # raised by the next call to getmany.
+        if (
+            fut is self._prefetch_fut
+            and not fut.cancelled()
+            and fut.exception() is None
+            and fut.result()
+        ):
+            self._maybe_prefetch(timeout)
+
+    async def _prefetch(self, timeout: float) -> bool:
+        # Fetch one batch ahead of processing, returns True if a batch was
+        # added.  Records are fetched while holding the lock, so that
+        # seeking waits for the fetch to complete before throwing away
+        # its records.  The lock is never held while waiting for the flow
+        # of messages to resume, as the consumer seeks before resuming it.
+        while not self.should_stop:
+            if not self.flow_active:
+                await self.wait(self.can_resume_flow)  # type: ignore[arg-type]
+                continue
+            async with self._prefetch_lock:
+                if not self.flow_active:
+                    continue
+                for tp, offset in list(self._prefetch_rewind.items()):
+                    del self._prefetch_rewind[tp]
+                    await self._seek(tp, offset)
+                epoch = self._prefetch_epoch
+                try:
+                    records, active_partitions = await self._fetch_next_records(timeout)
+                except asyncio.CancelledError:
+                    self._prefetch_needs_seek = True
+                    raise
+                if not records:
+                    return False
+                if epoch != self._prefetch_epoch:
+                    # flow stopped or partitions rebalanced while fetching.
+                    self._prefetch_needs_seek = True
+                    return False
+                paused = self._paused_partitions
+                if not paused.isdisjoint(records):
+                    records = self._without_partitions(records, paused, rewind=True)
+                size = records_size(records)
+                self._prefetched.append(
+                    PrefetchedBatch(records, active_partitions, size)
+                )
+                self._prefetched_bytes += size
+                return True
+        return False
+
+    def _cancel_prefetch(self) -> None:
+        fut, self._prefetch_fut = self._prefetch_fut, None
+        if fut is not None:
+            if not fut.done():
+                fut.cancel()
+            elif not fut.cancelled():
+                fut.exception()  # stopping: error no longer matters
+
+    def _discard_prefetched(self) -> None:
+        self._prefetch_epoch += 1
+        if self._prefetched:
+            self._prefetched.clear()
+            self._prefetched_bytes = 0
+            self._prefetch_needs_seek = True
+
+    def _discard_prefetched_partitions(
+        self, tps: Set[TP], *, rewind: bool = False
+    ) -> None:
+        prefetched = self._prefetched
+        for i, batch in enumerate(prefetched):
+            if not tps.isdisjoint(batch.records):
+                records = self._without_partitions(batch.records, tps, rewind=rewind)
+                size = records_size(records)
+                self._prefetched_bytes += size - batch.size
+                prefetched[i] = batch._replace(records=records, size=size)
+
+    def _without_partitions(
+        self, records: RecordMap, tps: Set[TP], *, rewind: bool = False
+    ) -> RecordMap:
+        if rewind:
+            # paused partitions are fetched again from the first record
+            # thrown away when they are resumed.
+            rewinds = self._prefetch_rewind
+            for tp in tps:
+                tp_records = records.get(tp)
+                if tp_records:
+                    offset = tp_records[0].offset
+                    rewinds[tp] = min(rewinds.get(tp, offset), offset)
+        return {tp: r for tp, r in records.items() if tp not in tps}
+
     async def _wait_next_records(
         self, timeout: float
     ) -> Tuple[Optional[RecordMap], Optional[Set[TP]]]:
@@ -781,7 +1102,11 @@ class Consumer(Service, ConsumerT):
             # Service.wait_first accepts anything with an awaitable
             # ``.wait()`` -- asyncio.Event included.
             await self.wait(self.can_resume_flow)  # type: ignore[arg-type]
+        return await self._fetch_next_records(timeout)
 
+    async def _fetch_next_records(
+        self, timeout: float
+    ) -> Tuple[RecordMap, Optional[Set[TP]]]:
         try:
             # Set signal that _wait_next_records is waiting on the fetcher service.
             self.not_waiting_next_records.set()
@@ -1064,6 +1389,7 @@ class Consumer(Service, ConsumerT):
         with flight_recorder(self.log, timeout=300.0) as on_timeout:
             did_commit = False
             on_timeout.info("+consumer.commit()")
+            await self.app.tables.flush()
             if self.in_transaction:
                 did_commit = await self.transactions.commit(
                     committable_offsets,
@@ -1247,6 +1573,7 @@ class Consumer(Service, ConsumerT):
             raise
         finally:
             unset_flag(flag_consumer_fetching)
+            self._cancel_prefetch()
 
     def close(self) -> None:
         """Close consumer for graceful shutdown."""
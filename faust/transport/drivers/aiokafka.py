@@ -79,6 +79,7 @@ from faust.transport.consumer import (
     ThreadDelegateConsumer,
     ensure_TPset,
 )
+from faust.transport.producer import ThreadedEventQueue
 from faust.types import (
     TP,
     AppT,
@@ -302,7 +303,11 @@ class Consumer(ThreadDelegateConsumer):
 
 class ThreadedProducer(ServiceThread):
     _producer: Optional[aiokafka.AIOKafkaProducer] = None
-    event_queue: Optional[asyncio.Queue] = None
+    event_queue: Optional[ThreadedEventQueue] = None
+
+    #: Max number of messages taken from :attr:`event_queue` at a time.
+    max_batch_messages: int = 1000
+
     #: The Faust producer this thread borrows its configuration from
     #: (not an :class:`aiokafka.AIOKafkaProducer`) -- always set by __init__.
     #: The ``= None`` class-level default is kept exactly as it was rather
@@ -354,12 +359,7 @@ class ThreadedProducer(ServiceThread):
         """Wait for producer to finish transmitting all buffered messages."""
         while True:
             try:
-                # ``event_queue`` is created in ``on_start``, and flushing is
-                # only reachable once the thread has started.  cast, not
-                # assert: an assert would turn the AttributeError this raises
-                # when unset into an AssertionError, and vanishes under
-                # ``python -O``.
-                msg = cast(asyncio.Queue, self.event_queue).get_nowait()
+                msg = self._event_queue().get_nowait()
             except QueueEmpty:
                 break
             else:
@@ -381,7 +381,7 @@ class ThreadedProducer(ServiceThread):
         )
 
     async def on_start(self) -> None:
-        self.event_queue = asyncio.Queue()
+        self.event_queue = ThreadedEventQueue(self.thread_loop)
         producer = self._producer = self._new_producer()
         await producer.start()
         self.stopped = False
@@ -402,23 +402,23 @@ class ThreadedProducer(ServiceThread):
                 await asyncio.sleep(0.1)
 
     async def push_events(self) -> None:
+        get_batch = self._event_queue().get_batch
+        publish_message = self.publish_message
+        on_buffer_processed = self.app.sensors.on_threaded_producer_buffer_processed
         while not self.stopped:
-            # ``event_queue`` is created by ``on_start`` before this task is
-            # scheduled.  cast, not assert: this runs per message, and an
-            # assert would both change the exception type and disappear
-            # under ``python -O``.
-            try:
-                event = await asyncio.wait_for(
-                    cast(asyncio.Queue, self.event_queue).get(), timeout=0.1
-                )
-            except asyncio.TimeoutError:
+            events = await get_batch(self.max_batch_messages, timeout=0.1)
+            if not events:
                 continue
-
-            self.app.sensors.on_threaded_producer_buffer_processed(
-                app=self.app,
-                size=cast(asyncio.Queue, self.event_queue).qsize(),
-            )
-            await self.publish_message(event)
+            on_buffer_processed(app=self.app, size=self._event_queue().qsize())
+            for event in events:
+                await publish_message(event)
+
+    def _event_queue(self) -> ThreadedEventQueue:
+        # ``event_queue`` is created by ``on_start`` before messages are
+        # pushed or flushed.  cast, not assert: an assert would turn the
+        # AttributeError this raises when unset into an AssertionError,
+        # and vanishes under ``python -O``.
+        return cast(ThreadedEventQueue, self.event_queue)
 
     async def publish_message(
         self, fut_other: FutureMessage, wait: bool = False
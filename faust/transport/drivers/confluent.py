@@ -39,6 +39,7 @@ from faust.transport.consumer import (
     ensure_TP,
     ensure_TPset,
 )
+from faust.transport.producer import ThreadedEventQueue
 from faust.types import (
     TP,
     AppT,
@@ -486,9 +487,12 @@ class ProducerThread(QueueServiceThread):
     transport: "Transport"
     _producer: Optional[_Producer] = None
     _flush_soon: Optional[asyncio.Future] = None
-    event_queue: Optional[asyncio.Queue] = None
+    event_queue: Optional[ThreadedEventQueue] = None
     _stopping: bool = False
 
+    #: Max number of messages taken from :attr:`event_queue` at a time.
+    max_batch_messages: int = 1000
+
     def __init__(self, producer: "Producer", **kwargs: Any) -> None:
         self.producer = producer
         self.transport = cast(Transport, self.producer.transport)
@@ -496,7 +500,7 @@ class ProducerThread(QueueServiceThread):
         super().__init__(**kwargs)
 
     async def on_start(self) -> None:
-        self.event_queue = asyncio.Queue()
+        self.event_queue = ThreadedEventQueue(self.thread_loop)
         self._stopping = False
         self._producer = confluent_kafka.Producer(
             {
@@ -526,13 +530,10 @@ class ProducerThread(QueueServiceThread):
 
     @Service.task
     async def _push_events(self) -> None:
-        queue = cast(asyncio.Queue, self.event_queue)
+        queue = cast(ThreadedEventQueue, self.event_queue)
         while not self._stopping or not queue.empty():
-            try:
-                fut = await asyncio.wait_for(queue.get(), timeout=0.1)
-            except asyncio.TimeoutError:
-                continue
-            await self._publish_buffered(fut)
+            for fut in await queue.get_batch(self.max_batch_messages, timeout=0.1):
+                await self._publish_buffered(fut)
 
     def _ensure_producer(self) -> _Producer:
         if self._producer is None:
@@ -0,0 +1,960 @@
+"""Message transport using an in-process memory broker.
+
+Every app in the process that uses the same broker URL shares one
+:class:`Broker`: ``memory://`` and ``memory://localhost`` name the
+default broker, ``memory://other`` a separate one, so several workers
+(apps) can form a consumer group in a single process.
+
+The broker keeps a partitioned log for every topic, with offsets,
+committed offsets per consumer group, log compaction for compacting
+topics (changelogs), and transactions.  Consumer group membership
+is coordinated by the broker, and partitions are assigned by the
+app's real :class:`~faust.assignor.PartitionAssignor`, so table
+standbys, recovery and rebalancing behave like they do with Kafka.
+
+Nothing leaves the process, which makes this transport useful for
+tests and for benchmarking Faust without Kafka
+(see :file:`extra/tools/e2e_benchmark.py`).
+
+Notes:
+    - The broker is not thread-safe: use it from one event loop,
+      and do not enable the :setting:`producer_threaded` setting.
+    - Records sent in a transaction are appended to the log when
+      the transaction commits, so consumers never see records from
+      pending or aborted transactions.
+"""
+
+import asyncio
+from bisect import bisect_left
+from itertools import count
+from time import time
+from typing import (
+    Any,
+    Awaitable,
+    ClassVar,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    cast,
+)
+
+from aiokafka.coordinator.protocol import (
+    ConsumerProtocolMemberAssignment,
+    ConsumerProtocolMemberMetadata,
+)
+from aiokafka.partitioner import DefaultPartitioner
+from mode import get_logger
+from mode.utils.times import Seconds
+from yarl import URL
+
+import faust
+from faust.assignor import PartitionAssignor
+from faust.exceptions import ProducerSendError
+from faust.transport import base
+from faust.transport.consumer import RecordMap
+from faust.types import TP, ConsumerMessage, HeadersArg, RecordMetadata
+from faust.types.transports import ConsumerT, ProducerT
+
+__all__ = [
+    "Broker",
+    "Consumer",
+    "Producer",
+    "Transport",
+    "brokers",
+    "get_broker",
+]
+
+logger = get_logger(__name__)
+
+#: Kafka timestamp type of timestamps set by the producer.
+TIMESTAMP_CREATE_TIME = 0
+
+#: Compaction of a partition starts once this many records
+#: were appended since it was last compacted...
+COMPACT_MIN_RECORDS = 1000
+#: ...and they make up at least this fraction of the partition.
+COMPACT_MIN_DIRTY_RATIO = 0.5
+
+
+class Record(NamedTuple):
+    """Record stored in a partition log."""
+
+    topic: str
+    partition: int
+    offset: int
+    timestamp: float
+    key: Optional[bytes]
+    value: Optional[bytes]
+    headers: List[Tuple[str, bytes]]
+
+
+class PartitionLog:
+    """Log of records in a topic partition.
+
+    Offsets of records are increasing, but not necessarily
+    contiguous, as compaction removes records from the log.
+    """
+
+    topic: str
+    partition: int
+    records: List[Record]
+    offsets: List[int]
+
+    #: Offset the next record appended will be given (the highwater).
+    end: int = 0
+
+    #: Records appended since the log was last compacted.
+    dirty: int = 0
+
+    def __init__(self, topic: str, partition: int) -> None:
+        self.topic = topic
+        self.partition = partition
+        self.records = []
+        self.offsets = []
+
+    @property
+    def start(self) -> int:
+        """Return offset of the first record available in the log."""
+        return self.offsets[0] if self.offsets else self.end
+
+    def append(
+        self,
+        key: Optional[bytes],
+        value: Optional[bytes],
+        timestamp: float,
+        headers: List[Tuple[str, bytes]],
+    ) -> Record:
+        record = Record(
+            self.topic, self.partition, self.end, timestamp, key, value, headers
+        )
+        self.records.append(record)
+        self.offsets.append(self.end)
+        self.end += 1
+        self.dirty += 1
+        return record
+
+    def read(self, offset: int, max_records: Optional[int] = None) -> List[Record]:
+        """Return records starting at offset (or the next one after it)."""
+        index = bisect_left(self.offsets, offset)
+        if max_records is None:
+            return self.records[index:]
+        return self.records[index : index + max_records]
+
+    def needs_compaction(self) -> bool:
+        dirty = self.dirty
+        return (
+            dirty >= COMPACT_MIN_RECORDS
+            and dirty >= len(self.records) * COMPACT_MIN_DIRTY_RATIO
+        )
+
+    def compact(self) -> int:
+        """Keep only the latest record for every key.
+
+        Returns:
+            int: the number of records removed.
+        """
+        latest: Dict[Optional[bytes], int] = {}
+        for index, record in enumerate(self.records):
+            latest[record.key] = index
+        if None in latest:
+            # records without a key cannot be compacted away.
+            keep = sorted(
+                {*latest.values()}
+                | {i for i, r in enumerate(self.records) if r.key is None}
+            )
+        else:
+            keep = sorted(latest.values())
+        removed = len(self.records) - len(keep)
+        self.records = [self.records[i] for i in keep]
+        self.offsets = [record.offset for record in self.records]
+        self.dirty = 0
+        return removed
+
+
+class TopicLog:
+    """Topic with its partitions."""
+
+    name: str
+    partitions: List[PartitionLog]
+    compacting: bool
+    config: Mapping[str, Any]
+
+    def __init__(
+        self,
+        name: str,
+        partitions: int,
+        *,
+        compacting: bool = False,
+        config: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.partitions = [PartitionLog(name, p) for p in range(partitions)]
+        self.compacting = compacting
+        self.config = config or {}
+
+
+class _ClusterView:
+    # The subset of aiokafka's ClusterMetadata used by PartitionAssignor.
+
+    def __init__(self, broker: "Broker") -> None:
+        self.broker = broker
+
+    def partitions_for_topic(self, topic: str) -> Optional[Set[int]]:
+        partitions = self.broker.topic_partitions(topic)
+        return set(range(partitions)) if partitions else None
+
+
+class Group:
+    """Consumer group.
+
+    A group of consumers with the same :setting:`id` shares
+    committed offsets, and has the partitions of the topics they are
+    subscribed to divided among them by the partition assignor of the
+    first member (the leader).
+
+    Consumers of client-only apps are given a group of their own,
+    that assigns every partition to them without consulting
+    the partition assignor.
+    """
+
+    broker: "Broker"
+    group_id: Optional[str]
+    members: MutableMapping[str, "Consumer"]
+    committed: MutableMapping[TP, int]
+    generation: int = 0
+
+    _rebalance_pending: bool = False
+    _rebalancing: Optional[asyncio.Future] = None
+
+    def __init__(self, broker: "Broker", group_id: Optional[str]) -> None:
+        self.broker = broker
+        self.group_id = group_id
+        self.members = {}
+        self.committed = {}
+
+    def join(self, member: "Consumer") -> None:
+        self.members[member.member_id] = member
+        self.request_rebalance()
+
+    def leave(self, member: "Consumer") -> None:
+        if self.members.pop(member.member_id, None) is not None:
+            if self.members:
+                self.request_rebalance()
+            elif self._rebalancing is not None:
+                self._rebalancing.cancel()
+                self._rebalancing = None
+
+    def commit(self, offsets: Mapping[TP, int]) -> None:
+        self.committed.update(offsets)
+
+    def request_rebalance(self) -> None:
+        """Schedule rebalance of the group.
+
+        Rebalances requested while one is in progress are coalesced
+        into a single rebalance that starts when it completes.
+        """
+        self._rebalance_pending = True
+        if self._rebalancing is None or self._rebalancing.done():
+            self._rebalancing = asyncio.ensure_future(self._rebalance())
+
+    async def wait_stable(self) -> None:
+        """Wait for rebalance in progress to complete."""
+        rebalancing = self._rebalancing
+        if rebalancing is not None and not rebalancing.done():
+            await asyncio.shield(rebalancing)
+
+    async def _rebalance(self) -> None:
+        # let members joining at the same time join the same generation.
+        await asyncio.sleep(0)
+        while self._rebalance_pending and self.members:
+            self._rebalance_pending = False
+            members = list(self.members.values())
+            for member in members:
+                await member._revoke()
+            self.generation += 1
+            assignments = self._assign(members)
+            for member in members:
+                if member.member_id in self.members:
+                    await member._assign(assignments[member.member_id], self.generation)
+
+    def _assign(
+        self, members: List["Consumer"]
+    ) -> Mapping[str, ConsumerProtocolMemberAssignment]:
+        if self.group_id is None:
+            return {
+                member.member_id: self._assign_all(member.subscription())
+                for member in members
+            }
+        leader = members[0]
+        metadata: MutableMapping[str, ConsumerProtocolMemberMetadata] = {
+            member.member_id: _assignor(member).metadata(member.subscription())
+            for member in members
+        }
+        assignments = _assignor(leader).assign(_ClusterView(self.broker), metadata)
+        # Members get the assignment in wire format, like from Kafka.
+        return {
+            member_id: ConsumerProtocolMemberAssignment.decode(assignment.encode())
+            for member_id, assignment in assignments.items()
+        }
+
+    def _assign_all(self, topics: Iterable[str]) -> ConsumerProtocolMemberAssignment:
+        return ConsumerProtocolMemberAssignment(
+            0,
+            sorted(
+                (topic, list(range(self.broker.topic_partitions(topic) or 0)))
+                for topic in topics
+            ),
+            b"",
+        )
+
+
+def _assignor(member: "Consumer") -> PartitionAssignor:
+    return cast(PartitionAssignor, member.app.assignor)
+
+
+class Broker:
+    """In-process broker.
+
+    See :func:`get_broker` for the broker used by an app.
+    """
+
+    name: str
+    topics: MutableMapping[str, TopicLog]
+    groups: MutableMapping[str, Group]
+
+    #: Used to choose partition when no partition is specified.
+    partitioner: Any
+
+    #: Default number of partitions of topics created on first use.
+    default_partitions: int = 1
+
+    _consumers: Set["Consumer"]
+
+    def __init__(self, name: str = "localhost") -> None:
+        self.name = name
+        self.topics = {}
+        self.groups = {}
+        self.partitioner = DefaultPartitioner()
+        self._consumers = set()
+
+    def create_topic(
+        self,
+        topic: str,
+        partitions: int,
+        *,
+        compacting: Optional[bool] = None,
+        config: Optional[Mapping[str, Any]] = None,
+    ) -> TopicLog:
+        """Create topic, or return the existing topic by that name."""
+        log = self.topics.get(topic)
+        if log is None:
+            log = self.topics[topic] = TopicLog(
+                topic,
+                partitions or self.default_partitions,
+                compacting=bool(compacting),
+                config=config,
+            )
+        return log
+
+    def topic(self, topic: str, partitions: Optional[int] = None) -> TopicLog:
+        """Return topic by name, creating it if it does not exist.
+
+        Like Kafka with ``auto.create.topics.enable``, topics are
+        created on first use, with ``partitions`` partitions,
+        or :attr:`default_partitions` if not set.
+        """
+        log = self.topics.get(topic)
+        if log is None:
+            log = self.create_topic(topic, partitions or self.default_partitions)
+        return log
+
+    def topic_partitions(self, topic: str) -> Optional[int]:
+        log = self.topics.get(topic)
+        return len(log.partitions) if log is not None else None
+
+    def partition_log(self, tp: TP) -> PartitionLog:
+        return self.topic(tp.topic).partitions[tp.partition]
+
+    def key_partition(
+        self, topic: str, key: Optional[bytes], partitioner: Any = None
+    ) -> int:
+        partitions = list(range(len(self.topic(topic).partitions)))
+        return cast(int, (partitioner or self.partitioner)(key, partitions, partitions))
+
+    def append(
+        self,
+        topic: str,
+        key: Optional[bytes],
+        value: Optional[bytes],
+        partition: Optional[int] = None,
+        timestamp: Optional[float] = None,
+        headers: Optional[List[Tuple[str, bytes]]] = None,
+        *,
+        partitions: Optional[int] = None,
+        partitioner: Any = None,
+    ) -> Record:
+        """Append record to topic partition.
+
+        The partition is chosen by ``partitioner`` (or the default
+        partitioner) if not set, and ``partitions`` is the number of
+        partitions to give the topic if it does not exist.
+        """
+        log = self.topic(topic, partitions)
+        if partition is None:
+            partition = self.key_partition(topic, key, partitioner)
+        elif not 0 <= partition < len(log.partitions):
+            raise ProducerSendError(f"Topic {topic!r} has no partition {partition!r}")
+        plog = log.partitions[partition]
+        record = plog.append(
+            key,
+            value,
+            timestamp if timestamp is not None else time(),
+            headers or [],
+        )
+        if log.compacting and plog.needs_compaction():
+            plog.compact()
+        for consumer in self._consumers:
+            consumer._on_records_appended(record)
+        return record
+
+    def compact(self, topic: Optional[str] = None) -> int:
+        """Compact compacting topics (or topic by name) now.
+
+        Returns:
+            int: the number of records removed.
+        """
+        logs = [self.topics[topic]] if topic is not None else self.topics.values()
+        return sum(
+            plog.compact() for log in logs if log.compacting for plog in log.partitions
+        )
+
+    def group(self, group_id: str) -> Group:
+        group = self.groups.get(group_id)
+        if group is None:
+            group = self.groups[group_id] = Group(self, group_id)
+        return group
+
+    def add_consumer(self, consumer: "Consumer") -> None:
+        self._consumers.add(consumer)
+
+    def remove_consumer(self, consumer: "Consumer") -> None:
+        self._consumers.discard(consumer)
+
+
+#: Brokers by name.
+brokers: MutableMapping[str, Broker] = {}
+
+
+def get_broker(url: URL) -> Broker:
+    """Return the broker for a ``memory://`` URL."""
+    name = url.host or "localhost"
+    broker = brokers.get(name)
+    if broker is None:
+        broker = brokers[name] = Broker(name)
+    return broker
+
+
+_member_ids = count(1)
+
+
+class Consumer(base.Consumer):
+    """Consumer reading from the in-process broker."""
+
+    logger = logger
+
+    #: Id of this consumer in its consumer group.
+    member_id: str
+
+    _broker: Broker
+    _group: Optional[Group] = None
+    _subscription: Set[str]
+    _assignment: Set[TP]
+    _positions: MutableMapping[TP, int]
+    _records_appended: asyncio.Event
+    _fetch_rotation: int = 0
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._broker = cast(Transport, self.transport).broker
+        self.member_id = f"{self.app.conf.broker_client_id}-{next(_member_ids)}"
+        self._subscription = set()
+        self._assignment = set()
+        self._positions = {}
+        self._records_appended = asyncio.Event()
+
+    async def on_stop(self) -> None:
+        """Call when consumer is stopping."""
+        await super().on_stop()
+        self.close()
+
+    def close(self) -> None:
+        """Leave the consumer group."""
+        if self._group is not None:
+            self._group.leave(self)
+            self._group = None
+        self._broker.remove_consumer(self)
+
+    def subscription(self) -> Set[str]:
+        """Return the set of topics subscribed to."""
+        return self._subscription
+
+    async def subscribe(self, topics: Iterable[str]) -> None:
+        """Reset subscription (requires rebalance)."""
+        self._subscription = set(topics)
+        for topic in self._subscription:
+            self._broker.topic(topic, self.app.conf.topic_partitions)
+        if self._group is None:
+            if self.app.client_only:
+                self._group = Group(self._broker, None)
+            else:
+                self._group = self._broker.group(self.app.conf.id)
+        self._broker.add_consumer(self)
+        self._group.join(self)
+
+    async def _revoke(self) -> None:
+        # called by the group when it starts rebalancing.
+        if self.should_stop:
+            return
+        self.app.on_rebalance_start()
+        revoked, self._assignment = self._assignment, set()
+        for tp in revoked:
+            self._positions.pop(tp, None)
+        try:
+            await self.on_partitions_revoked(revoked)
+        except Exception as exc:
+            await self.crash(exc)
+
+    async def _assign(
+        self, assignment: ConsumerProtocolMemberAssignment, generation: int
+    ) -> None:
+        # called by the group with the new assignment of this member.
+        if self.should_stop:
+            return
+        group = self._group
+        if group is not None and group.group_id is not None:
+            _assignor(self).on_assignment(assignment)
+        assigned = {
+            TP(topic, partition)
+            for topic, partitions in assignment.assignment
+            for partition in partitions
+        }
+        self._assignment = assigned
+        self.app.consumer_generation_id = generation
+        try:
+            await self.on_partitions_assigned(assigned, generation)
+        except Exception as exc:
+            await self.crash(exc)
+
+    def _on_records_appended(self, record: Record) -> None:
+        # called by the broker for every record appended to the log.
+        if (record.topic, record.partition) in self._assignment:
+            self._records_appended.set()
+
+    async def _getmany(
+        self, active_partitions: Optional[Set[TP]], timeout: float
+    ) -> RecordMap:
+        if self._group is not None:
+            await self._group.wait_stable()
+        # cleared before fetching so no append is missed while we wait.
+        self._records_appended.clear()
+        records = self._fetch(active_partitions)
+        if not records and timeout:
+            try:
+                await asyncio.wait_for(self._records_appended.wait(), timeout)
+            except asyncio.TimeoutError:
+                return {}
+            records = self._fetch(active_partitions)
+        return records
+
+    def _fetch(self, active_partitions: Optional[Set[TP]]) -> RecordMap:
+        assignment = self._assignment
+        if active_partitions is None:
+            tps = list(assignment)
+        else:
+            tps = [tp for tp in active_partitions if tp in assignment]
+        if not tps:
+            return {}
+        # start with a different partition every time, so that
+        # max_poll_records does not starve the partitions last in line.
+        self._fetch_rotation = rotation = (self._fetch_rotation + 1) % len(tps)
+        tps = tps[rotation:] + tps[:rotation]
+        budget = self.app.conf.broker_max_poll_records
+        positions = self._positions
+        records: Dict[TP, List[Record]] = {}
+        for tp in tps:
+            position = positions.get(tp)
+            if position is None:
+                position = positions[tp] = self._reset_position(tp)
+            batch = self._broker.partition_log(tp).read(position, budget)
+            if batch:
+                records[tp] = batch
+                positions[tp] = batch[-1].offset + 1
+                if budget is not None:
+                    budget -= len(batch)
+                    if budget <= 0:
+                        break
+        return records
+
+    def _committed(self, tp: TP) -> Optional[int]:
+        group = self._group
+        return group.committed.get(tp) if group is not None else None
+
+    def _reset_position(self, tp: TP) -> int:
+        committed = self._committed(tp)
+        if committed is not None:
+            return committed
+        log = self._broker.partition_log(tp)
+        if self.app.conf.consumer_auto_offset_reset == "latest":
+            return log.end
+        return log.start
+
+    def _to_message(self, tp: TP, record: Any) -> ConsumerMessage:
+        key, value = record.key, record.value
+        return ConsumerMessage(
+            record.topic,
+            record.partition,
+            record.offset,
+            record.timestamp,
+            TIMESTAMP_CREATE_TIME,
+            record.headers,
+            key,
+            value,
+            None,
+            len(key) if key is not None else 0,
+            len(value) if value is not None else 0,
+            tp,
+            generation_id=self.app.consumer_generation_id,
+        )
+
+    def _new_topicpartition(self, topic: str, partition: int) -> TP:
+        return TP(topic, partition)
+
+    async def _commit(self, offsets: Mapping[TP, int]) -> bool:
+        if self._group is None:
+            return False
+        self._group.commit(offsets)
+        return True
+
+    async def seek_to_committed(self) -> Mapping[TP, int]:
+        """Seek all partitions to the committed offset."""
+        committed: Dict[TP, int] = {}
+        for tp in self._assignment:
+            offset = self._committed(tp)
+            if offset is not None:
+                committed[tp] = offset
+            self._positions[tp] = self._reset_position(tp)
+        return committed
+
+    async def position(self, tp: TP) -> Optional[int]:
+        """Return the current position for partition."""
+        if tp not in self._assignment:
+            return None
+        position = self._positions.get(tp)
+        if position is None:
+            position = self._positions[tp] = self._reset_position(tp)
+        return position
+
+    async def seek_wait(self, partitions: Mapping[TP, int]) -> None:
+        """Seek partitions to specific offsets."""
+        for tp, offset in partitions.items():
+            self.log.dev("SEEK %r -> %r", tp, offset)
+            self._positions[tp] = offset
+            if offset > 0:
+                self._read_offset[tp] = offset
+            else:
+                self._read_offset.pop(tp, None)
+
+    async def _seek(self, partition: TP, offset: int) -> None:
+        self._positions[partition] = offset
+
+    def assignment(self) -> Set[TP]:
+        """Return the current assignment."""
+        return set(self._assignment)
+
+    def highwater(self, tp: TP) -> int:
+        """Return the last available offset for specific partition."""
+        return self._broker.partition_log(tp).end
+
+    def topic_partitions(self, topic: str) -> Optional[int]:
+        """Return the number of partitions configured for topic by name."""
+        return self._broker.topic_partitions(topic)
+
+    async def earliest_offsets(self, *partitions: TP) -> Mapping[TP, int]:
+        """Return the earliest offsets for a list of partitions."""
+        return {tp: self._broker.partition_log(tp).start for tp in partitions}
+
+    async def highwaters(self, *partitions: TP) -> Mapping[TP, int]:
+        """Return the last offset for a list of partitions."""
+        return {tp: self._broker.partition_log(tp).end for tp in partitions}
+
+    async def create_topic(
+        self,
+        topic: str,
+        partitions: int,
+        replication: int,
+        *,
+        config: Optional[Mapping[str, Any]] = None,
+        timeout: Seconds = 30.0,
+        retention: Optional[Seconds] = None,
+        compacting: Optional[bool] = None,
+        deleting: Optional[bool] = None,
+        ensure_created: bool = False,
+    ) -> None:
+        """Create/declare topic on server."""
+        if self.app.conf.topic_allow_declare:
+            self._broker.create_topic(
+                topic, partitions, compacting=compacting, config=config
+            )
+        else:
+            logger.warning(f"Topic creation disabled! Can't create topic {topic}")
+
+    def key_partition(
+        self, topic: str, key: Optional[bytes], partition: Optional[int] = None
+    ) -> Optional[int]:
+        """Hash key to determine partition destination."""
+        if self._broker.topic_partitions(topic) is None:
+            return None
+        if partition is not None:
+            return partition
+        return self._broker.key_partition(topic, key)
+
+
+#: Message sent in a transaction, waiting for the transaction to commit.
+_PendingSend = Tuple[
+    asyncio.Future,
+    str,
+    Optional[bytes],
+    Optional[bytes],
+    Optional[int],
+    Optional[float],
+    Optional[List[Tuple[str, bytes]]],
+]
+
+
+class Producer(base.Producer):
+    """Producer appending to the in-process broker."""
+
+    logger = logger
+
+    _broker: Broker
+    _transactions: MutableMapping[str, List[_PendingSend]]
+
+    def __post_init__(self) -> None:
+        self._broker = cast(Transport, self.transport).broker
+        self._send_on_produce_message = self.app.on_produce_message.send
+        self._transactions = {}
+
+    async def on_stop(self) -> None:
+        """Call when producer stops."""
+        await super().on_stop()
+        for transactional_id in list(self._transactions):
+            self._abort(transactional_id)
+
+    async def send(
+        self,
+        topic: str,
+        key: Optional[bytes],
+        value: Optional[bytes],
+        partition: Optional[int],
+        timestamp: Optional[float],
+        headers: Optional[HeadersArg],
+        *,
+        transactional_id: Optional[str] = None,
+    ) -> Awaitable[RecordMetadata]:
+        """Schedule message to be transmitted by producer."""
+        if headers is not None and isinstance(headers, Mapping):
+            headers = list(headers.items())
+        self._send_on_produce_message(
+            key=key,
+            value=value,
+            partition=partition,
+            timestamp=timestamp,
+            headers=headers,
+        )
+        fut = self.loop.create_future()
+        if transactional_id:
+            transaction = self._transactions.get(transactional_id)
+            if transaction is None:
+                raise ProducerSendError(
+                    f"No transaction producer found for : {transactional_id}"
+                )
+            transaction.append(
+                (fut, topic, key, value, partition, timestamp, cast(Any, headers))
+            )
+        else:
+            fut.set_result(
+                self._append(topic, key, value, partition, timestamp, headers)
+            )
+        return fut
+
+    def _append(
+        self,
+        topic: str,
+        key: Optional[bytes],
+        value: Optional[bytes],
+        partition: Optional[int],
+        timestamp: Optional[float],
+        headers: Any,
+    ) -> RecordMetadata:
+        record = self._broker.append(
+            topic,
+            key,
+            value,
+            partition,
+            timestamp,
+            headers,
+            partitions=self.app.conf.topic_partitions,
+            partitioner=self.partitioner,
+        )
+        return RecordMetadata(
+            topic=topic,
+            partition=record.partition,
+            topic_partition=TP(topic, record.partition),
+            offset=record.offset,
+            timestamp=record.timestamp,
+            timestamp_type=TIMESTAMP_CREATE_TIME,
+        )
+
+    async def send_and_wait(
+        self,
+        topic: str,
+        key: Optional[bytes],
+        value: Optional[bytes],
+        partition: Optional[int],
+        timestamp: Optional[float],
+        headers: Optional[HeadersArg],
+        *,
+        transactional_id: Optional[str] = None,
+    ) -> RecordMetadata:
+        """Send message and wait for it to be transmitted."""
+        fut = await self.send(
+            topic,
+            key=key,
+            value=value,
+            partition=partition,
+            timestamp=timestamp,
+            headers=headers,
+            transactional_id=transactional_id,
+        )
+        return await fut
+
+    async def flush(self) -> None:
+        """Wait for producer to finish transmitting all buffered messages."""
+        await self.buffer.flush()
+
+    async def create_topic(
+        self,
+        topic: str,
+        partitions: int,
+        replication: int,
+        *,
+        config: Optional[Mapping[str, Any]] = None,
+        timeout: Seconds = 20000.0,
+        retention: Optional[Seconds] = None,
+        compacting: Optional[bool] = None,
+        deleting: Optional[bool] = None,
+        ensure_created: bool = False,
+    ) -> None:
+        """Create/declare topic on server."""
+        self._broker.create_topic(
+            topic, partitions, compacting=compacting, config=config
+        )
+
+    def key_partition(self, topic: str, key: bytes) -> TP:
+        """Hash key to determine partition destination."""
+        return TP(topic, self._broker.key_partition(topic, key, self.partitioner))
+
+    async def begin_transaction(self, transactional_id: str) -> None:
+        """Begin transaction by id."""
+        if transactional_id in self._transactions:
+            logger.warning(f"Transaction {transactional_id} already started")
+        else:
+            self._transactions[transactional_id] = []
+
+    async def commit_transaction(self, transactional_id: str) -> None:
+        """Commit transaction by id."""
+        pending = self._transactions.pop(transactional_id, None)
+        if pending is None:
+            logger.warning(f"Commit invoked for unknown transaction {transactional_id}")
+        else:
+            self._commit(pending)
+
+    async def abort_transaction(self, transactional_id: str) -> None:
+        """Abort and rollback transaction by id."""
+        if transactional_id not in self._transactions:
+            logger.warning(f"Abort invoked for unknown transaction {transactional_id}")
+        self._abort(transactional_id)
+
+    async def stop_transaction(self, transactional_id: str) -> None:
+        """Stop transaction by id."""
+        self._abort(transactional_id)
+
+    async def maybe_begin_transaction(self, transactional_id: str) -> None:
+        """Begin transaction (if one does not already exist)."""
+        self._transactions.setdefault(transactional_id, [])
+
+    async def commit_transactions(
+        self,
+        tid_to_offset_map: Mapping[str, Mapping[TP, int]],
+        group_id: str,
+        start_new_transaction: bool = True,
+    ) -> None:
+        """Commit transactions."""
+        for transactional_id, offsets in tid_to_offset_map.items():
+            pending = self._transactions.pop(transactional_id, None)
+            if pending is None:
+                logger.warning(
+                    f"Commit invoked for unknown transaction {transactional_id}"
+                )
+                continue
+            # offsets and messages are committed together.
+            self._broker.group(group_id).commit(offsets)
+            self._commit(pending)
+            if start_new_transaction:
+                self._transactions[transactional_id] = []
+
+    def _commit(self, pending: List[_PendingSend]) -> None:
+        for fut, topic, key, value, partition, timestamp, headers in pending:
+            try:
+                metadata = self._append(
+                    topic, key, value, partition, timestamp, headers
+                )
+            except ProducerSendError as exc:
+                if not fut.done():
+                    fut.set_exception(exc)
+            else:
+                if not fut.done():
+                    fut.set_result(metadata)
+
+    def _abort(self, transactional_id: str) -> None:
+        for fut, *_ in self._transactions.pop(transactional_id, ()):
+            fut.cancel()
+
+    def supports_headers(self) -> bool:
+        """Return :const:`True` if message headers are supported."""
+        return True
+
+
+class Transport(base.Transport):
+    """In-process memory transport."""
+
+    Consumer: ClassVar[Type[ConsumerT]]
+    Consumer = Consumer
+    Producer: ClassVar[Type[ProducerT]]
+    Producer = Producer
+
+    driver_version = f"memory={faust.__version__}"
+
+    #: The broker shared by apps using the same URL.
+    broker: Broker
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.broker = get_broker(self.url[0])
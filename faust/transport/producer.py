@@ -9,7 +9,9 @@ The Producer is responsible for:
 
 import asyncio
 import time
-from typing import Any, Awaitable, Mapping, Optional, cast
+from asyncio import QueueEmpty
+from collections import deque
+from typing import Any, Awaitable, Deque, List, Mapping, Optional, cast
 
 from mode import Seconds, Service, get_logger
 from mode.threads import ServiceThread
@@ -22,13 +24,83 @@ __all__ = ["Producer"]
 logger = get_logger(__name__)
 
 
+class ThreadedEventQueue:
+    """Queue handing messages over to a producer thread.
+
+    :meth:`put` is called from the event loop of the app, and
+    :meth:`get_batch` from the event loop of the producer thread.
+
+    Messages are appended to a deque, and the thread's event loop is
+    only woken up (using :meth:`~asyncio.AbstractEventLoop.call_soon_threadsafe`)
+    for the first message put after it last woke up, so that a burst of
+    messages costs one wakeup rather than scheduling a coroutine for every
+    message.  The thread then takes the messages in batches.
+    """
+
+    def __init__(self, thread_loop: asyncio.AbstractEventLoop) -> None:
+        self.thread_loop = thread_loop
+        self._messages: Deque[FutureMessage] = deque()
+        self._ready = asyncio.Event()
+        self._wakeup_scheduled = False
+
+    def put(self, fut: FutureMessage) -> None:
+        """Add message to queue (from any thread)."""
+        self._messages.append(fut)
+        if not self._wakeup_scheduled:
+            self._wakeup_scheduled = True
+            self.thread_loop.call_soon_threadsafe(self._wakeup)
+
+    def _wakeup(self) -> None:
+        # Cleared before setting the event: messages put after this
+        # schedule a new wakeup, and messages put before are seen by
+        # the getter woken up by it.
+        self._wakeup_scheduled = False
+        self._ready.set()
+
+    async def get_batch(
+        self, max_messages: int, *, timeout: Optional[float] = None
+    ) -> List[FutureMessage]:
+        """Wait for messages and take up to ``max_messages`` of them.
+
+        Returns an empty list if no message arrives within ``timeout``.
+        """
+        if not self._messages:
+            self._ready.clear()
+            if not self._messages:
+                try:
+                    await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    return []
+        return self.get_nowait_batch(max_messages)
+
+    def get_nowait_batch(self, max_messages: int) -> List[FutureMessage]:
+        """Take up to ``max_messages`` messages without waiting."""
+        popleft = self._messages.popleft
+        return [popleft() for _ in range(min(max_messages, len(self._messages)))]
+
+    def get_nowait(self) -> FutureMessage:
+        """Take the next message, or raise :exc:`asyncio.QueueEmpty`."""
+        try:
+            return self._messages.popleft()
+        except IndexError:
+            raise QueueEmpty()
+
+    def empty(self) -> bool:
+        """Return :const:`True` if there are no messages in the queue."""
+        return not self._messages
+
+    def qsize(self) -> int:
+        """Return number of messages in the queue."""
+        return len(self._messages)
+
+
 class ProducerBuffer(Service, ProducerBufferT):
     #: Set by :class:`Producer` right after the buffer is created,
     #: so it is only ``None`` for a buffer that was never attached
     #: to a producer.
     app: Optional[AppT] = None
     max_messages = 100
-    queue: Optional[asyncio.Queue] = None
+    queue: Optional[ThreadedEventQueue] = None
 
     #: The transport driver's threaded producer.  Only assigned by
     #: :class:`Producer` when the :setting:`producer_threaded` setting is
@@ -62,9 +134,7 @@ class ProducerBuffer(Service, ProducerBufferT):
                 # (e.g. aiokafka's ``ThreadedProducer``), which lives in a
                 # module this one cannot import without a cycle.
                 self.queue = threaded_producer.event_queue  # type: ignore[attr-defined]
-            asyncio.run_coroutine_threadsafe(
-                self.queue.put(fut), threaded_producer.thread_loop
-            )
+            self.queue.put(fut)
         else:
             self.pending.put_nowait(fut)
 
@@ -135,11 +205,10 @@ class ProducerBuffer(Service, ProducerBufferT):
         if app.conf.producer_threaded:
             if not self.queue:
                 return 0
-            # ``Queue._queue`` is a CPython implementation detail (the
-            # underlying deque) that typeshed does not describe.
-            queue_items = self.queue._queue  # type: ignore[attr-defined]
-        else:
-            queue_items = self.pending._queue  # type: ignore[attr-defined]
+            return self.queue.qsize()
+        # ``Queue._queue`` is a CPython implementation detail (the
+        # underlying deque) that typeshed does not describe.
+        queue_items = self.pending._queue  # type: ignore[attr-defined]
         queue_items = cast(list, queue_items)
         return len(queue_items)
 
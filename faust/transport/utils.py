@@ -1,27 +1,35 @@
 """Transport utils - scheduling."""
 
 from collections import OrderedDict
+from itertools import chain, repeat, zip_longest
 from typing import (
     Any,
+    Callable,
     Dict,
     Iterator,
     List,
     Mapping,
     MutableMapping,
     Optional,
+    Sequence,
     Set,
     Tuple,
 )
 
 from faust.types import TP
-from faust.types.transports import SchedulingStrategyT
+from faust.types.transports import ConsumerT, SchedulingStrategyT
 
 __all__ = [
     "TopicIndexMap",
     "DefaultSchedulingStrategy",
+    "WeightedSchedulingStrategy",
     "TopicBuffer",
 ]
 
+#: Default size of the slices of records delivered from partitions
+#: of topics with weight 1.0, by :class:`WeightedSchedulingStrategy`.
+DEFAULT_SLICE_SIZE = 16
+
 # But we want to process records from topics in round-robin order.
 # We convert records into a mapping from topic-name to "chain-of-buffers":
 #   topic_index['topic-name'] = chain(all_topic_partition_buffers)
@@ -48,10 +56,51 @@ class DefaultSchedulingStrategy(SchedulingStrategyT):
             entry.add(tp, messages)
         return topic_index
 
+    #: Set for subclasses changing the order of :meth:`iterate`,
+    #: so that :meth:`iterate_slices` uses it.
+    _custom_iterate: bool = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        base = DefaultSchedulingStrategy
+        cls._custom_iterate = (
+            cls.iterate is not base.iterate
+            or cls.records_iterator is not base.records_iterator
+            or cls.map_from_records.__func__  # type: ignore[attr-defined]
+            is not base.map_from_records.__func__  # type: ignore[attr-defined]
+        )
+
     def iterate(self, records: Mapping[TP, List]) -> Iterator[Tuple[TP, Any]]:
         """Iterate over records in round-robin order."""
         return self.records_iterator(self.map_from_records(records))
 
+    def iterate_slices(
+        self, records: Mapping[TP, List]
+    ) -> Iterator[Tuple[TP, Sequence[Any]]]:
+        """Iterate over single records in round-robin order."""
+        if self._custom_iterate:
+            return super().iterate_slices(records)
+        # Same order as :meth:`iterate`, but using only iterators
+        # implemented in C instead of nested generators:
+        # round-robin over partitions in every topic, and then over topics.
+        # Every item is a non-empty tuple, so filter(None) drops only
+        # the fill values of zip_longest.
+        topics: Dict[str, List[Iterator]] = {}
+        for tp, messages in records.items():
+            # zip(messages) makes a 1-tuple slice of every record.
+            topics.setdefault(tp.topic, []).append(zip(repeat(tp), zip(messages)))
+        return filter(
+            None,
+            chain.from_iterable(
+                zip_longest(
+                    *(
+                        filter(None, chain.from_iterable(zip_longest(*partitions)))
+                        for partitions in topics.values()
+                    )
+                )
+            ),
+        )
+
     def records_iterator(self, index: TopicIndexMap) -> Iterator[Tuple[TP, Any]]:
         """Iterate over topic index map in round-robin order."""
         to_remove: Set[str] = set()
@@ -122,3 +171,115 @@ class TopicBuffer(Iterator[Tuple[TP, Any]]):
         if it is None:
             it = self._it = iter(self)
         return it.__next__()
+
+
+class WeightedSchedulingStrategy(SchedulingStrategyT):
+    """Weighted fair, lag-aware consumer record scheduler.
+
+    Delivers slices of records from each partition in rounds.  Every round
+    each topic gets a share of the records in proportion to its weight
+    in ``weights`` (1.0 for topics not in the mapping), and topics with
+    higher weight go first.  The shares are scaled so that partitions
+    of a topic with weight 1.0 get slices of about ``slice_size``
+    records.
+
+    The records of a topic are shared between its partitions in proportion
+    to their lag when ``highwater`` is given, or else in proportion to
+    the number of records fetched, so a backlogged partition
+    catches up faster than the others.
+
+    Shares of less than one record are carried over to the next round
+    (deficit round robin), so every partition progresses.
+    """
+
+    def __init__(
+        self,
+        *,
+        weights: Optional[Mapping[str, float]] = None,
+        highwater: Optional[Callable[[TP], Optional[int]]] = None,
+        slice_size: int = DEFAULT_SLICE_SIZE,
+    ) -> None:
+        self.weights = dict(weights or {})
+        for topic, weight in self.weights.items():
+            if weight <= 0:
+                raise ValueError(f"Weight of topic {topic!r} must be positive")
+        if slice_size < 1:
+            raise ValueError("slice_size must be at least 1")
+        self.highwater = highwater
+        self.slice_size = slice_size
+
+    @classmethod
+    def for_consumer(cls, consumer: ConsumerT) -> "WeightedSchedulingStrategy":
+        """Create scheduler configured by consumer app settings."""
+        conf = consumer.transport.app.conf
+        return cls(
+            weights=conf.consumer_topic_weights,
+            highwater=consumer.highwater,
+            slice_size=conf.consumer_scheduler_slice_size,
+        )
+
+    def iterate(self, records: Mapping[TP, List]) -> Iterator[Tuple[TP, Any]]:
+        """Iterate over records in weighted order."""
+        for tp, tp_records in self.iterate_slices(records):
+            for record in tp_records:
+                yield tp, record
+
+    def iterate_slices(
+        self, records: Mapping[TP, List]
+    ) -> Iterator[Tuple[TP, Sequence[Any]]]:
+        """Iterate over slices of records in weighted order."""
+        weights = self.weights
+        topics: Dict[str, List[_PartitionSlicer]] = {}
+        for tp, tp_records in records.items():
+            if tp_records:
+                topics.setdefault(tp.topic, []).append(
+                    _PartitionSlicer(tp, tp_records, self._lag(tp, tp_records))
+                )
+        # sort is stable, so topics with the same weight keep fetch order.
+        order = sorted(topics, key=lambda topic: -weights.get(topic, 1.0))
+        # scaled by the number of partitions, so that partitions
+        # get slices of about slice_size records.
+        scale = self.slice_size * max((len(p) for p in topics.values()), default=0)
+        quantums = {topic: scale * weights.get(topic, 1.0) for topic in order}
+        while order:
+            for topic in order:
+                partitions = topics[topic]
+                quantum = quantums[topic]
+                total_lag = sum(p.lag for p in partitions)
+                for partition in partitions:
+                    chunk = partition.take(quantum * partition.lag / total_lag)
+                    if chunk:
+                        yield partition.tp, chunk
+                topics[topic] = [p for p in partitions if p.remaining]
+            order = [topic for topic in order if topics[topic]]
+
+    def _lag(self, tp: TP, records: List) -> int:
+        if self.highwater is not None:
+            highwater = self.highwater(tp)
+            if highwater is not None:
+                return max(highwater - records[0].offset, len(records))
+        return len(records)
+
+
+class _PartitionSlicer:
+    __slots__ = ("tp", "records", "lag", "position", "remaining", "credit")
+
+    def __init__(self, tp: TP, records: List, lag: int) -> None:
+        self.tp = tp
+        self.records = records
+        self.lag = lag
+        self.position = 0
+        self.remaining = len(records)
+        self.credit = 0.0
+
+    def take(self, share: float) -> List:
+        credit = self.credit + share
+        count = min(int(credit), self.remaining)
+        self.credit = credit - count
+        if not count:
+            return []
+        start = self.position
+        self.position = start + count
+        self.remaining -= count
+        self.lag = max(self.lag - count, 1)
+        return self.records[start : start + count]
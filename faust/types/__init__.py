@@ -7,7 +7,7 @@ from .app import AppT
 from .channels import ChannelT
 from .codecs import CodecArg, CodecT
 from .core import HeadersArg, K, V
-from .enums import ProcessingGuarantee
+from .enums import AssignmentWeight, ProcessingGuarantee
 from .events import EventT
 from .fixups import FixupT
 from .joins import JoinT
@@ -75,6 +75,7 @@ __all__ = [
     "CollectionT",
     "TableT",
     # types.enums
+    "AssignmentWeight",
     "ProcessingGuarantee",
     # types.topics
     "ChannelT",
@@ -52,6 +52,7 @@ from .web import (
     HttpClientT,
     PageArg,
     ResourceOptions,
+    RPCClientT,
     View,
     ViewDecorator,
     Web,
@@ -59,6 +60,7 @@ from .web import (
 from .windows import WindowT
 
 if typing.TYPE_CHECKING:
+    from faust.app.manifest import DiscoveryManifest as _DiscoveryManifest
     from faust.cli.base import AppCommand as _AppCommand
     from faust.livecheck.app import LiveCheck as _LiveCheck
     from faust.sensors.monitor import Monitor as _Monitor
@@ -72,6 +74,8 @@ else:
 
     class _AppCommand: ...  # noqa
 
+    class _DiscoveryManifest: ...  # noqa
+
     class _SchemaT: ...  # noqa
 
     class _LiveCheck: ...  # noqa
@@ -244,8 +248,17 @@ class AppT(ServiceT):
         *extra_modules: str,
         categories: Iterable[str] = ("a", "b", "c"),
         ignore: Iterable[Any] = ("foo", "bar"),
+        use_manifest: bool = True,
     ) -> None: ...
 
+    @abc.abstractmethod
+    def discovery_manifest(
+        self,
+        *extra_modules: str,
+        categories: Iterable[str] = ("a", "b", "c"),
+        ignore: Iterable[Any] = ("foo", "bar"),
+    ) -> _DiscoveryManifest: ...
+
     @abc.abstractmethod
     def topic(
         self,
@@ -376,6 +389,18 @@ class AppT(ServiceT):
         **kwargs: Any,
     ) -> TableT: ...
 
+    @abc.abstractmethod
+    def AggregateTable(
+        self,
+        name: str,
+        *,
+        window: WindowT,
+        aggregate: str = "sum",
+        partitions: Optional[int] = None,
+        help: Optional[str] = None,
+        **kwargs: Any,
+    ) -> TableT: ...
+
     @abc.abstractmethod
     def SetGlobalTable(
         self,
@@ -541,6 +566,13 @@ class AppT(ServiceT):
     @http_client.setter
     def http_client(self, client: HttpClientT) -> None: ...
 
+    @property
+    @abc.abstractmethod
+    def rpc(self) -> RPCClientT: ...
+
+    @rpc.setter
+    def rpc(self, rpc: RPCClientT) -> None: ...
+
     @cached_property
     @abc.abstractmethod
     def assignor(self) -> PartitionAssignorT: ...
@@ -1,6 +1,17 @@
 import abc
 import typing
-from typing import Any, List, MutableMapping, Set
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Set,
+    Tuple,
+)
 
 from mode import ServiceT
 from yarl import URL
@@ -17,12 +28,73 @@ else:
 __all__ = [
     "TopicToPartitionMap",
     "HostToPartitionMap",
+    "TopicToPartitionWeights",
+    "TopicToPartitionOffsets",
+    "AssignedPartitions",
     "PartitionAssignorT",
     "LeaderAssignorT",
 ]
 
 TopicToPartitionMap = MutableMapping[str, List[int]]
 HostToPartitionMap = MutableMapping[str, TopicToPartitionMap]
+TopicToPartitionWeights = MutableMapping[str, List[Tuple[int, float]]]
+TopicToPartitionOffsets = MutableMapping[str, List[Tuple[int, int]]]
+
+
+class AssignedPartitions(AbstractSet[TP]):
+    """Immutable set of topic partitions assigned to this worker.
+
+    The partition assignor builds these once for every assignment it
+    receives, so they can be reused until the next rebalance, with
+    :attr:`generation` telling the views of different assignments
+    apart.  Besides the set of :class:`~faust.types.TP`, the partitions
+    of every topic are kept as a bitset, to test membership without
+    creating a :class:`~faust.types.TP`.
+    """
+
+    __slots__ = ("generation", "_tps", "_bitsets")
+
+    #: Number of the assignment this is a view of, incremented for
+    #: every assignment this worker receives.
+    generation: int
+
+    _tps: FrozenSet[TP]
+    _bitsets: Dict[str, int]
+
+    def __init__(self, tps: Iterable[TP] = (), *, generation: int = 0) -> None:
+        self.generation = generation
+        self._tps = frozenset(tps)
+        bitsets: Dict[str, int] = {}
+        for topic, partition in self._tps:
+            bitsets[topic] = bitsets.get(topic, 0) | 1 << partition
+        self._bitsets = bitsets
+
+    def __contains__(self, tp: object) -> bool:
+        return tp in self._tps
+
+    def __iter__(self) -> Iterator[TP]:
+        return iter(self._tps)
+
+    def __len__(self) -> int:
+        return len(self._tps)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} generation={self.generation} {set(self._tps)}>"
+
+    def has_partition(self, topic: str, partition: int) -> bool:
+        """Return :const:`True` if ``TP(topic, partition)`` is in the set."""
+        return bool(self._bitsets.get(topic, 0) >> partition & 1)
+
+    def partitions(self, topic: str) -> List[int]:
+        """Return sorted list of partitions of topic in the set."""
+        bits = self._bitsets.get(topic, 0)
+        return [
+            partition for partition in range(bits.bit_length()) if bits >> partition & 1
+        ]
+
+    def topics(self) -> AbstractSet[str]:
+        """Return set of topics with partitions in the set."""
+        return self._bitsets.keys()
 
 
 class PartitionAssignorT(abc.ABC):
@@ -36,10 +108,10 @@ class PartitionAssignorT(abc.ABC):
     def group_for_topic(self, topic: str) -> int: ...
 
     @abc.abstractmethod
-    def assigned_standbys(self) -> Set[TP]: ...
+    def assigned_standbys(self) -> AssignedPartitions: ...
 
     @abc.abstractmethod
-    def assigned_actives(self) -> Set[TP]: ...
+    def assigned_actives(self) -> AssignedPartitions: ...
 
     @abc.abstractmethod
     def is_active(self, tp: TP) -> bool: ...
@@ -47,6 +119,9 @@ class PartitionAssignorT(abc.ABC):
     @abc.abstractmethod
     def is_standby(self, tp: TP) -> bool: ...
 
+    @abc.abstractmethod
+    def on_partitions_revoked(self, revoked: Set[TP]) -> None: ...
+
     @abc.abstractmethod
     def key_store(self, topic: str, key: bytes) -> URL: ...
 
@@ -4,3 +4,9 @@ from enum import Enum
 class ProcessingGuarantee(Enum):
     AT_LEAST_ONCE = "at_least_once"
     EXACTLY_ONCE = "exactly_once"
+
+
+class AssignmentWeight(Enum):
+    NONE = "none"
+    BYTES = "bytes"
+    LAG = "lag"
@@ -240,6 +240,9 @@ class FieldDescriptorT(Generic[T]):
     @abc.abstractmethod
     def should_coerce(self, value: Any) -> bool: ...
 
+    @abc.abstractmethod
+    def decodes_as_is(self) -> bool: ...
+
     @abc.abstractmethod
     def getattr(self, obj: ModelT) -> T: ...
 
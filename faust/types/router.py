@@ -2,6 +2,7 @@
 
 import abc
 import typing
+from typing import AsyncIterator, Iterable, List, Mapping
 
 from yarl import URL
 
@@ -28,12 +29,20 @@ class RouterT(abc.ABC):
     @abc.abstractmethod
     def key_store(self, table_name: str, key: K) -> URL: ...
 
+    @abc.abstractmethod
+    def keys_by_store(
+        self, table_name: str, keys: Iterable[K]
+    ) -> Mapping[URL, List[K]]: ...
+
     @abc.abstractmethod
     def external_topic_key_store(self, topic: TopicT, key: K) -> URL: ...
 
     @abc.abstractmethod
     def table_metadata(self, table_name: str) -> HostToPartitionMap: ...
 
+    @abc.abstractmethod
+    def table_hosts(self, table_name: str) -> List[URL]: ...
+
     @abc.abstractmethod
     def tables_metadata(self) -> HostToPartitionMap: ...
 
@@ -45,6 +54,25 @@ class RouterT(abc.ABC):
         self, table_name: str, key: K, web: web.Web, request: web.Request
     ) -> web.Response: ...
 
+    @abc.abstractmethod
+    def stream_req(
+        self, dest_url: URL, request: web.Request, query: Mapping[str, str]
+    ) -> AsyncIterator[bytes]: ...
+
+    @abc.abstractmethod
+    async def post_req(
+        self,
+        dest_url: URL,
+        request: web.Request,
+        body: bytes,
+        query: Mapping[str, str],
+    ) -> bytes: ...
+
+    @abc.abstractmethod
+    async def get_many_req(
+        self, dest_url: URL, table_name: str, keys: List[K], request: web.Request
+    ) -> bytes: ...
+
     @abc.abstractmethod
     async def route_topic_req(
         self, topic: TopicT, key: K, web: web.Web, request: web.Request
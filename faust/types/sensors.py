@@ -1,6 +1,6 @@
 import abc
 import typing
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from mode import ServiceT
 
@@ -26,6 +26,9 @@ class SensorInterfaceT(abc.ABC):
     @abc.abstractmethod
     def on_message_in(self, tp: TP, offset: int, message: Message) -> None: ...
 
+    @abc.abstractmethod
+    def on_messages_in(self, tp: TP, offsets: Tuple[int, int], count: int) -> None: ...
+
     @abc.abstractmethod
     def on_stream_event_in(
         self, tp: TP, offset: int, stream: StreamT, event: EventT
@@ -123,6 +126,11 @@ class SensorInterfaceT(abc.ABC):
     @abc.abstractmethod
     def on_threaded_producer_buffer_processed(self, app: _AppT, size: int) -> None: ...
 
+    @abc.abstractmethod
+    def on_consumer_prefetch(
+        self, consumer: ConsumerT, depth: int, wait_time: float
+    ) -> None: ...
+
 
 class SensorT(SensorInterfaceT, ServiceT): ...
 
@@ -29,7 +29,7 @@ from faust.types.agents import AgentT
 from faust.types.assignor import LeaderAssignorT, PartitionAssignorT
 from faust.types.auth import CredentialsArg, CredentialsT
 from faust.types.codecs import CodecArg
-from faust.types.enums import ProcessingGuarantee
+from faust.types.enums import AssignmentWeight, ProcessingGuarantee
 from faust.types.events import EventT
 from faust.types.router import RouterT
 from faust.types.sensors import SensorT
@@ -78,6 +78,7 @@ class Settings(base.SettingsRegistry):
         *,
         # Common settings:
         autodiscover: Optional[AutodiscoverArg] = None,
+        autodiscover_manifest: Optional[typing.Union[str, Path]] = None,
         datadir: Optional[typing.Union[str, Path]] = None,
         tabledir: Optional[typing.Union[str, Path]] = None,
         debug: Optional[bool] = None,
@@ -108,11 +109,16 @@ class Settings(base.SettingsRegistry):
         ssl_context: Optional[ssl.SSLContext] = None,
         # Consumer settings:
         consumer_api_version: Optional[str] = None,
+        consumer_assignment_weight: Optional[Union[str, AssignmentWeight]] = None,
         consumer_max_fetch_size: Optional[int] = None,
         consumer_auto_offset_reset: Optional[str] = None,
         consumer_group_instance_id: Optional[str] = None,
         consumer_metadata_max_age_ms: Optional[int] = None,
         consumer_connections_max_idle_ms: Optional[int] = None,
+        consumer_topic_weights: Optional[Mapping[str, float]] = None,
+        consumer_scheduler_slice_size: Optional[int] = None,
+        consumer_prefetch_batches: Optional[int] = None,
+        consumer_prefetch_max_bytes: Optional[int] = None,
         # Topic serialization settings:
         key_serializer: Optional[CodecArg] = None,
         value_serializer: Optional[CodecArg] = None,
@@ -138,6 +144,7 @@ class Settings(base.SettingsRegistry):
         reply_to_prefix: Optional[str] = None,
         # Stream settings:
         processing_guarantee: Optional[Union[str, ProcessingGuarantee]] = None,
+        transaction_per_worker: Optional[bool] = None,
         stream_buffer_maxsize: Optional[int] = None,
         stream_processing_timeout: Optional[Seconds] = None,
         stream_publish_on_commit: Optional[bool] = None,
@@ -167,6 +174,8 @@ class Settings(base.SettingsRegistry):
         web_metrics_enabled: Optional[bool] = None,
         web_port: Optional[int] = None,
         web_router_enabled: Optional[bool] = None,
+        web_rpc_enabled: Optional[bool] = None,
+        web_rpc_timeout: Optional[Seconds] = None,
         web_ssl_context: Optional[ssl.SSLContext] = None,
         web_stats_enabled: Optional[bool] = None,
         web_tables_enabled: Optional[bool] = None,
@@ -182,6 +191,7 @@ class Settings(base.SettingsRegistry):
         Stream: Optional[SymbolArg[Type[StreamT]]] = None,
         Table: Optional[SymbolArg[Type[TableT]]] = None,
         SetTable: Optional[SymbolArg[Type[TableT]]] = None,
+        AggregateTable: Optional[SymbolArg[Type[TableT]]] = None,
         GlobalTable: Optional[SymbolArg[Type[GlobalTableT]]] = None,
         SetGlobalTable: Optional[SymbolArg[Type[GlobalTableT]]] = None,
         TableManager: Optional[SymbolArg[Type[TableManagerT]]] = None,
@@ -193,6 +203,7 @@ class Settings(base.SettingsRegistry):
         Topic: Optional[SymbolArg[Type[TopicT]]] = None,
         HttpClient: Optional[SymbolArg[Type[HttpClientT]]] = None,
         Monitor: Optional[SymbolArg[Type[SensorT]]] = None,
+        sensor_sampling: Optional[Mapping[str, int]] = None,
         # Deprecated settings:
         stream_ack_cancelled_tasks: Optional[bool] = None,
         stream_ack_exceptions: Optional[bool] = None,
@@ -415,6 +426,39 @@ class Settings(base.SettingsRegistry):
             :meth:`@discover` method manually.
         """
 
+    @sections.Common.setting(
+        params.Path,
+        version_introduced="0.15.0",
+        env_name="APP_AUTODISCOVER_MANIFEST",
+        default=None,
+        allow_none=True,
+    )
+    def autodiscover_manifest(self) -> Optional[Path]:
+        """Path to autodiscovery manifest.
+
+        Autodiscovery has to import every module in the packages it scans,
+        which can slow down worker startup considerably in large projects.
+
+        The :program:`faust discover --write-manifest` command scans the
+        packages once and writes a manifest of the modules where agents,
+        tables, pages, commands, services, tasks and timers were found:
+
+        .. sourcecode:: console
+
+            $ faust -A proj discover --write-manifest
+
+        When this setting is set and the manifest exists, workers
+        only import the modules listed in the manifest instead of scanning,
+        and if the manifest exists but lists something that no longer
+        exists, startup fails asking you to write it again.
+
+        .. warning::
+
+            Modules that do not define any of the above are not imported,
+            and new decorators are not found until the manifest is written
+            again, so make writing it part of your build.
+        """
+
     @sections.Common.setting(
         params.Path,
         env_name="APP_DATADIR",
@@ -771,6 +815,13 @@ class Settings(base.SettingsRegistry):
             Limitations: Does not do sticky partition assignment (not
                 suitable for tables), and do not create any necessary internal
                 topics (you have to create them manually).
+
+        - ``memory://``
+
+            In-process broker for tests and benchmarks: apps in the same
+            process using the same URL share topics and consumer groups.
+
+            Limitations: Nothing is persisted or shared between processes.
         """
 
     @broker.on_set_default  # type: ignore
@@ -1129,6 +1180,35 @@ class Settings(base.SettingsRegistry):
         See :setting:`broker_api_version` for more information.
         """
 
+    @sections.Consumer.setting(
+        params.Enum(AssignmentWeight),
+        version_introduced="0.15.0",
+        env_name="CONSUMER_ASSIGNMENT_WEIGHT",
+        default=AssignmentWeight.NONE,
+    )
+    def consumer_assignment_weight(self) -> AssignmentWeight:
+        """Partition assignment weighting.
+
+        By default the partition assignor balances the *number* of partitions
+        assigned to each worker, so a partition receiving a hundred times
+        the traffic of another counts the same as an idle one.
+
+        Setting this makes every worker report a load figure for each of its
+        active partitions in the group subscription, and the leader then
+        balances the sum of those weights instead, while keeping existing
+        assignments in place for as long as they stay within tolerance.
+
+        Possible values are:
+
+        - ``"none"`` (default): balance partition counts only.
+        - ``"bytes"``: weigh partitions by bytes received per second.
+        - ``"lag"``: weigh partitions by consumer lag, as tracked by
+          :setting:`Monitor`.
+
+        All workers in the group should use the same value.  Partitions no
+        worker has reported a weight for yet are given the average weight.
+        """
+
     @sections.Consumer.setting(
         params.UnsignedInt,
         version_introduced="1.4",
@@ -1215,6 +1295,84 @@ class Settings(base.SettingsRegistry):
         Default: 540000 (9 minutes).
         """
 
+    @sections.Consumer.setting(
+        params.Dict[float],
+        version_introduced="0.15.0",
+        default={},
+    )
+    def consumer_topic_weights(self) -> Mapping[str, float]:
+        """Share of records delivered from each topic.
+
+        Used by the
+        :class:`~faust.transport.utils.WeightedSchedulingStrategy`
+        :setting:`ConsumerScheduler`, as a mapping of topic name to
+        weight.  Topics not in the mapping have the weight 1.0.
+
+        Every round a topic with weight 2.0 gets twice as many records
+        delivered as a topic with weight 1.0, and topics with higher
+        weight go first, so that for example low-latency control topics
+        can be prioritized over topics used for bulk backfill::
+
+            app = App(
+                ...,
+                ConsumerScheduler='faust.transport.utils:WeightedSchedulingStrategy',
+                consumer_topic_weights={'control': 10.0, 'backfill': 0.5},
+            )
+        """
+
+    @sections.Consumer.setting(
+        params.UnsignedInt,
+        version_introduced="0.15.0",
+        env_name="CONSUMER_SCHEDULER_SLICE_SIZE",
+        default=16,
+    )
+    def consumer_scheduler_slice_size(self) -> int:
+        """Size of the slices of records delivered from a partition.
+
+        Used by the
+        :class:`~faust.transport.utils.WeightedSchedulingStrategy`
+        :setting:`ConsumerScheduler`, as the average number of records
+        delivered from every partition of a topic with weight 1.0 every round
+        (see :setting:`consumer_topic_weights`).  Larger slices take
+        less time to schedule, but make the scheduling less fine-grained.
+        """
+
+    @sections.Consumer.setting(
+        params.UnsignedInt,
+        version_introduced="0.15.0",
+        env_name="CONSUMER_PREFETCH_BATCHES",
+        default=0,
+    )
+    def consumer_prefetch_batches(self) -> int:
+        """Number of batches of records to fetch ahead of processing.
+
+        By default the consumer fetches the next batch of records
+        only after every record in the current batch was delivered
+        to streams, so fetching and processing never overlap.
+
+        When set, up to this many batches are fetched while the
+        current batch is being processed (see also
+        :setting:`consumer_prefetch_max_bytes`).  Batches already
+        fetched are thrown away when the flow of messages is stopped,
+        partitions are rebalanced or the consumer seeks, and records
+        of partitions paused in the meantime are fetched again when
+        the partitions are resumed.
+        """
+
+    @sections.Consumer.setting(
+        params.UnsignedInt,
+        version_introduced="0.15.0",
+        env_name="CONSUMER_PREFETCH_MAX_BYTES",
+        default=16 * 1024 * 1024,
+    )
+    def consumer_prefetch_max_bytes(self) -> int:
+        """Maximum size of batches fetched ahead of processing.
+
+        No more batches are fetched ahead when the serialized keys and
+        values in the batches already fetched take up this many bytes
+        (see :setting:`consumer_prefetch_batches`).
+        """
+
     @sections.Serialization.setting(
         params.Codec,
         env_name="APP_KEY_SERIALIZER",
@@ -1568,6 +1726,9 @@ class Settings(base.SettingsRegistry):
         The expiry time (in seconds :class:`float`,
         or :class:`~datetime.timedelta`), for how long replies will stay
         in the instances local reply topic before being removed.
+
+        Requests still waiting for a reply after this time fail with
+        :exc:`asyncio.TimeoutError`.
         """
 
     @sections.RPC.setting(
@@ -1619,6 +1780,44 @@ class Settings(base.SettingsRegistry):
         you want to use.
         """
 
+    @sections.Common.setting(
+        params.Bool,
+        version_introduced="0.15.0",
+        env_name="TRANSACTION_PER_WORKER",
+        default=False,
+        related_settings=[processing_guarantee],
+    )
+    def transaction_per_worker(self) -> bool:
+        """Use one transactional producer per worker.
+
+        With the "exactly_once" :setting:`processing_guarantee`, a
+        transactional producer is started for every active partition
+        assigned to the worker, so a worker assigned 200 partitions
+        keeps 200 producers (and connections), starts and stops them
+        on every rebalance, and commits 200 transactions at every
+        commit.
+
+        If enabled, a worker instead uses a single transactional
+        producer, and a single transaction covering every partition
+        assigned to it, committed together with the offsets of all
+        partitions at every commit, and when partitions are revoked.
+
+        The transactional id of the producer is derived from the
+        :setting:`id` and :setting:`canonical_url` of the worker,
+        which must therefore be unique, and the same when a worker
+        is restarted, so that a new instance of the worker fences off
+        the previous one.
+
+        .. warning::
+
+            As the transactional id does not follow the partitions
+            around, a worker that is considered dead by the consumer
+            group while still running is not fenced off by the worker
+            taking over its partitions: that requires committing the
+            offsets together with the consumer group generation, which
+            :pypi:`aiokafka` does not support.
+        """
+
     @sections.Stream.setting(
         params.UnsignedInt,
         env_name="STREAM_BUFFER_MAXSIZE",
@@ -2102,6 +2301,46 @@ class Settings(base.SettingsRegistry):
             in Prometheus format on its own ``/metrics`` path.
         """
 
+    @sections.WebServer.setting(
+        params.Bool,
+        version_introduced="0.15.0",
+        env_name="APP_WEB_RPC_ENABLED",
+        default=False,
+    )
+    def web_rpc_enabled(self) -> bool:
+        """Enable/disable remote procedure calls between workers.
+
+        Serves the ``/rpc/`` WebSocket endpoint, and sends replies to
+        :meth:`@Agent.ask` and requests for many keys of a table
+        (``/table/{name}/_mget/``) directly to the worker waiting for
+        them, over one long-lived connection per worker, instead of
+        through the reply topic or a new HTTP request each.
+
+        Replies are sent in the background, and go back through the
+        reply topic when the worker waiting for them cannot be reached.
+
+        .. warning::
+
+            Enable this on all workers of the app: workers not serving the
+            ``/rpc/`` endpoint cannot be called.
+        """
+
+    @sections.WebServer.setting(
+        params.Seconds,
+        version_introduced="0.15.0",
+        env_name="APP_WEB_RPC_TIMEOUT",
+        default=10.0,
+    )
+    def web_rpc_timeout(self) -> float:
+        """Timeout for remote procedure calls between workers.
+
+        How long to wait for the reply to a call made when
+        :setting:`web_rpc_enabled` is enabled, in seconds, including
+        connecting to the worker called.  A worker that could not be
+        reached in time is not called again for a few seconds: replies
+        to it go back through the reply topic right away.
+        """
+
     @sections.WebServer.setting(
         params.Str,
         version_introduced="1.2",
@@ -2265,6 +2504,12 @@ class Settings(base.SettingsRegistry):
         The default strategy does first round-robin over topics and then
         round-robin over partitions.
 
+        The :class:`~faust.transport.utils.WeightedSchedulingStrategy`
+        strategy instead delivers slices of records from every partition,
+        giving topics a share of the records according to
+        :setting:`consumer_topic_weights`, and partitions with more lag
+        a larger share of the records of the topic.
+
         Example using a class::
 
             class MySchedulingStrategy(DefaultSchedulingStrategy):
@@ -2392,6 +2637,30 @@ class Settings(base.SettingsRegistry):
             app = App(..., Table='myproj.tables.MySetTable')
         """
 
+    @sections.Extension.setting(
+        params.Symbol(Type[TableT]),
+        version_introduced="0.15.0",
+        default="faust:AggregateTable",
+    )
+    def AggregateTable(self) -> Type[TableT]:
+        """AggregateTable extension table.
+
+        The :class:`~faust.AggregateTable` class to use for tables of
+        numeric windowed aggregates, or the fully-qualified path to one
+        (supported by :func:`~mode.utils.imports.symbol_by_name`).
+
+        Example using a class::
+
+            class MyAggregateTable(faust.AggregateTable):
+                ...
+
+            app = App(..., AggregateTable=MyAggregateTable)
+
+        Example using the string path to a class::
+
+            app = App(..., AggregateTable='myproj.tables.MyAggregateTable')
+        """
+
     @sections.Extension.setting(
         params.Symbol(Type[GlobalTableT]),
         default="faust:GlobalTable",
@@ -2667,6 +2936,29 @@ class Settings(base.SettingsRegistry):
             app = faust.App(..., Monitor='myproj.monitors.Monitor')
         """
 
+    @sections.Extension.setting(
+        params.Dict[int],
+        version_introduced="0.15.0",
+        default={},
+    )
+    def sensor_sampling(self) -> Mapping[str, int]:
+        """Sample the timing of events and sends.
+
+        Mapping of sensor hook name to ``N``, so that the
+        :class:`~faust.sensors.Monitor` (and its subclasses) only time one
+        in every ``N`` calls to that hook, e.g. to only time every 100th
+        event processed by a stream::
+
+            app = faust.App(..., sensor_sampling={'on_stream_event': 100})
+
+        The hooks that can be sampled are ``on_stream_event`` (the event
+        runtime) and ``on_send`` (the producer send latency).
+
+        Only the timing is sampled: the sensors are still called for every
+        event and send, so counters of events, sent messages and send
+        errors are exact.
+        """
+
     @sections.Stream.setting(
         params.Bool,
         default=True,
@@ -1,6 +1,17 @@
 import abc
 import typing
-from typing import Any, Callable, Iterable, Mapping, Optional, Set, TypeVar, Union
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 from mode import ServiceT
 from mode.utils.collections import FastUserDict
@@ -23,11 +34,17 @@ else:
     class _CollectionT: ...  # noqa
 
 
-__all__ = ["StoreT"]
+__all__ = ["ScanCursor", "ScanPredicate", "StoreT"]
 
 KT = TypeVar("KT")
 VT = TypeVar("VT")
 
+#: Position in a table scan: partition and serialized key.
+ScanCursor = Tuple[int, bytes]
+
+#: Filter for table scans, called with serialized key and value.
+ScanPredicate = Callable[[bytes, bytes], bool]
+
 
 class StoreT(ServiceT, FastUserDict[KT, VT]):
     url: URL
@@ -62,6 +79,12 @@ class StoreT(ServiceT, FastUserDict[KT, VT]):
     @abc.abstractmethod
     def set_persisted_offset(self, tp: TP, offset: int) -> None: ...
 
+    @abc.abstractmethod
+    def persisted_offsets(self) -> Mapping[int, int]: ...
+
+    @abc.abstractmethod
+    async def flush(self) -> None: ...
+
     @abc.abstractmethod
     async def need_active_standby_for(self, tp: TP) -> bool: ...
 
@@ -73,6 +96,21 @@ class StoreT(ServiceT, FastUserDict[KT, VT]):
         to_value: Callable[[Any], VT],
     ) -> None: ...
 
+    @abc.abstractmethod
+    def get_many(
+        self, keys: Iterable[KT], *, partition: Optional[int] = None
+    ) -> Mapping[KT, VT]: ...
+
+    @abc.abstractmethod
+    def scan(
+        self,
+        *,
+        start: Optional[bytes] = None,
+        stop: Optional[bytes] = None,
+        after: Optional[ScanCursor] = None,
+        predicate: Optional[ScanPredicate] = None,
+    ) -> Iterator[Tuple[ScanCursor, KT, VT]]: ...
+
     @abc.abstractmethod
     def reset_state(self) -> None: ...
 
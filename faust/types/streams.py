@@ -162,6 +162,12 @@ class StreamT(AsyncIterable[T_co], JoinableT, ServiceT):
         self, max_: int, within: Seconds
     ) -> AsyncIterable[Sequence[T_co]]: ...
 
+    @abc.abstractmethod
+    @no_type_check
+    async def take_events(
+        self, max_: int, within: Seconds
+    ) -> AsyncIterable[Sequence[EventT]]: ...
+
     @abc.abstractmethod
     def enumerate(self, start: int = 0) -> AsyncIterable[Tuple[int, T_co]]: ...
 
@@ -171,6 +177,27 @@ class StreamT(AsyncIterable[T_co], JoinableT, ServiceT):
     @abc.abstractmethod
     def echo(self, *channels: Union[str, ChannelT]) -> "StreamT": ...
 
+    @abc.abstractmethod
+    def join(
+        self,
+        *fields: Union[FieldDescriptorT, JoinableT],
+        on: Optional[FieldDescriptorT] = None,
+    ) -> "StreamT": ...
+
+    @abc.abstractmethod
+    def left_join(
+        self,
+        *fields: Union[FieldDescriptorT, JoinableT],
+        on: Optional[FieldDescriptorT] = None,
+    ) -> "StreamT": ...
+
+    @abc.abstractmethod
+    def inner_join(
+        self,
+        *fields: Union[FieldDescriptorT, JoinableT],
+        on: Optional[FieldDescriptorT] = None,
+    ) -> "StreamT": ...
+
     @abc.abstractmethod
     def group_by(
         self,
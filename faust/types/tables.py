@@ -9,8 +9,10 @@ from typing import (
     Iterable,
     Iterator,
     KeysView,
+    List,
     Mapping,
     MutableMapping,
+    NamedTuple,
     Optional,
     Set,
     Tuple,
@@ -25,7 +27,7 @@ from yarl import URL
 
 from .codecs import CodecArg
 from .events import EventT
-from .stores import StoreT
+from .stores import ScanPredicate, StoreT
 from .streams import JoinableT
 from .topics import TopicT
 from .tuples import TP, FutureMessage
@@ -60,6 +62,7 @@ __all__ = [
     "WindowWrapperT",
     "ChangelogEventCallback",
     "CollectionTps",
+    "ScanBatch",
 ]
 
 RelativeHandler = Callable[[Optional[EventT]], Union[float, datetime]]
@@ -80,6 +83,17 @@ KT = TypeVar("KT")
 VT = TypeVar("VT")
 
 
+class ScanBatch(NamedTuple):
+    """Batch of items returned by :meth:`CollectionT.scan`."""
+
+    #: List of ``(key, value)`` tuples.
+    items: List[Tuple[Any, Any]]
+
+    #: Token to resume the scan after this batch,
+    #: or :const:`None` if there are no more items.
+    cursor: Optional[str]
+
+
 class CollectionT(ServiceT, JoinableT):
     app: _AppT
     name: str
@@ -144,12 +158,28 @@ class CollectionT(ServiceT, JoinableT):
     @abc.abstractmethod
     def persisted_offset(self, tp: TP) -> Optional[int]: ...
 
+    @abc.abstractmethod
+    def persisted_offsets(self) -> Mapping[int, int]: ...
+
     @abc.abstractmethod
     async def need_active_standby_for(self, tp: TP) -> bool: ...
 
     @abc.abstractmethod
     def reset_state(self) -> None: ...
 
+    @abc.abstractmethod
+    def scan(
+        self,
+        *,
+        start: Optional[bytes] = None,
+        stop: Optional[bytes] = None,
+        prefix: Optional[bytes] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 1000,
+        predicate: Optional[ScanPredicate] = None,
+    ) -> Iterator[ScanBatch]: ...
+
     @abc.abstractmethod
     def send_changelog(
         self,
@@ -227,7 +257,9 @@ class CollectionT(ServiceT, JoinableT):
     def _windowed_contains(self, key: Any, timestamp: float) -> bool: ...
 
 
-class TableT(CollectionT, ManagedUserDict[KT, VT]): ...
+class TableT(CollectionT, ManagedUserDict[KT, VT]):
+    @abc.abstractmethod
+    def get_many(self, keys: Iterable[KT]) -> Mapping[KT, VT]: ...
 
 
 class GlobalTableT(TableT): ...
@@ -251,6 +283,9 @@ class TableManagerT(ServiceT, FastUserDict[str, CollectionT]):
     @abc.abstractmethod
     def on_commit(self, offsets: MutableMapping[TP, int]) -> None: ...
 
+    @abc.abstractmethod
+    async def flush(self) -> None: ...
+
     @abc.abstractmethod
     async def on_rebalance(
         self,
@@ -264,9 +264,19 @@ class SchedulingStrategyT:
     @abc.abstractmethod
     def __init__(self) -> None: ...
 
+    @classmethod
+    def for_consumer(cls, consumer: "ConsumerT") -> "SchedulingStrategyT":
+        return cls()
+
     @abc.abstractmethod
     def iterate(self, records: Mapping[TP, List]) -> Iterator[Tuple[TP, Any]]: ...
 
+    def iterate_slices(
+        self, records: Mapping[TP, List]
+    ) -> Iterator[Tuple[TP, Sequence[Any]]]:
+        for tp, record in self.iterate(records):
+            yield tp, (record,)
+
 
 class ConsumerT(ServiceT):
     #: The transport that created this Consumer.
@@ -6,9 +6,11 @@ from typing import (
     Awaitable,
     Callable,
     Coroutine,
+    MutableMapping,
     NamedTuple,
     Optional,
     Sequence,
+    Tuple,
     Type,
     Union,
 )
@@ -45,7 +47,10 @@ __all__ = [
     "ViewDecorator",
     "PageArg",
     "HttpClientT",
+    "RPCHandler",
+    "RPCClientT",
     "Web",
+    "CachedResponse",
     "CacheBackendT",
     "CacheT",
     "BlueprintT",
@@ -90,6 +95,42 @@ class ResourceOptions(NamedTuple):
     allow_methods: Optional[CORSListOption] = ()
 
 
+#: Handler for remote procedure calls: takes and returns a payload.
+RPCHandler = Callable[[bytes], Awaitable[bytes]]
+
+
+class RPCClientT(abc.ABC):
+    app: _AppT
+    handlers: MutableMapping[str, RPCHandler]
+
+    @abc.abstractmethod
+    def __init__(self, app: _AppT) -> None: ...
+
+    @abc.abstractmethod
+    async def call(
+        self,
+        url: Union[URL, str],
+        method: str,
+        payload: bytes,
+        *,
+        timeout: Optional[Seconds] = None,
+    ) -> bytes: ...
+
+    @abc.abstractmethod
+    async def handle(self, data: bytes) -> bytes: ...
+
+    @abc.abstractmethod
+    async def close(self) -> None: ...
+
+
+class CachedResponse(NamedTuple):
+    """HTTP response stored in the cache, ready to be sent again."""
+
+    status: int
+    headers: Tuple[Tuple[str, str], ...]
+    body: bytes
+
+
 class CacheBackendT(ServiceT):
     Unavailable: Type[BaseException]
 
@@ -109,6 +150,20 @@ class CacheBackendT(ServiceT):
     @abc.abstractmethod
     async def delete(self, key: str) -> None: ...
 
+    @abc.abstractmethod
+    async def get_response(
+        self, key: str, loads: Callable[[bytes], CachedResponse]
+    ) -> Optional[CachedResponse]: ...
+
+    @abc.abstractmethod
+    async def set_response(
+        self,
+        key: str,
+        response: CachedResponse,
+        dumps: Callable[[CachedResponse], bytes],
+        timeout: Optional[float] = None,
+    ) -> None: ...
+
 
 class CacheT(abc.ABC):
     timeout: Optional[Seconds]
@@ -179,7 +179,9 @@ if orjson is not None:  # pragma: no cover
             option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
         )
 
-    def loads(s: str, json_loads: Callable = orjson.loads, **kwargs: Any) -> Any:
+    def loads(
+        s: Union[str, bytes], json_loads: Callable = orjson.loads, **kwargs: Any
+    ) -> Any:
         """Deserialize json string."""
         return json_loads(s)
 
@@ -199,6 +201,8 @@ else:
             separators=(",", ":"),
         )
 
-    def loads(s: str, json_loads: Callable = json.loads, **kwargs: Any) -> Any:
+    def loads(
+        s: Union[str, bytes], json_loads: Callable = json.loads, **kwargs: Any
+    ) -> Any:
         """Deserialize json string.  See :func:`json.loads`."""
         return json_loads(s, **kwargs)
@@ -4,12 +4,12 @@ We define our own interface so we don't have to specify the
 callback argument.
 """
 
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Container, List, Optional
 
 import venusian
-from venusian import Scanner, attach as _attach
+from venusian import ATTACH_ATTR, Scanner, attach as _attach
 
-__all__ = ["Scanner", "attach"]
+__all__ = ["Scanner", "attach", "attached_categories"]
 
 
 def attach(
@@ -27,4 +27,24 @@ def attach(
     return _attach(fun, callback, category=category, **kwargs)
 
 
+def attached_categories(
+    obj: Any, module_name: str, name: str, categories: Container[str]
+) -> List[str]:
+    """Return categories ``obj`` was attached to, if any.
+
+    Only returns categories when ``obj`` is the object that was
+    attached, not for example a subclass of an attached class,
+    the same way :class:`Scanner` decides what was decorated.
+    """
+    try:
+        attached = getattr(obj, ATTACH_ATTR)
+        if not attached.attached_to(module_name, name, obj):
+            return []
+        return sorted(c for c in attached.keys() if c in categories)
+    except Exception:
+        # same as venusian: objects with a custom __getattr__
+        # may return anything for the attribute.
+        return []
+
+
 def _on_found(scanner: venusian.Scanner, name: str, obj: Any) -> None: ...
@@ -9,13 +9,11 @@ Unlike the statistics endpoints in :mod:`faust.web.apps.stats` this is
 independent of :setting:`debug`, so it can be left on in production.
 
 The payload is grouped by concern rather than being a flat dump of
-:meth:`Monitor.asdict() <faust.sensors.monitor.Monitor.asdict>`, and adds two
-things that monitor does not compute:
-
-* **consumer lag** -- derived from the log end offsets and the offsets this
-  worker has actually read, which is the number you usually want to alert on.
-* **latency percentiles** -- monitor keeps raw deques of up to a few thousand
-  samples; those are summarized here instead of serialized.
+:meth:`Monitor.asdict() <faust.sensors.monitor.Monitor.asdict>`, and adds
+**consumer lag**, which monitor does not compute -- derived from the log end
+offsets and the offsets this worker has actually read, which is the number
+you usually want to alert on.  Latencies are summarized as percentiles of
+the quantile sketches kept by the monitor.
 
 :mod:`faust.sensors.prometheus` serves the same underlying data in Prometheus
 format on its own path; the two are independent.
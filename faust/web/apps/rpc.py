@@ -0,0 +1,25 @@
+"""WebSocket endpoint serving remote procedure calls of other workers.
+
+Enabled with the :setting:`web_rpc_enabled` setting, which is off by
+default.  See :mod:`faust.web.rpc` for the protocol.
+"""
+
+from faust import web
+
+__all__ = ["RPC", "blueprint"]
+
+blueprint = web.Blueprint("rpc")
+
+
+@blueprint.route("/", name="index")
+class RPC(web.View):
+    """
+    ---
+    description: Remote procedure calls between workers (WebSocket).
+    tags:
+    - Faust
+    """
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Serve calls of another worker until it disconnects."""
+        return await self.websocket(request, self.app.rpc.handle)
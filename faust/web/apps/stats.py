@@ -1,7 +1,7 @@
 """HTTP endpoint showing statistics from the Faust monitor."""
 
 from collections import defaultdict
-from typing import List, MutableMapping, Set
+from typing import AbstractSet, List, MutableMapping
 
 from faust import web
 from faust.types.tuples import TP
@@ -44,7 +44,7 @@ class Assignment(web.View):
     """
 
     @classmethod
-    def _topic_grouped(cls, assignment: Set[TP]) -> TPMap:
+    def _topic_grouped(cls, assignment: AbstractSet[TP]) -> TPMap:
         tps: MutableMapping[str, List[int]] = defaultdict(list)
         for tp in sorted(assignment):
             tps[tp.topic].append(tp.partition)
@@ -1,23 +1,51 @@
 """HTTP endpoint showing partition routing destinations."""
 
-from typing import Any, Mapping, cast
+import asyncio
+import base64
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    cast,
+)
+
+from mode import get_logger
+from yarl import URL
 
 from faust import web
 from faust.app.router import SameNode
 from faust.models import Record
 from faust.types import K, TableT, V
+from faust.types.stores import ScanPredicate
+from faust.types.tables import ScanBatch
+from faust.utils import json as _json
+from faust.web.base import dumps_json
+from faust.web.exceptions import ServiceUnavailable
 
 __all__ = [
     "TableView",
     "TableList",
     "TableDetail",
+    "TableScan",
+    "TableMultiGet",
     "TableKeyDetail",
     "blueprint",
 ]
 
+logger = get_logger(__name__)
 
 blueprint = web.Blueprint("tables")
 
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+#: Query parameters passed on when forwarding a scan to other workers.
+FORWARDED_SCAN_PARAMS = ("start", "stop", "prefix", "batch_size", "value_contains")
+
 
 class TableInfo(Record, serializer="json", namespace="@TableInfo"):
     name: str
@@ -84,6 +112,278 @@ class TableDetail(TableView):
         return self.json(self.table_json(table))
 
 
+@blueprint.route("/{name}/_scan/", name="scan")
+class TableScan(TableView):
+    """
+    ---
+    description: Stream items in table as newline delimited JSON.
+    tags:
+    - Faust
+    parameters:
+    - in: path
+      name: name
+      type: string
+      required: true
+    - in: query
+      name: start
+      type: string
+      description: Only keys serialized to this or greater.
+    - in: query
+      name: stop
+      type: string
+      description: Only keys serialized to less than this.
+    - in: query
+      name: prefix
+      type: string
+      description: Only keys serialized to start with this.
+    - in: query
+      name: value_contains
+      type: string
+      description: Only items with serialized value containing this.
+    - in: query
+      name: cursor
+      type: string
+      description: Resume from cursor returned by a previous scan.
+    - in: query
+      name: limit
+      type: integer
+    - in: query
+      name: batch_size
+      type: integer
+      default: 1000
+    - in: query
+      name: local
+      type: boolean
+      description: Only scan partitions stored by this worker.
+    produces:
+    - application/x-ndjson
+    """
+
+    async def get(self, request: web.Request, name: str) -> web.Response:
+        """Stream items in table, one JSON object per line.
+
+        Every batch of ``{"key": ..., "value": ...}`` lines is followed
+        by a ``{"cursor": ...}`` line, the token to resume the scan from.
+        The cursor is :const:`null` after the last item.  If the response
+        ends without a :const:`null` cursor, the scan was interrupted
+        and can be resumed using the last cursor.
+        """
+        table = self.get_table_or_404(name)
+        query = request.query
+        options = self._scan_options(query)
+        local = query.get("local", "").lower() in ("1", "true", "yes")
+        if local or table.is_global:
+            batches = table.scan(cursor=query.get("cursor"), **options)
+            try:
+                first = next(batches)
+            except ValueError as exc:
+                raise self.ParseError(str(exc))
+            chunks = self._local_chunks(first, batches)
+        else:
+            chunks = self._fan_out(request, table, query, options)
+        return await self.stream(request, chunks, content_type=NDJSON_CONTENT_TYPE)
+
+    def _scan_options(self, query: Mapping[str, str]) -> Dict[str, Any]:
+        options: Dict[str, Any] = {
+            "start": self._scan_key(query, "start"),
+            "stop": self._scan_key(query, "stop"),
+            "prefix": self._scan_key(query, "prefix"),
+            "limit": self._positive_int(query, "limit"),
+            "batch_size": self._positive_int(query, "batch_size") or 1000,
+        }
+        needle = self._scan_key(query, "value_contains")
+        if needle is not None:
+            options["predicate"] = _value_contains(needle)
+        return options
+
+    def _scan_key(self, query: Mapping[str, str], param: str) -> Optional[bytes]:
+        value = query.get(param)
+        return value.encode() if value is not None else None
+
+    def _positive_int(self, query: Mapping[str, str], param: str) -> Optional[int]:
+        value = query.get(param)
+        if value is None:
+            return None
+        try:
+            number = int(value)
+        except ValueError:
+            raise self.ParseError(f"{param} must be an integer", value=value)
+        if number < 1:
+            raise self.ValidationError(f"{param} must be at least 1", value=value)
+        return number
+
+    async def _local_chunks(
+        self, first: ScanBatch, batches: Iterator[ScanBatch]
+    ) -> AsyncIterator[bytes]:
+        yield b"".join(_batch_lines(first))
+        for batch in batches:
+            # scanning the store blocks, so let other tasks run between batches.
+            await asyncio.sleep(0)
+            yield b"".join(_batch_lines(batch))
+
+    async def _local_lines(
+        self, table: TableT, cursor: Optional[str], options: Mapping[str, Any]
+    ) -> AsyncIterator[bytes]:
+        for batch in table.scan(cursor=cursor, **options):
+            for line in _batch_lines(batch):
+                yield line
+            await asyncio.sleep(0)
+
+    def _fan_out(
+        self,
+        request: web.Request,
+        table: TableT,
+        query: Mapping[str, str],
+        options: Mapping[str, Any],
+    ) -> AsyncIterator[bytes]:
+        # Scans the workers one after the other, in the order of their
+        # URL, rewriting the cursors they return to include their URL.
+        router = self.app.router
+        hosts = router.table_hosts(table.name)
+        index, cursor = 0, None
+        if "cursor" in query:
+            host, cursor = _split_global_cursor(query["cursor"])
+            if host not in hosts:
+                # the worker left the group, or the token is invalid.
+                raise self.ValidationError("cursor expired", cursor=query["cursor"])
+            index = hosts.index(host)
+        remaining: Optional[int] = options["limit"]
+        forwarded = {
+            param: query[param] for param in FORWARDED_SCAN_PARAMS if param in query
+        }
+        forwarded["local"] = "1"
+        return self._scan_hosts(
+            request, table, hosts[index:], cursor, remaining, forwarded, options
+        )
+
+    async def _scan_hosts(
+        self,
+        request: web.Request,
+        table: TableT,
+        hosts: List[URL],
+        cursor: Optional[str],
+        remaining: Optional[int],
+        forwarded: Mapping[str, str],
+        options: Mapping[str, Any],
+    ) -> AsyncIterator[bytes]:
+        router = self.app.router
+        for i, host in enumerate(hosts):
+            host_query = dict(forwarded)
+            if cursor:
+                host_query["cursor"] = cursor
+            if remaining is not None:
+                host_query["limit"] = str(remaining)
+            try:
+                lines = router.stream_req(host, request, host_query)
+            except SameNode:
+                lines = self._local_lines(
+                    table, cursor or None, {**options, "limit": remaining}
+                )
+            rows: List[bytes] = []
+            host_cursor: Optional[str] = None
+            try:
+                async for line in lines:
+                    if not line.startswith(b'{"cursor"'):
+                        rows.append(line)
+                        continue
+                    host_cursor = _json.loads(line)["cursor"]
+                    if remaining is not None:
+                        remaining -= len(rows)
+                    if host_cursor is not None:
+                        rows.append(_cursor_line(_global_cursor(host, host_cursor)))
+                    elif i + 1 < len(hosts):
+                        # done with this host: if the scan of the next host
+                        # is interrupted, resume from its start, not from
+                        # the last batch of this host.
+                        rows.append(_cursor_line(_global_cursor(hosts[i + 1], "")))
+                    yield b"".join(rows)
+                    rows = []
+            except Exception as exc:
+                logger.warning(
+                    "Scan of table %r on %s failed: %r", table.name, host, exc
+                )
+                return
+            if host_cursor is not None:
+                # stopped at limit
+                return
+            cursor = None
+            if remaining == 0:
+                if i + 1 < len(hosts):
+                    # cursor of the next host already sent.
+                    return
+                break
+        yield _cursor_line(None)
+
+
+@blueprint.route("/{name}/_mget/", name="multi-get")
+class TableMultiGet(TableView):
+    """
+    ---
+    description: Look up values of many keys in table.
+    tags:
+    - Faust
+    parameters:
+    - in: path
+      name: name
+      type: string
+      required: true
+    - in: body
+      name: body
+      description: 'Object with list of keys to look up: {"keys": [...]}.'
+      required: true
+    - in: query
+      name: local
+      type: boolean
+      description: Only look up keys stored by this worker.
+    consumes:
+    - application/json
+    produces:
+    - application/json
+    """
+
+    async def post(self, request: web.Request, name: str) -> web.Response:
+        """Return JSON object with the values of keys found in table.
+
+        The keys are grouped by the worker hosting them, and looked
+        up on all those workers concurrently, with one request each.
+        Their responses are merged without deserializing them.
+        """
+        table = self.get_table_or_404(name)
+        keys = await self._keys(request)
+        local = request.query.get("local", "").lower() in ("1", "true", "yes")
+        if local or table.is_global:
+            return self.json(table.get_many(keys))
+        try:
+            stores = self.app.router.keys_by_store(name, keys)
+        except KeyError:
+            raise ServiceUnavailable()
+        bodies = await asyncio.gather(
+            *(
+                self._get_many(request, table, url, store_keys)
+                for url, store_keys in stores.items()
+            )
+        )
+        return self.bytes(_merge_json_objects(bodies), content_type="application/json")
+
+    async def _keys(self, request: web.Request) -> List[str]:
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise self.ParseError("body must be JSON")
+        keys = payload.get("keys") if isinstance(payload, dict) else None
+        if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+            raise self.ValidationError("keys must be a list of strings")
+        return keys
+
+    async def _get_many(
+        self, request: web.Request, table: TableT, url: URL, keys: List[K]
+    ) -> bytes:
+        try:
+            return await self.app.router.get_many_req(url, table.name, keys, request)
+        except SameNode:
+            return dumps_json(table.get_many(keys))
+
+
 @blueprint.route("/{name}/{key}/", name="key-detail")
 class TableKeyDetail(TableView):
     """
@@ -116,3 +416,44 @@ class TableKeyDetail(TableView):
             table = self.get_table_or_404(name)
             value = self.get_table_value_or_404(table, key)
             return self.json(value)
+
+
+def _value_contains(needle: bytes) -> ScanPredicate:
+    def predicate(key: bytes, value: bytes) -> bool:
+        return needle in value
+
+    return predicate
+
+
+def _dumps_line(obj: Any) -> bytes:
+    return dumps_json(obj) + b"\n"
+
+
+def _merge_json_objects(bodies: List[bytes]) -> bytes:
+    # Merges serialized JSON objects having no keys in common.
+    members = [body.strip()[1:-1].strip() for body in bodies]
+    return b"{" + b",".join(member for member in members if member) + b"}"
+
+
+def _cursor_line(cursor: Optional[str]) -> bytes:
+    return _dumps_line({"cursor": cursor})
+
+
+def _batch_lines(batch: ScanBatch) -> List[bytes]:
+    lines = [_dumps_line({"key": key, "value": value}) for key, value in batch.items]
+    lines.append(_cursor_line(batch.cursor))
+    return lines
+
+
+def _global_cursor(host: URL, cursor: str) -> str:
+    token = base64.urlsafe_b64encode(str(host).encode()).rstrip(b"=").decode()
+    return f"{token}.{cursor}"
+
+
+def _split_global_cursor(cursor: str) -> Tuple[Optional[URL], str]:
+    token, _, local_cursor = cursor.partition(".")
+    try:
+        host = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+    except ValueError:
+        return None, local_cursor
+    return URL(host), local_cursor
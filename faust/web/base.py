@@ -7,6 +7,7 @@ from http import HTTPStatus
 from pathlib import Path
 from typing import (
     Any,
+    AsyncIterable,
     Callable,
     ClassVar,
     Iterable,
@@ -26,7 +27,14 @@ from mode.utils.imports import SymbolArg, symbol_by_name
 from yarl import URL
 
 from faust.types import AppT
-from faust.types.web import BlueprintT, ResourceOptions, View
+from faust.types.web import (
+    BlueprintT,
+    CachedResponse,
+    ResourceOptions,
+    RPCHandler,
+    View,
+)
+from faust.utils import json as _json
 
 __all__ = [
     "DEFAULT_BLUEPRINTS",
@@ -58,6 +66,7 @@ DEBUG_BLUEPRINTS: _BPList = [
 #: Blueprints that are off unless explicitly enabled.
 OPTIONAL_BLUEPRINTS: _BPList = [
     ("/performance", "faust.web.apps.metrics:blueprint"),
+    ("/rpc", "faust.web.apps.rpc:blueprint"),
 ]
 
 #: Maps a blueprint to the setting that enables it.
@@ -70,6 +79,7 @@ BLUEPRINT_FLAGS: Mapping[str, str] = {
     "faust.web.apps.graph:blueprint": "web_graph_enabled",
     "faust.web.apps.stats:blueprint": "web_stats_enabled",
     "faust.web.apps.metrics:blueprint": "web_metrics_enabled",
+    "faust.web.apps.rpc:blueprint": "web_rpc_enabled",
 }
 
 CONTENT_SEPARATOR: bytes = b"\r\n\r\n"
@@ -77,6 +87,15 @@ HEADER_SEPARATOR: bytes = b"\r\n"
 HEADER_KEY_VALUE_SEPARATOR: bytes = b": "
 
 
+def dumps_json(obj: Any) -> bytes:
+    """Serialize ``obj`` to JSON, as :class:`bytes`."""
+    # normal json returns str, orjson returns bytes.
+    payload: Any = _json.dumps(obj)
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return payload
+
+
 class Response:
     """Web server response and status."""
 
@@ -291,6 +310,35 @@ class Web(Service):
         """Create new ``bytes`` response - for binary data."""
         ...
 
+    @abc.abstractmethod
+    async def stream(
+        self,
+        request: "Request",
+        chunks: AsyncIterable[_bytes],
+        *,
+        content_type: Optional[str] = None,
+        status: int = 200,
+        reason: Optional[str] = None,
+        headers: Optional[MutableMapping] = None,
+    ) -> Response:
+        """Send response body in chunks, as they are produced.
+
+        The response is sent using chunked transfer encoding,
+        so the size of the body does not have to be known upfront.
+        """
+        ...
+
+    @abc.abstractmethod
+    async def websocket(self, request: "Request", handler: RPCHandler) -> Response:
+        """Serve WebSocket connection, replying to binary messages.
+
+        Every binary message received is passed to ``handler``, and the
+        bytes returned are sent back.  Messages are handled concurrently,
+        so replies may be sent in a different order than the messages
+        were received.
+        """
+        ...
+
     @abc.abstractmethod
     def bytes_to_response(self, s: _bytes) -> Response:
         """Deserialize HTTP response from byte string."""
@@ -329,6 +377,9 @@ class Web(Service):
         )
 
     def _headers_serialize(self, headers: Mapping) -> _bytes:
+        return self._header_items_serialize(headers.items())
+
+    def _header_items_serialize(self, items: Iterable[Tuple[Any, Any]]) -> _bytes:
         return self.header_separator.join(
             self.header_key_value_separator.join(
                 [
@@ -336,7 +387,57 @@ class Web(Service):
                     v if isinstance(v, _bytes) else v.encode("latin-1"),
                 ]
             )
-            for k, v in headers.items()
+            for k, v in items
+        )
+
+    @abc.abstractmethod
+    def response_to_cached(self, response: Response) -> Optional[CachedResponse]:
+        """Return HTTP response as stored in the cache.
+
+        Returns :const:`None` for responses that cannot be cached,
+        like streamed responses, the body of which is already sent.
+        """
+        ...
+
+    @abc.abstractmethod
+    def cached_to_response(self, cached: CachedResponse) -> Response:
+        """Create HTTP response from response stored in the cache.
+
+        The body is sent as-is, without copying it.
+        """
+        ...
+
+    def cached_to_bytes(self, cached: CachedResponse) -> _bytes:
+        """Serialize cached HTTP response into byte string.
+
+        Uses the same format as :meth:`response_to_bytes`.
+        """
+        sep = self.content_separator
+        return b"".join(
+            [
+                str(cached.status).encode(),
+                sep,
+                self._header_items_serialize(cached.headers),
+                sep,
+                cached.body,
+            ]
+        )
+
+    def bytes_to_cached(self, s: _bytes) -> CachedResponse:
+        """Deserialize cached HTTP response from byte string.
+
+        Copies the body out of ``s`` only once.
+        """
+        sep = self.content_separator
+        status_end = s.index(sep)
+        headers_start = status_end + len(sep)
+        headers_end = s.index(sep, headers_start)
+        return CachedResponse(
+            int(s[:status_end]),
+            tuple(
+                self._splitheader(h) for h in s[headers_start:headers_end].splitlines()
+            ),
+            s[headers_end + len(sep) :],
         )
 
     @abc.abstractmethod
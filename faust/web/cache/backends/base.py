@@ -2,14 +2,23 @@
 
 import abc
 from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator, ClassVar, Optional, Tuple, Type, Union
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    ClassVar,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from mode import Service
 from mode.utils.logging import get_logger
 from yarl import URL
 
 from faust.types import AppT
-from faust.types.web import CacheBackendT
+from faust.types.web import CacheBackendT, CachedResponse
 from faust.web.cache.exceptions import CacheUnavailable
 
 logger = get_logger(__name__)
@@ -66,6 +75,23 @@ class CacheBackend(CacheBackendT, Service):
         async with self._recovery_context(key):
             await self._delete(key)
 
+    async def get_response(
+        self, key: str, loads: Callable[[bytes], CachedResponse]
+    ) -> Optional[CachedResponse]:
+        """Get cached HTTP response by key, deserialized using ``loads``."""
+        payload = await self.get(key)
+        return loads(payload) if payload is not None else None
+
+    async def set_response(
+        self,
+        key: str,
+        response: CachedResponse,
+        dumps: Callable[[CachedResponse], bytes],
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Set cached HTTP response by key, serialized using ``dumps``."""
+        await self.set(key, dumps(response), timeout)
+
     @asynccontextmanager
     async def _recovery_context(self, key: str) -> AsyncGenerator:
         try:
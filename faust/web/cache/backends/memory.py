@@ -3,10 +3,12 @@
 import sys
 import time
 from contextlib import suppress
-from typing import Callable, Dict, Generic, Optional, TypeVar
+from typing import Callable, Dict, Generic, Optional, TypeVar, Union
 
 from mode.utils.compat import want_bytes
 
+from faust.types.web import CachedResponse
+
 from . import base
 
 KT = TypeVar("KT")
@@ -80,22 +82,55 @@ class CacheStorage(Generic[KT, VT]):
 
 
 class CacheBackend(base.CacheBackend):
-    """In-memory backend for cache operations."""
+    """In-memory backend for cache operations.
+
+    HTTP responses are kept as they are sent, without serializing them,
+    so a cache hit neither parses nor copies the response body.
+    """
 
     def __post_init__(self) -> None:
         # we reuse this in t/conftest to mock a Redis server :D
-        self.storage: CacheStorage[str, bytes] = CacheStorage()
+        self.storage: CacheStorage[str, Union[bytes, CachedResponse]] = CacheStorage()
 
     async def _get(self, key: str) -> Optional[bytes]:
-        return self.storage.get(key)
+        value = self.storage.get(key)
+        # responses set by set_response() are only read by get_response().
+        return value if isinstance(value, bytes) else None
 
     async def _set(
         self, key: str, value: bytes, timeout: Optional[float] = None
+    ) -> None:
+        self._store(key, want_bytes(value), timeout)
+
+    def _store(
+        self,
+        key: str,
+        value: Union[bytes, CachedResponse],
+        timeout: Optional[float] = None,
     ) -> None:
         if timeout is not None:
-            self.storage.setex(key, timeout, want_bytes(value))
+            self.storage.setex(key, timeout, value)
         else:
-            self.storage.set(key, want_bytes(value))
+            self.storage.set(key, value)
+
+    async def get_response(
+        self, key: str, loads: Callable[[bytes], CachedResponse]
+    ) -> Optional[CachedResponse]:
+        """Get cached HTTP response by key."""
+        value = self.storage.get(key)
+        if isinstance(value, bytes):
+            return loads(value)
+        return value
+
+    async def set_response(
+        self,
+        key: str,
+        response: CachedResponse,
+        dumps: Callable[[CachedResponse], bytes],
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Set cached HTTP response by key."""
+        self._store(key, response, timeout)
 
     async def _delete(self, key: str) -> None:
         self.storage.delete(key)
@@ -91,9 +91,9 @@ class Cache(CacheT):
         """Get cached value for HTTP view request."""
         backend = self._view_backend(view)
         with suppress(backend.Unavailable):
-            payload = await backend.get(key)
-            if payload is not None:
-                return view.bytes_to_response(payload)
+            cached = await backend.get_response(key, view.web.bytes_to_cached)
+            if cached is not None:
+                return view.web.cached_to_response(cached)
         return None
 
     def _view_backend(self, view: View) -> CacheBackendT:
@@ -108,11 +108,15 @@ class Cache(CacheT):
     ) -> None:
         """Set cached value for HTTP view request."""
         backend = self._view_backend(view)
+        cached = view.web.response_to_cached(response)
+        if cached is None:
+            return None
         _timeout = timeout if timeout is not None else self.timeout
         with suppress(backend.Unavailable):
-            return await backend.set(
+            return await backend.set_response(
                 key,
-                view.response_to_bytes(response),
+                cached,
+                view.web.cached_to_bytes,
                 want_seconds(_timeout) if _timeout is not None else None,
             )
 
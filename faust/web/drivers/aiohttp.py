@@ -1,10 +1,21 @@
 """Web driver using :pypi:`aiohttp`."""
 
+import asyncio
 from pathlib import Path
-from typing import Any, Callable, Mapping, MutableMapping, Optional, Union, cast
+from typing import (
+    Any,
+    AsyncIterable,
+    Callable,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Set,
+    Union,
+    cast,
+)
 
 import aiohttp_cors
-from aiohttp import __version__ as aiohttp_version
+from aiohttp import WSMsgType, __version__ as aiohttp_version
 from aiohttp.payload import Payload
 from aiohttp.web import (
     Application,
@@ -12,15 +23,22 @@ from aiohttp.web import (
     BaseSite,
     Request,
     Response,
+    StreamResponse,
     TCPSite,
     UnixSite,
+    WebSocketResponse,
 )
 from aiohttp_cors import CorsConfig, ResourceOptions
 from mode import Service
 from mode.threads import ServiceThread
 
 from faust.types import AppT
-from faust.types.web import ResourceOptions as _ResourceOptions, View
+from faust.types.web import (
+    CachedResponse,
+    ResourceOptions as _ResourceOptions,
+    RPCHandler,
+    View,
+)
 from faust.utils import json as _json
 from faust.web import base
 
@@ -278,6 +296,50 @@ class Web(base.Web):
         """Add route for static assets."""
         self.web_app.router.add_static(prefix, str(path), **kwargs)
 
+    async def stream(
+        self,
+        request: base.Request,
+        chunks: AsyncIterable[_bytes],
+        *,
+        content_type: Optional[str] = None,
+        status: int = 200,
+        reason: Optional[str] = None,
+        headers: Optional[MutableMapping] = None,
+    ) -> base.Response:
+        """Send response body in chunks, as they are produced."""
+        response = StreamResponse(status=status, reason=reason, headers=headers)
+        response.content_type = content_type or "application/octet-stream"
+        response.enable_chunked_encoding()
+        await response.prepare(cast(Request, request))
+        async for chunk in chunks:
+            await response.write(chunk)
+        await response.write_eof()
+        return cast(base.Response, response)
+
+    async def websocket(
+        self, request: base.Request, handler: RPCHandler
+    ) -> base.Response:
+        """Serve WebSocket connection, replying to binary messages."""
+        ws = WebSocketResponse(heartbeat=30.0)
+        await ws.prepare(cast(Request, request))
+        pending: Set[asyncio.Task] = set()
+
+        async def reply(data: _bytes) -> None:
+            response = await handler(data)
+            if not ws.closed:
+                await ws.send_bytes(response)
+
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.BINARY:
+                    task = asyncio.create_task(reply(message.data))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+        finally:
+            for task in list(pending):
+                task.cancel()
+        return cast(base.Response, ws)
+
     def bytes_to_response(self, s: _bytes) -> base.Response:
         """Deserialize byte string back into a response object."""
         status, headers, body = self._bytes_to_response(s)
@@ -288,6 +350,27 @@ class Web(base.Web):
         )
         return cast(base.Response, response)
 
+    def response_to_cached(self, response: base.Response) -> Optional[CachedResponse]:
+        """Return HTTP response as stored in the cache.
+
+        Returns :const:`None` for streamed responses and payloads.
+        """
+        resp = cast(StreamResponse, response)
+        if not isinstance(resp, Response) or isinstance(resp.body, Payload):
+            return None
+        # bytes(body) is the body itself if it is bytes already.
+        body = b"" if resp.body is None else bytes(resp.body)
+        return CachedResponse(resp.status, tuple(resp.headers.items()), body)
+
+    def cached_to_response(self, cached: CachedResponse) -> base.Response:
+        """Create HTTP response from response stored in the cache."""
+        response = Response(
+            body=cached.body,
+            status=cached.status,
+            headers=cached.headers,
+        )
+        return cast(base.Response, response)
+
     def response_to_bytes(self, response: base.Response) -> _bytes:
         """Convert response to serializable byte string.
 
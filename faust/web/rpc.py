@@ -0,0 +1,246 @@
+"""Remote procedure calls between workers.
+
+Enabled with the :setting:`web_rpc_enabled` setting, workers call each
+other over one long-lived WebSocket connection to the ``/rpc/``
+endpoint of every other worker they talk to, keyed by its
+:setting:`canonical_url`.  Calls are pipelined: many calls can be
+waiting for a reply on the same connection, and are answered in the
+order they complete.
+
+Every call and reply is a binary WebSocket message (a frame), made of
+a header and the payload::
+
+    kind (uint8) | call id (uint32) | method length (uint16) | method | payload
+
+where ``kind`` is :const:`REQUEST` (with the name of the method called)
+or :const:`RESPONSE` or :const:`ERROR` (with an empty method name),
+sent back with the id of the call.  The payload of an error is the
+error message.
+
+Handlers are registered by method name in :attr:`RPCClient.handlers`,
+and are called with the payload of the request, returning the payload
+of the response.  The built-in handlers are:
+
+- ``agents.reply``: fulfills :meth:`@Agent.ask` requests, taking a
+  serialized :class:`~faust.agents.models.ReqRepResponse`.
+- ``tables.get_many``: looks up keys in a table, taking a JSON object
+  ``{"table": name, "keys": [...]}`` and returning a JSON object of
+  the keys found.
+"""
+
+import asyncio
+import struct
+from itertools import count
+from time import monotonic
+from typing import Dict, Iterator, MutableMapping, Optional, Tuple, Union
+
+import aiohttp
+from mode import Seconds, get_logger, want_seconds
+from yarl import URL
+
+from faust.exceptions import RPCError
+from faust.types import AppT
+from faust.types.web import RPCClientT, RPCHandler
+from faust.utils import json as _json
+from faust.web.base import dumps_json
+
+__all__ = ["RPCClient", "pack_frame", "unpack_frame"]
+
+logger = get_logger(__name__)
+
+REQUEST = 0
+RESPONSE = 1
+ERROR = 2
+
+#: Path of the endpoint serving remote procedure calls.
+RPC_PATH = "/rpc/"
+
+_HEADER = struct.Struct(">BIH")
+
+
+def pack_frame(
+    kind: int, call_id: int, payload: bytes = b"", method: str = ""
+) -> bytes:
+    """Create frame sent for a call or a reply."""
+    name = method.encode()
+    return _HEADER.pack(kind, call_id, len(name)) + name + payload
+
+
+def unpack_frame(data: bytes) -> Tuple[int, int, str, bytes]:
+    """Split frame into kind, call id, method name and payload.
+
+    Raises:
+        ValueError: if the frame is truncated.
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated RPC frame")
+    kind, call_id, name_size = _HEADER.unpack_from(data)
+    start = _HEADER.size + name_size
+    if len(data) < start:
+        raise ValueError("Truncated RPC frame")
+    return kind, call_id, data[_HEADER.size : start].decode(), data[start:]
+
+
+class _Channel:
+    """Connection to the RPC endpoint of another worker."""
+
+    def __init__(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        self.ws = ws
+        self.pending: Dict[int, asyncio.Future] = {}
+        self._call_ids: Iterator[int] = count(1)
+        self.reader = asyncio.ensure_future(self._read())
+
+    @property
+    def closed(self) -> bool:
+        return self.ws.closed or self.reader.done()
+
+    async def call(self, method: str, payload: bytes) -> bytes:
+        call_id = next(self._call_ids) & 0xFFFFFFFF
+        reply = self.pending[call_id] = asyncio.get_running_loop().create_future()
+        try:
+            await self.ws.send_bytes(pack_frame(REQUEST, call_id, payload, method))
+            return await reply
+        finally:
+            self.pending.pop(call_id, None)
+
+    async def _read(self) -> None:
+        try:
+            async for message in self.ws:
+                if message.type != aiohttp.WSMsgType.BINARY:
+                    continue
+                kind, call_id, _, payload = unpack_frame(message.data)
+                reply = self.pending.get(call_id)
+                if reply is None or reply.done():
+                    continue  # call timed out
+                if kind == ERROR:
+                    reply.set_exception(RPCError(payload.decode()))
+                else:
+                    reply.set_result(payload)
+        finally:
+            for reply in self.pending.values():
+                if not reply.done():
+                    reply.set_exception(RPCError("RPC connection closed"))
+
+    async def close(self) -> None:
+        await self.ws.close()
+        await self.reader
+
+
+class RPCClient(RPCClientT):
+    """Calls procedures of other workers, and serves calls of other workers."""
+
+    handlers: MutableMapping[str, RPCHandler]
+
+    #: Seconds calls to a worker that could not be reached, or did not
+    #: reply in time, fail right away instead of trying to reach it again.
+    failure_backoff: float = 10.0
+
+    _channels: Dict[URL, _Channel]
+    _connecting: Dict[URL, asyncio.Lock]
+
+    #: URL -> time calls to the worker are tried again.
+    _unavailable_until: Dict[URL, float]
+
+    def __init__(self, app: AppT) -> None:
+        self.app = app
+        self.handlers = {
+            "agents.reply": self._on_agent_reply,
+            "tables.get_many": self._on_table_get_many,
+        }
+        self._channels = {}
+        self._connecting = {}
+        self._unavailable_until = {}
+
+    async def call(
+        self,
+        url: Union[URL, str],
+        method: str,
+        payload: bytes,
+        *,
+        timeout: Optional[Seconds] = None,
+    ) -> bytes:
+        """Call procedure of the worker having the canonical URL ``url``.
+
+        The timeout (see :setting:`web_rpc_timeout`) includes
+        connecting to the worker.  Once a worker could not be reached
+        or did not reply in time, calls to it fail right away for
+        :attr:`failure_backoff` seconds.
+
+        Raises:
+            RPCError: if the call failed, did not complete in time
+                or the worker could not be reached.
+        """
+        url = URL(url)
+        unavailable_until = self._unavailable_until.get(url)
+        if unavailable_until is not None:
+            if monotonic() < unavailable_until:
+                raise RPCError(f"RPC call {method!r} to {url}: worker unavailable")
+            del self._unavailable_until[url]
+        timeout = want_seconds(
+            timeout if timeout is not None else self.app.conf.web_rpc_timeout
+        )
+        try:
+            return await asyncio.wait_for(self._call(url, method, payload), timeout)
+        except asyncio.TimeoutError as exc:
+            self._unavailable_until[url] = monotonic() + self.failure_backoff
+            raise RPCError(f"RPC call {method!r} to {url} timed out") from exc
+        except (aiohttp.ClientError, ConnectionError) as exc:
+            self._unavailable_until[url] = monotonic() + self.failure_backoff
+            raise RPCError(f"RPC call {method!r} to {url} failed: {exc!r}") from exc
+
+    async def _call(self, url: URL, method: str, payload: bytes) -> bytes:
+        channel = await self._channel(url)
+        return await channel.call(method, payload)
+
+    async def _channel(self, url: URL) -> _Channel:
+        channel = self._channels.get(url)
+        if channel is None or channel.closed:
+            lock = self._connecting.setdefault(url, asyncio.Lock())
+            async with lock:
+                channel = self._channels.get(url)
+                if channel is None or channel.closed:
+                    ws = await self.app.http_client.ws_connect(
+                        url.with_path(RPC_PATH), heartbeat=30.0
+                    )
+                    channel = self._channels[url] = _Channel(ws)
+        return channel
+
+    async def handle(self, data: bytes) -> bytes:
+        """Serve call of another worker, returning the reply frame."""
+        try:
+            kind, call_id, method, payload = unpack_frame(data)
+        except ValueError as exc:
+            return pack_frame(ERROR, 0, str(exc).encode())
+        handler = self.handlers.get(method)
+        if kind != REQUEST or handler is None:
+            message = f"Unknown RPC method: {method!r}"
+            return pack_frame(ERROR, call_id, message.encode())
+        try:
+            return pack_frame(RESPONSE, call_id, await handler(payload))
+        except RPCError as exc:
+            return pack_frame(ERROR, call_id, str(exc).encode())
+        except Exception as exc:
+            logger.exception("RPC method %r raised: %r", method, exc)
+            return pack_frame(ERROR, call_id, repr(exc).encode())
+
+    async def close(self) -> None:
+        """Close connections to other workers."""
+        channels, self._channels = self._channels, {}
+        for channel in channels.values():
+            await channel.close()
+
+    async def _on_agent_reply(self, payload: bytes) -> bytes:
+        from faust.agents.models import ReqRepResponse
+
+        reply = ReqRepResponse.loads(payload)
+        consumer = self.app._reply_consumer  # type: ignore[attr-defined]
+        if not consumer.fulfill(reply):
+            # the promise may not be registered yet: have the reply
+            # sent to the reply topic instead.
+            raise RPCError(f"Not waiting for reply {reply.correlation_id!r}")
+        return b""
+
+    async def _on_table_get_many(self, payload: bytes) -> bytes:
+        request = _json.loads(payload)
+        table = self.app.tables[request["table"]]
+        return dumps_json(table.get_many(request["keys"]))  # type: ignore[attr-defined]
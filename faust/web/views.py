@@ -3,6 +3,7 @@
 from functools import wraps
 from typing import (
     Any,
+    AsyncIterable,
     Awaitable,
     Callable,
     ClassVar,
@@ -19,7 +20,7 @@ from typing import (
 from yarl import URL
 
 from faust.types import AppT, ModelT
-from faust.types.web import ViewDecorator, ViewHandlerFun
+from faust.types.web import RPCHandler, ViewDecorator, ViewHandlerFun
 
 from . import exceptions
 from .base import Request, Response, Web
@@ -272,6 +273,30 @@ class View:
             headers=headers,
         )
 
+    async def stream(
+        self,
+        request: Request,
+        chunks: AsyncIterable[_bytes],
+        *,
+        content_type: Optional[str] = None,
+        status: int = 200,
+        reason: Optional[str] = None,
+        headers: Optional[MutableMapping] = None,
+    ) -> Response:
+        """Send response body in chunks, as they are produced."""
+        return await self.web.stream(
+            request,
+            chunks,
+            content_type=content_type,
+            status=status,
+            reason=reason,
+            headers=headers,
+        )
+
+    async def websocket(self, request: Request, handler: RPCHandler) -> Response:
+        """Serve WebSocket connection, replying to binary messages."""
+        return await self.web.websocket(request, handler)
+
     async def read_request_content(self, request: Request) -> _bytes:
         """Return the request body as bytes."""
         return await self.web.read_request_content(request)
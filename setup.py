@@ -49,6 +49,7 @@ BUNDLES = {
     "fast",
     "fastapi",
     "fickling",
+    "numpy",
     "opentelemetry",
     "opentracing",
     "orjson",
@@ -1605,3 +1605,168 @@ def test_Secret(*, caplog):
 
     assert x.phone_number.get_value() not in caplog.text
     assert x.phone_number.mask in caplog.text
+
+
+class Decoded(Record):
+    id: int
+    name: str
+    tags: List[str]
+    account: Account
+    ratio: float = 1.0
+    alias: Optional[str] = None
+    created: Optional[datetime] = None
+
+
+class DecodedCoerced(Record, coerce=True, isodates=True, decimals=True):
+    id: int
+    price: Decimal
+    created: datetime
+    name: str = StringField(required=False, default="x", trim_whitespace=True)
+
+
+class DecodedTagged(Record):
+    name: str
+    phone_number: Secret[str] = None
+
+
+class DecodedRenamed(Record):
+    name: str = StringField(input_name="Name")
+
+
+def _decoded_state(obj):
+    return {
+        key: getattr(obj, key) if key in obj._options.fieldset else value
+        for key, value in obj.__dict__.items()
+        if key != "__evaluated_fields__"
+    }
+
+
+@pytest.mark.parametrize(
+    "model,data",
+    [
+        (
+            Decoded,
+            {
+                "id": 1,
+                "name": "foo",
+                "tags": ["a"],
+                "account": {"id": "1", "name": "bar"},
+                "alias": None,
+            },
+        ),
+        (
+            Decoded,
+            {
+                "id": 1,
+                "name": "foo",
+                "tags": [],
+                "account": {"id": "1", "name": "bar", "active": False},
+                "ratio": 3.3,
+                "alias": "baz",
+                "created": "2020-01-01T00:00:00",
+                "unknown": 1,
+                "__faust": {"ns": Decoded._options.namespace},
+            },
+        ),
+        (
+            DecodedCoerced,
+            {"id": "3", "price": "1.10", "created": "2020-01-01T00:00:00"},
+        ),
+        (
+            DecodedCoerced,
+            {
+                "id": 3,
+                "price": 1,
+                "created": "2020-01-01T00:00:00",
+                "name": "  y  ",
+            },
+        ),
+        (DecodedRenamed, {"Name": "foo"}),
+    ],
+)
+def test_from_data__matches_init(model, data):
+    decoded = model.from_data(dict(data))
+    expected = dict(data)
+    model._input_translate_fields(expected)
+    constructed = model(**expected, __strict__=False)
+    assert type(decoded) is model
+    assert _decoded_state(decoded) == _decoded_state(constructed)
+    assert decoded == constructed
+
+
+def test_from_data__keeps_unknown_fields():
+    account = Account.from_data(
+        {
+            "id": "1",
+            "name": "foo",
+            "extra": 3,
+            "__faust": {"ns": Account._options.namespace},
+        }
+    )
+    assert account.extra == 3
+    assert "__faust" not in account.__dict__
+
+
+def test_from_data__lazy_fields():
+    decoded = Decoded.from_data(
+        {"id": 1, "name": "foo", "tags": [], "account": {"id": "1", "name": "b"}}
+    )
+    assert isinstance(decoded.__dict__["account"], dict)
+    assert decoded.account == Account(id="1", name="b")
+    assert decoded.__evaluated_fields__ == {"account"}
+
+
+def test_from_data__tagged():
+    decoded = DecodedTagged.from_data({"name": "foo", "phone_number": "123"})
+    assert decoded.phone_number.get_value() == "123"
+    assert str(decoded.phone_number) == decoded.phone_number.mask
+
+
+def test_from_data__post_init_and_validation():
+    class Validated(Record, validation=True):
+        name: str = StringField(max_length=3)
+
+        def __post_init__(self) -> None:
+            self.initialized = True
+
+    assert Validated.from_data({"name": "foo"}).initialized
+    with pytest.raises(ValidationError):
+        Validated.from_data({"name": "foobar"})
+
+
+def test_from_data__subclass_with_custom_init():
+    calls = []
+
+    class Point(Record):
+        x: int
+
+    class Point3D(Point):
+        y: int
+
+        def __init__(self, *args, **kwargs):
+            calls.append(kwargs)
+            super().__init__(*args, **kwargs)
+
+    point = Point3D.from_data({"x": 1, "y": 2})
+    assert type(point) is Point3D
+    assert calls == [{"x": 1, "y": 2, "__strict__": False}]
+
+
+def test_decodes_as_is():
+    descriptors = Decoded._options.descriptors
+    assert descriptors["id"].decodes_as_is()
+    assert descriptors["tags"].decodes_as_is()
+    assert descriptors["account"].decodes_as_is()
+    assert not descriptors["created"].decodes_as_is()
+    coerced = DecodedCoerced._options.descriptors
+    assert not any(d.decodes_as_is() for d in coerced.values())
+    assert not DecodedTagged._options.descriptors["phone_number"].decodes_as_is()
+
+    class CustomField(IntegerField):
+        def prepare_value(self, value, *, coerce=None):
+            return value
+
+    class Custom(Record):
+        x: int = CustomField()
+
+    assert not Custom._options.descriptors["x"].decodes_as_is()
@@ -746,12 +746,12 @@ async def test_take_cleanup_on_stream_stop(app):
     """An abandoned take() generator is closed when the stream stops.
 
     Breaking out of ``async for`` leaves the generator suspended; its cleanup
-    (acking consumed events, restoring ``enable_acks``, detaching the
-    buffering processor) normally runs only when the interpreter finalizes
-    the generator.  Holding a strong reference here blocks finalization on
-    every interpreter -- mimicking PyPy, where finalization waits for a GC
-    cycle that may never come -- so this asserts the stream itself closes
-    leftover generators deterministically on stop.
+    (acking consumed events, restoring ``enable_acks``) normally runs only
+    when the interpreter finalizes the generator.  Holding a strong
+    reference here blocks finalization on every interpreter -- mimicking
+    PyPy, where finalization waits for a GC cycle that may never come -- so
+    this asserts the stream itself closes leftover generators
+    deterministically on stop.
     """
     async with new_stream(app) as s:
         assert s.enable_acks is True
@@ -849,23 +849,47 @@ async def test_take__10(app, loop):
 
 
 @pytest.mark.asyncio
-async def test_take__no_event_crashes(app, loop):
-    class NoCurrentEventStream(faust.Stream):
-        @property
-        def current_event(self):
-            return None
+async def test_take__drains_queued_values(app):
+    async with new_stream(app) as s:
+        for i in range(25):
+            await s.channel.send(value=i)
+        buffer = s.take(10, within=0.1)
+        batches = []
+        async for values in buffer:
+            batches.append(values)
+            event = mock_stream_event_ack(s)
+            if len(batches) == 3:
+                break
+        assert batches == [list(range(10)), list(range(10, 20)), list(range(20, 25))]
+        assert s.events_total == 25
+        await wait_for_stream_ack(event, buffer)
+        event.ack.assert_called_once_with()
 
-        @current_event.setter
-        def current_event(self, event):
-            pass
 
-    app.conf.Stream = NoCurrentEventStream
+@pytest.mark.asyncio
+async def test_take__deadline_starts_at_first_value(app):
+    async with new_stream(app) as s:
+        buffer = s.take(10, within=0.1)
+
+        async def send_later():
+            await asyncio.sleep(0.3)
+            await s.channel.send(value=1)
+
+        sending = asyncio.ensure_future(send_later())
+        async for values in buffer:
+            # an empty buffer is never yielded
+            assert values == [1]
+            break
+        await sending
+        await wait_for_stream_ack(None, buffer)
+
 
+@pytest.mark.asyncio
+async def test_take__no_event_crashes(app, loop):
     s = new_stream(app)
-    assert isinstance(s, NoCurrentEventStream)
     async with s:
         assert s.enable_acks is True
-        await s.channel.send(value=1)
+        await s.channel.queue.put(1)  # no associated event
         buffer_processor = s.take(10, within=10.0)
         print("STARTING STREAM ITERATION")
         async for value in buffer_processor:
@@ -5,6 +5,7 @@ import redis.asyncio as aredis
 
 import faust
 from faust.exceptions import ImproperlyConfigured
+from faust.types.web import CachedResponse
 from faust.web import Blueprint, View
 from faust.web.cache import backends
 from faust.web.cache.backends import redis
@@ -106,6 +107,22 @@ async def test_cached_view__memory_no_timeout(
         assert await response2.read() == content
 
 
+@pytest.mark.asyncio
+@pytest.mark.app(cache="memory://")
+async def test_cached_view__memory_keeps_response(*, app, bp, web_client, web):
+    app.cache.storage.clear()
+    async with app.cache:
+        client = await web_client
+        response = await model_response(await client.get(web.url_for("test:d")))
+        cached = app.cache.storage.get(response.key)
+        assert isinstance(cached, CachedResponse)
+        assert await app.cache.get(response.key) is None
+        assert await app.cache.get_response(response.key, web.bytes_to_cached) is (
+            cached
+        )
+        assert await model_value(await client.get(web.url_for("test:d"))) == 0
+
+
 @pytest.mark.asyncio
 @pytest.mark.app(cache="memory://")
 async def test_cached_view__cannot_cache(*, app, bp, web_client, web):
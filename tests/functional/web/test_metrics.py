@@ -36,13 +36,13 @@ async def test_metrics(web_client, traffic):
 
 
 async def test_latency_is_summarized_not_dumped(web_client, traffic):
-    """Monitor keeps raw deques; the endpoint must not serialize them."""
+    """Monitor keeps latency sketches; the endpoint summarizes them."""
     async with await web_client as client:
         payload = await (await client.get("/performance/")).json()
 
     commit = payload["latency"]["commit_latency"]
     assert commit["count"] == 4
-    assert commit["p50"] == 0.014
+    assert commit["p50"] == pytest.approx(0.014, rel=0.01)
     assert commit["max"] == 0.031
     assert not isinstance(commit, list)
 
@@ -58,6 +58,7 @@ async def test_latency_with_no_samples(web_client):
         "count": 0,
         "p50": None,
         "p95": None,
+        "p99": None,
         "max": None,
     }
 
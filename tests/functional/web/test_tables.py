@@ -1,4 +1,12 @@
+import json
+from unittest.mock import Mock
+
 import pytest
+from yarl import URL
+
+from faust.exceptions import SameNode
+from faust.types import TP
+from faust.web.apps.tables import _split_global_cursor
 
 
 @pytest.fixture()
@@ -67,3 +75,187 @@ async def test_table_key__missing_key(web_client, tables, table_foo, router_same
             "table": "foo-table",
             "key": "MISSINGKEY",
         }
+
+
+def ndjson(body):
+    return [json.loads(line) for line in body.splitlines()]
+
+
+async def _lines(*lines):
+    for line in lines:
+        yield line
+
+
+async def test_table_scan__local(web_client, tables, table_foo):
+    async with await web_client as client:
+        for i in range(5):
+            table_foo.data[f"k{i}"] = i
+        resp = await client.get(
+            "/table/foo-table/_scan/",
+            params={"local": "1", "batch_size": "2", "prefix": '"k'},
+        )
+        assert resp.status == 200
+        assert resp.content_type == "application/x-ndjson"
+        lines = ndjson(await resp.read())
+        assert [line["key"] for line in lines if "key" in line] == [
+            "k0",
+            "k1",
+            "k2",
+            "k3",
+            "k4",
+        ]
+        cursors = [line["cursor"] for line in lines if "cursor" in line]
+        assert len(cursors) == 3
+        assert cursors[-1] is None
+
+        resp = await client.get(
+            "/table/foo-table/_scan/",
+            params={"local": "1", "cursor": cursors[1], "value_contains": "4"},
+        )
+        assert ndjson(await resp.read()) == [
+            {"key": "k4", "value": 4},
+            {"cursor": None},
+        ]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"local": "1", "limit": "x"},
+        {"local": "1", "batch_size": "0"},
+        {"local": "1", "cursor": "!"},
+        {"cursor": "bm9wZQ.AAAAAA"},
+    ],
+)
+async def test_table_scan__invalid(params, web_client, tables, app):
+    app.router.table_hosts = Mock(return_value=[])
+    async with await web_client as client:
+        resp = await client.get("/table/foo-table/_scan/", params=params)
+        assert resp.status == 400
+
+
+async def test_table_scan__fan_out(web_client, tables, table_foo, app):
+    remote = URL("http://a.example.com:6066")
+    local = URL("http://b.example.com:6066")
+    table_foo.data.update({"x": 1, "y": 2})
+    app.router.table_hosts = Mock(return_value=[remote, local])
+
+    def stream_req(dest_url, request, query):
+        if dest_url == local:
+            raise SameNode()
+        assert query == {"local": "1", "limit": "2"}
+        return _lines(b'{"key": "a", "value": 0}\n', b'{"cursor": null}\n')
+
+    app.router.stream_req = Mock(side_effect=stream_req)
+    async with await web_client as client:
+        resp = await client.get("/table/foo-table/_scan/", params={"limit": "2"})
+        lines = ndjson(await resp.read())
+        assert [line.get("key") for line in lines] == ["a", None, "x", None]
+        assert lines[1]["cursor"].endswith(".")
+        assert lines[-1]["cursor"] is not None
+
+        resp = await client.get(
+            "/table/foo-table/_scan/", params={"cursor": lines[-1]["cursor"]}
+        )
+        assert ndjson(await resp.read()) == [
+            {"key": "y", "value": 2},
+            {"cursor": None},
+        ]
+
+
+async def test_table_scan__fan_out_error(web_client, tables, app):
+    async def failing():
+        yield b'{"key": "a", "value": 0}\n'
+        yield b'{"cursor": "AAAAAA"}\n'
+        raise ConnectionError()
+
+    app.router.table_hosts = Mock(return_value=[URL("http://a.example.com:6066")])
+    app.router.stream_req = Mock(return_value=failing())
+    async with await web_client as client:
+        resp = await client.get("/table/foo-table/_scan/")
+        lines = ndjson(await resp.read())
+        assert lines[0] == {"key": "a", "value": 0}
+        assert lines[-1]["cursor"].endswith(".AAAAAA")
+
+
+async def test_table_scan__fan_out_error_on_next_host(web_client, tables, app):
+    first = URL("http://a.example.com:6066")
+    second = URL("http://b.example.com:6066")
+
+    async def first_lines():
+        yield b'{"key": "a", "value": 0}\n'
+        yield b'{"cursor": "AAAAAA"}\n'
+        yield b'{"key": "b", "value": 1}\n'
+        yield b'{"cursor": null}\n'
+
+    async def failing():
+        raise ConnectionError()
+        yield  # pragma: no cover
+
+    app.router.table_hosts = Mock(return_value=[first, second])
+    app.router.stream_req = Mock(side_effect=[first_lines(), failing()])
+    async with await web_client as client:
+        resp = await client.get("/table/foo-table/_scan/")
+        lines = ndjson(await resp.read())
+        assert [line.get("key") for line in lines] == ["a", None, "b", None]
+        # resuming starts at the second host, without sending "b" again.
+        assert _split_global_cursor(lines[-1]["cursor"]) == (second, "")
+
+
+@pytest.fixture()
+def key_partition(app):
+    app.producer.key_partition = Mock(return_value=TP("foo-table-changelog", 0))
+
+
+async def test_table_mget__local(web_client, tables, table_foo, key_partition):
+    async with await web_client as client:
+        table_foo.data.update({"a": 1, "b": 2})
+        resp = await client.post(
+            "/table/foo-table/_mget/?local=1", json={"keys": ["a", "b", "c"]}
+        )
+        assert resp.status == 200
+        assert await resp.json() == {"a": 1, "b": 2}
+
+
+@pytest.mark.parametrize(
+    "body,status",
+    [
+        (b"not json", 400),
+        (b'{"keys": "a"}', 400),
+        (b'{"keys": [1]}', 400),
+        (b"[]", 400),
+    ],
+)
+async def test_table_mget__invalid(body, status, web_client, tables):
+    async with await web_client as client:
+        resp = await client.post("/table/foo-table/_mget/", data=body)
+        assert resp.status == status
+
+
+async def test_table_mget__routed(web_client, tables, table_foo, app, key_partition):
+    remote = URL("http://a.example.com:6066")
+    local = URL("http://b.example.com:6066")
+    table_foo.data.update({"x": 1})
+    app.router.keys_by_store = Mock(return_value={remote: ["a", "b"], local: ["x"]})
+
+    async def post_req(dest_url, request, body, query):
+        if dest_url == local:
+            raise SameNode()
+        assert json.loads(body) == {"keys": ["a", "b"]}
+        assert query == {"local": "1"}
+        return b'{"a": {"v": "\\u00e9"}}'
+
+    app.router.post_req = Mock(side_effect=post_req)
+    async with await web_client as client:
+        resp = await client.post(
+            "/table/foo-table/_mget/", json={"keys": ["a", "b", "x"]}
+        )
+        assert resp.status == 200
+        assert await resp.json() == {"a": {"v": "é"}, "x": 1}
+
+
+async def test_table_mget__unavailable(web_client, tables, app):
+    app.router.keys_by_store = Mock(side_effect=KeyError())
+    async with await web_client as client:
+        resp = await client.post("/table/foo-table/_mget/", json={"keys": ["a"]})
+        assert resp.status == 503
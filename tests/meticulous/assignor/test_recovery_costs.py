@@ -0,0 +1,192 @@
+import random
+from typing import MutableMapping
+from unittest.mock import Mock
+
+from hypothesis import assume, given, settings
+from hypothesis.strategies import integers
+
+from faust.assignor.client_assignment import (
+    ClientAssignment,
+    ClientMetadata,
+    CopartitionedAssignment,
+)
+from faust.assignor.copartitioned_assignor import CopartitionedAssignor, RecoveryCosts
+from faust.assignor.partition_assignor import PartitionAssignor
+from faust.assignor.weighted_assignor import WeightedCopartitionedAssignor
+
+from .test_copartitioned_assignor import TEST_DEADLINE, is_valid
+
+_topics = {"foo", "bar", "baz"}
+
+
+def fresh(num_clients: int) -> MutableMapping[str, CopartitionedAssignment]:
+    return {
+        str(client): CopartitionedAssignment(topics=_topics)
+        for client in range(num_clients)
+    }
+
+
+def random_costs(seed: int, partitions: int, num_clients: int) -> RecoveryCosts:
+    rng = random.Random(seed)
+    return {
+        partition: {
+            str(client): rng.randint(0, 1000)
+            for client in rng.sample(range(num_clients), rng.randint(0, num_clients))
+        }
+        for partition in range(partitions)
+    }
+
+
+@given(
+    partitions=integers(min_value=0, max_value=256),
+    replicas=integers(min_value=0, max_value=8),
+    num_clients=integers(min_value=1, max_value=64),
+    seed=integers(min_value=0),
+)
+@settings(deadline=TEST_DEADLINE)
+def test_assignment_with_recovery_costs(partitions, replicas, num_clients, seed):
+    assume(replicas < num_clients)
+    costs = random_costs(seed, partitions, num_clients)
+    for assignor in (
+        CopartitionedAssignor(
+            _topics, fresh(num_clients), partitions, replicas, recovery_costs=costs
+        ),
+        WeightedCopartitionedAssignor(
+            _topics, fresh(num_clients), partitions, replicas, recovery_costs=costs
+        ),
+    ):
+        assert is_valid(assignor.get_assignment(), partitions, replicas)
+
+
+def restarted_cluster() -> MutableMapping[str, CopartitionedAssignment]:
+    # "a" was restarted: its partitions 0 and 3 went to "b" and "c",
+    # and it rejoins with nothing assigned but their state still on disk.
+    return {
+        "a": CopartitionedAssignment(topics=_topics),
+        "b": CopartitionedAssignment(actives={0, 1, 2}, topics=_topics),
+        "c": CopartitionedAssignment(actives={3, 4, 5}, topics=_topics),
+    }
+
+
+RESTART_COSTS = {
+    0: {"a": 10, "b": 0},
+    1: {"b": 0},
+    2: {"b": 0},
+    3: {"a": 10, "c": 0},
+    4: {"c": 0},
+    5: {"c": 0},
+}
+
+
+def test_rolling_restart_returns_to_warm_client():
+    assignments = CopartitionedAssignor(
+        _topics, restarted_cluster(), 6, replicas=0, recovery_costs=RESTART_COSTS
+    ).get_assignment()
+    assert assignments["a"].actives == {0, 3}
+    assert assignments["b"].actives == {1, 2}
+    assert assignments["c"].actives == {4, 5}
+
+
+def test_rolling_restart_returns_to_warm_client__weighted():
+    cluster = restarted_cluster()
+    cluster["b"].actives = {0, 1}
+    cluster["c"].actives = {2, 3}
+    assignments = WeightedCopartitionedAssignor(
+        _topics,
+        cluster,
+        6,
+        replicas=0,
+        recovery_costs={**RESTART_COSTS, 4: {"a": 5, "c": 2}, 5: {"c": 9}},
+    ).get_assignment()
+    assert assignments["a"].actives == {4, 5}
+
+
+def test_prefers_warmest_over_standby():
+    cluster = {
+        "a": CopartitionedAssignment(standbys={0}, topics=_topics),
+        "b": CopartitionedAssignment(topics=_topics),
+        "c": CopartitionedAssignment(topics=_topics),
+    }
+    assignments = CopartitionedAssignor(
+        _topics, cluster, 1, replicas=1, recovery_costs={0: {"a": 500, "b": 3}}
+    ).get_assignment()
+    assert assignments["b"].actives == {0}
+    assert assignments["a"].standbys == {0}
+
+
+def test_warm_standby_promoted_over_cold():
+    for assignor in (CopartitionedAssignor, WeightedCopartitionedAssignor):
+        cluster = {
+            "a": CopartitionedAssignment(standbys={0}, topics=_topics),
+            "b": CopartitionedAssignment(standbys={0}, topics=_topics),
+        }
+        assignments = assignor(
+            _topics, cluster, 1, replicas=1, recovery_costs={0: {"b": 0}}
+        ).get_assignment()
+        assert assignments["b"].actives == {0}
+        assert assignments["a"].standbys == {0}
+
+
+def test_standbys_placed_on_warm_clients():
+    assignments = CopartitionedAssignor(
+        _topics,
+        fresh(4),
+        1,
+        replicas=1,
+        recovery_costs={0: {"0": 0, "3": 7}},
+    ).get_assignment()
+    assert assignments["0"].actives == {0}
+    assert assignments["3"].standbys == {0}
+
+
+def metadata(offsets) -> ClientMetadata:
+    return ClientMetadata(
+        assignment=ClientAssignment(actives={}, standbys={}),
+        url="http://localhost:6066",
+        changelog_distribution={},
+        changelog_offsets=offsets,
+    )
+
+
+def test_recovery_costs():
+    clients = {
+        "a": metadata(
+            {"foo-changelog": [(0, 100), (1, 40)], "bar-changelog": [(0, 7)]}
+        ),
+        "b": metadata({"foo-changelog": [[0, 90]], "other-changelog": [[1, 10]]}),
+        "c": metadata({}),
+    }
+    costs = PartitionAssignor._recovery_costs(
+        {"foo", "foo-changelog", "bar-changelog"}, clients
+    )
+    assert costs == {
+        0: {"a": 0, "b": 10 + 8},
+        1: {"a": 0},
+    }
+
+
+def test_local_changelog_offsets():
+    app = Mock(name="app")
+    table = Mock(name="table", is_global=False)
+    table._changelog_topic_name.return_value = "foo-changelog"
+    table.persisted_offsets.return_value = {1: 30, 0: 10}
+    empty = Mock(name="empty", is_global=False)
+    empty.persisted_offsets.return_value = {}
+    global_table = Mock(name="global", is_global=True)
+    app.tables.data = {"foo": table, "empty": empty, "global": global_table}
+    assignor = PartitionAssignor(app)
+    assert assignor._local_changelog_offsets() == {"foo-changelog": [(0, 10), (1, 30)]}
+    global_table.persisted_offsets.assert_not_called()
+
+
+def test_changelog_offsets_read_when_revoked():
+    app = Mock(name="app")
+    table = Mock(name="table", is_global=False)
+    table._changelog_topic_name.return_value = "foo-changelog"
+    table.persisted_offsets.return_value = {0: 10}
+    app.tables.data = {"foo": table}
+    assignor = PartitionAssignor(app)
+    assert assignor._changelog_offsets == {}
+    assignor.on_partitions_revoked(set())
+    table.persisted_offsets.assert_called_once_with()
+    assert assignor._changelog_offsets == {"foo-changelog": [(0, 10)]}
@@ -0,0 +1,211 @@
+import copy
+from typing import Mapping, MutableMapping
+from unittest.mock import Mock
+
+from hypothesis import assume, given, settings
+from hypothesis.strategies import floats, integers, lists
+
+from faust.assignor.client_assignment import (
+    ClientAssignment,
+    ClientMetadata,
+    CopartitionedAssignment,
+)
+from faust.assignor.partition_assignor import PartitionAssignor
+from faust.assignor.weighted_assignor import WeightedCopartitionedAssignor
+from faust.types import TP
+from faust.types.enums import AssignmentWeight
+
+from .test_copartitioned_assignor import TEST_DEADLINE, is_valid
+
+_topics = {"foo", "bar", "baz"}
+
+
+def fresh(num_clients: int) -> MutableMapping[str, CopartitionedAssignment]:
+    return {
+        str(client): CopartitionedAssignment(topics=_topics)
+        for client in range(num_clients)
+    }
+
+
+def loads(
+    assignments: Mapping[str, CopartitionedAssignment],
+    assignor: WeightedCopartitionedAssignor,
+) -> Mapping[str, float]:
+    return {
+        client: assignor.load(assignment, active=True)
+        for client, assignment in assignments.items()
+    }
+
+
+def weights_balanced(
+    assignments: Mapping[str, CopartitionedAssignment],
+    assignor: WeightedCopartitionedAssignor,
+) -> bool:
+    # Kept clients are shed down to max_load (or hold a single partition),
+    # and a placement always goes to a client at or below the fair share.
+    heaviest = max(assignor.weights.values(), default=0.0)
+    bound = max(assignor.max_load, assignor.fair_share + heaviest)
+    assert all(
+        load <= bound + 1e-6 for load in loads(assignments, assignor).values()
+    ), "Client loaded beyond bound"
+    return True
+
+
+@given(
+    weights=lists(floats(min_value=0.0, max_value=1e6), min_size=0, max_size=256),
+    replicas=integers(min_value=0, max_value=8),
+    num_clients=integers(min_value=1, max_value=128),
+)
+@settings(deadline=TEST_DEADLINE)
+def test_fresh_assignment(weights, replicas, num_clients):
+    assume(replicas < num_clients)
+    partitions = len(weights)
+    assignor = WeightedCopartitionedAssignor(
+        _topics,
+        fresh(num_clients),
+        partitions,
+        replicas=replicas,
+        weights=dict(enumerate(weights)),
+    )
+    new_assignments = assignor.get_assignment()
+    assert is_valid(new_assignments, partitions, replicas)
+    assert weights_balanced(new_assignments, assignor)
+
+
+@given(
+    weights=lists(floats(min_value=0.0, max_value=1e6), min_size=1, max_size=256),
+    replicas=integers(min_value=0, max_value=8),
+    num_clients=integers(min_value=1, max_value=128),
+)
+@settings(deadline=TEST_DEADLINE)
+def test_stable_when_load_unchanged(weights, replicas, num_clients):
+    assume(replicas < num_clients)
+    partitions = len(weights)
+    weights = dict(enumerate(weights))
+    first = WeightedCopartitionedAssignor(
+        _topics, fresh(num_clients), partitions, replicas=replicas, weights=weights
+    ).get_assignment()
+    old_assignments = copy.deepcopy(first)
+    second = WeightedCopartitionedAssignor(
+        _topics, first, partitions, replicas=replicas, weights=weights
+    ).get_assignment()
+    assert is_valid(second, partitions, replicas)
+    for client, assignment in second.items():
+        assert assignment.actives == old_assignments[client].actives
+        assert assignment.standbys == old_assignments[client].standbys
+
+
+@given(
+    partitions=integers(min_value=1, max_value=256),
+    replicas=integers(min_value=0, max_value=8),
+    num_clients=integers(min_value=2, max_value=64),
+    num_additional_clients=integers(min_value=1, max_value=16),
+)
+@settings(deadline=TEST_DEADLINE)
+def test_add_new_clients(partitions, replicas, num_clients, num_additional_clients):
+    assume(replicas < num_clients)
+    weights = {p: float(p % 7) for p in range(partitions)}
+    valid_assignment = WeightedCopartitionedAssignor(
+        _topics, fresh(num_clients), partitions, replicas=replicas, weights=weights
+    ).get_assignment()
+    for client in range(num_clients, num_clients + num_additional_clients):
+        valid_assignment[str(client)] = CopartitionedAssignment(topics=_topics)
+
+    assignor = WeightedCopartitionedAssignor(
+        _topics, valid_assignment, partitions, replicas=replicas, weights=weights
+    )
+    new_assignments = assignor.get_assignment()
+    assert is_valid(new_assignments, partitions, replicas)
+    assert weights_balanced(new_assignments, assignor)
+
+
+def test_hot_partition_gets_its_own_client():
+    # Partition 0 carries as much traffic as all the others together.
+    weights = {0: 100.0, **{p: 100.0 / 7 for p in range(1, 8)}}
+    assignments = WeightedCopartitionedAssignor(
+        _topics, fresh(2), 8, replicas=0, weights=weights
+    ).get_assignment()
+    hot = next(a for a in assignments.values() if 0 in a.actives)
+    cold = next(a for a in assignments.values() if 0 not in a.actives)
+    assert hot.actives == {0}
+    assert cold.actives == set(range(1, 8))
+
+
+def test_overloaded_client_sheds_partitions():
+    weights = {0: 10.0, 1: 10.0, 2: 10.0, 3: 1.0}
+    cluster = {
+        "a": CopartitionedAssignment(actives={0, 1, 2}, topics=_topics),
+        "b": CopartitionedAssignment(actives={3}, topics=_topics),
+    }
+    assignments = WeightedCopartitionedAssignor(
+        _topics, cluster, 4, replicas=0, weights=weights
+    ).get_assignment()
+    # The heaviest partition stays put, the others make room around it.
+    assert 2 in assignments["a"].actives
+    assert 3 in assignments["b"].actives
+    assert len(assignments["a"].actives) == 2
+    assert len(assignments["b"].actives) == 2
+
+
+def test_promotes_warm_standby():
+    weights = {0: 1.0, 1: 1.0}
+    cluster = {
+        "a": CopartitionedAssignment(standbys={1}, topics=_topics),
+        "b": CopartitionedAssignment(standbys={0}, topics=_topics),
+    }
+    assignments = WeightedCopartitionedAssignor(
+        _topics, cluster, 2, replicas=1, weights=weights
+    ).get_assignment()
+    assert assignments["a"].actives == {1}
+    assert assignments["b"].actives == {0}
+    assert assignments["a"].standbys == {0}
+    assert assignments["b"].standbys == {1}
+
+
+def test_unknown_weights_default_to_mean():
+    assignor = WeightedCopartitionedAssignor(
+        _topics, fresh(2), 4, replicas=0, weights={0: 2.0, 1: 4.0}
+    )
+    assert assignor.weights == {0: 2.0, 1: 4.0, 2: 3.0, 3: 3.0}
+
+
+def test_no_weights_balances_counts():
+    assignments = WeightedCopartitionedAssignor(
+        _topics, fresh(3), 9, replicas=0
+    ).get_assignment()
+    assert sorted(len(a.actives) for a in assignments.values()) == [3, 3, 3]
+
+
+def test_group_partition_weights():
+    def metadata(weights):
+        return ClientMetadata(
+            assignment=ClientAssignment(actives={}, standbys={}),
+            url="http://localhost:6066",
+            changelog_distribution={},
+            partition_weights=weights,
+        )
+
+    clients = {
+        "a": metadata({"foo": [(0, 1.0), (1, 2.0)], "bar": [(0, 4.0)]}),
+        # zombie reporting partition 1 as well: larger figure wins.
+        "b": metadata({"foo": [[1, 3.0]], "other": [[0, 100.0]]}),
+        "c": metadata({}),
+    }
+    weights = PartitionAssignor._group_partition_weights({"foo", "bar"}, clients)
+    assert weights == {0: 5.0, 1: 3.0}
+
+
+def test_local_partition_weights():
+    app = Mock(name="app")
+    assignor = PartitionAssignor(app)
+    assignor._assignment = ClientAssignment(actives={"foo": [0, 1]}, standbys={})
+    app.monitor.tp_bytes_s = {TP("foo", 0): 10.0, TP("bar", 0): 20.0}
+    app.monitor.tp_lag_at_rebalance = {TP("foo", 0): 7, TP("foo", 1): 3}
+    app.monitor.tp_lags.return_value = {TP("foo", 1): 5}
+
+    app.conf.consumer_assignment_weight = AssignmentWeight.NONE
+    assert assignor._local_partition_weights() == {}
+    app.conf.consumer_assignment_weight = AssignmentWeight.BYTES
+    assert assignor._local_partition_weights() == {"foo": [(0, 10.0)]}
+    app.conf.consumer_assignment_weight = AssignmentWeight.LAG
+    assert assignor._local_partition_weights() == {"foo": [(0, 7.0), (1, 5.0)]}
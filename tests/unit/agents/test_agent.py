@@ -20,7 +20,7 @@ from faust.agents.models import (
 )
 from faust.agents.replies import ReplyConsumer
 from faust.events import Event
-from faust.exceptions import ImproperlyConfigured
+from faust.exceptions import ImproperlyConfigured, RPCError
 from faust.types import TP, Message
 from tests.helpers import AsyncMock, FutureMock, Mock
 
@@ -568,7 +568,7 @@ class Test_Agent:
         await agent._slurp(aref, it)
 
         agent._reply.assert_called_once_with(
-            None, word, word_req.reply_to, word_req.correlation_id
+            None, word, word_req.reply_to, word_req.correlation_id, reply_url=None
         )
         agent._delegate_to_sinks.assert_has_calls(
             [
@@ -616,7 +616,9 @@ class Test_Agent:
         it = aiter(AIT())
         await agent._slurp(aref, it)
 
-        agent._reply.assert_called_once_with(None, word, "reply_to", "correlation_id")
+        agent._reply.assert_called_once_with(
+            None, word, "reply_to", "correlation_id", reply_url=None
+        )
         agent._delegate_to_sinks.assert_has_calls(
             [
                 call(word),
@@ -624,6 +626,29 @@ class Test_Agent:
             ]
         )
 
+    @pytest.mark.asyncio
+    async def test_slurp__reply_url(self, *, agent, app):
+        aref = agent(index=None, active_partitions=None)
+        stream = aref.stream.get_active_stream()
+        agent._delegate_to_sinks = AsyncMock(name="_delegate_to_sinks")
+        agent._reply = AsyncMock(name="_reply")
+        word = Word("word")
+        word_req = ReqRepRequest(word, "reply_to", "correlation_id")
+        message = Mock(name="message", autospec=Message)
+        headers = message.headers = {"Faust-Ag-ReplyUrl": b"http://a:6066"}
+        event = Event(app, None, word_req, headers, message)
+
+        class AIT:
+            async def __aiter__(self):
+                stream.current_event = event
+                yield word
+
+        await agent._slurp(aref, aiter(AIT()))
+
+        agent._reply.assert_called_once_with(
+            None, word, "reply_to", "correlation_id", reply_url="http://a:6066"
+        )
+
     @pytest.mark.asyncio
     async def test_delegate_to_sinks(self, *, agent, agent2, foo_topic):
         agent2.send = AsyncMock(name="agent2.send")
@@ -668,6 +693,55 @@ class Test_Agent:
             ),
         )
 
+    @pytest.mark.asyncio
+    async def test_reply__rpc(self, *, agent):
+        agent.app = Mock(name="app", autospec=App, send=AsyncMock())
+        agent.app.conf.web_rpc_enabled = True
+        agent.app.rpc.call = AsyncMock()
+        agent.add_future = Mock(name="add_future")
+        await agent._reply(
+            "key", "reply", "reply_to", "correlation_id", reply_url="http://a:6066"
+        )
+        # the reply is sent in the background.
+        agent.app.rpc.call.assert_not_called()
+        await agent.add_future.call_args[0][0]
+        url, method, payload = agent.app.rpc.call.call_args[0]
+        assert (url, method) == ("http://a:6066", "agents.reply")
+        assert ReqRepResponse.loads(payload) == ReqRepResponse(
+            key="key", value="reply", correlation_id="correlation_id"
+        )
+        agent.app.send.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reply__rpc_error(self, *, agent):
+        agent.app = Mock(name="app", autospec=App, send=AsyncMock())
+        agent.app.conf.web_rpc_enabled = True
+        agent.app.rpc.call = AsyncMock(side_effect=RPCError())
+        agent.add_future = Mock(name="add_future")
+        await agent._reply(
+            "key", "reply", "reply_to", "correlation_id", reply_url="http://a:6066"
+        )
+        agent.app.send.assert_not_called()
+        await agent.add_future.call_args[0][0]
+        agent.app.send.assert_called_once_with(
+            "reply_to",
+            key=None,
+            value=ReqRepResponse(
+                key="key", value="reply", correlation_id="correlation_id"
+            ),
+        )
+
+    @pytest.mark.asyncio
+    async def test_reply__rpc_disabled(self, *, agent):
+        agent.app = Mock(name="app", autospec=App, send=AsyncMock())
+        agent.app.conf.web_rpc_enabled = False
+        agent.app.rpc.call = AsyncMock()
+        await agent._reply(
+            "key", "reply", "reply_to", "correlation_id", reply_url="http://a:6066"
+        )
+        agent.app.rpc.call.assert_not_called()
+        agent.app.send.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_cast(self, *, agent):
         agent.send = AsyncMock(name="send")
@@ -691,6 +765,7 @@ class Test_Agent:
                 add=AsyncMock(),
             ),
         )
+        agent.app.conf.web_rpc_enabled = False
         pp = done_future()
         agent.ask_nowait = Mock(name="ask_nowait")
         agent.ask_nowait.return_value = done_future(pp)
@@ -715,6 +790,22 @@ class Test_Agent:
         )
         agent.app._reply_consumer.add.assert_called_once_with(pp.correlation_id, pp)
 
+    def test_reply_url_headers(self, *, agent, app):
+        app.conf.web_rpc_enabled = True
+        app.conf.canonical_url = "http://a:6066"
+        assert agent._reply_url_headers({"k1": b"v1"}) == {
+            "k1": b"v1",
+            "Faust-Ag-ReplyUrl": b"http://a:6066",
+        }
+        assert agent._reply_url_headers(None) == {
+            "Faust-Ag-ReplyUrl": b"http://a:6066",
+        }
+
+    def test_reply_url_headers__disabled(self, *, agent, app):
+        app.conf.web_rpc_enabled = False
+        headers = {"k1": b"v1"}
+        assert agent._reply_url_headers(headers) is headers
+
     @pytest.mark.asyncio
     async def test_ask_nowait(self, *, agent):
         agent._create_req = Mock(name="_create_req")
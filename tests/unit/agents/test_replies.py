@@ -6,7 +6,12 @@ import pytest
 
 from faust import Record
 from faust.agents.models import ReqRepResponse
-from faust.agents.replies import BarrierState, ReplyConsumer, ReplyPromise
+from faust.agents.replies import (
+    BarrierState,
+    ReplyConsumer,
+    ReplyPromise,
+    ReplyTuple,
+)
 from tests.helpers import AsyncMock
 
 
@@ -44,6 +49,29 @@ class Test_BarrierState:
             self.joiner(p),
         )
 
+    @pytest.mark.asyncio
+    async def test_fulfill_many__more_than_buffered(self):
+        p = BarrierState(reply_to="rt")
+        for i in range(5000):
+            p.expect(str(i))
+        p.finalize()
+        p.fulfill_many([ReplyTuple(str(i), i) for i in range(5000)])
+        assert p.done()
+        assert not p.pending
+        assert len([x async for x in p.iterate()]) == 5000
+
+    @pytest.mark.asyncio
+    async def test_fail__before_finalize(self):
+        p = BarrierState(reply_to="rt")
+        p.expect("id1")
+        p.expect("id2")
+        p.fulfill("id1", "v1")
+        p.fail("id2", asyncio.TimeoutError())
+        p.finalize()
+        p.fulfill("id2", "v2")
+        with pytest.raises(asyncio.TimeoutError):
+            await p
+
     @pytest.mark.asyncio
     async def test_get_nowait__exhaust_sentinels(self):
         p = BarrierState(reply_to="rt")
@@ -188,6 +216,34 @@ class Test_ReplyConsumer:
 
         c._start_fetcher.assert_called_once_with(p.reply_to)
 
+    @pytest.mark.asyncio
+    async def test_add__registers_before_fetcher_starts(self, *, c):
+        p = ReplyPromise(reply_to="rt", correlation_id="id1")
+
+        async def _start_fetcher(topic_name):
+            assert p in list(c._waiting["id1"])
+
+        c._start_fetcher = AsyncMock(side_effect=_start_fetcher)
+        await c.add("id1", p)
+        c._start_fetcher.assert_called_once_with("rt")
+
+    def test_fulfill(self, *, c):
+        p1 = ReplyPromise(reply_to="rt", correlation_id="id1")
+        p2 = ReplyPromise(reply_to="rt", correlation_id="id1")
+        p2.set_result("previous")
+        c._waiting["id1"] = {p1, p2}
+        assert c.fulfill(
+            ReqRepResponse(key="k", value="value1", correlation_id="id1"),
+        )
+        assert p1.result() == "value1"
+        assert p2.result() == "previous"
+
+    def test_fulfill__unknown(self, *, c):
+        assert not c.fulfill(
+            ReqRepResponse(key="k", value="v", correlation_id="id2"),
+        )
+        assert "id2" not in c._waiting
+
     @pytest.mark.asyncio
     async def test_start_fetcher(self, *, c):
         c._drain_replies = Mock()
@@ -228,27 +284,112 @@ class Test_ReplyConsumer:
                 )
             ),
         ]
-        channel = Mock(
-            stream=Mock(return_value=self._response_stream(responses)),
-        )
-        p1 = Mock()
-        p2 = Mock()
-        p3 = Mock()
-        p4 = Mock()
-        c._waiting["id1"] = {p1, p2}
-        c._waiting["id2"] = {p3}
-        c._waiting["id3"] = {p4}
+        stream = MagicMock(name="stream")
+        stream.__aiter__.return_value = responses
+        # the first two replies are fetched together.
+        stream.channel.empty.side_effect = [False, True, True]
+        channel = Mock(stream=Mock(return_value=stream))
+        c.fulfill_many = Mock(wraps=c.fulfill_many)
+        p1 = ReplyPromise(reply_to="rt", correlation_id="id1")
+        p2 = ReplyPromise(reply_to="rt", correlation_id="id1")
+        p3 = ReplyPromise(reply_to="rt", correlation_id="id2")
+        p4 = ReplyPromise(reply_to="rt", correlation_id="id3")
+        c._waiting["id1"] = [p1, p2]
+        c._waiting["id2"] = [p3]
+        c._waiting["id3"] = [p4]
 
         await c._drain_replies(channel)
 
-        p1.fulfill.assert_called_once_with("id1", "value1")
-        p2.fulfill.assert_called_once_with("id1", "value1")
-        p3.fulfill.assert_called_once_with("id2", "value2")
-        p4.fulfill.assert_called_once_with("id3", an_account)
+        assert c.fulfill_many.call_count == 2
+        assert p1.result() == "value1"
+        assert p2.result() == "value1"
+        assert p3.result() == "value2"
+        assert p4.result() == an_account
+        assert not c._waiting
 
-    async def _response_stream(self, responses):
-        for response in responses:
-            yield response
+    def test_fulfill_many__barrier(self, *, c):
+        barrier = BarrierState(reply_to="rt")
+        for correlation_id in ("id1", "id2", "id3"):
+            barrier.expect(correlation_id)
+            c._waiting[correlation_id] = [barrier]
+        barrier.finalize()
+        barrier.fulfill_many = Mock(wraps=barrier.fulfill_many)
+        found = c.fulfill_many(
+            [
+                ReqRepResponse(key="k", value=i, correlation_id=correlation_id)
+                for i, correlation_id in enumerate(["id1", "id2", "id3", "id4"])
+            ]
+        )
+        assert found == 3
+        barrier.fulfill_many.assert_called_once()
+        assert barrier.done()
+        assert not barrier.pending
+
+    @pytest.mark.asyncio
+    async def test_add__expires(self, *, c, app):
+        app.conf.reply_expires = 10.0
+        c._start_fetcher = AsyncMock()
+        p1 = ReplyPromise(reply_to="rt", correlation_id="id1")
+        p2 = ReplyPromise(reply_to="rt", correlation_id="id2")
+        await c.add("id1", p1)
+        await c.add("id1", p1)
+        assert c._waiting["id1"] == [p1]
+        await c.add("id2", p2)
+        now = c._expires["id1"]
+        c._expire(now)
+        assert list(c._waiting) == ["id2"]
+        assert list(c._expires) == ["id2"]
+        with pytest.raises(asyncio.TimeoutError):
+            await p1
+        assert not p2.done()
+        c._expire(now + 10.0)
+        assert not c._waiting
+        assert not c._expires
+        with pytest.raises(asyncio.TimeoutError):
+            await p2
+
+    @pytest.mark.asyncio
+    async def test_expire__barrier(self, *, c, app):
+        app.conf.reply_expires = 10.0
+        c._start_fetcher = AsyncMock()
+        barrier = BarrierState(reply_to="rt")
+        for correlation_id in ("id1", "id2", "id3"):
+            barrier.expect(correlation_id)
+            await c.add(correlation_id, barrier)
+        barrier.finalize()
+        c.fulfill(ReqRepResponse(key="k", value="v1", correlation_id="id1"))
+        c._expire(c._expires["id2"])
+        assert barrier.done()
+        await asyncio.sleep(0)  # run done callbacks
+        assert not c._waiting
+        assert not c._expires
+
+        received = []
+        with pytest.raises(asyncio.TimeoutError):
+            async for _, value in barrier.iterate():
+                received.append(value)
+        assert received == ["v1"]
+
+    @pytest.mark.asyncio
+    async def test_add__forgets_done_promises(self, *, c):
+        c._start_fetcher = AsyncMock()
+        p1 = ReplyPromise(reply_to="rt", correlation_id="id1")
+        p1.cancel()
+        await c.add("id1", p1)
+        assert not c._waiting
+        assert not c._expires
+
+        p2 = ReplyPromise(reply_to="rt", correlation_id="id2")
+        p3 = ReplyPromise(reply_to="rt", correlation_id="id2")
+        await c.add("id2", p2)
+        await c.add("id2", p3)
+        p2.cancel()
+        await asyncio.sleep(0)  # run done callbacks
+        assert c._waiting["id2"] == [p3]
+        p3.cancel()
+        await asyncio.sleep(0)
+        assert not c._waiting
+        assert not c._expires
 
     def test_reply_topic(self, *, c, app):
         topic = c._reply_topic("foo")
@@ -307,9 +307,11 @@ class Test_App:
         ass = app.consumer.assignment.return_value = {TP("foo", 0)}
 
         app.in_transaction = False
+        app.assignor.on_partitions_revoked = Mock()
         await app._on_partitions_revoked(revoked)
 
         app.on_partitions_revoked.send.assert_called_once_with(revoked)
+        app.assignor.on_partitions_revoked.assert_called_once_with(revoked)
         consumer.stop_flow.assert_called_once_with()
         app.flow_control.suspend.assert_called_once_with()
         consumer.pause_partitions.assert_called_once_with(ass)
@@ -327,6 +329,7 @@ class Test_App:
         app.on_partitions_revoked = Mock(send=AsyncMock())
         app.consumer = Mock()
         app.tables = Mock()
+        app.assignor.on_partitions_revoked = Mock()
         revoked = {TP("foo", 0), TP("bar", 1)}
         app.consumer.assignment.return_value = set()
         await app._on_partitions_revoked(revoked)
@@ -1142,6 +1145,10 @@ class Test_App:
         app._conf = None
         assert repr(app)
 
+    @pytest.mark.conf(consumer_assignment_weight="bytes")
+    def test_monitor__weighted_by_bytes(self, *, app):
+        assert app.monitor.track_bytes_received
+
     def test_monitor(self, *, app):
         assert app._monitor is None
         app.conf.Monitor = Mock(
@@ -1151,6 +1158,7 @@ class Test_App:
         monitor = app.monitor
         app.conf.Monitor.assert_called_once_with(loop=app.loop, beacon=app.beacon)
         assert monitor is app.conf.Monitor()
+        assert not monitor.track_bytes_received
         assert app.monitor is monitor
         assert app._monitor is monitor
 
@@ -0,0 +1,168 @@
+import json
+import sys
+from textwrap import dedent
+from unittest.mock import patch
+
+import pytest
+
+from faust.app.manifest import CATEGORY_TABLE, MANIFEST_VERSION, DiscoveryManifest
+from faust.exceptions import ImproperlyConfigured
+
+MODULES = {
+    "__init__.py": "",
+    "app.py": """
+        import faust
+
+        app = faust.App("manifest-test", autodiscover=True, origin="mproj")
+    """,
+    "agents.py": """
+        from mproj.app import app
+
+        table = app.Table("totals", default=int)
+
+        @app.agent()
+        async def process(stream):
+            async for value in stream:
+                yield value
+
+        @app.timer(interval=10.0)
+        async def every_10_seconds():
+            ...
+
+        @app.page("/hello/")
+        async def hello(web, request):
+            return web.json({})
+    """,
+    "commands.py": """
+        from mproj.app import app
+        from mproj.agents import process
+
+        @app.command()
+        async def hello():
+            ...
+    """,
+    "models.py": """
+        import faust
+
+        class Point(faust.Record):
+            x: int
+    """,
+    "test_agents.py": """
+        raise RuntimeError("test modules are not imported")
+    """,
+}
+
+
+@pytest.fixture()
+def project(tmp_path):
+    package = tmp_path / "mproj"
+    package.mkdir()
+    for name, source in MODULES.items():
+        (package / name).write_text(dedent(source))
+    sys.path.insert(0, str(tmp_path))
+    try:
+        yield tmp_path
+    finally:
+        sys.path.remove(str(tmp_path))
+        _forget_project()
+
+
+@pytest.fixture()
+def mproj(project):
+    return _import_app()
+
+
+def _import_app():
+    from mproj.app import app
+
+    app.finalize()
+    return app
+
+
+def _forget_project():
+    for name in list(sys.modules):
+        if name == "mproj" or name.startswith("mproj."):
+            del sys.modules[name]
+
+
+class TestDiscoveryManifest:
+    def test_collect(self, *, mproj):
+        manifest = mproj.discovery_manifest()
+        assert manifest.app == "manifest-test"
+        assert manifest.packages == ["mproj"]
+        assert manifest.modules == ["mproj.agents", "mproj.commands"]
+        assert manifest.entries == {
+            CATEGORY_TABLE: ["mproj.agents:table"],
+            "faust.agent": ["mproj.agents:process", "mproj.commands:process"],
+            "faust.command": ["mproj.commands:hello"],
+            "faust.page": ["mproj.agents:hello"],
+            "faust.task": ["mproj.agents:every_10_seconds"],
+        }
+
+    def test_write__from_path(self, *, mproj, tmp_path):
+        manifest = mproj.discovery_manifest()
+        path = tmp_path / "manifest.json"
+        manifest.write(path)
+        assert json.loads(path.read_text())["version"] == MANIFEST_VERSION
+        assert DiscoveryManifest.from_path(path) == manifest
+
+    def test_from_path__unsupported_version(self, *, tmp_path):
+        path = tmp_path / "manifest.json"
+        path.write_text(json.dumps({"version": 0, "app": "x"}))
+        with pytest.raises(ImproperlyConfigured):
+            DiscoveryManifest.from_path(path)
+
+    def test_discover__uses_manifest(self, *, mproj, tmp_path):
+        path = tmp_path / "manifest.json"
+        mproj.discovery_manifest().write(path)
+        _forget_project()
+        app = _import_app()
+        app.conf.autodiscover_manifest = path
+        with patch("faust.app.base.venusian") as venusian:
+            app.discover()
+            venusian.Scanner.assert_not_called()
+        assert set(app.agents) == {"mproj.agents.process"}
+        assert set(app.tables) == {"totals"}
+        assert "mproj.agents" in sys.modules
+        assert "mproj.commands" in sys.modules
+        assert "mproj.models" not in sys.modules
+
+    def test_discover__manifest_missing(self, *, mproj, tmp_path):
+        mproj.conf.autodiscover_manifest = tmp_path / "manifest.json"
+        mproj.discover()
+        assert "mproj.models" in sys.modules
+
+    def test_discover__manifest_other_packages(self, *, mproj, tmp_path):
+        path = tmp_path / "manifest.json"
+        mproj.discovery_manifest()._replace(packages=["other"]).write(path)
+        mproj.conf.autodiscover_manifest = path
+        with patch("faust.app.base.venusian") as venusian:
+            mproj.discover()
+            venusian.Scanner.assert_called_once_with()
+
+    def test_discover__stale_entry(self, *, mproj, tmp_path):
+        path = tmp_path / "manifest.json"
+        manifest = mproj.discovery_manifest()
+        manifest._replace(
+            entries={"faust.agent": ["mproj.agents:removed"]},
+        ).write(path)
+        mproj.conf.autodiscover_manifest = path
+        with pytest.raises(ImproperlyConfigured, match="removed not found"):
+            mproj.discover()
+
+    def test_discover__stale_module(self, *, mproj, tmp_path):
+        path = tmp_path / "manifest.json"
+        manifest = mproj.discovery_manifest()
+        manifest._replace(modules=["mproj.removed"]).write(path)
+        mproj.conf.autodiscover_manifest = path
+        with pytest.raises(ImproperlyConfigured, match="mproj.removed not found"):
+            mproj.discover()
+
+    def test_discovery_manifest__ignores_manifest(self, *, mproj, tmp_path):
+        path = tmp_path / "manifest.json"
+        mproj.discovery_manifest()._replace(modules=["mproj.removed"]).write(path)
+        mproj.conf.autodiscover_manifest = path
+        assert mproj.discovery_manifest().modules == [
+            "mproj.agents",
+            "mproj.commands",
+        ]
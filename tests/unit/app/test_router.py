@@ -4,8 +4,15 @@ import pytest
 from yarl import URL
 
 from faust.app.router import Router
-from faust.exceptions import SameNode
+from faust.exceptions import RPCError, SameNode
+from faust.utils import json
 from faust.web.exceptions import ServiceUnavailable
+from tests.helpers import AsyncContextManagerMock, AsyncMock
+
+
+async def _lines(*lines):
+    for line in lines:
+        yield line
 
 
 class Test_Router:
@@ -42,6 +49,17 @@ class Test_Router:
             table.changelog_topic.prepare_key.return_value,
         )
 
+    def test_keys_by_store(self, *, router, app, assignor):
+        app.tables["foo"] = Mock(name="table")
+        router._get_serialized_key = Mock(side_effect=lambda table, key: key.encode())
+        assignor.key_store.side_effect = lambda topic, key: URL(
+            f"http://{'a' if key < b'm' else 'b'}.example.com:6066"
+        )
+        assert router.keys_by_store("foo", ["x", "c", "z", "d"]) == {
+            URL("http://a.example.com:6066"): ["c", "d"],
+            URL("http://b.example.com:6066"): ["x", "z"],
+        }
+
     def test_external_topic_key_store(self, *, router, app, assignor):
         topic = Mock()
         prepare_key = topic.prepare_key
@@ -63,6 +81,119 @@ class Test_Router:
             table.changelog_topic.get_topic_name(),
         )
 
+    def test_table_hosts(self, *, router, app, assignor):
+        table = app.tables["foo"] = Mock(name="table")
+        topic = table.changelog_topic.get_topic_name.return_value = "foo-changelog"
+        assignor.table_metadata.return_value = {
+            "http://b.example.com:6066": {topic: [1]},
+            "http://c.example.com:6066": {topic: []},
+            "http://a.example.com:6066": {topic: [0, 2]},
+        }
+        assert router.table_hosts("foo") == [
+            URL("http://a.example.com:6066"),
+            URL("http://b.example.com:6066"),
+        ]
+
+    def test_stream_req__same_node(self, *, router, app):
+        app.conf.canonical_url = URL("http://example.com:8181")
+        with pytest.raises(SameNode):
+            router.stream_req(URL("http://example.com:8181"), Mock(), {})
+
+    @pytest.mark.asyncio
+    async def test_stream_req(self, *, router, app, mock_http_client):
+        app.conf.canonical_url = URL("http://ge.example.com:8181")
+        request = Mock(name="request")
+        request.url = URL("http://ge.example.com:8181/table/foo/_scan/?limit=3")
+        response = Mock(name="response", content=_lines(b"1\n", b"2\n"))
+        mock_http_client.get.return_value = AsyncContextManagerMock(
+            return_value=response
+        )
+        lines = router.stream_req(
+            URL("http://el.example.com:8181"), request, {"local": "1"}
+        )
+        assert [line async for line in lines] == [b"1\n", b"2\n"]
+        mock_http_client.get.assert_called_once_with(
+            URL("http://el.example.com:8181/table/foo/_scan/?local=1"),
+            headers=request.headers,
+        )
+        response.raise_for_status.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_post_req__same_node(self, *, router, app):
+        app.conf.canonical_url = URL("http://example.com:8181")
+        with pytest.raises(SameNode):
+            await router.post_req(URL("http://example.com:8181"), Mock(), b"", {})
+
+    @pytest.mark.asyncio
+    @pytest.mark.http_session(text=b'{"k": 1}')
+    async def test_post_req(self, *, router, app, mock_http_client):
+        app.conf.canonical_url = URL("http://ge.example.com:8181")
+        request = Mock(name="request")
+        request.url = URL("http://ge.example.com:8181/table/foo/_mget/")
+        request.headers = {"Content-Length": "30", "Authorization": "x"}
+        body = await router.post_req(
+            URL("http://el.example.com:8181"), request, b'{"keys": []}', {"local": "1"}
+        )
+        assert body == b'{"k": 1}'
+        mock_http_client.post.assert_called_once_with(
+            URL("http://el.example.com:8181/table/foo/_mget/?local=1"),
+            headers={"Authorization": "x"},
+            data=b'{"keys": []}',
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.http_session(status_code=503)
+    async def test_post_req__unavail(self, *, router, app, mock_http_client):
+        app.conf.canonical_url = URL("http://ge.example.com:8181")
+        request = Mock(name="request")
+        request.url = URL("http://ge.example.com:8181/table/foo/_mget/")
+        request.headers = {}
+        with pytest.raises(ServiceUnavailable):
+            await router.post_req(URL("http://el.example.com:8181"), request, b"", {})
+
+    @pytest.mark.asyncio
+    async def test_get_many_req(self, *, router, app):
+        app.conf.web_rpc_enabled = False
+        router.post_req = AsyncMock(return_value=b'{"a": 1}')
+        request = Mock(name="request")
+        url = URL("http://el.example.com:8181")
+        body = await router.get_many_req(url, "foo", ["a"], request)
+        assert body == b'{"a": 1}'
+        dest_url, req, payload, query = router.post_req.call_args[0]
+        assert (dest_url, req, query) == (url, request, {"local": "1"})
+        assert json.loads(payload) == {"keys": ["a"]}
+
+    @pytest.mark.asyncio
+    async def test_get_many_req__rpc(self, *, router, app):
+        app.conf.web_rpc_enabled = True
+        app.conf.canonical_url = URL("http://ge.example.com:8181")
+        app.rpc = Mock(name="rpc", call=AsyncMock(return_value=b'{"a": 1}'))
+        url = URL("http://el.example.com:8181")
+        body = await router.get_many_req(url, "foo", ["a"], Mock())
+        assert body == b'{"a": 1}'
+        dest_url, method, payload = app.rpc.call.call_args[0]
+        assert (dest_url, method) == (url, "tables.get_many")
+        assert json.loads(payload) == {"table": "foo", "keys": ["a"]}
+
+    @pytest.mark.asyncio
+    async def test_get_many_req__rpc_same_node(self, *, router, app):
+        app.conf.web_rpc_enabled = True
+        app.conf.canonical_url = URL("http://example.com:8181")
+        with pytest.raises(SameNode):
+            await router.get_many_req(
+                URL("http://example.com:8181"), "foo", ["a"], Mock()
+            )
+
+    @pytest.mark.asyncio
+    async def test_get_many_req__rpc_error(self, *, router, app):
+        app.conf.web_rpc_enabled = True
+        app.conf.canonical_url = URL("http://ge.example.com:8181")
+        app.rpc = Mock(name="rpc", call=AsyncMock(side_effect=RPCError()))
+        with pytest.raises(ServiceUnavailable):
+            await router.get_many_req(
+                URL("http://el.example.com:8181"), "foo", ["a"], Mock()
+            )
+
     def test_tables_metadata(self, *, router, assignor):
         res = router.tables_metadata()
         assert res is assignor.tables_metadata.return_value
@@ -101,8 +232,8 @@ class Test_Router:
         app.router.key_store = Mock()
         app.router.key_store.return_value = URL("http://el.example.com:8181")
         response = await router.route_req("foo", "k", web, request)
-        assert response is web.text.return_value
-        web.text.assert_called_once_with(b"foobar", content_type=ANY, status=ANY)
+        assert response is web.bytes.return_value
+        web.bytes.assert_called_once_with(b"foobar", content_type=ANY, status=ANY)
 
     @pytest.mark.asyncio
     @pytest.mark.http_session(text=b"foobar")
@@ -135,5 +266,5 @@ class Test_Router:
             "http://el.example.com:8181"
         )
         response = await router.route_topic_req("foo", "k", web, request)
-        assert response is web.text.return_value
-        web.text.assert_called_once_with(b"foobar", content_type=ANY, status=ANY)
+        assert response is web.bytes.return_value
+        web.bytes.assert_called_once_with(b"foobar", content_type=ANY, status=ANY)
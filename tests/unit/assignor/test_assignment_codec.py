@@ -0,0 +1,140 @@
+import zlib
+
+import pytest
+
+from faust.assignor import assignment_codec
+from faust.assignor.assignment_codec import (
+    MAGIC,
+    dumps_assignment,
+    dumps_distributions,
+    is_compact,
+    loads_assignment,
+)
+from faust.assignor.client_assignment import ClientAssignment, ClientMetadata
+
+URL_A = "http://a.example.com:6066"
+URL_B = "http://b.example.com:6066"
+URL_C = "http://c.example.com:6066"
+
+CHANGELOG_DISTRIBUTION = {
+    URL_A: {"t-changelog": [0, 2, 4], "global-changelog": [0, 1, 2, 3]},
+    URL_B: {"t-changelog": [1, 3], "global-changelog": [0, 1, 2, 3]},
+    URL_C: {"t-changelog": [], "global-changelog": [0, 1, 2, 3]},
+}
+
+EXTERNAL_TOPIC_DISTRIBUTION = {
+    URL_A: {"orders": [5, 0, 1, 2]},
+    URL_B: {"orders": [3, 4, 7]},
+    URL_C: {},
+}
+
+
+def assignment():
+    return ClientAssignment(
+        actives={"orders": [2, 0, 1, 5], "t-changelog": [0, 2, 4]},
+        standbys={"t-changelog": [1, 3]},
+    )
+
+
+def dumps(**kwargs):
+    return dumps_assignment(
+        kwargs.get("assignment", assignment()),
+        kwargs.get("url", URL_A),
+        kwargs.get("topic_groups", {"orders": 0, "t-changelog": 1}),
+        dumps_distributions(
+            kwargs.get("changelog_distribution", CHANGELOG_DISTRIBUTION),
+            kwargs.get("external_topic_distribution", EXTERNAL_TOPIC_DISTRIBUTION),
+        ),
+    )
+
+
+def test_roundtrip():
+    payload = dumps()
+    assert is_compact(payload)
+    metadata = loads_assignment(payload)
+    assert metadata.url == URL_A
+    assert metadata.assignment.actives == {
+        "orders": [0, 1, 2, 5],
+        "t-changelog": [0, 2, 4],
+    }
+    assert metadata.assignment.standbys == {"t-changelog": [1, 3]}
+    assert metadata.topic_groups == {"orders": 0, "t-changelog": 1}
+    assert metadata.changelog_distribution == CHANGELOG_DISTRIBUTION
+    global_a, global_b, _ = (
+        partitions["global-changelog"]
+        for partitions in metadata.changelog_distribution.values()
+    )
+    assert global_a is not global_b
+    assert metadata.external_topic_distribution == {
+        URL_A: {"orders": [0, 1, 2, 5]},
+        URL_B: {"orders": [3, 4, 7]},
+        URL_C: {},
+    }
+
+
+def test_roundtrip__empty():
+    metadata = loads_assignment(
+        dumps(
+            assignment=ClientAssignment(actives={}, standbys={}),
+            topic_groups={},
+            changelog_distribution={},
+            external_topic_distribution={},
+        )
+    )
+    assert metadata.assignment.actives == {}
+    assert metadata.assignment.standbys == {}
+    assert metadata.topic_groups == {}
+    assert metadata.changelog_distribution == {}
+    assert metadata.external_topic_distribution == {}
+
+
+@pytest.mark.parametrize("num_hosts", [3, 300, 70000])
+def test_roundtrip__owner_vector(num_hosts):
+    hosts = [f"http://worker{i}:6066" for i in range(num_hosts)]
+    distribution = {host: {"t-changelog": []} for host in hosts}
+    for partition in range(512):
+        distribution[hosts[partition * 7 % num_hosts]]["t-changelog"].append(partition)
+    metadata = loads_assignment(
+        dumps(changelog_distribution=distribution, external_topic_distribution={})
+    )
+    assert metadata.changelog_distribution == distribution
+
+
+def test_partition_runs():
+    writer = assignment_codec._Writer()
+    writer.partitions([9, 1, 2, 3, 300, 10, 2])
+    writer.partitions([])
+    reader = assignment_codec._Reader(writer.getvalue())
+    assert reader.partitions() == [1, 2, 3, 9, 10, 300]
+    assert reader.partitions() == []
+
+
+def test_distributions_are_shared():
+    distributions = dumps_distributions(
+        CHANGELOG_DISTRIBUTION, EXTERNAL_TOPIC_DISTRIBUTION
+    )
+    payload = dumps_assignment(assignment(), URL_B, {}, distributions)
+    assert payload.endswith(distributions)
+
+
+def test_loads_assignment__legacy_json():
+    legacy = zlib.compress(
+        ClientMetadata(
+            assignment=assignment(),
+            url=URL_A,
+            changelog_distribution=CHANGELOG_DISTRIBUTION,
+            external_topic_distribution=EXTERNAL_TOPIC_DISTRIBUTION,
+            topic_groups={"orders": 0},
+        ).dumps()
+    )
+    assert not is_compact(legacy)
+    metadata = loads_assignment(legacy)
+    assert metadata.assignment.actives == assignment().actives
+    assert metadata.changelog_distribution == CHANGELOG_DISTRIBUTION
+    assert metadata.topic_groups == {"orders": 0}
+
+
+def test_loads_assignment__unknown_version():
+    payload = dumps()
+    with pytest.raises(ValueError):
+        loads_assignment(MAGIC + bytes([99]) + payload[len(MAGIC) + 1 :])
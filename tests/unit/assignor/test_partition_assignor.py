@@ -0,0 +1,123 @@
+import zlib
+
+from aiokafka.coordinator.protocol import ConsumerProtocolMemberAssignment
+from yarl import URL
+
+from faust.assignor import assignment_codec
+from faust.assignor.client_assignment import ClientAssignment, ClientMetadata
+from faust.assignor.partition_assignor import (
+    COMPACT_ASSIGNMENT_VERSION,
+    PartitionAssignor,
+)
+from faust.types import TP
+from faust.types.assignor import AssignedPartitions
+
+URL_A = "http://a.example.com:6066"
+URL_B = "http://b.example.com:6066"
+
+ASSIGNMENT = ClientAssignment(actives={"orders": [3, 1]}, standbys={})
+DISTRIBUTION = {URL_A: {"orders": [1, 3]}, URL_B: {"orders": [0, 2]}}
+
+
+def dumps(assignor, member_version):
+    return assignor._dumps_assignment(
+        member_version,
+        ASSIGNMENT,
+        URL_A,
+        {},
+        DISTRIBUTION,
+        {"orders": 0},
+        assignment_codec.dumps_distributions({}, DISTRIBUTION),
+    )
+
+
+class Test_PartitionAssignor:
+    def assignor(self, app):
+        app.conf.canonical_url = URL(URL_A)
+        return PartitionAssignor(app)
+
+    def test_version(self, *, app):
+        assert self.assignor(app).version == COMPACT_ASSIGNMENT_VERSION
+
+    def test_metadata__leaves_out_distributions(self, *, app):
+        assignor = self.assignor(app)
+        assignor.external_topic_distribution = DISTRIBUTION
+        metadata = assignor.metadata({"orders"})
+        assert metadata.version == COMPACT_ASSIGNMENT_VERSION
+        client_metadata = ClientMetadata.loads(metadata.user_data)
+        assert client_metadata.url == URL_A
+        assert client_metadata.external_topic_distribution == {}
+
+    def test_dumps_assignment__compact(self, *, app):
+        payload = dumps(self.assignor(app), COMPACT_ASSIGNMENT_VERSION)
+        assert assignment_codec.is_compact(payload)
+
+    def test_dumps_assignment__legacy_member(self, *, app):
+        payload = dumps(self.assignor(app), 4)
+        metadata = ClientMetadata.loads(zlib.decompress(payload))
+        assert metadata.external_topic_distribution == DISTRIBUTION
+
+    def test_on_assignment(self, *, app):
+        for version in (4, COMPACT_ASSIGNMENT_VERSION):
+            assignor = self.assignor(app)
+            assignor.on_assignment(
+                ConsumerProtocolMemberAssignment(
+                    version, [("orders", [3, 1])], dumps(assignor, version)
+                )
+            )
+            assert assignor.assigned_actives() == {("orders", 1), ("orders", 3)}
+            assert not assignor.assigned_standbys()
+            assert assignor.external_topics_metadata() == DISTRIBUTION
+            assert assignor.group_for_topic("orders") == 0
+
+    def test_assigned__cached_per_assignment(self, *, app):
+        assignor = self.assignor(app)
+        assert assignor.assigned_actives().generation == 0
+        for generation in (1, 2):
+            assignor.on_assignment(
+                ConsumerProtocolMemberAssignment(
+                    COMPACT_ASSIGNMENT_VERSION,
+                    [("orders", [3, 1])],
+                    dumps(assignor, COMPACT_ASSIGNMENT_VERSION),
+                )
+            )
+            actives = assignor.assigned_actives()
+            assert actives is assignor.assigned_actives()
+            assert actives.generation == generation
+            assert assignor.assigned_standbys().generation == generation
+            assert assignor.is_active(TP("orders", 3))
+            assert not assignor.is_standby(TP("orders", 3))
+
+
+class Test_AssignedPartitions:
+    def test_set(self):
+        tps = AssignedPartitions(
+            [TP("foo", 0), TP("foo", 65), TP("bar", 2)], generation=3
+        )
+        assert tps.generation == 3
+        assert len(tps) == 3
+        assert TP("foo", 65) in tps
+        assert TP("foo", 1) not in tps
+        assert set(tps) == {TP("foo", 0), TP("foo", 65), TP("bar", 2)}
+        assert tps == {TP("foo", 0), TP("foo", 65), TP("bar", 2)}
+        assert tps & {TP("bar", 2), TP("baz", 0)} == frozenset({TP("bar", 2)})
+        assert "generation=3" in repr(tps)
+
+    def test_has_partition(self):
+        tps = AssignedPartitions([TP("foo", 0), TP("foo", 65)])
+        assert tps.has_partition("foo", 0)
+        assert tps.has_partition("foo", 65)
+        assert not tps.has_partition("foo", 64)
+        assert not tps.has_partition("bar", 0)
+
+    def test_partitions(self):
+        tps = AssignedPartitions([TP("foo", 9), TP("foo", 0), TP("bar", 2)])
+        assert tps.partitions("foo") == [0, 9]
+        assert tps.partitions("baz") == []
+        assert set(tps.topics()) == {"foo", "bar"}
+
+    def test_empty(self):
+        tps = AssignedPartitions()
+        assert not tps
+        assert tps.generation == 0
+        assert tps == set()
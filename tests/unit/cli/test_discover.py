@@ -0,0 +1,51 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from faust.app.manifest import DiscoveryManifest
+from faust.cli.discover import discover
+
+MANIFEST = DiscoveryManifest(
+    app="testid",
+    packages=["proj"],
+    modules=["proj.agents"],
+    entries={"faust.agent": ["proj.agents:process"]},
+)
+
+
+class Test_discover:
+    @pytest.fixture()
+    def command(self, *, app, context):
+        app.discovery_manifest = Mock(return_value=MANIFEST)
+        return discover(context)
+
+    @pytest.mark.asyncio
+    async def test_run(self, *, command):
+        command.say = Mock()
+        command.tabulate = Mock()
+        await command.run(write_manifest=False, manifest=None)
+        command.tabulate.assert_called_once_with(
+            [["faust.agent", "proj.agents:process"]],
+            headers=command.headers,
+            title=command.title,
+        )
+        command.say.assert_called_once_with(command.tabulate.return_value)
+
+    @pytest.mark.asyncio
+    async def test_run__write_manifest(self, *, command, tmp_path):
+        path = tmp_path / "manifest.json"
+        command.say = Mock()
+        await command.run(write_manifest=True, manifest=str(path))
+        assert DiscoveryManifest.from_path(path) == MANIFEST
+
+    def test_manifest_path(self, *, command):
+        assert command.manifest_path("foo.json") == Path("foo.json")
+
+    def test_manifest_path__setting(self, *, app, command):
+        app.conf.autodiscover_manifest = "bar.json"
+        assert command.manifest_path(None) == Path("bar.json")
+
+    def test_manifest_path__not_set(self, *, command):
+        with pytest.raises(command.UsageError):
+            command.manifest_path(None)
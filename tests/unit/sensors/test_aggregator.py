@@ -0,0 +1,43 @@
+from faust.sensors.aggregator import MetricAggregator
+
+
+class TestMetricAggregator:
+    def test_counters(self):
+        agg = MetricAggregator()
+        agg.increment("a")
+        agg.increment("a", 3, labels=("x:1",))
+        agg.increment("a", labels=("x:1",))
+        agg.decrement("a", 2, labels=("x:1",))
+        assert agg.counters == {("a", None): 1, ("a", ("x:1",)): 2}
+
+    def test_gauges__last_value(self):
+        agg = MetricAggregator()
+        agg.gauge("g", 1)
+        agg.gauge("g", 2)
+        assert agg.gauges == {("g", None): 2}
+
+    def test_timings__bounded(self):
+        agg = MetricAggregator(max_timing_samples=10)
+        for i in range(1000):
+            agg.timing("t", float(i))
+        timing = agg.timings[("t", None)]
+        assert timing.count == 1000
+        assert len(timing.samples) == 10
+        assert all(0 <= sample < 1000 for sample in timing.samples)
+        assert timing.capped
+        agg.timing("u", 1.0)
+        assert not agg.timings[("u", None)].capped
+
+    def test_drain(self):
+        agg = MetricAggregator()
+        assert not agg
+        agg.increment("a")
+        agg.gauge("g", 1)
+        agg.timing("t", 1.0)
+        assert agg
+        counters, gauges, timings = agg.drain()
+        assert counters == {("a", None): 1}
+        assert gauges == {("g", None): 1}
+        assert timings[("t", None)].samples == [1.0]
+        assert not agg
+        assert agg.counters == {}
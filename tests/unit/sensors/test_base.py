@@ -4,7 +4,7 @@ import pytest
 
 from faust import Event, Stream, Table, Topic, web
 from faust.assignor import PartitionAssignor
-from faust.sensors import Sensor
+from faust.sensors import Monitor, Sensor
 from faust.transport.consumer import Consumer
 from faust.transport.producer import Producer
 from faust.types import TP, Message
@@ -14,7 +14,12 @@ TP1 = TP("foo", 0)
 
 @pytest.fixture
 def message():
-    return Mock(name="message", autospec=Message)
+    return Mock(
+        name="message",
+        autospec=Message,
+        serialized_key_size=3,
+        serialized_value_size=10,
+    )
 
 
 @pytest.fixture
@@ -75,6 +80,9 @@ class TestSensor:
     def test_on_message_in(self, *, sensor, message):
         sensor.on_message_in(TP1, 3, message)
 
+    def test_on_messages_in(self, *, sensor):
+        sensor.on_messages_in(TP1, (3, 5), 3)
+
     def test_on_stream_event_in(self, *, sensor, stream, event):
         sensor.on_stream_event_in(TP1, 3, stream, event)
 
@@ -132,6 +140,9 @@ class TestSensor:
     def test_on_send_error(self, *, sensor, producer):
         sensor.on_send_error(producer, KeyError("foo"), Mock(name="state"))
 
+    def test_on_consumer_prefetch(self, *, sensor, consumer):
+        sensor.on_consumer_prefetch(consumer, 2, 0.1)
+
     def test_asdict(self, *, sensor):
         assert sensor.asdict() == {}
 
@@ -156,6 +167,10 @@ class TestSensorDelegate:
         sensors.on_message_in(TP1, 303, message)
         sensor.on_message_in.assert_called_once_with(TP1, 303, message)
 
+    def test_on_messages_in(self, *, sensors, sensor):
+        sensors.on_messages_in(TP1, (303, 305), 3)
+        sensor.on_messages_in.assert_called_once_with(TP1, (303, 305), 3)
+
     def test_on_stream_event_in_out(self, *, sensors, sensor, stream, event):
         state = sensors.on_stream_event_in(TP1, 303, stream, event)
         sensor.on_stream_event_in.assert_called_once_with(TP1, 303, stream, event)
@@ -237,5 +252,182 @@ class TestSensorDelegate:
             app, req, response, state[sensor], view=view
         )
 
+    def test_on_consumer_prefetch(self, *, sensors, sensor, consumer):
+        sensors.on_consumer_prefetch(consumer, 2, 0.1)
+        sensor.on_consumer_prefetch.assert_called_once_with(consumer, 2, 0.1)
+
     def test_repr(self, *, sensors):
         assert repr(sensors)
+
+
+class TestSensorDelegate_Monitor:
+    @pytest.fixture
+    def monitor(self):
+        return Mock(name="monitor", spec=Monitor)
+
+    @pytest.fixture
+    def sensors(self, *, app, monitor):
+        sensors = app.sensors
+        sensors.add(monitor)
+        return sensors
+
+    def test_compile(self, *, sensors, monitor):
+        assert sensors._monitor is monitor
+        other = Mock(name="sensor", autospec=Sensor)
+        sensors.add(other)
+        assert sensors._monitor is None
+        sensors.remove(other)
+        assert sensors._monitor is monitor
+
+    def test_on_message_in_out(self, *, sensors, monitor, message):
+        sensors.on_message_in(TP1, 303, message)
+        monitor.on_message_in.assert_called_once_with(TP1, 303, message)
+        sensors.on_message_out(TP1, 303, message)
+        monitor.on_message_out.assert_called_once_with(TP1, 303, message)
+
+    def test_on_stream_event_in_out(self, *, sensors, monitor, stream, event):
+        state = sensors.on_stream_event_in(TP1, 303, stream, event)
+        assert state is monitor.on_stream_event_in.return_value
+        sensors.on_stream_event_out(TP1, 303, stream, event, state)
+        monitor.on_stream_event_out.assert_called_once_with(
+            TP1, 303, stream, event, state
+        )
+
+    def test_on_table(self, *, sensors, monitor, table):
+        sensors.on_table_get(table, "key")
+        monitor.on_table_get.assert_called_once_with(table, "key")
+        sensors.on_table_set(table, "key", "value")
+        monitor.on_table_set.assert_called_once_with(table, "key", "value")
+        sensors.on_table_del(table, "key")
+        monitor.on_table_del.assert_called_once_with(table, "key")
+
+    def test_on_commit(self, *, sensors, monitor, consumer):
+        state = sensors.on_commit_initiated(consumer)
+        assert state is monitor.on_commit_initiated.return_value
+        sensors.on_commit_completed(consumer, state)
+        monitor.on_commit_completed.assert_called_once_with(consumer, state)
+
+    def test_on_send(self, *, sensors, monitor, producer):
+        metadata = Mock(name="metadata")
+        state = sensors.on_send_initiated(producer, "topic", "message", 303, 606)
+        assert state is monitor.on_send_initiated.return_value
+        sensors.on_send_completed(producer, state, metadata)
+        monitor.on_send_completed.assert_called_once_with(producer, state, metadata)
+        exc = KeyError("foo")
+        sensors.on_send_error(producer, exc, state)
+        monitor.on_send_error.assert_called_once_with(producer, exc, state)
+
+    def test_monitor_state(self, *, app, stream, event):
+        monitor = Monitor()
+        app.sensors.add(monitor)
+        state = app.sensors.on_stream_event_in(TP1, 303, stream, event)
+        assert state["time_in"] is not None
+        app.sensors.on_stream_event_out(TP1, 303, stream, event, state)
+        assert monitor.events_total == 1
+        assert monitor.events_active == 0
+        assert len(monitor.events_runtime) == 1
+
+    def test_sensor_added_while_processing(self, *, app, stream, event, producer):
+        monitor = Monitor()
+        app.sensors.add(monitor)
+        event_state = app.sensors.on_stream_event_in(TP1, 303, stream, event)
+        send_state = app.sensors.on_send_initiated(producer, "topic", "m", 3, 6)
+        other = Mock(name="sensor", autospec=Sensor)
+        app.sensors.add(other)
+        app.sensors.on_stream_event_out(TP1, 303, stream, event, event_state)
+        app.sensors.on_send_error(producer, KeyError("foo"), send_state)
+        assert monitor.events_active == 0
+        assert len(monitor.events_runtime) == 1
+        assert monitor.send_errors == 1
+        other.on_stream_event_out.assert_called_once_with(TP1, 303, stream, event, None)
+        other.on_send_error.assert_not_called()
+
+    def test_sensor_removed_while_processing(self, *, app, stream, event):
+        monitor = Monitor()
+        other = Mock(name="sensor", autospec=Sensor)
+        app.sensors.add(monitor)
+        app.sensors.add(other)
+        state = app.sensors.on_stream_event_in(TP1, 303, stream, event)
+        app.sensors.remove(other)
+        app.sensors.on_stream_event_out(TP1, 303, stream, event, state)
+        assert monitor.events_active == 0
+        assert len(monitor.events_runtime) == 1
+
+
+class TestSensorDelegate_sampling:
+    @pytest.fixture
+    def monitor(self):
+        return Monitor()
+
+    @pytest.fixture
+    def sensor(self):
+        return Mock(name="sensor", autospec=Sensor)
+
+    @pytest.fixture
+    def app(self, *, app):
+        app.conf.sensor_sampling = {"on_stream_event": 3, "on_send": 4}
+        return app
+
+    def _stream_events(self, sensors, stream, event, n):
+        for i in range(n):
+            state = sensors.on_stream_event_in(TP1, i, stream, event)
+            sensors.on_stream_event_out(TP1, i, stream, event, state)
+
+    def _send_errors(self, sensors, producer, n):
+        exc = KeyError("foo")
+        for _ in range(n):
+            state = sensors.on_send_initiated(producer, "topic", "message", 3, 6)
+            sensors.on_send_error(producer, exc, state)
+
+    def _send_completed(self, sensors, producer, n):
+        metadata = Mock(name="metadata")
+        for _ in range(n):
+            state = sensors.on_send_initiated(producer, "topic", "message", 3, 6)
+            sensors.on_send_completed(producer, state, metadata)
+
+    def test_on_stream_event(self, *, app, monitor, stream, event):
+        app.sensors.add(monitor)
+        self._stream_events(app.sensors, stream, event, 9)
+        assert monitor.events_total == 9
+        assert monitor.events_active == 0
+        assert len(monitor.events_runtime) == 3
+
+    def test_on_stream_event__generic(self, *, app, monitor, sensor, stream, event):
+        app.sensors.add(monitor)
+        app.sensors.add(sensor)
+        self._stream_events(app.sensors, stream, event, 9)
+        assert monitor.events_total == 9
+        assert monitor.events_active == 0
+        assert len(monitor.events_runtime) == 3
+        assert sensor.on_stream_event_in.call_count == 9
+        assert sensor.on_stream_event_out.call_count == 9
+
+    def test_on_send(self, *, app, monitor, producer):
+        app.sensors.add(monitor)
+        self._send_completed(app.sensors, producer, 8)
+        self._send_errors(app.sensors, producer, 8)
+        assert monitor.messages_sent == 16
+        assert monitor.send_errors == 8
+        assert len(monitor.send_latency) == 2
+
+    def test_on_send__generic(self, *, app, monitor, sensor, producer):
+        app.sensors.add(monitor)
+        app.sensors.add(sensor)
+        self._send_errors(app.sensors, producer, 8)
+        assert monitor.messages_sent == 8
+        assert monitor.send_errors == 8
+        assert sensor.on_send_initiated.call_count == 8
+        assert sensor.on_send_error.call_count == 8
+        for call in sensor.on_send_error.call_args_list:
+            assert call[0][2] is sensor.on_send_initiated.return_value
+
+    def test_on_table_not_sampled(self, *, app, sensor, table):
+        app.sensors.add(sensor)
+        for _ in range(10):
+            app.sensors.on_table_get(table, "key")
+        assert sensor.on_table_get.call_count == 10
+
+    def test_unknown_hook(self, *, app):
+        app.conf.sensor_sampling = {"on_table_get": 10}
+        with pytest.raises(ValueError):
+            app.sensors.add(Mock(name="sensor", autospec=Sensor))
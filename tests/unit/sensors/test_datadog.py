@@ -88,8 +88,9 @@ class TestDatadogMonitor:
         table.name = "table1"
         return table
 
-    def increment_call(self, name, *args, **kwargs):
-        return call(name, *args, **kwargs)
+    def flush(self, mon):
+        mon.flush()
+        return mon.client.client
 
     def test_raises_if_datadog_not_installed(self, *, monkeypatch):
         monkeypatch.setattr("faust.sensors.datadog.datadog", None)
@@ -99,104 +100,189 @@ class TestDatadogMonitor:
     def test_statsd(self, *, mon):
         assert mon.client.client
 
+    def test_flush_interval(self, *, statsd, dogstatsd):
+        assert DatadogMonitor().flush_interval == 1.0
+        assert DatadogMonitor(flush_interval=0.25).flush_interval == 0.25
+
+    def test_flush__nothing_to_send(self, *, mon):
+        client = self.flush(mon)
+        client.open_buffer.assert_not_called()
+
+    def test_flush__buffered(self, *, mon):
+        mon.count("metric_name")
+        client = self.flush(mon)
+        client.open_buffer.assert_called_once_with()
+        client.close_buffer.assert_called_once_with()
+        assert not mon.metrics
+
+    def test_flush__closes_buffer_on_error(self, *, mon):
+        mon.count("metric_name")
+        mon.client.client.increment.side_effect = KeyError()
+        with pytest.raises(KeyError):
+            mon.flush()
+        mon.client.client.close_buffer.assert_called_once_with()
+
+    def test_flush__latency_quantiles(self, *, mon):
+        mon.send_latency.extend([0.010, 0.020, 0.030])
+        client = self.flush(mon)
+        client.gauge.assert_any_call(
+            "send_latency_max", value=30.0, tags=None, sample_rate=1
+        )
+        gauges = {c.args[0]: c.kwargs["value"] for c in client.gauge.call_args_list}
+        assert gauges["send_latency_p50"] == pytest.approx(20.0, rel=0.01)
+        assert "commit_latency_p50" not in gauges
+
+        # only sent again when new latencies were recorded.
+        client.gauge.reset_mock()
+        client = self.flush(mon)
+        client.gauge.assert_not_called()
+        mon.send_latency.append(0.040)
+        client = self.flush(mon)
+        client.gauge.assert_any_call(
+            "send_latency_max", value=40.0, tags=None, sample_rate=1
+        )
+
+        # quantiles of the last latency_window seconds only.
+        for _ in range(mon.latency_window):
+            mon.send_latency.rotate()
+        mon.send_latency.append(0.005)
+        client = self.flush(mon)
+        client.gauge.assert_any_call(
+            "send_latency_max", value=5.0, tags=None, sample_rate=1
+        )
+
+    async def test_on_stop__flushes(self, *, mon):
+        mon.count("metric_name")
+        await mon.on_stop()
+        mon.client.client.increment.assert_called_once_with(
+            "metric_name", value=1, sample_rate=1, tags=None
+        )
+
     def test_on_message_in_out(self, *, mon):
-        message = Mock(name="message")
+        message = Mock(name="message", serialized_key_size=3, serialized_value_size=10)
         mon.on_message_in(TP1, 400, message)
+        mon.on_message_in(TP1, 401, message)
+        mon.on_message_out(TP1, 400, message)
 
-        client = mon.client.client
+        client = self.flush(mon)
         client.increment.assert_has_calls(
             [
                 call(
                     "messages_received",
-                    sample_rate=mon.rate,
+                    sample_rate=1,
                     tags=["topic:foo", "partition:3"],
-                    value=1.0,
+                    value=2.0,
                 ),
                 call(
                     "messages_active",
-                    sample_rate=mon.rate,
+                    sample_rate=1,
                     tags=["topic:foo", "partition:3"],
                     value=1.0,
                 ),
                 call(
                     "topic_messages_received",
-                    sample_rate=mon.rate,
+                    sample_rate=1,
                     tags=["topic:foo"],
-                    value=1.0,
+                    value=2.0,
                 ),
             ]
         )
         client.gauge.assert_called_once_with(
             "read_offset",
-            sample_rate=1.0,
+            sample_rate=1,
             tags=["topic:foo", "partition:3"],
-            value=400,
+            value=401,
         )
 
+    def test_on_message_in_out__nets_to_zero(self, *, mon):
+        message = Mock(name="message", serialized_key_size=3, serialized_value_size=10)
+        mon.on_message_in(TP1, 400, message)
         mon.on_message_out(TP1, 400, message)
-        client.decrement.assert_called_once_with(
-            "messages_active",
-            sample_rate=mon.rate,
-            tags=["topic:foo", "partition:3"],
-            value=1.0,
-        )
+        client = self.flush(mon)
+        metrics = [c.args[0] for c in client.increment.call_args_list]
+        assert "messages_active" not in metrics
+        client.decrement.assert_not_called()
 
     def test_on_stream_event_in_out(self, *, mon, stream, event):
         state = mon.on_stream_event_in(TP1, 401, stream, event)
-        client = mon.client.client
+        client = self.flush(mon)
         client.increment.assert_has_calls(
             [
                 call(
                     "events",
-                    sample_rate=mon.rate,
+                    sample_rate=1,
                     tags=["topic:foo", "partition:3", "stream:topic_foo"],
                     value=1.0,
                 ),
                 call(
                     "events_active",
-                    sample_rate=mon.rate,
+                    sample_rate=1,
                     tags=["topic:foo", "partition:3", "stream:topic_foo"],
                     value=1.0,
                 ),
             ]
         )
         mon.on_stream_event_out(TP1, 401, stream, event, state)
-        client.decrement.assert_called_once_with(
+        client = self.flush(mon)
+        client.increment.assert_called_with(
             "events_active",
-            sample_rate=mon.rate,
+            sample_rate=1,
             tags=["topic:foo", "partition:3", "stream:topic_foo"],
-            value=1.0,
+            value=-1.0,
         )
         client.timing.assert_called_once_with(
             "events_runtime",
-            value=mon.secs_to_ms(mon.events_runtime[-1]),
+            value=mon.secs_to_ms(mon.events_runtime.last),
             sample_rate=mon.rate,
             tags=["topic:foo", "partition:3", "stream:topic_foo"],
         )
 
+    def test_stream_tags_cached(self, *, mon, stream, event):
+        mon._normalize = Mock(name="_normalize", return_value="topic_foo")
+        mon.on_stream_event_in(TP1, 401, stream, event)
+        mon.on_stream_event_in(TP1, 402, stream, event)
+        mon._normalize.assert_called_once()
+        assert mon._stream_tags[stream][TP1] == (
+            "topic:foo",
+            "partition:3",
+            "stream:topic_foo",
+        )
+
+    def test_timing_samples_are_bounded(self, *, statsd, dogstatsd, time):
+        mon = DatadogMonitor(time=time, max_timing_samples=10, rate=0.5)
+        for _ in range(100):
+            mon.on_commit_completed(Mock(name="consumer"), 100.1)
+        client = self.flush(mon)
+        assert client.timing.call_count == 10
+        for timing_call in client.timing.call_args_list:
+            assert timing_call.kwargs["sample_rate"] == 1
+        client.increment.assert_called_once_with(
+            "commit_latency_count", value=100, tags=None, sample_rate=1
+        )
+
     def test_on_table_get(self, *, mon, table):
         mon.on_table_get(table, "key")
-        mon.client.client.increment.assert_called_once_with(
+        self.flush(mon).increment.assert_called_once_with(
             "table_keys_retrieved",
-            sample_rate=mon.rate,
+            sample_rate=1,
             tags=["table:table1"],
             value=1.0,
         )
 
     def test_on_table_set(self, *, mon, table):
         mon.on_table_set(table, "key", "value")
-        mon.client.client.increment.assert_called_once_with(
+        self.flush(mon).increment.assert_called_once_with(
             "table_keys_updated",
-            sample_rate=mon.rate,
+            sample_rate=1,
             tags=["table:table1"],
             value=1.0,
         )
 
     def test_on_table_del(self, *, mon, table):
         mon.on_table_del(table, "key")
-        mon.client.client.increment.assert_called_once_with(
+        self.flush(mon).increment.assert_called_once_with(
             "table_keys_deleted",
-            sample_rate=mon.rate,
+            sample_rate=1,
             tags=["table:table1"],
             value=1.0,
         )
@@ -205,8 +291,7 @@ class TestDatadogMonitor:
         consumer = Mock(name="consumer")
         state = mon.on_commit_initiated(consumer)
         mon.on_commit_completed(consumer, state)
-        client = mon.client.client
-        client.timing.assert_called_once_with(
+        self.flush(mon).timing.assert_called_once_with(
             "commit_latency",
             value=mon.ms_since(float(state)),
             sample_rate=mon.rate,
@@ -218,16 +303,16 @@ class TestDatadogMonitor:
         state = mon.on_send_initiated(producer, "topic1", "message", 321, 123)
         mon.on_send_completed(producer, state, Mock(name="metadata"))
 
-        client = mon.client.client
+        client = self.flush(mon)
         client.increment.assert_has_calls(
             [
                 call(
                     "topic_messages_sent",
-                    sample_rate=mon.rate,
+                    sample_rate=1,
                     tags=["topic:topic1"],
                     value=1.0,
                 ),
-                call("messages_sent", sample_rate=mon.rate, tags=None, value=1.0),
+                call("messages_sent", sample_rate=1, tags=None, value=1.0),
             ]
         )
         client.timing.assert_called_once_with(
@@ -238,25 +323,18 @@ class TestDatadogMonitor:
         )
 
         mon.on_send_error(producer, KeyError("foo"), state)
-        client.increment.assert_has_calls(
-            [
-                call(
-                    "messages_send_failed",
-                    sample_rate=mon.rate,
-                    tags=None,
-                    value=1.0,
-                ),
-            ]
+        client = self.flush(mon)
+        client.increment.assert_called_with(
+            "messages_send_failed",
+            sample_rate=1,
+            tags=None,
+            value=1.0,
         )
-        client.timing.assert_has_calls(
-            [
-                call(
-                    "send_latency_for_error",
-                    value=mon.ms_since(float(state)),
-                    sample_rate=mon.rate,
-                    tags=None,
-                ),
-            ]
+        client.timing.assert_called_with(
+            "send_latency_for_error",
+            value=mon.ms_since(float(state)),
+            sample_rate=mon.rate,
+            tags=None,
         )
 
     def test_on_assignment_start_completed(self, *, mon):
@@ -264,16 +342,12 @@ class TestDatadogMonitor:
         state = mon.on_assignment_start(assignor)
         mon.on_assignment_completed(assignor, state)
 
-        client = mon.client.client
-        client.increment.assert_has_calls(
-            [
-                call(
-                    "assignments_complete",
-                    sample_rate=mon.rate,
-                    tags=None,
-                    value=1.0,
-                ),
-            ]
+        client = self.flush(mon)
+        client.increment.assert_called_once_with(
+            "assignments_complete",
+            sample_rate=1,
+            tags=None,
+            value=1.0,
         )
         client.timing.assert_called_once_with(
             "assignment_latency",
@@ -287,16 +361,12 @@ class TestDatadogMonitor:
         state = mon.on_assignment_start(assignor)
         mon.on_assignment_error(assignor, state, KeyError())
 
-        client = mon.client.client
-        client.increment.assert_has_calls(
-            [
-                call(
-                    "assignments_error",
-                    sample_rate=mon.rate,
-                    tags=None,
-                    value=1.0,
-                ),
-            ]
+        client = self.flush(mon)
+        client.increment.assert_called_once_with(
+            "assignments_error",
+            sample_rate=1,
+            tags=None,
+            value=1.0,
         )
         client.timing.assert_called_once_with(
             "assignment_latency",
@@ -317,18 +387,17 @@ class TestDatadogMonitor:
         app = Mock(name="app")
         request = Mock(name="request")
         view = Mock(name="view")
-        client = mon.client.client
 
         state = mon.on_web_request_start(app, request, view=view)
         mon.on_web_request_end(app, request, response, state, view=view)
 
+        client = self.flush(mon)
         client.increment.assert_called_once_with(
             f"http_status_code.{expected_status}",
-            sample_rate=mon.rate,
+            sample_rate=1,
             tags=None,
             value=1.0,
         )
-
         client.timing.assert_called_once_with(
             "http_response_latency",
             value=mon.ms_since(state["time_end"]),
@@ -338,36 +407,28 @@ class TestDatadogMonitor:
 
     def test_on_rebalance(self, *, mon):
         app = Mock(name="app")
-        client = mon.client.client
 
         state = mon.on_rebalance_start(app)
-
-        client.increment.assert_called_once_with(
+        self.flush(mon).increment.assert_called_once_with(
             "rebalances",
-            sample_rate=mon.rate,
+            sample_rate=1,
             tags=None,
             value=1.0,
         )
 
         mon.on_rebalance_return(app, state)
-
+        client = self.flush(mon)
         client.increment.assert_has_calls(
             [
-                call("rebalances", sample_rate=mon.rate, tags=None, value=1.0),
+                call("rebalances", sample_rate=1, tags=None, value=-1.0),
                 call(
                     "rebalances_recovering",
-                    sample_rate=mon.rate,
+                    sample_rate=1,
                     tags=None,
                     value=1.0,
                 ),
             ]
         )
-        client.decrement.assert_called_once_with(
-            "rebalances",
-            sample_rate=mon.rate,
-            tags=None,
-            value=1.0,
-        )
         client.timing.assert_called_once_with(
             "rebalance_return_latency",
             value=mon.ms_since(state["time_return"]),
@@ -376,40 +437,25 @@ class TestDatadogMonitor:
         )
 
         mon.on_rebalance_end(app, state)
-
-        client.decrement.assert_has_calls(
-            [
-                call("rebalances", sample_rate=mon.rate, tags=None, value=1.0),
-                call(
-                    "rebalances_recovering",
-                    sample_rate=mon.rate,
-                    tags=None,
-                    value=1.0,
-                ),
-            ]
+        client = self.flush(mon)
+        client.increment.assert_called_with(
+            "rebalances_recovering",
+            sample_rate=1,
+            tags=None,
+            value=-1.0,
         )
-
-        client.timing.assert_has_calls(
-            [
-                call(
-                    "rebalance_return_latency",
-                    value=mon.ms_since(state["time_return"]),
-                    sample_rate=mon.rate,
-                    tags=None,
-                ),
-                call(
-                    "rebalance_end_latency",
-                    value=mon.ms_since(state["time_end"]),
-                    sample_rate=mon.rate,
-                    tags=None,
-                ),
-            ]
+        client.timing.assert_called_with(
+            "rebalance_end_latency",
+            value=mon.ms_since(state["time_end"]),
+            sample_rate=mon.rate,
+            tags=None,
         )
 
     def test_count(self, *, mon):
         mon.count("metric_name", count=3)
-        mon.client.client.increment.assert_called_once_with(
-            "metric_name", value=3, sample_rate=mon.rate, tags=None
+        mon.count("metric_name", count=2)
+        self.flush(mon).increment.assert_called_once_with(
+            "metric_name", value=5, sample_rate=1, tags=None
         )
 
     def test_on_tp_commit(self, *, mon):
@@ -419,36 +465,36 @@ class TestDatadogMonitor:
             TP("bar", 3): 3003,
         }
         mon.on_tp_commit(offsets)
-        client = mon.client.client
+        client = self.flush(mon)
         client.gauge.assert_has_calls(
             [
                 call(
                     "committed_offset",
                     value=1001,
                     tags=["topic:foo", "partition:0"],
-                    sample_rate=mon.rate,
+                    sample_rate=1,
                 ),
                 call(
                     "committed_offset",
                     value=2002,
                     tags=["topic:foo", "partition:1"],
-                    sample_rate=mon.rate,
+                    sample_rate=1,
                 ),
                 call(
                     "committed_offset",
                     value=3003,
                     tags=["topic:bar", "partition:3"],
-                    sample_rate=mon.rate,
+                    sample_rate=1,
                 ),
             ]
         )
 
     def test_track_tp_end_offsets(self, *, mon):
         mon.track_tp_end_offset(TP("foo", 0), 4004)
-        client = mon.client.client
-        client.gauge.assert_called_once_with(
+        mon.track_tp_end_offset(TP("foo", 0), 4005)
+        self.flush(mon).gauge.assert_called_once_with(
             "end_offset",
-            value=4004,
+            value=4005,
             tags=["topic:foo", "partition:0"],
-            sample_rate=mon.rate,
+            sample_rate=1,
         )
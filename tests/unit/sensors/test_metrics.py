@@ -1,3 +1,5 @@
+import pytest
+
 from faust.sensors.metrics import performance_metrics
 from faust.types import TP
 
@@ -14,12 +16,12 @@ def test_performance_metrics_is_framework_neutral(*, app):
 
     assert payload["throughput"]["messages_received_total"] == 10
     assert payload["throughput"]["events_s"] == 3
-    assert payload["latency"]["commit_latency"] == {
-        "count": 3,
-        "p50": 0.02,
-        "p95": 0.03,
-        "max": 0.03,
-    }
+    commit_latency = payload["latency"]["commit_latency"]
+    assert commit_latency["count"] == 3
+    assert commit_latency["p50"] == pytest.approx(0.02, rel=0.01)
+    assert commit_latency["p95"] == pytest.approx(0.03, rel=0.01)
+    assert commit_latency["p99"] == pytest.approx(0.03, rel=0.01)
+    assert commit_latency["max"] == 0.03
     assert payload["consumer"]["lag_total"] == 10
     assert payload["consumer"]["lag_by_partition"] == {"orders": {0: 10}}
 
@@ -7,6 +7,7 @@ import pytest
 
 from faust import Event, Stream, Table, Topic
 from faust.sensors.monitor import Monitor, TableState
+from faust.sensors.sketch import WindowedLatencySketch
 from faust.transport.consumer import Consumer
 from faust.transport.producer import Producer
 from faust.types import TP, Message
@@ -24,7 +25,12 @@ class TestMonitor:
 
     @pytest.fixture
     def message(self):
-        return Mock(name="message", autospec=Message)
+        return Mock(
+            name="message",
+            autospec=Message,
+            serialized_key_size=3,
+            serialized_value_size=10,
+        )
 
     @pytest.fixture
     def stream(self):
@@ -91,7 +97,8 @@ class TestMonitor:
         assert Monitor().max_avg_history == Monitor.max_avg_history
 
     def test_init_max_avg_history__default(self):
-        assert Monitor(max_avg_history=33).max_avg_history == 33
+        with pytest.warns(UserWarning, match="max_avg_history is deprecated"):
+            assert Monitor(max_avg_history=33).max_avg_history == 33
 
     def test_init_max_commit_latency_history(self):
         assert (
@@ -99,23 +106,25 @@ class TestMonitor:
         )
 
     def test_init_max_commit_latency_history__default(self):
-        assert (
-            Monitor(
-                max_commit_latency_history=33,
-            ).max_commit_latency_history
-            == 33
-        )
+        with pytest.warns(UserWarning, match="deprecated"):
+            assert (
+                Monitor(
+                    max_commit_latency_history=33,
+                ).max_commit_latency_history
+                == 33
+            )
 
     def test_init_max_send_latency_history(self):
         assert Monitor().max_send_latency_history == Monitor.max_send_latency_history
 
     def test_init_max_send_latency_history__default(self):
-        assert (
-            Monitor(
-                max_send_latency_history=33,
-            ).max_send_latency_history
-            == 33
-        )
+        with pytest.warns(UserWarning, match="deprecated"):
+            assert (
+                Monitor(
+                    max_send_latency_history=33,
+                ).max_send_latency_history
+                == 33
+            )
 
     def test_init_max_assignment_latency_history(self):
         assert (
@@ -124,12 +133,13 @@ class TestMonitor:
         )
 
     def test_init_max_assignment_latency_history__default(self):
-        assert (
-            Monitor(
-                max_assignment_latency_history=33,
-            ).max_assignment_latency_history
-            == 33
-        )
+        with pytest.warns(UserWarning, match="deprecated"):
+            assert (
+                Monitor(
+                    max_assignment_latency_history=33,
+                ).max_assignment_latency_history
+                == 33
+            )
 
     def test_init_rebalances(self):
         assert Monitor(rebalances=99).rebalances == 99
@@ -147,11 +157,12 @@ class TestMonitor:
             "events_total": mon.events_total,
             "events_s": mon.events_s,
             "events_runtime_avg": mon.events_runtime_avg,
+            "events_runtime": mon.events_runtime.asdict(),
             "events_by_task": mon._events_by_task_dict(),
             "events_by_stream": mon._events_by_stream_dict(),
-            "commit_latency": mon.commit_latency,
-            "send_latency": mon.send_latency,
-            "assignment_latency": mon.assignment_latency,
+            "commit_latency": mon.commit_latency.asdict(),
+            "send_latency": mon.send_latency.asdict(),
+            "assignment_latency": mon.assignment_latency.asdict(),
             "assignments_completed": mon.assignments_completed,
             "assignments_failed": mon.assignments_failed,
             "send_errors": mon.send_errors,
@@ -162,16 +173,19 @@ class TestMonitor:
             "topic_read_offsets": {},
             "topic_end_offsets": {},
             "rebalance_end_avg": mon.rebalance_end_avg,
-            "rebalance_end_latency": mon.rebalance_end_latency,
+            "rebalance_end_latency": mon.rebalance_end_latency.asdict(),
             "rebalance_return_avg": mon.rebalance_return_avg,
-            "rebalance_return_latency": mon.rebalance_return_latency,
+            "rebalance_return_latency": mon.rebalance_return_latency.asdict(),
             "rebalances": mon.rebalances,
             "http_response_codes": mon._http_response_codes_dict(),
-            "http_response_latency": mon.http_response_latency,
+            "http_response_latency": mon.http_response_latency.asdict(),
             "http_response_latency_avg": mon.http_response_latency_avg,
+            "consumer_prefetch_depth": mon.consumer_prefetch_depth,
+            "prefetch_wait_latency": mon.prefetch_wait_latency.asdict(),
         }
 
     def test_on_message_in(self, *, message, mon, time):
+        mon.track_bytes_received = True
         for i in range(1, 11):
             offset = 3 + i
             mon.on_message_in(TP1, offset, message)
@@ -181,6 +195,29 @@ class TestMonitor:
             assert mon.messages_received_by_topic[TP1.topic] == i
             assert message.time_in is time()
             assert mon.tp_read_offsets[TP1] == offset
+            assert mon.tp_bytes_received[TP1] == 13 * i
+
+    def test_on_message_in__bytes_not_tracked(self, *, message, mon):
+        mon.on_message_in(TP1, 3, message)
+        assert mon.messages_received_total == 1
+        assert not mon.tp_bytes_received
+
+    def test_on_message_in__null_key(self, *, message, mon):
+        mon.track_bytes_received = True
+        message.serialized_key_size = -1
+        mon.on_message_in(TP1, 3, message)
+        assert mon.tp_bytes_received[TP1] == message.serialized_value_size
+
+    def test__sample_tp_bytes(self, *, mon):
+        mon.bytes_rate_smoothing = 0.5
+        mon.tp_bytes_received[TP1] = 100
+        mon._sample_tp_bytes()
+        assert mon.tp_bytes_s[TP1] == 50.0
+        mon.tp_bytes_received[TP1] = 300
+        mon._sample_tp_bytes()
+        assert mon.tp_bytes_s[TP1] == 125.0
+        mon._sample_tp_bytes()
+        assert mon.tp_bytes_s[TP1] == 62.5
 
     def test_on_stream_event_in(self, *, event, mon, stream, time):
         for i in range(1, 11):
@@ -213,7 +250,15 @@ class TestMonitor:
                 "time_out": time(),
                 "time_total": time() - other_time,
             }
-            assert mon.events_runtime[-1] == time() - other_time
+            assert mon.events_runtime.last == time() - other_time
+
+    def test_on_stream_event_out__untimed(self, *, event, mon, stream, time):
+        mon.events_active = 1
+        state = {"time_in": None, "time_out": None, "time_total": None}
+        mon.on_stream_event_out(TP1, 3, stream, event, state)
+        assert mon.events_active == 0
+        assert state["time_total"] is None
+        assert not mon.events_runtime
 
     def test_on_stream_event_out__missing_state(self, *, event, mon, stream, time):
         # should not be an error
@@ -261,7 +306,7 @@ class TestMonitor:
     def test_on_commit_completed(self, *, mon, time):
         other_time = 56.7
         mon.on_commit_completed(Mock(name="consumer", autospec=Consumer), other_time)
-        assert mon.commit_latency[-1] == time() - other_time
+        assert mon.commit_latency.last == time() - other_time
 
     def test_on_send_initiated(self, *, mon, time):
         for i in range(1, 11):
@@ -283,7 +328,7 @@ class TestMonitor:
             other_time,
             Mock(name="metadata"),
         )
-        assert mon.send_latency[-1] == time() - other_time
+        assert mon.send_latency.last == time() - other_time
 
     def test_on_send_error(self, *, mon, time):
         mon.on_send_error(
@@ -302,7 +347,7 @@ class TestMonitor:
         assignor = Mock(name="assignor")
         assert mon.assignments_completed == 0
         mon.on_assignment_completed(assignor, {"time_start": other_time})
-        assert mon.assignment_latency[-1] == time() - other_time
+        assert mon.assignment_latency.last == time() - other_time
         assert mon.assignments_completed == 1
 
     def test_on_assignment_error(self, *, mon, time):
@@ -310,7 +355,7 @@ class TestMonitor:
         assignor = Mock(name="assignor")
         assert mon.assignments_failed == 0
         mon.on_assignment_error(assignor, {"time_start": other_time}, KeyError())
-        assert mon.assignment_latency[-1] == time() - other_time
+        assert mon.assignment_latency.last == time() - other_time
         assert mon.assignments_failed == 1
 
     def test_on_rebalance_start(self, *, mon, time, app):
@@ -324,7 +369,7 @@ class TestMonitor:
         other_time = 56.7
         state = {"time_start": other_time}
         mon.on_rebalance_return(app, state)
-        assert mon.rebalance_return_latency[-1] == time() - other_time
+        assert mon.rebalance_return_latency.last == time() - other_time
         assert state["time_return"] == time()
         assert state["latency_return"] == time() - other_time
 
@@ -332,7 +377,7 @@ class TestMonitor:
         other_time = 56.7
         state = {"time_start": other_time}
         mon.on_rebalance_end(app, state)
-        assert mon.rebalance_end_latency[-1] == time() - other_time
+        assert mon.rebalance_end_latency.last == time() - other_time
         assert state["time_end"] == time()
         assert state["latency_end"] == time() - other_time
 
@@ -383,7 +428,7 @@ class TestMonitor:
         assert state["latency_end"] == time() - other_time
         assert state["status_code"] == HTTPStatus(expected_status)
 
-        assert mon.http_response_latency[-1] == time() - other_time
+        assert mon.http_response_latency.last == time() - other_time
         assert mon.http_response_codes[HTTPStatus(expected_status)] == 1
 
     def test_TableState_asdict(self, *, mon, table):
@@ -416,6 +461,23 @@ class TestMonitor:
             offsets_dict = mon.asdict()["topic_committed_offsets"][topic]
             assert all(offsets_dict[p] == offset for p in partitions)
 
+    def test_tp_lags(self, *, mon):
+        TP2 = TP("foo", 1)
+        TP3 = TP("foo", 2)
+        mon.tp_read_offsets.update({TP1: 10, TP2: 30})
+        mon.tp_end_offsets.update({TP1: 15, TP2: 20, TP3: 100})
+        assert mon.tp_lags() == {TP1: 5, TP2: 0}
+
+    def test_on_rebalance_start__keeps_lag(self, *, mon, app):
+        mon.tp_read_offsets[TP1] = 10
+        mon.tp_end_offsets[TP1] = 15
+        state = mon.on_rebalance_start(app)
+        assert mon.tp_lag_at_rebalance == {TP1: 5}
+        # interrupted before offsets were tracked again
+        mon.on_rebalance_start(app)
+        mon.on_rebalance_end(app, state)
+        assert mon.tp_lag_at_rebalance == {TP1: 5}
+
     def test_track_tp_end_offsets(self, *, mon):
         tp = TP(topic="foo", partition=2)
         for offset in range(20):
@@ -448,19 +510,73 @@ class TestMonitor:
     def test__sample(self, *, mon):
         prev_event_total = 0
         prev_message_total = 0
-        mon.events_runtime = []
         mon._sample(prev_event_total, prev_message_total)
-        mon.events_runtime.extend(range(100))
-        mon.rebalance_return_latency.extend(range(100))
-        mon.rebalance_end_latency.extend(range(100))
-        mon.http_response_latency.extend(range(100))
+        assert mon.events_runtime_avg == 0.0
+        values = [i / 1000.0 for i in range(1, 102)]
+        mon.events_runtime.extend(values)
+        mon.rebalance_return_latency.extend(values)
+        mon.rebalance_end_latency.extend(values)
+        mon.http_response_latency.extend(values)
         prev_event_total = 0
         prev_message_total = 0
         mon._sample(prev_event_total, prev_message_total)
 
-        assert mon.events_runtime_avg == median(mon.events_runtime)
+        expected = pytest.approx(median(values), rel=mon.latency_relative_accuracy)
+        assert mon.events_runtime_avg == expected
         assert mon.events_s == 0  # XXX this is wrong!
 
-        assert mon.rebalance_return_avg == median(mon.rebalance_return_latency)
-        assert mon.rebalance_end_avg == median(mon.rebalance_end_latency)
-        assert mon.http_response_latency_avg == median(mon.http_response_latency)
+        assert mon.rebalance_return_avg == expected
+        assert mon.rebalance_end_avg == expected
+        assert mon.http_response_latency_avg == expected
+
+    def test_init_latency_sketch(self):
+        sketch = WindowedLatencySketch([0.1])
+        mon = Monitor(commit_latency=sketch, send_latency=[0.2, 0.3])
+        assert mon.commit_latency is sketch
+        assert mon.send_latency.count == 2
+        assert mon.send_latency.last == 0.3
+
+    def test_init_latency_relative_accuracy(self):
+        mon = Monitor(latency_relative_accuracy=0.05)
+        assert mon.latency_relative_accuracy == 0.05
+        for sketch in mon.latency_sketches().values():
+            assert sketch.relative_accuracy == 0.05
+
+    def test_init_latency_window(self):
+        mon = Monitor(latency_window=5)
+        assert mon.latency_window == 5
+        for sketch in mon.latency_sketches().values():
+            assert sketch.window == 5
+
+    def test__sample__window(self):
+        mon = Monitor(latency_window=2)
+        mon.events_runtime.extend([10.0] * 5)
+        mon._sample(0, 0)
+        assert mon.events_runtime_avg == pytest.approx(10.0, rel=0.01)
+        mon.events_runtime.extend([1.0] * 3)
+        mon._sample(0, 0)
+        # the window still has the older latencies.
+        assert mon.events_runtime_avg == pytest.approx(10.0, rel=0.01)
+        mon.events_runtime.append(1.0)
+        mon._sample(0, 0)
+        # the older latencies are no longer in the window.
+        assert mon.events_runtime_avg == pytest.approx(1.0, rel=0.01)
+        assert mon.events_runtime.total == 9
+        mon._sample(0, 0)
+        mon._sample(0, 0)
+        assert not mon.events_runtime
+        # kept until new latencies are recorded.
+        assert mon.events_runtime_avg == pytest.approx(1.0, rel=0.01)
+
+    def test_latency_sketches(self, *, mon):
+        sketches = mon.latency_sketches()
+        assert sketches["events_runtime"] is mon.events_runtime
+        assert sketches["http_response_latency"] is mon.http_response_latency
+        assert sketches["prefetch_wait_latency"] is mon.prefetch_wait_latency
+        assert len(sketches) == 8
+
+    def test_on_consumer_prefetch(self, *, mon):
+        mon.on_consumer_prefetch(Mock(name="consumer"), 3, 0.25)
+        assert mon.consumer_prefetch_depth == 3
+        assert mon.prefetch_wait_latency.count == 1
+        assert mon.prefetch_wait_latency.last == 0.25
@@ -115,7 +115,11 @@ class TestOpenTelemetryMonitor:
         assert mon.metrics is metrics
 
     def test_on_message_in(self, *, mon, reader):
-        mon.on_message_in(TP1, 400, Mock(name="message"))
+        mon.on_message_in(
+            TP1,
+            400,
+            Mock(name="message", serialized_key_size=3, serialized_value_size=10),
+        )
 
         c = Collected(reader)
         attrs = {"topic": "foo", "partition": 3}
@@ -124,7 +128,16 @@ class TestOpenTelemetryMonitor:
         assert c.value("faust.offset.read", attrs) == 400
 
     def test_on_message_out_decrements_active(self, *, mon, reader):
-        mon.on_message_in(TP1, 400, Mock(name="message", time_in=100.0))
+        mon.on_message_in(
+            TP1,
+            400,
+            Mock(
+                name="message",
+                time_in=100.0,
+                serialized_key_size=3,
+                serialized_value_size=10,
+            ),
+        )
         mon.on_message_out(TP1, 400, Mock(name="message", time_in=100.0))
 
         c = Collected(reader)
@@ -243,6 +256,12 @@ class TestOpenTelemetryMonitor:
         c = Collected(reader)
         assert c.value("faust.producer.buffer") == 17
 
+    def test_consumer_prefetch(self, *, mon, reader):
+        mon.on_consumer_prefetch(Mock(name="consumer"), 3, 0.25)
+        c = Collected(reader)
+        assert c.value("faust.consumer.prefetch_depth") == 3
+        assert c.count("faust.consumer.prefetch_wait") == 1
+
     def test_count(self, *, mon, reader):
         mon.count("my_metric", 5)
         mon.count("my_metric", 3)
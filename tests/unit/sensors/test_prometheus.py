@@ -44,7 +44,10 @@ class TestPrometheusMonitor:
 
     @pytest.fixture()
     def event(self) -> EventT:
-        return Mock(autospec=EventT, name="event")
+        event = Mock(autospec=EventT, name="event")
+        event.message.serialized_key_size = 3
+        event.message.serialized_value_size = 10
+        return event
 
     @pytest.fixture()
     def table(self) -> TableT:
@@ -62,7 +65,7 @@ class TestPrometheusMonitor:
     def test_on_message_in(
         self, monitor: PrometheusMonitor, metrics: FaustMetrics
     ) -> None:
-        message = Mock(name="message")
+        message = Mock(name="message", serialized_key_size=3, serialized_value_size=10)
 
         monitor.on_message_in(TP1, 400, message)
 
@@ -206,6 +209,18 @@ class TestPrometheusMonitor:
             monitor.ms_since(float(state)),
         )
 
+    def test_on_consumer_prefetch(
+        self, monitor: PrometheusMonitor, metrics: FaustMetrics
+    ) -> None:
+        monitor.on_consumer_prefetch(Mock(name="consumer"), 3, 0.25)
+
+        self.assert_has_sample_value(
+            metrics.consumer_prefetch_depth, "test_consumer_prefetch_depth", {}, 3
+        )
+        self.assert_has_sample_value(
+            metrics.consumer_prefetch_wait, "test_consumer_prefetch_wait_sum", {}, 250
+        )
+
     def test_on_send_initiated_completed(
         self, monitor: PrometheusMonitor, metrics: FaustMetrics
     ) -> None:
@@ -494,6 +509,105 @@ class TestPrometheusMonitor:
         )
         assert collected_partitions == frozenset([(TP2.topic, str(TP2.partition))])
 
+    def test_labelled_metrics_are_cached(
+        self,
+        monitor: PrometheusMonitor,
+        metrics: FaustMetrics,
+        stream: StreamT,
+        event: EventT,
+        table: TableT,
+    ) -> None:
+        monitor._normalize = Mock(name="_normalize", return_value="topic_foo")
+        for offset in range(3):
+            self._handle_event(monitor, TP1, stream, event, offset)
+            monitor.on_table_get(table, "key")
+        monitor._normalize.assert_called_once()
+        assert list(monitor._tp_children) == [TP1]
+        assert list(monitor._table_children) == [table.name]
+        self.assert_has_sample_value(
+            metrics.total_events_per_stream,
+            "test_total_events_per_stream_total",
+            {"stream": "stream.topic_foo.events"},
+            3,
+        )
+        self.assert_has_sample_value(
+            metrics.messages_received_per_topics_partition,
+            "test_messages_received_per_topics_partition",
+            {"topic": TP1.topic, "partition": str(TP1.partition)},
+            2,
+        )
+
+    def test_cached_labels_are_recreated_after_rebalance(
+        self,
+        monitor: PrometheusMonitor,
+        metrics: FaustMetrics,
+        stream: StreamT,
+        event: EventT,
+        app: AppT,
+    ) -> None:
+        self._handle_event(monitor, TP1, stream, event, 10)
+        monitor.on_rebalance_start(app)
+        assert not monitor._tp_children
+        self._handle_event(monitor, TP1, stream, event, 11)
+        self.assert_has_sample_value(
+            metrics.messages_received_per_topics,
+            "test_messages_received_per_topic_total",
+            {"topic": TP1.topic},
+            1,
+        )
+
+    def test_latency_sample_every(
+        self, metrics: FaustMetrics, stream: StreamT, event: EventT
+    ) -> None:
+        monitor = PrometheusMonitor(metrics=metrics, time=_time, latency_sample_every=3)
+        producer = Mock(name="producer")
+        for offset in range(7):
+            state = monitor.on_stream_event_in(TP1, offset, stream, event)
+            monitor.on_stream_event_out(TP1, offset, stream, event, state)
+            state = monitor.on_send_initiated(producer, "topic1", "m", 1, 1)
+            monitor.on_send_completed(producer, state, Mock(name="metadata"))
+        self.assert_has_sample_value(
+            metrics.events_runtime_latency, "test_events_runtime_ms_count", {}, 2
+        )
+        self.assert_has_sample_value(
+            metrics.producer_send_latency, "test_producer_send_latency_count", {}, 2
+        )
+        self.assert_has_sample_value(
+            metrics.total_sent_messages, "test_total_sent_messages_total", {}, 7
+        )
+
+    def test_update_latency_quantiles(
+        self, monitor: PrometheusMonitor, metrics: FaustMetrics
+    ) -> None:
+        monitor.send_latency.extend([0.010, 0.020, 0.030])
+
+        monitor.update_latency_quantiles()
+
+        self.assert_has_sample_value(
+            metrics.latency_quantiles,
+            "test_latency_quantile_ms",
+            {"series": "send_latency", "quantile": "1.0"},
+            30.0,
+        )
+        samples = {
+            sample.labels["quantile"]: sample.value
+            for sample in metrics.latency_quantiles.collect()[0].samples
+            if sample.labels["series"] == "send_latency"
+        }
+        assert samples["0.5"] == pytest.approx(20.0, rel=0.01)
+        # series with no latencies recorded are not exported.
+        assert not any(
+            sample.labels["series"] == "commit_latency"
+            for sample in metrics.latency_quantiles.collect()[0].samples
+        )
+
+        # nor once their latencies are no longer in the window.
+        for _ in range(monitor.latency_window):
+            monitor.send_latency.rotate()
+        monitor.update_latency_quantiles()
+        assert not metrics.latency_quantiles.collect()[0].samples
+        monitor.update_latency_quantiles()
+
     def assert_has_sample_value(
         self, metric: Metric, name: str, labels: Dict[str, str], value: int
     ) -> None:
@@ -0,0 +1,158 @@
+import random
+
+import pytest
+
+from faust.sensors.sketch import LatencySketch, WindowedLatencySketch
+
+
+def nearest_rank(values, q):
+    ordered = sorted(values)
+    return ordered[round(q * (len(ordered) - 1))]
+
+
+class TestLatencySketch:
+    def test_empty(self):
+        sketch = LatencySketch()
+        assert not sketch
+        assert len(sketch) == 0
+        assert sketch.quantile(0.5) is None
+        assert sketch.mean is None
+        assert sketch.last is None
+        assert sketch.asdict() == {
+            "count": 0,
+            "p50": None,
+            "p95": None,
+            "p99": None,
+            "max": None,
+        }
+
+    def test_append(self):
+        sketch = LatencySketch()
+        sketch.append(0.2)
+        sketch.append(0.1)
+        assert sketch
+        assert len(sketch) == 2
+        assert sketch.last == 0.1
+        assert sketch.min == 0.1
+        assert sketch.max == 0.2
+        assert sketch.mean == pytest.approx(0.15)
+
+    @pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99, 0.999])
+    def test_relative_accuracy(self, q):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(-5, 2) for _ in range(20_000)]
+        sketch = LatencySketch(values, relative_accuracy=0.01)
+        assert sketch.quantile(q) == pytest.approx(nearest_rank(values, q), rel=0.01)
+
+    def test_min_max_exact(self):
+        sketch = LatencySketch([0.013, 0.5, 0.017])
+        assert sketch.quantile(0.0) == 0.013
+        assert sketch.quantile(1.0) == 0.5
+        assert sketch.asdict()["max"] == 0.5
+
+    def test_quantiles(self):
+        values = [float(i) for i in range(1, 101)]
+        sketch = LatencySketch(values)
+        p99, p50 = sketch.quantiles([0.99, 0.5])
+        assert p50 == pytest.approx(nearest_rank(values, 0.5), rel=0.01)
+        assert p99 == pytest.approx(nearest_rank(values, 0.99), rel=0.01)
+
+    def test_zero(self):
+        sketch = LatencySketch([0.0, 0.0, 0.0, 1.0])
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == 1.0
+
+    def test_max_buckets(self):
+        values = [10.0**e for e in range(-6, 4)]
+        values.extend(1.0 + i / 100 for i in range(100))
+        sketch = LatencySketch(values, max_buckets=32)
+        assert len(sketch._buckets) <= 32
+        assert sketch.count == 110
+        # only the lowest values lose accuracy.
+        for q in (0.5, 0.9, 0.99):
+            expected = nearest_rank(values, q)
+            assert sketch.quantile(q) == pytest.approx(expected, rel=0.01)
+
+    def test_merge(self):
+        rng = random.Random(3)
+        values = [rng.expovariate(100) for _ in range(10_000)]
+        a = LatencySketch(values[:5000])
+        b = LatencySketch(values[5000:])
+        a.merge(b)
+        whole = LatencySketch(values)
+        assert a.count == whole.count
+        assert a.min == whole.min
+        assert a.max == whole.max
+        assert a.sum == pytest.approx(whole.sum)
+        assert a.asdict() == whole.asdict()
+
+    def test_merge__empty(self):
+        a = LatencySketch([0.1])
+        a.merge(LatencySketch())
+        assert a.count == 1
+        assert a.last == 0.1
+
+    def test_merge__different_accuracy(self):
+        with pytest.raises(ValueError):
+            LatencySketch().merge(LatencySketch([1.0], relative_accuracy=0.05))
+
+    def test_relative_accuracy__invalid(self):
+        with pytest.raises(ValueError):
+            LatencySketch(relative_accuracy=1.0)
+
+    def test_repr(self):
+        assert repr(LatencySketch([0.1]))
+
+
+class TestWindowedLatencySketch:
+    def test_empty(self):
+        sketch = WindowedLatencySketch()
+        assert not sketch
+        assert len(sketch) == 0
+        assert sketch.quantile(0.5) is None
+        assert sketch.last is None
+        assert sketch.asdict()["count"] == 0
+
+    def test_invalid_window(self):
+        with pytest.raises(ValueError):
+            WindowedLatencySketch(window=0)
+
+    def test_window(self):
+        sketch = WindowedLatencySketch([0.3, 0.4], window=3)
+        assert sketch.count == 2
+        sketch.rotate()
+        sketch.append(0.1)
+        sketch.rotate()
+        sketch.extend([0.2, 0.2])
+        assert sketch.count == 5
+        assert sketch.quantile(1.0) == 0.4
+        assert sketch.last == 0.2
+        # the first interval is no longer in the window.
+        sketch.rotate()
+        assert sketch.count == 3
+        assert sketch.quantile(1.0) == 0.2
+        assert sketch.quantiles([0.0, 1.0]) == [0.1, 0.2]
+        assert sketch.asdict()["max"] == 0.2
+        sketch.rotate()
+        sketch.rotate()
+        assert not sketch
+        assert sketch.quantile(0.5) is None
+        assert sketch.last == 0.2
+        assert sketch.total == 5
+
+    def test_merged__matches_values(self):
+        values = [random.expovariate(10.0) for _ in range(1000)]
+        sketch = WindowedLatencySketch(window=20)
+        for i, value in enumerate(values):
+            sketch.append(value)
+            if i % 100 == 99:
+                sketch.rotate()
+        for q in (0.5, 0.99):
+            assert sketch.quantile(q) == pytest.approx(
+                nearest_rank(values, q), rel=0.011
+            )
+        # querying twice reuses the merge of the previous intervals.
+        assert sketch.merged().count == sketch.merged().count == 1000
+
+    def test_repr(self):
+        assert "count" in repr(WindowedLatencySketch([0.1]))
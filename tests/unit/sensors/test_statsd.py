@@ -55,6 +55,10 @@ class TestStatsdMonitor:
     def mon(self, *, statsd, time):
         return StatsdMonitor(time=time)
 
+    def flush(self, mon):
+        mon.flush()
+        return mon.client.pipeline.return_value
+
     def test_statsd(self, *, mon):
         assert mon.client
 
@@ -63,101 +67,137 @@ class TestStatsdMonitor:
         with pytest.raises(ImproperlyConfigured):
             StatsdMonitor()
 
+    def test_flush__nothing_to_send(self, *, mon):
+        mon.flush()
+        mon.client.pipeline.assert_not_called()
+
+    def test_flush__sends_pipeline(self, *, mon):
+        mon.count("metric_name")
+        pipe = self.flush(mon)
+        pipe.send.assert_called_once_with()
+        mon.client.incr.assert_not_called()
+        assert not mon.metrics
+
+    async def test_on_stop__flushes(self, *, mon):
+        mon.count("metric_name")
+        await mon.on_stop()
+        mon.client.pipeline.return_value.incr.assert_called_once_with(
+            "metric_name", count=1
+        )
+
     def test_on_message_in_out(self, *, mon):
-        message = Mock(name="message")
+        message = Mock(name="message", serialized_key_size=3, serialized_value_size=10)
         mon.on_message_in(TP1, 400, message)
+        mon.on_message_in(TP1, 401, message)
+        mon.on_message_out(TP1, 400, message)
 
-        mon.client.incr.assert_has_calls(
+        pipe = self.flush(mon)
+        pipe.incr.assert_has_calls(
             [
-                call("messages_received", rate=mon.rate),
-                call("messages_active", rate=mon.rate),
-                call("topic.foo.messages_received", rate=mon.rate),
+                call("messages_received", count=2),
+                call("messages_active", count=1),
+                call("topic.foo.messages_received", count=2),
             ]
         )
-        mon.client.gauge.assert_called_once_with("read_offset.foo.3", 400)
-
-        mon.on_message_out(TP1, 400, message)
-        mon.client.decr.assert_called_once_with("messages_active", rate=mon.rate)
+        pipe.gauge.assert_called_once_with("read_offset.foo.3", 401)
 
     def test_on_stream_event_in_out(self, *, mon, stream, event):
         state = mon.on_stream_event_in(TP1, 401, stream, event)
-        mon.client.incr.assert_has_calls(
+        pipe = self.flush(mon)
+        pipe.incr.assert_has_calls(
             [
-                call("events", rate=mon.rate),
-                call("stream.topic_foo.events", rate=mon.rate),
-                call("events_active", rate=mon.rate),
+                call("events", count=1),
+                call("stream.topic_foo.events", count=1),
+                call("events_active", count=1),
             ]
         )
         mon.on_stream_event_out(TP1, 401, stream, event, state)
-        mon.client.decr.assert_called_once_with("events_active", rate=mon.rate)
-        mon.client.timing.assert_called_once_with(
+        pipe = self.flush(mon)
+        pipe.incr.assert_called_with("events_active", count=-1)
+        pipe.timing.assert_called_once_with(
             "events_runtime",
-            mon.secs_to_ms(mon.events_runtime[-1]),
+            mon.secs_to_ms(mon.events_runtime.last),
             rate=mon.rate,
         )
 
+    def test_stream_names_cached(self, *, mon, stream, event):
+        mon._normalize = Mock(name="_normalize", return_value="topic_foo")
+        mon.on_stream_event_in(TP1, 401, stream, event)
+        mon.on_stream_event_in(TP1, 402, stream, event)
+        mon._normalize.assert_called_once()
+        assert mon._stream_names[stream] == "stream.topic_foo.events"
+
     def test_on_table_get(self, *, mon, table):
         mon.on_table_get(table, "key")
-        mon.client.incr.assert_called_once_with(
-            "table.table1.keys_retrieved",
-            rate=mon.rate,
+        self.flush(mon).incr.assert_called_once_with(
+            "table.table1.keys_retrieved", count=1
         )
 
     def test_on_table_set(self, *, mon, table):
         mon.on_table_set(table, "key", "value")
-        mon.client.incr.assert_called_once_with(
-            "table.table1.keys_updated",
-            rate=mon.rate,
+        self.flush(mon).incr.assert_called_once_with(
+            "table.table1.keys_updated", count=1
         )
 
     def test_on_table_del(self, *, mon, table):
         mon.on_table_del(table, "key")
-        mon.client.incr.assert_called_once_with(
-            "table.table1.keys_deleted",
-            rate=mon.rate,
+        self.flush(mon).incr.assert_called_once_with(
+            "table.table1.keys_deleted", count=1
         )
 
     def test_on_commit_completed(self, *, mon):
         consumer = Mock(name="consumer")
         state = mon.on_commit_initiated(consumer)
         mon.on_commit_completed(consumer, state)
-        mon.client.timing.assert_called_once_with(
+        self.flush(mon).timing.assert_called_once_with(
             "commit_latency",
             mon.ms_since(float(state)),
             rate=mon.rate,
         )
 
+    def test_timing_samples_are_bounded(self, *, mon):
+        mon.metrics.max_timing_samples = 10
+        for _ in range(100):
+            mon.on_commit_completed(Mock(name="consumer"), 100.1)
+        pipe = self.flush(mon)
+        assert pipe.timing.call_count == 10
+        for timing_call in pipe.timing.call_args_list:
+            assert timing_call.kwargs["rate"] == 1
+        pipe.incr.assert_called_once_with("commit_latency_count", count=100)
+
+    def test_on_consumer_prefetch(self, *, mon):
+        mon.on_consumer_prefetch(Mock(name="consumer"), 3, 0.25)
+        pipe = self.flush(mon)
+        pipe.gauge.assert_called_once_with("consumer_prefetch_depth", 3)
+        pipe.timing.assert_called_once_with(
+            "consumer_prefetch_wait", 250.0, rate=mon.rate
+        )
+
     def test_on_send_initiated_completed(self, *, mon):
         producer = Mock(name="producer")
         state = mon.on_send_initiated(producer, "topic1", "message", 321, 123)
         mon.on_send_completed(producer, state, Mock(name="metadata"))
 
-        mon.client.incr.assert_has_calls(
+        pipe = self.flush(mon)
+        pipe.incr.assert_has_calls(
             [
-                call("topic.topic1.messages_sent", rate=mon.rate),
-                call("messages_sent", rate=mon.rate),
+                call("topic.topic1.messages_sent", count=1),
+                call("messages_sent", count=1),
             ]
         )
-        mon.client.timing.assert_called_once_with(
+        pipe.timing.assert_called_once_with(
             "send_latency",
             mon.ms_since(float(state)),
             rate=mon.rate,
         )
 
         mon.on_send_error(producer, KeyError("foo"), state)
-        mon.client.incr.assert_has_calls(
-            [
-                call("messages_sent_error", rate=mon.rate),
-            ]
-        )
-        mon.client.timing.assert_has_calls(
-            [
-                call(
-                    "send_latency_for_error",
-                    mon.ms_since(float(state)),
-                    rate=mon.rate,
-                ),
-            ]
+        pipe = self.flush(mon)
+        pipe.incr.assert_called_with("messages_sent_error", count=1)
+        pipe.timing.assert_called_with(
+            "send_latency_for_error",
+            mon.ms_since(float(state)),
+            rate=mon.rate,
         )
 
     def test_on_assignment_start_completed(self, *, mon):
@@ -165,19 +205,12 @@ class TestStatsdMonitor:
         state = mon.on_assignment_start(assignor)
         mon.on_assignment_completed(assignor, state)
 
-        mon.client.incr.assert_has_calls(
-            [
-                call("assignments_complete", rate=mon.rate),
-            ]
-        )
-        mon.client.timing.assert_has_calls(
-            [
-                call(
-                    "assignment_latency",
-                    mon.ms_since(state["time_start"]),
-                    rate=mon.rate,
-                ),
-            ]
+        pipe = self.flush(mon)
+        pipe.incr.assert_called_once_with("assignments_complete", count=1)
+        pipe.timing.assert_called_once_with(
+            "assignment_latency",
+            mon.ms_since(state["time_start"]),
+            rate=mon.rate,
         )
 
     def test_on_assignment_start_failed(self, *, mon):
@@ -185,76 +218,40 @@ class TestStatsdMonitor:
         state = mon.on_assignment_start(assignor)
         mon.on_assignment_error(assignor, state, KeyError())
 
-        mon.client.incr.assert_has_calls(
-            [
-                call("assignments_error", rate=mon.rate),
-            ]
-        )
-        mon.client.timing.assert_has_calls(
-            [
-                call(
-                    "assignment_latency",
-                    mon.ms_since(state["time_start"]),
-                    rate=mon.rate,
-                ),
-            ]
+        pipe = self.flush(mon)
+        pipe.incr.assert_called_once_with("assignments_error", count=1)
+        pipe.timing.assert_called_once_with(
+            "assignment_latency",
+            mon.ms_since(state["time_start"]),
+            rate=mon.rate,
         )
 
     def test_on_rebalance(self, *, mon):
         app = Mock(name="app")
         state = mon.on_rebalance_start(app)
-
-        mon.client.incr.assert_has_calls(
-            [
-                call("rebalances", rate=mon.rate),
-            ]
-        )
+        self.flush(mon).incr.assert_called_once_with("rebalances", count=1)
 
         mon.on_rebalance_return(app, state)
-
-        mon.client.incr.assert_has_calls(
-            [
-                call("rebalances", rate=mon.rate),
-                call("rebalances_recovering", rate=mon.rate),
-            ]
-        )
-        mon.client.decr.assert_has_calls(
+        pipe = self.flush(mon)
+        pipe.incr.assert_has_calls(
             [
-                call("rebalances", rate=mon.rate),
+                call("rebalances", count=-1),
+                call("rebalances_recovering", count=1),
             ]
         )
-        mon.client.timing.assert_has_calls(
-            [
-                call(
-                    "rebalance_return_latency",
-                    mon.ms_since(state["time_return"]),
-                    rate=mon.rate,
-                ),
-            ]
+        pipe.timing.assert_called_once_with(
+            "rebalance_return_latency",
+            mon.ms_since(state["time_return"]),
+            rate=mon.rate,
         )
 
         mon.on_rebalance_end(app, state)
-
-        mon.client.decr.assert_has_calls(
-            [
-                call("rebalances", rate=mon.rate),
-                call("rebalances_recovering", rate=mon.rate),
-            ]
-        )
-
-        mon.client.timing.assert_has_calls(
-            [
-                call(
-                    "rebalance_return_latency",
-                    mon.ms_since(state["time_return"]),
-                    rate=mon.rate,
-                ),
-                call(
-                    "rebalance_end_latency",
-                    mon.ms_since(state["time_end"]),
-                    rate=mon.rate,
-                ),
-            ]
+        pipe = self.flush(mon)
+        pipe.incr.assert_called_with("rebalances_recovering", count=-1)
+        pipe.timing.assert_called_with(
+            "rebalance_end_latency",
+            mon.ms_since(state["time_end"]),
+            rate=mon.rate,
         )
 
     def test_on_web_request(self, *, mon, request, response, view):
@@ -269,25 +266,20 @@ class TestStatsdMonitor:
         state = mon.on_web_request_start(app, request, view=view)
         mon.on_web_request_end(app, request, response, state, view=view)
 
-        mon.client.incr.assert_has_calls(
-            [
-                call(f"http_status_code.{expected_status}", rate=mon.rate),
-            ]
+        pipe = self.flush(mon)
+        pipe.incr.assert_called_once_with(
+            f"http_status_code.{expected_status}", count=1
         )
-
-        mon.client.timing.assert_has_calls(
-            [
-                call(
-                    "http_response_latency",
-                    mon.ms_since(state["time_end"]),
-                    rate=mon.rate,
-                ),
-            ]
+        pipe.timing.assert_called_once_with(
+            "http_response_latency",
+            mon.ms_since(state["time_end"]),
+            rate=mon.rate,
         )
 
     def test_count(self, *, mon):
         mon.count("metric_name", count=3)
-        mon.client.incr.assert_called_once_with("metric_name", count=3, rate=mon.rate)
+        mon.count("metric_name", count=2)
+        self.flush(mon).incr.assert_called_once_with("metric_name", count=5)
 
     def test_on_tp_commit(self, *, mon):
         offsets = {
@@ -296,7 +288,7 @@ class TestStatsdMonitor:
             TP("bar", 3): 3003,
         }
         mon.on_tp_commit(offsets)
-        mon.client.gauge.assert_has_calls(
+        self.flush(mon).gauge.assert_has_calls(
             [
                 call("committed_offset.foo.0", 1001),
                 call("committed_offset.foo.1", 2002),
@@ -306,7 +298,7 @@ class TestStatsdMonitor:
 
     def test_track_tp_end_offsets(self, *, mon):
         mon.track_tp_end_offset(TP("foo", 0), 4004)
-        mon.client.gauge.assert_called_once_with(
+        self.flush(mon).gauge.assert_called_once_with(
             "end_offset.foo.0",
             4004,
         )
@@ -1,10 +1,13 @@
+import asyncio
 import sys
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 import faust
 from faust.stores.aerospike import AeroSpikeStore
+from faust.types import TP
 
 try:
     from aerospike.exception import RecordNotFound
@@ -242,3 +245,220 @@ class TestAerospikeStore:
         assert store._contains(key) is True
         exist_key = (store.namespace, store.table_name, key)
         store.client.exists.assert_called_with(key=exist_key)
+
+
+class TestAerospikeStoreAsync:
+    @pytest.fixture(autouse=True)
+    def aero(self):
+        with patch("faust.stores.aerospike.aerospike") as aero:
+            aero.exception.RecordNotFound = RecordNotFound
+            yield aero
+
+    @pytest.fixture(autouse=True)
+    def stores(self):
+        stores = []
+        yield stores
+        for store in stores:
+            for executor in [*store._writers, store._reader]:
+                if executor is not None:
+                    executor.shutdown(wait=True)
+        # on_stop() shuts down the I/O threads without waiting for them.
+        for thread in threading.enumerate():
+            if thread.name.startswith("aerospike-"):
+                thread.join()
+
+    @pytest.fixture()
+    def event(self):
+        event = MagicMock(name="event")
+        event.message.partition = 1
+        with patch("faust.stores.aerospike.current_event", return_value=event):
+            yield event
+
+    def new_store(self, stores, **extra):
+        options = {
+            AeroSpikeStore.HOSTS_KEY: "localhost",
+            AeroSpikeStore.TTL_KEY: -1,
+            **extra,
+        }
+        table = MagicMock(name="table", is_global=False)
+        table.name = "table"
+        table.changelog_topic.topics = {"changelog"}
+        store = AeroSpikeStore("aerospike://", MagicMock(), table, options=options)
+        store.app.producer.key_partition.return_value = TP("changelog", 1)
+        store.namespace = "test_ns"
+        store.client = MagicMock()
+        store.app.conf.aerospike_sleep_seconds_between_retries_on_exception = 0
+        store.app.conf.aerospike_retries_on_exception = 2
+        store.app.conf.crash_app_on_aerospike_exception = False
+        stores.append(store)
+        return store
+
+    @pytest.fixture()
+    def cached(self, stores):
+        return self.new_store(stores, near_cache_size=10)
+
+    @pytest.fixture()
+    def behind(self, stores):
+        return self.new_store(stores, write_behind=True, io_threads=2)
+
+    def test_defaults(self, stores):
+        store = self.new_store(stores)
+        assert store.near_cache_size == 0
+        assert not store.write_behind
+        assert store.io_threads == 8
+
+    def test_get__cached(self, cached, event):
+        cached.client.get.return_value = (None, None, {"value_key": b"v"})
+        assert cached._get(b"k") == b"v"
+        assert cached._get(b"k") == b"v"
+        cached.client.get.assert_called_once()
+
+    def test_get__not_found_cached(self, cached, event):
+        cached.client.get.side_effect = RecordNotFound()
+        with pytest.raises(KeyError):
+            cached._get(b"k")
+        assert cached._get(b"k") is None
+        cached.client.get.assert_called_once()
+
+    def test_get__not_cached_outside_of_event(self, cached):
+        cached.client.get.return_value = (None, None, {"value_key": b"v"})
+        with patch("faust.stores.aerospike.current_event", return_value=None):
+            cached._get(b"k")
+            cached._get(b"k")
+        assert cached.client.get.call_count == 2
+
+    def test_get__global_table_not_cached(self, cached, event):
+        cached.table.is_global = True
+        cached.client.get.return_value = (None, None, {"value_key": b"v"})
+        cached._get(b"k")
+        cached._get(b"k")
+        assert cached.client.get.call_count == 2
+
+    def test_get__other_key_partition_not_cached(self, cached, event):
+        cached.app.producer.key_partition.return_value = TP("changelog", 2)
+        cached.client.get.return_value = (None, None, {"value_key": b"v"})
+        cached._get(b"k")
+        cached._get(b"k")
+        assert cached.client.get.call_count == 2
+        cached.app.producer.key_partition.assert_called_with(
+            cached.table.changelog_topic.get_topic_name(), b"k"
+        )
+
+    def test_get__unknown_key_partition_not_cached(self, cached, event):
+        cached.app.producer.key_partition.side_effect = TypeError()
+        cached._set(b"k", b"v")
+        assert b"k" not in cached._near_cache
+
+    def test_set_del__update_cache(self, cached, event):
+        cached._set(b"k", b"v")
+        assert cached._get(b"k") == b"v"
+        assert cached._contains(b"k")
+        cached._del(b"k")
+        assert cached._get(b"k") is None
+        cached.client.get.assert_not_called()
+        cached.client.exists.assert_not_called()
+
+    def test_set__outside_of_event_invalidates(self, cached, event):
+        cached._set(b"k", b"v")
+        with patch("faust.stores.aerospike.current_event", return_value=None):
+            cached._set(b"k", b"v2")
+        assert b"k" not in cached._near_cache
+
+    @pytest.mark.asyncio
+    async def test_on_rebalance__drops_revoked_partitions(self, cached, event):
+        cached._set(b"k1", b"v1")
+        event.message.partition = 2
+        cached.app.producer.key_partition.return_value = TP("changelog", 2)
+        cached._set(b"k2", b"v2")
+        await cached.on_rebalance(
+            set(), {TP("changelog", 1), TP("other", 2)}, set(), generation_id=1
+        )
+        assert list(cached._near_cache) == [b"k2"]
+
+    @pytest.mark.asyncio
+    async def test_write_behind(self, behind):
+        started, release = threading.Event(), threading.Event()
+
+        def put(**kwargs):
+            started.set()
+            release.wait(5)
+
+        behind.client.put.side_effect = put
+        behind._set(b"k", b"v")
+        assert started.wait(5)
+        # visible before the write completed
+        assert behind._get(b"k") == b"v"
+        behind.client.get.assert_not_called()
+        release.set()
+        await behind.flush()
+        behind.client.put.assert_called_once()
+        assert not behind._pending_writes
+
+    @pytest.mark.asyncio
+    async def test_write_behind__ordered_per_key(self, behind):
+        values = []
+        behind.client.put.side_effect = lambda **kw: values.append(kw["bins"])
+        behind.client.remove.side_effect = lambda **kw: values.append(None)
+        for i in range(20):
+            behind._set(b"k", str(i).encode())
+        behind._del(b"k")
+        assert behind._get(b"k") is None
+        await behind.flush()
+        assert values == [{"value_key": str(i).encode()} for i in range(20)] + [None]
+
+    @pytest.mark.asyncio
+    async def test_write_behind__flush_raises(self, behind):
+        behind.client.put.side_effect = KeyError("down")
+        behind._set(b"k", b"v")
+        with pytest.raises(KeyError):
+            await behind.flush()
+        await behind.flush()
+
+    @pytest.mark.asyncio
+    async def test_get_async__batches(self, cached):
+        ok = MagicMock(result=0, record=(None, None, {"value_key": b"v1"}))
+        missing = MagicMock(result=2, record=None)
+        cached.client.batch_read.return_value = MagicMock(batch_records=[ok, missing])
+        cached._encode_key = lambda key: key
+        cached._decode_value = lambda value: value.decode()
+        results = await asyncio.gather(
+            cached.get_async(b"k1"), cached.get_async(b"k2"), cached.get_async(b"k1")
+        )
+        assert results == ["v1", None, "v1"]
+        cached.client.batch_read.assert_called_once_with(
+            [
+                ("test_ns", cached.table_name, b"k1"),
+                ("test_ns", cached.table_name, b"k2"),
+            ]
+        )
+        await cached.on_stop()
+
+    @pytest.mark.asyncio
+    async def test_get_async__error(self, cached):
+        cached.client.batch_read.side_effect = KeyError("down")
+        cached._encode_key = lambda key: key
+        with pytest.raises(KeyError):
+            await cached.get_async(b"k1")
+        failed = MagicMock(result=9, record=None)
+        cached.client.batch_read.side_effect = None
+        cached.client.batch_read.return_value = MagicMock(batch_records=[failed])
+        with pytest.raises(KeyError):
+            await cached.get_async(b"k1")
+        await cached.on_stop()
+
+    @pytest.mark.asyncio
+    async def test_get_async__local(self, cached, event):
+        cached._encode_key = lambda key: key
+        cached._decode_value = lambda value: value.decode()
+        cached._set(b"k", b"v")
+        assert await cached.get_async(b"k") == "v"
+        cached.client.batch_read.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_on_stop(self, behind):
+        behind._set(b"k", b"v")
+        writers = list(behind._writers)
+        await behind.on_stop()
+        behind.client.put.assert_called_once()
+        assert not behind._writers
+        assert all(writer._shutdown for writer in writers)
@@ -53,6 +53,13 @@ class Test_Store:
     def test_set_persisted_offset(self, *, store):
         store.set_persisted_offset(TP("foo", 0), 30303)
 
+    def test_persisted_offsets(self, *, store):
+        assert store.persisted_offsets() == {}
+
+    @pytest.mark.asyncio
+    async def test_flush(self, *, store):
+        await store.flush()
+
     @pytest.mark.asyncio
     async def test_need_active_standby_for(self, *, store):
         assert await store.need_active_standby_for(TP("foo", 0))
@@ -190,3 +197,28 @@ class Test_SerializedStore:
         store["foo"] = "303"
         store.clear()
         assert not len(store)
+
+    def test_get_many(self, *, store):
+        store["foo"] = "303"
+        store["bar"] = {"x": 1}
+        assert store.get_many(["foo", "bar", "baz"], partition=1) == {
+            "foo": "303",
+            "bar": {"x": 1},
+        }
+
+    def test_scan(self, *, store):
+        for key in ("c", "a", "b"):
+            store[key] = {"k": key}
+        decoded = []
+        store._decode_value = Mock(side_effect=decoded.append)
+
+        rows = list(
+            store.scan(start=b'"a', after=(0, b'"a"'), predicate=lambda k, v: True)
+        )
+        assert [(position, key) for position, key, _ in rows] == [
+            ((0, b'"b"'), "b"),
+            ((0, b'"c"'), "c"),
+        ]
+        assert list(store.scan(stop=b'"b"', predicate=lambda k, v: b"a" in v))
+        assert not list(store.scan(predicate=lambda k, v: False))
+        assert len(decoded) == 3
@@ -17,6 +17,31 @@ class Test_Store:
         store._clear()
         assert not store.data
 
+    def test_get_many(self, *, store):
+        store.data.update(foo=1, bar=2)
+        assert store.get_many(["foo", "baz"]) == {"foo": 1}
+
+    def test_scan(self, *, app):
+        store = Store(
+            url="memory://",
+            app=app,
+            table=Mock(name="table"),
+            key_serializer="raw",
+            value_serializer="raw",
+        )
+        store.data.update({b"a": b"1", b"b": b"2", b"c": b"3", b"d": b"4"})
+        store._key_partition.update({b"a": 1, b"c": 1})
+
+        assert [key for _, key, _ in store.scan()] == [b"b", b"d", b"a", b"c"]
+        assert list(store.scan(start=b"b", stop=b"d")) == [
+            ((0, b"b"), b"b", b"2"),
+            ((1, b"c"), b"c", b"3"),
+        ]
+        assert [key for _, key, _ in store.scan(after=(0, b"d"))] == [b"a", b"c"]
+        assert list(store.scan(predicate=lambda k, v: v == b"3")) == [
+            ((1, b"c"), b"c", b"3"),
+        ]
+
     def test_apply_changelog_batch(self, *, store):
         event, to_key, to_value = self.mock_event_to_key_value()
         store.apply_changelog_batch([event], to_key=to_key, to_value=to_value)
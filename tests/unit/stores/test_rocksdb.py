@@ -9,6 +9,7 @@ from faust.exceptions import ImproperlyConfigured
 from faust.stores import rocksdb
 from faust.stores.rocksdb import RocksDBOptions, Store
 from faust.types import TP
+from faust.types.assignor import AssignedPartitions
 from tests.helpers import AsyncMock
 
 TP1 = TP("foo", 0)
@@ -28,6 +29,38 @@ class MockIterator(Mock):
         return iter(self.values)
 
 
+class SortedDB:
+    """Database iterating over items in key order, for both drivers."""
+
+    def __init__(self, items):
+        self.data = sorted(items)
+        self.seeks = []
+
+    def items(self, from_key=None):
+        self.seeks.append(from_key)
+        return iter(
+            [item for item in self.data if from_key is None or item[0] >= from_key]
+        )
+
+    def iteritems(self):
+        db = self
+
+        class Iterator:
+            def seek(self, key):
+                db.seeks.append(key)
+
+            def seek_to_first(self):
+                db.seeks.append(None)
+
+            def __iter__(self):
+                start = db.seeks[-1]
+                return iter(
+                    [item for item in db.data if start is None or item[0] >= start]
+                )
+
+        return Iterator()
+
+
 class TestRocksDBOptions:
     @pytest.mark.parametrize(
         "arg",
@@ -67,6 +100,34 @@ class TestRocksDBOptions:
             )
             assert db is rocks.DB()
 
+    def test_open_for_reading_rocksdb(self):
+        with patch("faust.stores.rocksdb.rocksdb", Mock()) as rocks:
+            opts = RocksDBOptions(use_rocksdict=False)
+            db = opts.open_for_reading(Path("foo.db"))
+            rocks.DB.assert_called_once_with(
+                "foo.db", opts.as_options(), read_only=True
+            )
+            assert db is rocks.DB()
+
+    def test_open_for_reading_rocksdict(self):
+        with (
+            patch("faust.stores.rocksdb.rocksdict", Mock()) as rocks,
+            patch("faust.stores.rocksdb.Options"),
+            patch("faust.stores.rocksdb.DB") as DB,
+        ):
+            opts = RocksDBOptions(use_rocksdict=True)
+            db = opts.open_for_reading(Path("foo.db"))
+            rocks.AccessType.read_only.assert_called_once_with(
+                error_if_log_file_exist=False
+            )
+            DB.assert_called_once_with(
+                "foo.db",
+                options=opts.as_options(),
+                access_type=rocks.AccessType.read_only.return_value,
+            )
+            db.set_read_options.assert_called_once_with(rocks.ReadOptions())
+            assert db is DB.return_value
+
     def test_open_rocksdict(self):
         with (
             patch("faust.stores.rocksdb.rocksdict", Mock()) as rocks,
@@ -185,6 +246,44 @@ class Test_Store_RocksDB:
         db_for_partition.return_value.get.return_value = None
         assert store.persisted_offset(TP1) is None
 
+    def test_persisted_offsets(self, *, store, tmp_path):
+        store.app.conf.tabledir = tmp_path
+        for name in ("table1-0.db", "table1-2.db", "table1-3.db", "table1-x.db"):
+            (tmp_path / name).mkdir()
+        (tmp_path / "table1-4.db").touch()
+        (tmp_path / "table10-5.db").mkdir()
+        open_db = store._dbs[1] = Mock(name="db1")
+        open_db.get.return_value = b"1001"
+        store._dbs[2] = Mock(name="db2")
+        store._dbs[2].get.return_value = None
+        on_disk = {
+            store.partition_path(0): b"300",
+            store.partition_path(3): None,
+        }
+        open_for_reading = store.rocksdb_options.open_for_reading = Mock(
+            name="open_for_reading"
+        )
+        open_for_reading.side_effect = lambda path: Mock(
+            get=Mock(return_value=on_disk[path])
+        )
+
+        assert store.persisted_offsets() == {0: 300, 1: 1001}
+        assert open_for_reading.call_count == 2
+        # databases that are not open are only read once
+        assert store.persisted_offsets() == {0: 300, 1: 1001}
+        assert open_for_reading.call_count == 2
+
+    def test_persisted_offsets__unreadable(self, *, store, tmp_path):
+        store.app.conf.tabledir = tmp_path
+        (tmp_path / "table1-0.db").mkdir()
+        store.rocksdb_options.open_for_reading = Mock(side_effect=KeyError("lock"))
+        assert store.persisted_offsets() == {}
+        assert store._closed_offsets == {0: None}
+
+    def test_persisted_offsets__no_tabledir(self, *, store, tmp_path):
+        store.app.conf.tabledir = tmp_path / "missing"
+        assert store.persisted_offsets() == {}
+
     def test_set_persisted_offset(self, *, store, db_for_partition):
         store.set_persisted_offset(TP1, 3003)
         db_for_partition.assert_called_once_with(TP1.partition)
@@ -398,6 +497,35 @@ class Test_Store_RocksDB:
         # A global, custom-partitioned table will also ignore the event partition
         assert store._get(b"key") == b"value"
 
+    def test__get_many(self, *, store, db_for_partition):
+        db = db_for_partition.return_value
+        db.multi_get.return_value = {b"a": b"1"}
+        db.get.return_value = [b"1", None]
+        store.table.is_global = False
+        store.table.use_partitioner = False
+
+        assert store._get_many([b"a", b"b"], 3) == [b"1", None]
+        db_for_partition.assert_called_once_with(3)
+        if store.use_rocksdict:
+            db.get.assert_called_once_with([b"a", b"b"])
+        else:
+            db.multi_get.assert_called_once_with([b"a", b"b"])
+        assert store._key_index[b"a"] == 3
+        assert b"b" not in store._key_index
+
+    @pytest.mark.parametrize(
+        "partition,is_global,use_partitioner",
+        [(None, False, False), (3, True, False), (3, False, True)],
+    )
+    def test__get_many__any_partition(
+        self, partition, is_global, use_partitioner, *, store, db_for_partition
+    ):
+        store.table.is_global = is_global
+        store.table.use_partitioner = use_partitioner
+        store._get_from_any_partition = Mock(side_effect=[b"1", None])
+        assert store._get_many([b"a", b"b"], partition) == [b"1", None]
+        db_for_partition.assert_not_called()
+
     def test_get_bucket_for_key__is_in_index(self, *, store):
         store._key_index[b"key"] = 30
         db = store._dbs[30] = Mock(name="db-p30")
@@ -464,10 +592,12 @@ class Test_Store_RocksDB:
 
     def test_revoke_partitions(self, *, store, table):
         table.changelog_topic.topics = {TP1.topic, TP3.topic}
-        store._dbs[TP3.partition] = Mock(name="db")
+        db = store._dbs[TP3.partition] = Mock(name="db")
+        db.get.return_value = b"3003"
 
         store.revoke_partitions(table, {TP1, TP2, TP3, TP4})
         assert not store._dbs
+        assert store._closed_offsets == {TP3.partition: 3003}
 
     @pytest.mark.asyncio
     async def test_assign_partitions(self, *, store, app, table):
@@ -642,10 +772,7 @@ class Test_Store_RocksDB:
     def test__dbs_for_actives(self, *, store, table):
         table.changelog_topic_name = "clog"
         store.app.assignor.assigned_actives = Mock(
-            return_value=[
-                TP("clog", 1),
-                TP("clog", 2),
-            ]
+            return_value=AssignedPartitions([TP("clog", 1), TP("clog", 2)])
         )
         dbs = store._dbs = {
             1: self.new_db("db1"),
@@ -666,6 +793,46 @@ class Test_Store_RocksDB:
         table.synchronize_all_active_partitions = True
         assert list(store._dbs_for_actives()) == [dbs[1], dbs[2], dbs[3]]
 
+    def test__partition_dbs_for_actives(self, *, store, table):
+        table.changelog_topic_name = "clog"
+        table.is_global = False
+        store.app.assignor.assigned_actives = Mock(
+            return_value=AssignedPartitions([TP("clog", 2)])
+        )
+        dbs = store._dbs = {1: self.new_db("db1"), 2: self.new_db("db2")}
+        assert list(store._partition_dbs_for_actives()) == [(2, dbs[2])]
+
+    def test_scan(self, *, store):
+        db1 = SortedDB([(b"a", b"1"), (b"c", b"3"), (store.offset_key, b"100")])
+        db2 = SortedDB([(b"a", b"4"), (b"b", b"5"), (b"d", b"6")])
+        store._partition_dbs_for_actives = Mock(return_value=[(2, db2), (1, db1)])
+        store._decode_key = store._decode_value = bytes.decode
+
+        assert list(store.scan()) == [
+            ((1, b"a"), "a", "1"),
+            ((1, b"c"), "c", "3"),
+            ((2, b"a"), "a", "4"),
+            ((2, b"b"), "b", "5"),
+            ((2, b"d"), "d", "6"),
+        ]
+        assert [position for position, _, _ in store.scan(start=b"b", stop=b"d")] == [
+            (1, b"c"),
+            (2, b"b"),
+        ]
+        assert db1.seeks[-1] == db2.seeks[-1] == b"b"
+
+        assert [position for position, _, _ in store.scan(after=(2, b"a"))] == [
+            (2, b"b"),
+            (2, b"d"),
+        ]
+        assert db2.seeks[-1] == b"a"
+
+        decoded = []
+        store._decode_value = Mock(side_effect=decoded.append)
+        rows = list(store.scan(start=b"b", predicate=lambda k, v: v > b"3"))
+        assert [position for position, _, _ in rows] == [(2, b"b"), (2, b"d")]
+        assert decoded == [b"5", b"6"]
+
     def test__size(self, *, store):
         dbs = self._setup_keys(
             db1=[
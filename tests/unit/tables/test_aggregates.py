@@ -0,0 +1,299 @@
+from unittest.mock import Mock, call, patch
+
+import pytest
+
+import faust
+from faust.exceptions import ImproperlyConfigured
+from faust.tables import aggregates
+from faust.tables.aggregates import SNAPSHOT_HEADER, PaneGrid
+
+numpy = pytest.importorskip("numpy")
+
+
+def event(key, value, timestamp, partition=0):
+    return Mock(
+        name="event",
+        key=key,
+        value=value,
+        message=Mock(partition=partition, timestamp=timestamp),
+    )
+
+
+class Test_PaneGrid:
+    def grid(self, aggregate="sum", columns=4, rows=64):
+        return PaneGrid(aggregate, columns, rows=rows)
+
+    @pytest.mark.parametrize(
+        "aggregate,expected",
+        [
+            ("count", 3.0),
+            ("sum", 6.0),
+            ("mean", 2.0),
+            ("min", 1.0),
+            ("max", 3.0),
+        ],
+    )
+    def test_window(self, aggregate, expected):
+        grid = self.grid(aggregate)
+        grid.update(["k", "k", "k", "j"], [1.0, 2.0, 3.0, 10.0], [0, 0, 1, 1])
+        assert grid.window("k", 0, 2) == expected
+        assert grid.window("missing", 0, 2) is None
+
+    def test_window__empty_panes(self):
+        grid = self.grid()
+        grid.update(["k"], [1.0], [5])
+        assert grid.window("k", 3, 2) is None
+        assert grid.window("k", 10, 2) is None
+
+    def test_windows(self):
+        grid = self.grid()
+        grid.update(["k", "k", "k"], [1.0, 2.0, 4.0], [0, 1, 3])
+        assert grid.windows("k", 2) == {0: 3.0, 1: 2.0, 2: 4.0, 3: 4.0}
+
+    def test_update__expires(self):
+        grid = self.grid()
+        grid.update(["a", "b"], [1.0, 2.0], [0, 1])
+        grid.dirty.clear()
+        grid.update(["b"], [1.0], [4])
+        assert "a" not in grid
+        assert grid.removed == {"a"}
+        assert grid.window("b", 1, 1) == 2.0
+        assert grid.window("b", 4, 1) == 1.0
+
+    def test_update__drops_late_values(self):
+        grid = self.grid()
+        grid.update(["k"], [1.0], [10])
+        assert grid.update(["k", "late"], [2.0, 5.0], [10, 6]) == 1
+        assert "late" not in grid
+        assert grid.window("k", 10, 1) == 3.0
+
+    def test_update__reuses_rows(self):
+        grid = self.grid()
+        grid.update(["a"], [1.0], [0])
+        grid.update(["b"], [1.0], [10])
+        assert grid.index == {"b": 0}
+        assert grid.keys == ["b"]
+
+    def test_update__grows(self):
+        grid = self.grid(rows=2)
+        keys = [f"k{i}" for i in range(5)]
+        grid.update(keys, range(5), [0] * 5)
+        assert [grid.window(key, 0, 1) for key in keys] == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert grid.dirty == {0, 1, 2, 3, 4}
+
+    def test_update__empty(self):
+        grid = self.grid()
+        assert grid.update([], [], []) == 0
+        assert grid.last_pane is None
+
+    @pytest.mark.parametrize("aggregate", ["count", "sum", "mean", "min", "max"])
+    def test_snapshot_restore(self, aggregate):
+        grid = self.grid(aggregate)
+        grid.update(["k", "k", "k"], [1.0, 2.0, 5.0], [1, 1, 3])
+        snapshot = grid.snapshot("k")
+        assert len(snapshot) == SNAPSHOT_HEADER.size + 3 * 8 * len(grid.fields)
+
+        other = self.grid(aggregate)
+        other.restore("k", snapshot)
+        assert other.windows("k", 2) == grid.windows("k", 2)
+        assert not other.dirty
+
+    def test_restore__replaces(self):
+        grid = self.grid()
+        grid.update(["k"], [1.0], [2])
+        snapshot = grid.snapshot("k")
+        grid.update(["k"], [1.0], [3])
+        grid.restore("k", snapshot)
+        assert grid.windows("k", 1) == {2: 1.0}
+
+    def test_restore__tombstone(self):
+        grid = self.grid()
+        grid.update(["k"], [1.0], [0])
+        grid.restore("k", None)
+        assert "k" not in grid
+        assert grid.snapshot("k") is None
+
+    def test_restore__expired(self):
+        grid = self.grid()
+        old = self.grid()
+        old.update(["k"], [1.0], [0])
+        grid.update(["j"], [1.0], [10])
+        grid.restore("k", old.snapshot("k"))
+        assert "k" not in grid
+
+    def test_restore__does_not_record_removed(self):
+        grid = self.grid()
+        grid.update(["a"], [1.0], [0])
+        grid.removed.clear()
+        new = self.grid()
+        new.update(["b"], [1.0], [10])
+        grid.restore("b", new.snapshot("b"))
+        assert "a" not in grid
+        assert not grid.removed
+
+    def test_restore__unknown_version(self):
+        grid = self.grid()
+        with pytest.raises(ValueError):
+            grid.restore("k", SNAPSHOT_HEADER.pack(99, 0, 0))
+
+
+class Test_AggregateTable:
+    @pytest.fixture()
+    def table(self, *, app):
+        return app.AggregateTable(
+            "latency",
+            window=faust.HoppingWindow(20, 10, expires=30),
+            aggregate="sum",
+        )
+
+    def test_init(self, *, table):
+        assert table.step == 10
+        assert table.panes_per_window == 2
+        assert table.columns == 5
+        assert table.value_serializer == "raw"
+        assert table.changelog_topic.value_serializer == "raw"
+
+    def test_init__numpy_missing(self, *, app):
+        with patch.object(aggregates, "numpy", None):
+            with pytest.raises(ImproperlyConfigured):
+                app.AggregateTable("t", window=faust.TumblingWindow(10, expires=60))
+
+    def test_init__unknown_aggregate(self, *, app):
+        with pytest.raises(ImproperlyConfigured):
+            app.AggregateTable(
+                "t", window=faust.TumblingWindow(10, expires=60), aggregate="median"
+            )
+
+    @pytest.mark.parametrize(
+        "window",
+        [
+            None,
+            faust.TumblingWindow(10),
+            faust.HoppingWindow(15, 10, expires=60),
+            faust.SlidingWindow(10, 10, expires=60),
+        ],
+    )
+    def test_init__unsupported_window(self, window, *, app):
+        with pytest.raises(ImproperlyConfigured):
+            app.AggregateTable("t", window=window)
+
+    def test_clone(self, *, table):
+        assert table.clone().aggregate == "sum"
+
+    def test_using_window(self, *, table):
+        with pytest.raises(NotImplementedError):
+            table.tumbling(10, expires=60)
+
+    def test_set_del(self, *, table):
+        with pytest.raises(NotImplementedError):
+            table["k"] = 1
+        with pytest.raises(NotImplementedError):
+            del table["k"]
+
+    def test_add(self, *, table):
+        with patch("faust.tables.aggregates.current_event") as current:
+            current.return_value = event("k", 2.0, 15.0, partition=3)
+            table.add("k", 2.0)
+            table.add("k", 1.0, timestamp=25.0)
+            assert table.current("k") == 3.0
+        assert list(table.store.grids) == [3]
+        assert table.current("k", timestamp=5.0) == 2.0
+        assert table["k"] == {(0.0, 19.9): 2.0, (10.0, 29.9): 3.0, (20.0, 39.9): 1.0}
+
+    def test_add__outside_stream(self, *, table):
+        with pytest.raises(RuntimeError):
+            table.add("k", 1.0)
+
+    def test_add_many(self, *, table):
+        table.add_many(["a", "b", "a"], numpy.array([1, 2, 3]), [0, 0, 12], partition=1)
+        assert table.current("a", timestamp=5.0) == 4.0
+        assert table.current("a", timestamp=12.0) == 3.0
+        assert table.current("b", timestamp=5.0) == 2.0
+        assert table.current("missing", timestamp=5.0) is None
+        assert set(table.keys()) == {"a", "b"}
+        assert dict(table.items())["b"] == {(-10.0, 9.9): 2.0, (0.0, 19.9): 2.0}
+        assert len(list(table.values())) == 2
+        assert len(table) == 2
+
+    def test_add_events(self, *, table):
+        table.add_events(
+            [
+                event("a", {"n": 1.0}, 0.0, partition=0),
+                event("b", {"n": 2.0}, 0.0, partition=1),
+                event("a", {"n": 3.0}, 1.0, partition=0),
+            ],
+            value=lambda v: v["n"],
+        )
+        assert table.store.grids[0].window("a", 0, 1) == 4.0
+        assert table.store.grids[1].window("b", 0, 1) == 2.0
+
+    def test_add_events__key(self, *, table):
+        table.add_events(
+            [event(None, {"k": ["x", 1], "n": 1.0}, 0.0)],
+            key=lambda v: v["k"],
+            value=lambda v: v["n"],
+        )
+        assert ("x", 1) in table
+
+    @pytest.mark.asyncio
+    async def test_flush(self, *, table):
+        table.send_changelog = Mock()
+        table.add_many(["a"], [1.0], [0.0], partition=0)
+        table.add_many(["b"], [2.0], [0.0], partition=1)
+        await table.data.flush()
+        grids = table.store.grids
+        table.send_changelog.assert_has_calls(
+            [
+                call(0, "a", grids[0].snapshot("a")),
+                call(1, "b", grids[1].snapshot("b")),
+            ]
+        )
+
+        table.send_changelog.reset_mock()
+        table.add_many(["c"], [1.0], [100.0], partition=0)
+        await table.data.flush()
+        table.send_changelog.assert_has_calls(
+            [call(0, "a", None), call(0, "c", grids[0].snapshot("c"))]
+        )
+
+        table.send_changelog.reset_mock()
+        await table.data.flush()
+        table.send_changelog.assert_not_called()
+
+    def test_apply_changelog_batch(self, *, app, table):
+        source = app.AggregateTable(
+            "source", window=faust.HoppingWindow(20, 10, expires=30)
+        )
+        source.add_many([("x", 1)], [5.0], [0.0], partition=2)
+        snapshot = source.store.grids[2].snapshot(("x", 1))
+        table.apply_changelog_batch(
+            [
+                Mock(key=["x", 1], message=Mock(partition=2, value=snapshot)),
+                Mock(key="gone", message=Mock(partition=2, value=snapshot)),
+                Mock(key="gone", message=Mock(partition=2, value=None)),
+            ]
+        )
+        assert table[("x", 1)] == source[("x", 1)]
+        assert "gone" not in table
+
+    @pytest.mark.asyncio
+    async def test_on_recovery_completed(self, *, table):
+        for partition in range(3):
+            table.add_many(["k"], [1.0], [0.0], partition=partition)
+        await table.on_recovery_completed(
+            {faust.types.TP("t", 0)}, {faust.types.TP("t", 2)}
+        )
+        assert sorted(table.store.grids) == [0, 2]
+        table.reset_state()
+        assert not table.store.grids
+
+    def test_persisted_offset(self, *, table):
+        assert table.persisted_offset(faust.types.TP("t", 0)) is None
+
+    @pytest.mark.asyncio
+    async def test_backup_restore(self, *, table):
+        table.add_many(["k"], [1.0], [0.0], partition=0)
+        tp = faust.types.TP("t", 0)
+        await table.store.backup_partition(tp)
+        table.store.restore_backup(tp)
+        assert table.store.grids
@@ -9,7 +9,12 @@ from mode import label, shortlabel
 from faust import Event, Record, Stream, Topic, joins
 from faust.exceptions import PartitionsMismatch
 from faust.stores.base import Store
-from faust.tables.base import Collection
+from faust.tables.base import (
+    Collection,
+    _decode_scan_cursor,
+    _encode_scan_cursor,
+    _prefix_stop,
+)
 from faust.types import TP
 from faust.windows import Window
 from tests.helpers import AsyncMock
@@ -111,6 +116,10 @@ class Test_Collection:
         data = table._data = Mock(name="_data")
         assert table.persisted_offset(TP1) == data.persisted_offset()
 
+    def test_persisted_offsets(self, *, table):
+        data = table._data = Mock(name="_data")
+        assert table.persisted_offsets() is data.persisted_offsets()
+
     @pytest.mark.asyncio
     async def test_need_active_standby_for(self, *, table):
         table._data = Mock(
@@ -128,6 +137,71 @@ class Test_Collection:
         table.reset_state()
         data.reset_state.assert_called_once_with()
 
+    def test_scan(self, *, table):
+        rows = [((i % 2, b"k%d" % i), f"k{i}", i) for i in range(5)]
+        data = table._data = Mock(name="_data", autospec=Store)
+        data.scan.return_value = iter(rows)
+
+        batches = list(table.scan(batch_size=2))
+        assert [batch.items for batch in batches] == [
+            [("k0", 0), ("k1", 1)],
+            [("k2", 2), ("k3", 3)],
+            [("k4", 4)],
+        ]
+        assert _decode_scan_cursor(batches[0].cursor) == (1, b"k1")
+        assert batches[-1].cursor is None
+        data.scan.assert_called_once_with(
+            start=None, stop=None, after=None, predicate=None
+        )
+
+    def test_scan__limit(self, *, table):
+        data = table._data = Mock(name="_data", autospec=Store)
+        data.scan.return_value = iter([((0, b"a"), "a", 1), ((0, b"b"), "b", 2)])
+        (batch,) = table.scan(limit=1)
+        assert batch.items == [("a", 1)]
+        assert _decode_scan_cursor(batch.cursor) == (0, b"a")
+
+        data.scan.return_value = iter([((0, b"a"), "a", 1)])
+        (batch,) = table.scan(limit=1)
+        assert batch.cursor is None
+
+    def test_scan__bounds(self, *, table):
+        data = table._data = Mock(name="_data", autospec=Store)
+        data.scan.return_value = iter([])
+        cursor = _encode_scan_cursor((3, b"ab"))
+        predicate = Mock(name="predicate")
+        assert list(
+            table.scan(prefix=b"a", stop=b"az", cursor=cursor, predicate=predicate)
+        ) == [([], None)]
+        data.scan.assert_called_once_with(
+            start=b"a", stop=b"az", after=(3, b"ab"), predicate=predicate
+        )
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"cursor": "!"},
+            {"cursor": "AA"},
+            {"limit": 0},
+            {"batch_size": 0},
+        ],
+    )
+    def test_scan__invalid(self, kwargs, *, table):
+        with pytest.raises(ValueError):
+            list(table.scan(**kwargs))
+
+    @pytest.mark.parametrize(
+        "prefix,stop",
+        [
+            (b"a", b"b"),
+            (b"a\xff", b"b"),
+            (b"\xff\xff", None),
+            (b"", None),
+        ],
+    )
+    def test__prefix_stop(self, prefix, stop):
+        assert _prefix_stop(prefix) == stop
+
     def test_send_changelog(self, *, table):
         table.changelog_topic.send_soon = Mock(name="send_soon")
         event = Mock(name="event")
@@ -39,6 +39,15 @@ class Test_Manager:
         tables.on_commit_tp(TP1)
         store.set_persisted_offset.assert_called_once_with(TP1, 30)
 
+    @pytest.mark.asyncio
+    async def test_flush(self, *, tables):
+        table1 = Mock(name="table1", data=Mock(flush=AsyncMock()))
+        table2 = Mock(name="table2", data=Mock(flush=AsyncMock()))
+        tables.data = {"table1": table1, "table2": table2}
+        await tables.flush()
+        table1.data.flush.assert_called_once_with()
+        table2.data.flush.assert_called_once_with()
+
     def test_on_rebalance_start(self, *, tables):
         tables.on_rebalance_start()
         assert not tables.actives_ready
@@ -1,8 +1,8 @@
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import MagicMock, Mock, call, patch
 
 import pytest
 
-from faust.tables.objects import ChangeloggedObjectManager
+from faust.tables.objects import ChangeloggedObject, ChangeloggedObjectManager
 from faust.types import TP
 from tests.helpers import AsyncMock
 
@@ -32,7 +32,7 @@ def current_event():
         yield current_event
 
 
-class ValueType:
+class ValueType(ChangeloggedObject):
     def __init__(self, man, key):
         self.man = man
         self.key = key
@@ -63,13 +63,40 @@ class Test_ChangeloggedObjectManager:
 
     def test_send_changelog_event(self, *, man, table, key, current_event):
         man.send_changelog_event(key, 3, "value")
-        man.storage.__setitem__.assert_called_once()
+        man.storage.__setitem__.assert_not_called()
+        assert man._dirty == {key}
         table._send_changelog.assert_called_once_with(
             current_event(),
             (3, key),
             "value",
         )
 
+    def test_send_changelog_event__event(self, *, man, table, key, current_event):
+        event = Mock(name="event")
+        man.send_changelog_event(key, 3, "value", event=event)
+        table._send_changelog.assert_called_once_with(event, (3, key), "value")
+
+    def test_write_dirty(self, *, man, storage, current_event):
+        man.send_changelog_event("k", 1, "a")
+        man.send_changelog_event("k", 1, "b")
+        man.send_changelog_event("j", 1, "c")
+        man.set_persisted_offset(TP1, 10)
+        man.set_persisted_offset(TP1, 11)
+        storage.set_persisted_offset.assert_not_called()
+        assert man.persisted_offset(TP1) == 11
+
+        man._write_dirty()
+        man.storage.__setitem__.assert_has_calls(
+            [call("k", "k-stored"), call("j", "j-stored")], any_order=True
+        )
+        assert man.storage.__setitem__.call_count == 2
+        storage.set_persisted_offset.assert_called_once_with(TP1, 11)
+        assert not man._dirty
+        assert not man._pending_offsets
+
+        man._write_dirty()
+        assert man.storage.__setitem__.call_count == 2
+
     def test__getitem__(self, *, man):
         v1 = man["k"]
         v2 = man["k"]
@@ -104,13 +131,32 @@ class Test_ChangeloggedObjectManager:
         storage.persisted_offset.assert_called_once_with(TP1)
         assert ret is storage.persisted_offset()
 
+    def test_persisted_offsets(self, *, man, storage):
+        assert man.persisted_offsets() is storage.persisted_offsets()
+
+    @pytest.mark.asyncio
+    async def test_flush(self, *, man, storage):
+        storage.flush = AsyncMock()
+        man._write_dirty = Mock()
+        await man.flush()
+        man._write_dirty.assert_called_once_with()
+        storage.flush.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_on_stop(self, *, man):
+        man._write_dirty = Mock()
+        await man.on_stop()
+        man._write_dirty.assert_called_once_with()
+
     def test_set_persisted_offset(self, *, man, storage):
         man.set_persisted_offset(TP1, 3003)
         storage.set_persisted_offset.assert_called_once_with(TP1, 3003)
 
     @pytest.mark.asyncio
     async def test_on_rebalance(self, *, man, storage, table):
+        man._write_dirty = Mock()
         await man.on_rebalance(table, {TP1}, {TP1}, {TP1})
+        man._write_dirty.assert_called_once_with()
         man.storage.on_rebalance.assert_called_once_with(
             table,
             {TP1},
@@ -130,9 +176,13 @@ class Test_ChangeloggedObjectManager:
         assert 1 in man["foo"].synced
         assert 2 in man["bar"].synced
 
-    def test_reset_state(self, *, man, storage):
+    def test_reset_state(self, *, man, storage, current_event):
+        man.send_changelog_event("k", 1, "a")
+        man.set_persisted_offset(TP1, 10)
         man.reset_state()
         storage.reset_state.assert_called_once_with()
+        assert not man._dirty
+        assert not man._pending_offsets
 
     def test_apply_changelog_batch__key_is_None(self, *, man):
         event1 = Mock(name="event1")
@@ -149,3 +199,29 @@ class Test_ChangeloggedObjectManager:
         event1.value = "foo"
         man.apply_changelog_batch([event1], lambda k: k, lambda v: v)
         assert (3, "foo") in man["k"].changes
+
+    def test_apply_changelog_batch__per_key(self, *, man, storage):
+        def event(key, value, offset):
+            return Mock(key=(1, key), value=value, message=Mock(tp=TP1, offset=offset))
+
+        storage.get.side_effect = {"k": "stored"}.get
+        man.apply_changelog_batch(
+            [event("k", "a", 1), event("j", "b", 2), event("k", "c", 3)],
+            lambda k: k,
+            lambda v: v,
+        )
+        assert man["k"].changes == [(1, "a"), (1, "c")]
+        assert man["k"].synced == {"stored"}
+        assert man["j"].changes == [(1, "b")]
+        assert not man["j"].synced
+        man.storage.__setitem__.assert_has_calls(
+            [call("k", "k-stored"), call("j", "j-stored")]
+        )
+        assert man.storage.__setitem__.call_count == 2
+        storage.set_persisted_offset.assert_called_once_with(TP1, 3)
+
+    def test_apply_changelog_batch__loaded_key(self, *, man, storage):
+        man["k"]
+        event1 = Mock(key=(1, "k"), value="a", message=Mock(tp=TP1, offset=1))
+        man.apply_changelog_batch([event1], lambda k: k, lambda v: v)
+        storage.get.assert_not_called()
@@ -7,12 +7,16 @@ from faust.tables.sets import (
     OPERATION_ADD,
     OPERATION_DISCARD,
     OPERATION_UPDATE,
+    PACK_THRESHOLD,
     ChangeloggedSet,
     ChangeloggedSetManager,
     SetAction,
+    SetDelta,
     SetManagerOperation,
     SetTableManager,
     SetWindowSet,
+    pack_members,
+    unpack_members,
 )
 from tests.helpers import AsyncMock
 
@@ -132,15 +136,33 @@ class Test_ChangeloggedSet:
             [{5, 6}, set()],
         )
 
+    def test_apply_delta(self, *, cset, manager, key):
+        event = Mock(name="event")
+        cset.data.update({1, 2, 3})
+        cset.apply_delta({4}, {1}, event=event)
+        assert cset.data == {2, 3, 4}
+        manager.send_changelog_event.assert_called_once_with(
+            key, OPERATION_UPDATE, [{4}, {1}], event=event
+        )
+
     def test_sync_from_storage(self, *, cset):
         cset.data.update({1, 2, 3})
         cset.sync_from_storage({2, 3, 4})
         assert cset.data == {2, 3, 4}
 
+    def test_sync_from_storage__packed(self, *, cset):
+        members = set(range(PACK_THRESHOLD * 2))
+        cset.sync_from_storage(pack_members(members))
+        assert cset.data == members
+
     def test_as_stored_value(self, *, cset):
         cset.data.update({1, 2, 3})
         assert cset.as_stored_value() == {1, 2, 3}
 
+    def test_as_stored_value__packed(self, *, cset):
+        cset.data.update(range(PACK_THRESHOLD))
+        assert cset.as_stored_value() == {"__int_runs__": [0, PACK_THRESHOLD]}
+
     def test_apply_changelog_event__ADD(self, *, cset):
         cset.data.update({2})
         cset.apply_changelog_event(OPERATION_ADD, 3)
@@ -162,6 +184,123 @@ class Test_ChangeloggedSet:
         with pytest.raises(NotImplementedError):
             cset.apply_changelog_event(0xFFFF, {1, 2, 3})
 
+    def test_apply_changelog_events(self, *, cset):
+        cset.data.update({1, 2, 3})
+        events = [
+            (OPERATION_ADD, 4),
+            (OPERATION_DISCARD, 1),
+            (OPERATION_UPDATE, [[1, 5], [2, 4]]),
+            (OPERATION_ADD, 2),
+            (OPERATION_DISCARD, 5),
+        ]
+        expected = ChangeloggedSet(Mock(name="manager"), "expected")
+        expected.data.update({1, 2, 3})
+        for operation, value in events:
+            expected.apply_changelog_event(operation, value)
+        cset.apply_changelog_events(events)
+        assert cset.data == expected.data == {1, 2, 3}
+
+    def test_apply_changelog_events__not_implemented(self, *, cset):
+        with pytest.raises(NotImplementedError):
+            cset.apply_changelog_events([(OPERATION_ADD, 1), (0xFFFF, 2)])
+
+
+@pytest.mark.parametrize(
+    "members",
+    [
+        set(),
+        {1, 2, 3},
+        {"a", "b"},
+        set(range(PACK_THRESHOLD)),
+        set(range(-10, PACK_THRESHOLD)),
+        {i * 7 for i in range(PACK_THRESHOLD)},
+        set(range(100)) | set(range(1000, 1010)) | {5000},
+    ],
+)
+def test_pack_members(members):
+    assert unpack_members(pack_members(members)) == members
+
+
+def test_pack_members__runs():
+    members = set(range(3, 3 + PACK_THRESHOLD)) | {1000, 1001, 2000}
+    assert pack_members(members) == {
+        "__int_runs__": [3, PACK_THRESHOLD, 1000 - 3 - PACK_THRESHOLD, 2, 998, 1],
+    }
+
+
+def test_pack_members__not_only_ints():
+    members = set(range(PACK_THRESHOLD)) | {"x"}
+    assert pack_members(members) is members
+    bools = {True, False} | set(range(2, PACK_THRESHOLD))
+    assert pack_members(bools) is bools
+
+
+def test_unpack_members__list():
+    assert unpack_members([1, 2, 2]) == {1, 2}
+
+
+class Test_SetDelta:
+    @pytest.fixture()
+    def cset(self, *, key):
+        cset = ChangeloggedSet(Mock(name="manager"), key)
+        cset.data.update({1, 2, 3})
+        return cset
+
+    @pytest.fixture()
+    def delta(self, *, cset):
+        return SetDelta(cset)
+
+    def check(self, delta, cset, expected):
+        assert set(delta) == expected
+        assert all(m in delta for m in expected)
+        assert cset.data == {1, 2, 3}
+        delta.commit()
+        assert cset.data == expected
+
+    def test_add_discard(self, *, delta, cset):
+        delta.add(4)
+        delta.add(1)
+        delta.discard(2)
+        delta.discard(5)
+        delta.add(2)
+        delta.discard(4)
+        assert 4 not in delta
+        self.check(delta, cset, {1, 2, 3})
+        cset.manager.send_changelog_event.assert_not_called()
+
+    def test_update(self, *, delta, cset):
+        delta.update([3, 4])
+        delta.difference_update([1, 5])
+        self.check(delta, cset, {2, 3, 4})
+        cset.manager.send_changelog_event.assert_called_once_with(
+            cset.key, OPERATION_UPDATE, [{4}, {1}], event=None
+        )
+
+    def test_clear(self, *, delta, cset):
+        delta.add(4)
+        delta.clear()
+        delta.add(2)
+        self.check(delta, cset, {2})
+
+    def test_intersection_update(self, *, delta, cset):
+        delta.add(4)
+        delta.intersection_update([2, 4, 5])
+        self.check(delta, cset, {2, 4})
+
+    def test_symmetric_difference_update(self, *, delta, cset):
+        delta.add(4)
+        delta.symmetric_difference_update([1, 4, 5, 5])
+        self.check(delta, cset, {2, 3, 5})
+
+    def test_commit__resets(self, *, delta, cset):
+        event = Mock(name="event")
+        delta.add(4)
+        delta.commit(event=event)
+        delta.commit(event=event)
+        cset.manager.send_changelog_event.assert_called_once_with(
+            cset.key, OPERATION_UPDATE, [{4}, set()], event=event
+        )
+
 
 def test_ChangeloggedSetManager():
     assert ChangeloggedSetManager.ValueType is ChangeloggedSet
@@ -255,32 +394,30 @@ class Test_SetTableManager:
         )
 
     def test__update(self, *, man):
-        man.set_table = {"a": Mock(name="a"), "b": Mock(name="b")}
-        man._update("a", ["v1"])
-        man.set_table["a"].update.assert_called_once_with({"v1"})
+        delta = Mock(name="delta")
+        man._update(delta, ["v1"])
+        delta.update.assert_called_once_with(["v1"])
 
     def test__difference_update(self, *, man):
-        man.set_table = {"a": Mock(name="a"), "b": Mock(name="b")}
-        man._difference_update("a", ["v1"])
-        man.set_table["a"].difference_update.assert_called_once_with({"v1"})
+        delta = Mock(name="delta")
+        man._difference_update(delta, ["v1"])
+        delta.difference_update.assert_called_once_with(["v1"])
 
     def test__clear(self, *, man):
-        man.set_table = {"a": Mock(name="a"), "b": Mock(name="b")}
-        man._clear("a", [])
-        man.set_table["a"].clear.assert_called_once_with()
+        delta = Mock(name="delta")
+        man._clear(delta, [])
+        delta.clear.assert_called_once_with()
 
     def test__intersection_update(self, *, man):
-        man.set_table = {"a": Mock(name="a"), "b": Mock(name="b")}
-        man._intersection_update("a", ["v1", "v2", "v3"])
-        man.set_table["a"].intersection_update.assert_called_once_with(
-            {"v1", "v2", "v3"},
-        )
+        delta = Mock(name="delta")
+        man._intersection_update(delta, ["v1", "v2", "v3"])
+        delta.intersection_update.assert_called_once_with(["v1", "v2", "v3"])
 
     def test__symmetric_difference_update(self, *, man):
-        man.set_table = {"a": Mock(name="a"), "b": Mock(name="b")}
-        man._symmetric_difference_update("a", ["v1", "v2", "v3"])
-        man.set_table["a"].symmetric_difference_update.assert_called_once_with(
-            {"v1", "v2", "v3"},
+        delta = Mock(name="delta")
+        man._symmetric_difference_update(delta, ["v1", "v2", "v3"])
+        delta.symmetric_difference_update.assert_called_once_with(
+            ["v1", "v2", "v3"],
         )
 
     @pytest.mark.asyncio
@@ -313,123 +450,82 @@ class Test_SetTableManager:
         )
 
     @pytest.mark.asyncio
-    @pytest.mark.allow_lingering_tasks(count=1)
     async def test__modify_set(self, *, man):
         stream = Mock()
+        batches = [[Mock(name="e1")], [Mock(name="e2"), Mock(name="e3")]]
+
+        async def take_events(max_, within):
+            assert max_ == man.batch_size
+            assert within == man.batch_timeout
+            for batch in batches:
+                yield batch
+
+        stream.take_events.side_effect = take_events
+        man._apply_batch = Mock()
+        await man._modify_set(stream)
+        man._apply_batch.assert_has_calls([call(batch) for batch in batches])
+
+    def test__apply_batch(self, *, man):
+        manager = Mock(name="manager")
         man.set_table = {
-            "k1": Mock(name="k1"),
-            "k2": Mock(name="k2"),
-            "k3": Mock(name="k3"),
-            "k4": Mock(name="k4"),
-            "k5": Mock(name="k5"),
-            "k6": Mock(name="k6"),
-            "k7": Mock(name="k7"),
-            "k8": Mock(name="k8"),
+            k: ChangeloggedSet(manager, k)
+            for k in ("k1", "k2", "k3", "k4", "k5", "k6", "k7", "k8")
         }
-
-        class X(faust.Record):
-            x: int
-            y: int
+        for k in ("k2", "k3", "k6", "k7", "k8"):
+            man.set_table[k].data.update({"v", "v2", X(10, 30)})
 
         unknown_set_op = SetManagerOperation(
             action=SetAction.ADD,
             members=["v4"],
         )
         unknown_set_op.action = "UNKNOWN"
-
-        async def stream_items():
-            yield (
-                "k1",
-                SetManagerOperation(
-                    action=SetAction.ADD,
-                    members=["v"],
-                ),
-            )
-            yield (
-                "k2",
-                SetManagerOperation(
-                    action=SetAction.DISCARD,
-                    members=["v2"],
-                ),
-            )
-            yield (
-                "k3",
-                SetManagerOperation(
-                    action=SetAction.DISCARD,
-                    members=[X(10, 30).to_representation()],
-                ),
-            )
-            yield ("k4", unknown_set_op)
-            yield (
-                "k5",
-                SetManagerOperation(
-                    action=SetAction.ADD,
-                    members=[
-                        X(10, 30).to_representation(),
-                        X(20, 40).to_representation(),
-                        "v3",
-                    ],
-                ),
-            )
-            yield (
-                "k6",
-                SetManagerOperation(
-                    action=SetAction.INTERSECTION,
-                    members=[
-                        X(10, 30).to_representation(),
-                        X(20, 40).to_representation(),
-                        "v3",
-                    ],
-                ),
-            )
-            yield (
-                "k7",
-                SetManagerOperation(
-                    action=SetAction.SYMDIFF,
-                    members=[
-                        X(10, 30).to_representation(),
-                        X(20, 40).to_representation(),
-                        "v3",
-                    ],
-                ),
-            )
-            yield (
-                "k8",
-                SetManagerOperation(
-                    action=SetAction.CLEAR,
-                    members=[],
-                ),
+        members = [
+            X(10, 30).to_representation(),
+            X(20, 40).to_representation(),
+            "v3",
+        ]
+
+        def event(key, action, members):
+            return Mock(
+                name=key,
+                key=key,
+                value=SetManagerOperation(action=action, members=members),
             )
 
-        stream.items.side_effect = stream_items
+        k1_last = event("k1", SetAction.ADD, ["v5"])
+        events = [
+            event("k1", SetAction.ADD, ["v"]),
+            event("k2", SetAction.DISCARD, ["v2"]),
+            event("k3", SetAction.DISCARD, [X(10, 30).to_representation()]),
+            Mock(name="k4", key="k4", value=unknown_set_op),
+            event("k5", SetAction.ADD, members),
+            event("k6", SetAction.INTERSECTION, members),
+            event("k7", SetAction.SYMDIFF, members),
+            event("k8", SetAction.CLEAR, []),
+            event("k1", SetAction.DISCARD, ["v"]),
+            k1_last,
+        ]
+
+        man._apply_batch(events)
+
+        assert man.set_table["k1"].data == {"v5"}
+        assert man.set_table["k2"].data == {"v", X(10, 30)}
+        assert man.set_table["k3"].data == {"v", "v2"}
+        assert not man.set_table["k4"].data
+        assert man.set_table["k5"].data == {X(10, 30), X(20, 40), "v3"}
+        assert man.set_table["k6"].data == {X(10, 30)}
+        assert man.set_table["k7"].data == {"v", "v2", X(20, 40), "v3"}
+        assert not man.set_table["k8"].data
+        sent = {c.args[0]: c for c in manager.send_changelog_event.call_args_list}
+        assert len(sent) == manager.send_changelog_event.call_count == 7
+        assert sent["k1"] == call(
+            "k1", OPERATION_UPDATE, [{"v5"}, set()], event=k1_last
+        )
 
-        await man._modify_set(stream)
 
-        man.set_table["k1"].update.assert_called_with({"v"})
-        man.set_table["k2"].difference_update.assert_called_with({"v2"})
-        man.set_table["k3"].difference_update.assert_called_with({X(10, 30)})
-        man.set_table["k5"].update.assert_called_with(
-            {
-                X(10, 30),
-                X(20, 40),
-                "v3",
-            }
-        )
-        man.set_table["k6"].intersection_update.assert_called_with(
-            {
-                X(10, 30),
-                X(20, 40),
-                "v3",
-            }
-        )
-        man.set_table["k7"].symmetric_difference_update.assert_called_with(
-            {
-                X(10, 30),
-                X(20, 40),
-                "v3",
-            }
-        )
-        man.set_table["k8"].clear.assert_called_once_with()
+class X(faust.Record):
+    x: int
+    y: int
 
 
 class Test_SetTable:
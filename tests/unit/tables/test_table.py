@@ -110,6 +110,25 @@ class Test_Table:
         strict_table.data["foo"] = 3
         assert strict_table["foo"] == 3
 
+    def test_get_many(self, *, table):
+        table.data.update(a=1, b=2, c=3)
+        table.data.get_many = Mock(wraps=table.data.get_many)
+        table.app.producer = Mock(name="producer")
+        table.app.producer.key_partition.side_effect = lambda topic, key: Mock(
+            partition=0 if key in (b'"a"', b'"x"') else 1
+        )
+        table.on_key_get = Mock(name="on_key_get")
+
+        assert table.get_many(["a", "b", "x", "c"]) == {"a": 1, "b": 2, "c": 3}
+        table.data.get_many.assert_any_call(["a", "x"], partition=0)
+        table.data.get_many.assert_any_call(["b", "c"], partition=1)
+        assert table.on_key_get.call_count == 4
+
+    def test_get_many__global(self, *, app):
+        table = app.GlobalTable("g")
+        table.data.update(a=1)
+        assert table.get_many(["a", "b"]) == {"a": 1}
+
     def test_has_key(self, *, table):
         assert not table._has_key("foo")
         table.data["foo"] = 3
@@ -168,3 +187,13 @@ class Test_Table:
             ce.return_value = None
             with pytest.raises(TypeError):
                 table.on_key_del("k")
+
+    def test_on_key_set_del__forgets_joined(self, *, table):
+        join = Mock(name="join")
+        table._joins.add(join)
+        with patch("faust.tables.base.current_event", return_value=event()):
+            table.on_key_set("k", "v")
+            join.forget.assert_called_once_with("k")
+            join.forget.reset_mock()
+            table.on_key_del("k")
+            join.forget.assert_called_once_with("k")
@@ -1,9 +1,20 @@
-from unittest.mock import Mock
+from asyncio import Queue
+from unittest.mock import Mock, patch
 
 import pytest
 
 from faust import Event, Record, Stream
-from faust.joins import InnerJoin, Join, LeftJoin, OuterJoin, RightJoin
+from faust.exceptions import Skip
+from faust.joins import (
+    InnerJoin,
+    Join,
+    LeftJoin,
+    LeftTableJoin,
+    OuterJoin,
+    RightJoin,
+    TableJoin,
+)
+from faust.types import ChannelT
 
 
 class User(Record):
@@ -43,3 +54,146 @@ def test_eq_ne():
     assert InnerJoin(stream=stream, fields=(User.name,)) != InnerJoin(
         stream=stream, fields=(User.id,)
     )
+
+
+def table_event(key, value=None, partition=0):
+    return Event(
+        app=Mock(name="app"),
+        key=key,
+        value=value,
+        headers={},
+        message=Mock(name="message", partition=partition),
+    )
+
+
+class Test_TableJoin:
+    @pytest.fixture()
+    def table(self):
+        table = Mock(name="table", is_global=False, use_partitioner=False)
+        table.data.get_many.side_effect = lambda keys, partition: {
+            key: f"v-{key}" for key in keys if key != "missing"
+        }
+        return table
+
+    @pytest.fixture()
+    def channel(self):
+        channel = Mock(name="channel", spec=ChannelT)
+        channel.queue = Queue()
+        return channel
+
+    @pytest.fixture()
+    def stream(self, *, channel):
+        return Mock(name="stream", autospec=Stream, channel=channel)
+
+    @pytest.fixture()
+    def join(self, *, stream, table):
+        return TableJoin(stream=stream, table=table)
+
+    async def process(self, join, event):
+        with patch("faust.streams.current_event", return_value=event):
+            return await join.process(event.value)
+
+    @pytest.mark.asyncio
+    async def test_process(self, *, join, table):
+        event = table_event("k", "value", partition=3)
+        assert await self.process(join, event) == ("value", "v-k")
+        table.data.get_many.assert_called_once_with({"k"}, partition=3)
+        table.on_key_get.assert_called_once_with("k")
+
+    @pytest.mark.asyncio
+    async def test_process__prefetches_fetched_events(self, *, join, table, channel):
+        events = [
+            table_event("a", 1, partition=0),
+            table_event("b", 2, partition=1),
+            table_event("a", 3, partition=0),
+        ]
+        for event in events[1:]:
+            channel.queue.put_nowait(event)
+        assert await self.process(join, events[0]) == (1, "v-a")
+        assert table.data.get_many.call_count == 2
+        table.data.get_many.assert_any_call({"a"}, partition=0)
+        table.data.get_many.assert_any_call({"b"}, partition=1)
+
+        table.data.get_many.reset_mock()
+        for event in events[1:]:
+            channel.queue.get_nowait()
+            await self.process(join, event)
+        table.data.get_many.assert_not_called()
+
+        await self.process(join, table_event("c", 4))
+        table.data.get_many.assert_called_once_with({"c"}, partition=0)
+
+    @pytest.mark.asyncio
+    async def test_process__max_prefetch(self, *, join, table, channel):
+        join.max_prefetch = 1
+        channel.queue.put_nowait(table_event("b"))
+        channel.queue.put_nowait(table_event("c"))
+        await self.process(join, table_event("a"))
+        table.data.get_many.assert_called_once_with({"a", "b"}, partition=0)
+
+    @pytest.mark.asyncio
+    async def test_process__reads_unknown_keys(self, *, join, table, channel):
+        channel.queue.put_nowait(table_event("b"))
+        await self.process(join, table_event("a"))
+        table.data.get_many.reset_mock()
+        await self.process(join, table_event("x"))
+        table.data.get_many.assert_called_once_with(["x"], partition=0)
+
+    @pytest.mark.asyncio
+    async def test_process__forget(self, *, join, table, channel):
+        channel.queue.put_nowait(table_event("a"))
+        await self.process(join, table_event("a"))
+        join.forget("a")
+        join.forget("never-read")
+        table.data.get_many.reset_mock()
+        await self.process(join, table_event("a"))
+        table.data.get_many.assert_called_once_with(["a"], partition=0)
+
+    @pytest.mark.asyncio
+    async def test_process__on(self, *, stream, table):
+        join = TableJoin(stream=stream, table=table, on=User.name)
+        user = User(id="1", name="foo")
+        assert await self.process(join, table_event("k", user)) == (user, "v-foo")
+
+    @pytest.mark.asyncio
+    async def test_process__on_changed_values(self, *, stream, table, channel):
+        join = TableJoin(stream=stream, table=table, on=User.name)
+        channel.queue.put_nowait(table_event("k", "not a user"))
+        user = User(id="1", name="foo")
+        assert await self.process(join, table_event("k", user)) == (user, "v-foo")
+        table.data.get_many.assert_called_once_with({"foo"}, partition=0)
+
+    @pytest.mark.asyncio
+    async def test_process__global(self, *, join, table):
+        table.is_global = True
+        await self.process(join, table_event("k", partition=3))
+        table.data.get_many.assert_called_once_with({"k"}, partition=None)
+
+    @pytest.mark.asyncio
+    async def test_process__missing(self, *, join):
+        with pytest.raises(Skip):
+            await self.process(join, table_event("missing", "value"))
+
+    @pytest.mark.asyncio
+    async def test_process__missing_left(self, *, stream, table):
+        join = LeftTableJoin(stream=stream, table=table)
+        event = table_event("missing", "value")
+        assert await self.process(join, event) == ("value", None)
+
+    @pytest.mark.asyncio
+    async def test_process__no_event(self, *, join):
+        with patch("faust.streams.current_event", return_value=None):
+            with pytest.raises(TypeError):
+                await join.process("value")
+
+    def test_registers_with_table(self, *, stream, app):
+        table = app.Table("joined")
+        join = TableJoin(stream=stream, table=table)
+        assert join in table._joins
+
+    def test_eq_hash(self, *, stream, table):
+        join = TableJoin(stream=stream, table=table)
+        assert join == TableJoin(stream=stream, table=table)
+        assert join != TableJoin(stream=stream, table=Mock(name="other"))
+        assert join != LeftTableJoin(stream=stream, table=table)
+        assert hash(join) != hash(TableJoin(stream=stream, table=table))
@@ -2,13 +2,15 @@ import asyncio
 import gc
 from collections import defaultdict
 from contextlib import ExitStack
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, call, patch
 
 import pytest
+from mode.utils.queues import FlowControlEvent, ThrowableQueue
 
 import faust
 from faust import joins
 from faust.exceptions import Skip
+from faust.streams import _TakeDeadline, _wait_for_put
 from tests.helpers import AsyncMock, new_event
 
 
@@ -42,6 +44,26 @@ class Test_Stream:
         assert s2.join_strategy.stream is stream
         assert s2.join_strategy.fields == {Model.foo.model: Model.foo}
 
+    @pytest.mark.parametrize(
+        "method,join_cls",
+        [
+            ("join", joins.TableJoin),
+            ("inner_join", joins.TableJoin),
+            ("left_join", joins.LeftTableJoin),
+        ],
+    )
+    def test_join__table(self, method, join_cls, *, app, stream):
+        table = app.Table("accounts")
+        s2 = getattr(stream, method)(table, on=Model.foo)
+        assert type(s2.join_strategy) is join_cls
+        assert s2.join_strategy.stream is stream
+        assert s2.join_strategy.table is table
+        assert s2.join_strategy.on is Model.foo
+
+    def test_join__tables(self, *, app, stream):
+        with pytest.raises(TypeError):
+            stream.join(app.Table("a"), app.Table("b"))
+
     def test_outer_join(self, *, stream):
         s2 = stream.outer_join(Model.foo)
         assert s2.join_strategy
@@ -221,6 +243,27 @@ class Test_Stream:
             event.message,
         )
 
+    def test__ack_events(self, *, stream):
+        events = [Mock(name="event1"), Mock(name="event2")]
+        events[0].ack.return_value = False
+        events[1].ack.return_value = True
+        stream._on_stream_event_out = Mock()
+        stream._on_message_out = Mock()
+        stream._ack_events(events, ["state1", "state2"])
+        for event in events:
+            event.ack.assert_called_once_with()
+        stream._on_stream_event_out.assert_has_calls(
+            [
+                call(e.message.tp, e.message.offset, stream, e, state)
+                for e, state in zip(events, ["state1", "state2"])
+            ]
+        )
+        stream._on_message_out.assert_called_once_with(
+            events[1].message.tp,
+            events[1].message.offset,
+            events[1].message,
+        )
+
     @pytest.mark.asyncio
     async def test__format_key__callable_raises(self, *, stream):
         keyfun = Mock(name="keyfun")
@@ -228,3 +271,45 @@ class Test_Stream:
 
         with pytest.raises(Skip):
             await stream._format_key(keyfun, 300)
+
+
+class Test_wait_for_put:
+    @pytest.fixture()
+    def queue(self):
+        return ThrowableQueue(flow_control=FlowControlEvent())
+
+    @pytest.mark.asyncio
+    async def test_put(self, *, queue):
+        loop = asyncio.get_running_loop()
+        deadline = _TakeDeadline(loop, 10.0)
+        loop.call_soon(queue.put_nowait, 1)
+        await _wait_for_put(loop, queue, deadline)
+        deadline.cancel()
+        assert not deadline.expired
+        assert deadline.waiter is None
+        assert queue.get_nowait() == 1
+        assert not queue._getters
+
+    @pytest.mark.asyncio
+    async def test_expired(self, *, queue):
+        loop = asyncio.get_running_loop()
+        deadline = _TakeDeadline(loop, 0.01)
+        await _wait_for_put(loop, queue, deadline)
+        assert deadline.expired
+        assert queue.empty()
+        assert not queue._getters
+
+    @pytest.mark.asyncio
+    async def test_cancelled__passes_on_wakeup(self, *, queue):
+        loop = asyncio.get_running_loop()
+        deadline = _TakeDeadline(loop, 10.0)
+        waiting = asyncio.ensure_future(_wait_for_put(loop, queue, deadline))
+        await asyncio.sleep(0)
+        getter = asyncio.ensure_future(queue.get())
+        await asyncio.sleep(0)
+        queue.put_nowait(1)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        deadline.cancel()
+        assert await asyncio.wait_for(getter, 1.0) == 1
@@ -1,3 +1,4 @@
+import asyncio
 import random
 import string
 from contextlib import contextmanager
@@ -39,6 +40,7 @@ from faust.transport.drivers.aiokafka import (
     ensure_aiokafka_TPset,
     server_list,
 )
+from faust.transport.producer import ThreadedEventQueue
 from faust.types import TP
 from faust.types.tuples import FutureMessage, PendingMessage
 from tests.helpers import AsyncMock
@@ -1898,6 +1900,52 @@ class TestThreadedProducer(ProducerBaseTest):
         finally:
             await threaded_producer.stop()
 
+    @pytest.mark.asyncio
+    async def test_push_events(
+        self,
+        *,
+        threaded_producer: ThreadedProducer,
+        app,
+    ):
+        queue = threaded_producer.event_queue = ThreadedEventQueue(
+            asyncio.get_running_loop()
+        )
+        threaded_producer.stopped = False
+        threaded_producer.max_batch_messages = 2
+        app.sensors.on_threaded_producer_buffer_processed = Mock()
+        published = []
+
+        async def publish_message(fut):
+            published.append(fut)
+            if len(published) == 3:
+                threaded_producer.stopped = True
+
+        threaded_producer.publish_message = publish_message
+        for i in range(3):
+            queue.put(i)
+        await threaded_producer.push_events()
+
+        assert published == [0, 1, 2]
+        app.sensors.on_threaded_producer_buffer_processed.assert_has_calls(
+            [call(app=app, size=1), call(app=app, size=0)]
+        )
+
+    @pytest.mark.asyncio
+    async def test_flush__drains_event_queue(
+        self,
+        *,
+        threaded_producer: ThreadedProducer,
+    ):
+        queue = threaded_producer.event_queue = ThreadedEventQueue(
+            asyncio.get_running_loop()
+        )
+        threaded_producer.publish_message = AsyncMock()
+        queue.put(1)
+        queue.put(2)
+        await threaded_producer.flush()
+        threaded_producer.publish_message.assert_has_calls([call(1), call(2)])
+        assert queue.empty()
+
     @pytest.mark.asyncio
     async def test_publish_message(
         self,
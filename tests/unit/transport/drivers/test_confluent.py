@@ -29,6 +29,7 @@ from faust.transport.drivers.confluent import (  # noqa: E402
     Transport,
     server_list,
 )
+from faust.transport.producer import ThreadedEventQueue  # noqa: E402
 from faust.types import TP  # noqa: E402
 from faust.types.tuples import RecordMetadata  # noqa: E402
 from tests.helpers import AsyncMock  # noqa: E402
@@ -502,10 +503,10 @@ class TestProducerThread:
     @pytest.mark.asyncio
     async def test_on_thread_stop__drains_event_queue(self, *, producer_thread):
         producer_thread._producer = Mock(name="_producer")
-        producer_thread.event_queue = asyncio.Queue()
+        producer_thread.event_queue = ThreadedEventQueue(asyncio.get_running_loop())
         fut = Mock(name="future_message")
         fut.message.channel.publish_message = AsyncMock()
-        await producer_thread.event_queue.put(fut)
+        producer_thread.event_queue.put(fut)
 
         await producer_thread.on_thread_stop()
 
@@ -514,15 +515,21 @@ class TestProducerThread:
 
     @pytest.mark.asyncio
     async def test_push_events__publishes_buffered_message(self, *, producer_thread):
-        producer_thread.event_queue = asyncio.Queue()
+        producer_thread.event_queue = ThreadedEventQueue(asyncio.get_running_loop())
         producer_thread._stopping = True
-        fut = Mock(name="future_message")
-        fut.message.channel.publish_message = AsyncMock()
-        await producer_thread.event_queue.put(fut)
+        producer_thread.max_batch_messages = 2
+        futs = [Mock(name=f"future_message{i}") for i in range(3)]
+        for fut in futs:
+            fut.message.channel.publish_message = AsyncMock()
+            producer_thread.event_queue.put(fut)
 
         await ProducerThread._push_events.fun(producer_thread)
 
-        fut.message.channel.publish_message.assert_awaited_once_with(fut, wait=False)
+        for fut in futs:
+            fut.message.channel.publish_message.assert_awaited_once_with(
+                fut, wait=False
+            )
+        assert producer_thread.event_queue.empty()
 
     def test_produce__with_partition(self, *, producer_thread):
         producer_thread._producer = Mock(name="_producer")
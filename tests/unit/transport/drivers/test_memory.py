@@ -0,0 +1,408 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from yarl import URL
+
+import faust
+from faust.exceptions import ProducerSendError
+from faust.transport.drivers import by_url, memory as mod
+from faust.transport.drivers.memory import (
+    Broker,
+    PartitionLog,
+    Transport,
+    brokers,
+    get_broker,
+)
+from faust.types import TP
+from tests.helpers import AsyncMock
+
+TP1 = TP("foo", 0)
+TP2 = TP("foo", 1)
+
+
+@pytest.fixture()
+def broker_name():
+    name = f"test-{uuid4().hex}"
+    yield name
+    brokers.pop(name, None)
+
+
+def new_app(broker_name, host="localhost", **kwargs):
+    app = faust.App(
+        "memory-test",
+        broker=f"memory://{broker_name}",
+        store="memory://",
+        web_enabled=False,
+        canonical_url=f"http://{host}:6066",
+        **kwargs,
+    )
+    app.finalize()
+    return app
+
+
+def new_consumer(app):
+    return app.transport.create_consumer(
+        callback=AsyncMock(name="callback"),
+        on_partitions_revoked=AsyncMock(name="on_partitions_revoked"),
+        on_partitions_assigned=AsyncMock(name="on_partitions_assigned"),
+    )
+
+
+async def rebalanced(*consumers):
+    for consumer in consumers:
+        await consumer._group.wait_stable()
+
+
+def test_by_url():
+    assert by_url(URL("memory://")) is Transport
+
+
+def test_get_broker(broker_name):
+    broker = get_broker(URL(f"memory://{broker_name}"))
+    assert get_broker(URL(f"memory://{broker_name}")) is broker
+    assert broker.name == broker_name
+    assert get_broker(URL("memory://")) is get_broker(URL("memory://localhost"))
+
+
+class TestPartitionLog:
+    def test_append_read(self):
+        log = PartitionLog("foo", 0)
+        assert log.start == log.end == 0
+        for i in range(5):
+            record = log.append(b"k", str(i).encode(), 1.0, [])
+            assert record.offset == i
+        assert log.end == 5
+        assert [r.offset for r in log.read(2)] == [2, 3, 4]
+        assert [r.offset for r in log.read(1, 2)] == [1, 2]
+        assert log.read(5) == []
+
+    def test_compact(self):
+        log = PartitionLog("foo", 0)
+        log.append(b"a", b"1", 1.0, [])
+        log.append(None, b"2", 1.0, [])
+        log.append(b"b", b"3", 1.0, [])
+        log.append(b"a", b"4", 1.0, [])
+        log.append(b"b", None, 1.0, [])
+        assert log.compact() == 2
+        # records without key are kept, and tombstones are the latest value.
+        assert [(r.offset, r.key, r.value) for r in log.records] == [
+            (1, None, b"2"),
+            (3, b"a", b"4"),
+            (4, b"b", None),
+        ]
+        assert log.start == 1
+        assert log.end == 5
+        # reading from a compacted offset continues with the next record.
+        assert [r.offset for r in log.read(2)] == [3, 4]
+        assert not log.dirty
+
+    def test_needs_compaction(self):
+        log = PartitionLog("foo", 0)
+        for _ in range(mod.COMPACT_MIN_RECORDS - 1):
+            log.append(b"k", b"v", 1.0, [])
+        assert not log.needs_compaction()
+        log.append(b"k", b"v", 1.0, [])
+        assert log.needs_compaction()
+
+
+class TestBroker:
+    def test_create_topic(self):
+        broker = Broker()
+        log = broker.create_topic("foo", 3, compacting=True)
+        assert len(log.partitions) == 3
+        assert log.compacting
+        assert broker.create_topic("foo", 10) is log
+        assert broker.topic_partitions("foo") == 3
+        assert broker.topic_partitions("bar") is None
+
+    def test_topic__created_on_first_use(self):
+        broker = Broker()
+        assert len(broker.topic("foo").partitions) == broker.default_partitions
+        assert len(broker.topic("bar", 4).partitions) == 4
+
+    def test_append(self):
+        broker = Broker()
+        broker.create_topic("foo", 2)
+        record = broker.append("foo", b"k", b"v", partition=1, timestamp=3.0)
+        assert (record.partition, record.offset, record.timestamp) == (1, 0, 3.0)
+        assert broker.partition_log(TP2).records == [record]
+
+    def test_append__key_partition(self):
+        broker = Broker()
+        broker.create_topic("foo", 8)
+        partition = broker.key_partition("foo", b"k")
+        for _ in range(3):
+            assert broker.append("foo", b"k", b"v").partition == partition
+
+    def test_append__unknown_partition(self):
+        broker = Broker()
+        broker.create_topic("foo", 2)
+        with pytest.raises(ProducerSendError):
+            broker.append("foo", b"k", b"v", partition=2)
+
+    def test_append__compacts(self):
+        broker = Broker()
+        broker.create_topic("foo", 1, compacting=True)
+        for i in range(mod.COMPACT_MIN_RECORDS):
+            broker.append("foo", str(i % 10).encode(), b"v")
+        assert len(broker.partition_log(TP1).records) == 10
+        assert broker.partition_log(TP1).end == mod.COMPACT_MIN_RECORDS
+
+    def test_compact(self):
+        broker = Broker()
+        broker.create_topic("foo", 1, compacting=True)
+        broker.create_topic("bar", 1)
+        for _ in range(3):
+            broker.append("foo", b"k", b"v")
+            broker.append("bar", b"k", b"v")
+        assert broker.compact() == 2
+        assert len(broker.partition_log(TP("bar", 0)).records) == 3
+
+
+class TestProducer:
+    @pytest.fixture()
+    def app(self, broker_name):
+        return new_app(broker_name, topic_partitions=2)
+
+    @pytest.fixture()
+    def producer(self, app):
+        return app.producer
+
+    @pytest.fixture()
+    def broker(self, app):
+        return app.transport.broker
+
+    async def test_send(self, producer, broker):
+        fut = await producer.send(
+            "foo", b"k", b"v", partition=1, timestamp=2.0, headers={"h": b"1"}
+        )
+        metadata = await fut
+        assert metadata.topic_partition == TP2
+        assert metadata.offset == 0
+        assert metadata.timestamp == 2.0
+        (record,) = broker.partition_log(TP2).records
+        assert record.headers == [("h", b"1")]
+        assert len(broker.topic("foo").partitions) == 2
+
+    async def test_send_and_wait(self, producer):
+        metadata = await producer.send_and_wait(
+            "foo", b"k", b"v", partition=None, timestamp=None, headers=None
+        )
+        assert metadata.topic_partition == producer.key_partition("foo", b"k")
+
+    async def test_send__unknown_transaction(self, producer):
+        with pytest.raises(ProducerSendError):
+            await producer.send(
+                "foo", b"k", b"v", None, None, None, transactional_id="t"
+            )
+
+    async def test_commit_transaction(self, producer, broker):
+        await producer.begin_transaction("t")
+        fut = await producer.send(
+            "foo", b"k", b"v", 0, None, None, transactional_id="t"
+        )
+        assert not fut.done()
+        assert not broker.partition_log(TP1).records
+        await producer.commit_transaction("t")
+        assert (await fut).offset == 0
+        assert len(broker.partition_log(TP1).records) == 1
+
+    async def test_abort_transaction(self, producer, broker):
+        await producer.maybe_begin_transaction("t")
+        fut = await producer.send(
+            "foo", b"k", b"v", 0, None, None, transactional_id="t"
+        )
+        await producer.abort_transaction("t")
+        assert fut.cancelled()
+        assert not broker.partition_log(TP1).records
+
+    async def test_commit_transactions(self, producer, broker):
+        await producer.begin_transaction("t")
+        fut = await producer.send(
+            "foo", b"k", b"v", 1, None, None, transactional_id="t"
+        )
+        await producer.commit_transactions({"t": {TP1: 10}}, "group")
+        assert (await fut).topic_partition == TP2
+        assert broker.groups["group"].committed == {TP1: 10}
+        # a new transaction was started.
+        await producer.send("foo", b"k", b"v", 1, None, None, transactional_id="t")
+
+    async def test_create_topic(self, producer, broker):
+        await producer.create_topic("bar", 3, 1, compacting=True)
+        assert broker.topic_partitions("bar") == 3
+        assert broker.topics["bar"].compacting
+
+
+class TestConsumer:
+    @pytest.fixture()
+    def app(self, broker_name):
+        return new_app(broker_name, topic_partitions=4)
+
+    @pytest.fixture()
+    def consumer(self, app):
+        consumer = new_consumer(app)
+        yield consumer
+        consumer.close()
+
+    async def test_subscribe__assigns_partitions(self, app, consumer):
+        await consumer.subscribe(["foo"])
+        await rebalanced(consumer)
+        assert consumer.assignment() == {TP("foo", p) for p in range(4)}
+        assert app.assignor.assigned_actives() == consumer.assignment()
+        consumer._on_partitions_assigned.assert_called_once_with(
+            consumer.assignment(), 1
+        )
+        assert app.consumer_generation_id == 1
+
+    async def test_group_members_share_partitions(self, broker_name, consumer):
+        other = new_consumer(new_app(broker_name, host="other", topic_partitions=4))
+        try:
+            await consumer.subscribe(["foo"])
+            await other.subscribe(["foo"])
+            await rebalanced(consumer, other)
+            assert len(consumer.assignment()) == 2
+            assert len(other.assignment()) == 2
+            assert consumer.assignment() | other.assignment() == {
+                TP("foo", p) for p in range(4)
+            }
+            other.close()
+            await rebalanced(consumer)
+            assert len(consumer.assignment()) == 4
+            consumer._on_partitions_revoked.assert_called()
+        finally:
+            other.close()
+
+    async def test_client_only(self, broker_name):
+        app = new_app(broker_name, topic_partitions=2)
+        app.client_only = True
+        consumer = new_consumer(app)
+        try:
+            await consumer.subscribe(["foo"])
+            await rebalanced(consumer)
+            assert consumer.assignment() == {TP1, TP2}
+            assert consumer._group.group_id is None
+        finally:
+            consumer.close()
+
+    async def test_getmany(self, app, consumer):
+        await consumer.subscribe(["foo"])
+        await rebalanced(consumer)
+        broker = app.transport.broker
+        broker.append("foo", b"k", b"v0", partition=0)
+        broker.append("foo", b"k", b"v1", partition=0)
+        broker.append("foo", b"k", b"v2", partition=1)
+        records = await consumer._getmany({TP1, TP2}, timeout=0)
+        assert [r.value for r in records[TP1]] == [b"v0", b"v1"]
+        assert [r.value for r in records[TP2]] == [b"v2"]
+        assert await consumer.position(TP1) == 2
+        # partitions not active are not fetched.
+        broker.append("foo", b"k", b"v3", partition=1)
+        assert await consumer._getmany({TP1}, timeout=0) == {}
+
+        message = consumer._to_message(TP1, records[TP1][0])
+        assert (message.tp, message.offset, message.value) == (TP1, 0, b"v0")
+        assert message.serialized_key_size == 1
+
+    async def test_getmany__waits_for_records(self, app, consumer):
+        await consumer.subscribe(["foo"])
+        await rebalanced(consumer)
+        broker = app.transport.broker
+        asyncio.get_event_loop().call_later(0.01, broker.append, "foo", b"k", b"v", 0)
+        records = await consumer._getmany({TP1}, timeout=5.0)
+        assert [r.value for r in records[TP1]] == [b"v"]
+
+    async def test_getmany__timeout(self, consumer):
+        await consumer.subscribe(["foo"])
+        await rebalanced(consumer)
+        assert await consumer._getmany({TP1}, timeout=0.01) == {}
+
+    async def test_getmany__max_poll_records(self, broker_name):
+        app = new_app(broker_name, topic_partitions=2, broker_max_poll_records=3)
+        consumer = new_consumer(app)
+        try:
+            await consumer.subscribe(["foo"])
+            await rebalanced(consumer)
+            for i in range(4):
+                app.transport.broker.append("foo", b"k", b"v", partition=i % 2)
+            records = await consumer._getmany(None, timeout=0)
+            assert sum(len(batch) for batch in records.values()) == 3
+        finally:
+            consumer.close()
+
+    async def test_commit__seek_to_committed(self, app, consumer):
+        await consumer.subscribe(["foo"])
+        await rebalanced(consumer)
+        broker = app.transport.broker
+        for _ in range(3):
+            broker.append("foo", b"k", b"v", partition=0)
+        assert await consumer._commit({TP1: 2})
+        assert broker.groups[app.conf.id].committed == {TP1: 2}
+        assert await consumer.seek_to_committed() == {TP1: 2}
+        records = await consumer._getmany({TP1}, timeout=0)
+        assert [r.offset for r in records[TP1]] == [2]
+
+    async def test_auto_offset_reset__latest(self, broker_name):
+        app = new_app(
+            broker_name, topic_partitions=1, consumer_auto_offset_reset="latest"
+        )
+        app.transport.broker.append("foo", b"k", b"v", partitions=1)
+        consumer = new_consumer(app)
+        try:
+            await consumer.subscribe(["foo"])
+            await rebalanced(consumer)
+            assert await consumer.position(TP1) == 1
+        finally:
+            consumer.close()
+
+    async def test_seek(self, app, consumer):
+        await consumer.subscribe(["foo"])
+        await rebalanced(consumer)
+        for _ in range(3):
+            app.transport.broker.append("foo", b"k", b"v", partition=0)
+        await consumer.seek_wait({TP1: 1})
+        assert await consumer.position(TP1) == 1
+        assert consumer._read_offset[TP1] == 1
+        await consumer.seek(TP1, 2)
+        assert await consumer.position(TP1) == 2
+
+    async def test_offsets(self, app, consumer):
+        broker = app.transport.broker
+        broker.create_topic("foo", 2, compacting=True)
+        for value in (b"1", b"2", b"3"):
+            broker.append("foo", b"k", value, partition=0)
+        broker.compact("foo")
+        assert await consumer.earliest_offsets(TP1, TP2) == {TP1: 2, TP2: 0}
+        assert await consumer.highwaters(TP1, TP2) == {TP1: 3, TP2: 0}
+        assert consumer.highwater(TP1) == 3
+        assert consumer.topic_partitions("foo") == 2
+        assert consumer.topic_partitions("bar") is None
+        assert consumer.key_partition("foo", b"k", partition=1) == 1
+        assert consumer.key_partition("bar", b"k") is None
+
+    async def test_create_topic(self, app, consumer):
+        await consumer.create_topic("bar", 3, 1, compacting=True)
+        assert app.transport.broker.topic_partitions("bar") == 3
+
+
+async def test_app_end_to_end(broker_name):
+    app = new_app(broker_name, topic_partitions=2)
+    topic = app.topic("events", key_type=str, value_type=int)
+    table = app.Table("counts", default=int)
+    done = asyncio.Event()
+
+    @app.agent(topic)
+    async def process(stream):
+        async for key, value in stream.items():
+            table[key] += value
+            if sum(table.values()) >= 10:
+                done.set()
+
+    await app.start()
+    try:
+        for i in range(10):
+            await topic.send(key=str(i % 2), value=1)
+        await asyncio.wait_for(done.wait(), 10.0)
+        assert dict(table) == {"0": 5, "1": 5}
+    finally:
+        await app.stop()
@@ -2,6 +2,7 @@ import asyncio
 from unittest.mock import ANY, Mock, call, patch
 
 import pytest
+from aiokafka.errors import ProducerFenced
 from intervaltree import Interval, IntervalTree
 from mode import Service
 from mode.threads import MethodQueue
@@ -20,7 +21,9 @@ from faust.transport.consumer import (
     ProducerSendError,
     ThreadDelegateConsumer,
     TransactionManager,
+    WorkerTransactionManager,
 )
+from faust.transport.utils import WeightedSchedulingStrategy
 from faust.types import TP, Message
 from tests.helpers import AsyncMock
 
@@ -355,6 +358,128 @@ class TestTransactionManager:
         assert ret is manager.producer.supports_headers.return_value
 
 
+class TestWorkerTransactionManager:
+    @pytest.fixture()
+    def consumer(self):
+        return Mock(name="consumer", spec=Consumer, commit=AsyncMock())
+
+    @pytest.fixture()
+    def producer(self):
+        return Mock(
+            name="producer",
+            spec=Producer,
+            maybe_begin_transaction=AsyncMock(),
+            commit_transaction=AsyncMock(),
+            commit_transactions=AsyncMock(),
+            send=AsyncMock(),
+            flush=AsyncMock(),
+        )
+
+    @pytest.fixture()
+    def manager(self, *, app, consumer, producer):
+        app.conf.canonical_url = "http://w1.example.com:6067"
+        app.assignor._topic_groups = {TP1.topic: 0, TP3.topic: 1}
+        transport = Mock(name="transport", spec=Transport, app=app)
+        return WorkerTransactionManager(
+            transport,
+            consumer=consumer,
+            producer=producer,
+        )
+
+    def test_transactional_id(self, *, manager):
+        assert manager.transactional_id == "testid-w1.example.com-6067"
+
+    def test_create_transaction_manager(self, *, app):
+        app.conf.transaction_per_worker = True
+        manager = app.transport.create_transaction_manager(
+            consumer=Mock(name="consumer"), producer=Mock(name="producer")
+        )
+        assert isinstance(manager, WorkerTransactionManager)
+
+    @pytest.mark.asyncio
+    async def test_on_rebalance(self, *, manager, producer):
+        manager.app.assignor.is_standby = Mock(return_value=False)
+        await manager.on_rebalance(set(), set(), set())
+        producer.maybe_begin_transaction.assert_not_called()
+
+        await manager.on_rebalance({TP1, TP2}, set(), {TP1, TP2})
+        await manager.on_rebalance({TP1}, {TP2}, set())
+        producer.maybe_begin_transaction.assert_called_once_with(
+            "testid-w1.example.com-6067"
+        )
+
+    @pytest.mark.asyncio
+    async def test_on_rebalance__standby_only(self, *, manager, producer):
+        manager.app.assignor.is_standby = Mock(return_value=True)
+        await manager.on_rebalance({TP1}, set(), {TP1})
+        producer.maybe_begin_transaction.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_on_partitions_revoked(self, *, manager, consumer, producer):
+        manager.app.assignor.is_standby = Mock(return_value=False)
+        await manager.on_partitions_revoked({TP1})
+        producer.flush.assert_called_once_with()
+        consumer.commit.assert_not_called()
+
+        await manager.on_rebalance({TP1, TP2}, set(), {TP1, TP2})
+        consumer.commit.return_value = True
+        await manager.on_partitions_revoked({TP1})
+        consumer.commit.assert_called_once_with(start_new_transaction=False)
+        producer.commit_transaction.assert_not_called()
+
+        await manager.on_rebalance({TP2}, {TP1}, set())
+        assert producer.maybe_begin_transaction.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_on_partitions_revoked__no_offsets(
+        self, *, manager, consumer, producer
+    ):
+        manager.app.assignor.is_standby = Mock(return_value=False)
+        await manager.on_rebalance({TP1}, set(), {TP1})
+        consumer.commit.return_value = False
+        await manager.on_partitions_revoked({TP1})
+        producer.commit_transaction.assert_called_once_with(
+            "testid-w1.example.com-6067"
+        )
+
+    @pytest.mark.asyncio
+    async def test_send(self, *, manager, consumer, producer):
+        consumer.key_partition.return_value = None
+        await manager.send("t", "k", "v", partition=None, headers=None, timestamp=None)
+        producer.send.assert_called_once_with(
+            "t",
+            "k",
+            "v",
+            None,
+            None,
+            None,
+            transactional_id="testid-w1.example.com-6067",
+        )
+
+    @pytest.mark.asyncio
+    async def test_commit(self, *, manager, producer):
+        offsets = {TP1: 3003, TP3: 4004}
+        assert await manager.commit(offsets, start_new_transaction=False)
+        producer.commit_transactions.assert_called_once_with(
+            {"testid-w1.example.com-6067": offsets},
+            "testid",
+            start_new_transaction=False,
+        )
+
+    @pytest.mark.asyncio
+    async def test_commit__empty(self, *, manager, producer):
+        await manager.commit({})
+        producer.commit_transactions.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_commit__fenced(self, *, manager, producer):
+        exc = ProducerFenced()
+        producer.commit_transactions.side_effect = exc
+        manager.app.crash = AsyncMock()
+        await manager.commit({TP1: 3003})
+        manager.app.crash.assert_called_once_with(exc)
+
+
 class MockedConsumerAbstractMethods:
     def assignment(self):
         return self.current_assignment
@@ -460,18 +585,19 @@ class TestConsumer:
     async def test_getmany__flow_inactive2(self, *, consumer):
         consumer._wait_next_records = AsyncMock(
             return_value=(
-                {TP1: ["A", "B", "C"], TP2: ["D"]},
+                {TP1: self._records("A", "B", "C"), TP2: self._records("D")},
                 {TP1},
             )
         )
         consumer.scheduler = Mock()
 
         def se(records):
-            for value in records.items():
-                yield value
-                consumer.flow_active = False
+            for tp, tp_records in records.items():
+                for record in tp_records:
+                    yield tp, [record]
+                    consumer.flow_active = False
 
-        consumer.scheduler.iterate.side_effect = se
+        consumer.scheduler.iterate_slices.side_effect = se
 
         consumer.flow_active = True
         res = [a async for a in consumer.getmany(1.0)]
@@ -481,16 +607,16 @@ class TestConsumer:
     @pytest.mark.asyncio
     async def test_getmany(self, *, consumer):
         def to_message(tp, record):
-            return record
+            return record.value
 
         consumer._to_message = to_message
         self._setup_records(
             consumer,
             active_partitions={TP1, TP2},
             records={
-                TP1: ["A", "B", "C"],
-                TP2: ["D", "E", "F", "G"],
-                TP3: ["H", "I", "J"],
+                TP1: self._records("A", "B", "C"),
+                TP2: self._records("D", "E", "F", "G"),
+                TP3: self._records("H", "I", "J"),
             },
         )
         assert not consumer.should_stop
@@ -509,10 +635,56 @@ class TestConsumer:
             (TP2, "G"),
         ]
 
+    def test_scheduler__weighted(self, *, app, consumer):
+        app.conf.ConsumerScheduler = WeightedSchedulingStrategy
+        app.conf.consumer_topic_weights = {"foo": 2.0}
+        app.conf.consumer_scheduler_slice_size = 3
+        consumer = MyConsumer(
+            app.transport,
+            callback=Mock(name="callback"),
+            on_partitions_revoked=Mock(name="on_partitions_revoked"),
+            on_partitions_assigned=Mock(name="on_partitions_assigned"),
+        )
+        scheduler = consumer.scheduler
+        assert isinstance(scheduler, WeightedSchedulingStrategy)
+        assert scheduler.weights == {"foo": 2.0}
+        assert scheduler.slice_size == 3
+        assert scheduler.highwater == consumer.highwater
+
+    @pytest.mark.asyncio
+    async def test_getmany__weighted_scheduler(self, *, consumer):
+        def to_message(tp, record):
+            return record.value
+
+        consumer._to_message = to_message
+        consumer.scheduler = WeightedSchedulingStrategy(
+            weights={"foo": 2.0},
+            slice_size=1,
+        )
+        self._setup_records(
+            consumer,
+            active_partitions={TP1, TP3},
+            records={
+                TP3: self._records("A", "B", "C"),
+                TP1: self._records("D", "E", "F", "G"),
+                TP2: self._records("H", "I", "J"),
+            },
+        )
+        consumer.flow_active = True
+        assert [a async for a in consumer.getmany(1.0)] == [
+            (TP1, "D"),
+            (TP1, "E"),
+            (TP3, "A"),
+            (TP3, "B"),
+            (TP1, "F"),
+            (TP1, "G"),
+            (TP3, "C"),
+        ]
+
     @pytest.mark.asyncio
     async def test_getmany_buffered(self, *, consumer):
         def to_message(tp, record):
-            return record
+            return record.value
 
         consumer._to_message = to_message
         self._setup_records(
@@ -520,9 +692,9 @@ class TestConsumer:
             active_partitions={TP1},
             buffered_partitions={TP2},
             records={
-                TP1: ["A", "B", "C"],
-                TP2: ["D", "E", "F", "G"],
-                TP3: ["H", "I", "J"],
+                TP1: self._records("A", "B", "C"),
+                TP2: self._records("D", "E", "F", "G"),
+                TP3: self._records("H", "I", "J"),
             },
         )
         assert not consumer.should_stop
@@ -578,6 +750,39 @@ class TestConsumer:
         consumer.sleep.assert_called_once_with(1)
         assert ret == ({}, set())
 
+    @pytest.mark.asyncio
+    async def test_getmany__on_messages_in(self, *, consumer):
+        consumer._to_message = lambda tp, record: record.value
+        consumer.app.sensors.on_messages_in = Mock(name="on_messages_in")
+        consumer.app.monitor.track_tp_end_offset = Mock(name="track_end_offset")
+        consumer.highwater = Mock(name="highwater", return_value=1000)
+        self._setup_records(
+            consumer,
+            active_partitions={TP1, TP2},
+            records={
+                TP1: self._records("A", "B", "C", offset=10),
+                TP2: self._records("D", offset=20),
+                TP3: self._records("E", "F", offset=30),
+            },
+        )
+        consumer.flow_active = True
+        assert len([a async for a in consumer.getmany(1.0)]) == 4
+        consumer.app.sensors.on_messages_in.assert_has_calls(
+            [call(TP1, (10, 12), 3), call(TP2, (20, 20), 1)],
+            any_order=True,
+        )
+        assert consumer.app.sensors.on_messages_in.call_count == 2
+        consumer.app.monitor.track_tp_end_offset.assert_has_calls(
+            [call(TP1, 1000), call(TP2, 1000)],
+            any_order=True,
+        )
+
+    def _records(self, *values, offset=0):
+        return [
+            Mock(name=value, value=value, offset=offset + i)
+            for i, value in enumerate(values)
+        ]
+
     def _setup_records(
         self,
         consumer,
@@ -593,6 +798,176 @@ class TestConsumer:
             return_value={} if records is None else records,
         )
 
+    def _sized_records(self, *values, offset=0, size=10):
+        records = self._records(*values, offset=offset)
+        for record in records:
+            record.serialized_key_size = -1
+            record.serialized_value_size = size
+        return records
+
+    def _setup_prefetch(self, consumer, batches, *, max_bytes=1000):
+        consumer._prefetch_batches = 2
+        consumer._prefetch_max_bytes = max_bytes
+        consumer._to_message = lambda tp, record: record.value
+        consumer.app.sensors.on_consumer_prefetch = Mock(name="on_prefetch")
+        self._setup_records(consumer, {TP1, TP2})
+        consumer._getmany.side_effect = [*batches, *[{}] * 10]
+
+    async def _prefetched(self, consumer):
+        # let fetching ahead run until there are enough batches.
+        for _ in range(10):
+            await asyncio.sleep(0)
+        return [batch.records for batch in consumer._prefetched]
+
+    @pytest.mark.asyncio
+    async def test_getmany__prefetch(self, *, consumer):
+        batches = [
+            {TP1: self._sized_records("A", "B")},
+            {TP1: self._sized_records("C", offset=2)},
+            {TP2: self._sized_records("D")},
+        ]
+        self._setup_prefetch(consumer, batches)
+        assert [m async for _, m in consumer.getmany(1.0)] == ["A", "B"]
+        # the next two batches are fetched while the first is processed.
+        assert await self._prefetched(consumer) == batches[1:]
+        assert consumer._prefetched_bytes == 20
+        consumer.app.sensors.on_consumer_prefetch.assert_called_once_with(
+            consumer, 0, ANY
+        )
+        assert [m async for _, m in consumer.getmany(1.0)] == ["C"]
+        assert [m async for _, m in consumer.getmany(1.0)] == ["D"]
+        assert consumer._getmany.await_count >= 3
+
+    @pytest.mark.asyncio
+    async def test_getmany__prefetch_max_bytes(self, *, consumer):
+        batches = [
+            {TP1: self._sized_records("A", size=100)},
+            {TP1: self._sized_records("B", offset=1, size=100)},
+        ]
+        self._setup_prefetch(consumer, batches, max_bytes=100)
+        assert [m async for _, m in consumer.getmany(1.0)] == ["A"]
+        assert await self._prefetched(consumer) == batches[1:]
+        assert consumer._getmany.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_getmany__prefetch_error(self, *, consumer):
+        self._setup_prefetch(consumer, [])
+        consumer._getmany.side_effect = KeyError("foo")
+        with pytest.raises(KeyError):
+            [m async for _, m in consumer.getmany(1.0)]
+
+    @pytest.mark.asyncio
+    async def test_stop_flow__discards_prefetched(self, *, consumer):
+        batches = [
+            {TP1: self._sized_records("A")},
+            {TP1: self._sized_records("B", offset=1)},
+        ]
+        self._setup_prefetch(consumer, batches)
+        assert [m async for _, m in consumer.getmany(1.0)] == ["A"]
+        assert await self._prefetched(consumer)
+        consumer.stop_flow()
+        assert not consumer._prefetched
+        assert not consumer._prefetched_bytes
+        assert consumer._prefetch_needs_seek
+
+        consumer.seek_to_committed = AsyncMock(return_value={TP1: 1})
+        consumer.resume_flow()
+        consumer._getmany.side_effect = [
+            {TP1: self._sized_records("B", offset=1)},
+            *[{}] * 10,
+        ]
+        assert [m async for _, m in consumer.getmany(1.0)] == ["B"]
+        consumer.seek_to_committed.assert_called_once_with()
+        assert not consumer._prefetch_needs_seek
+
+    @pytest.mark.asyncio
+    async def test_prefetch__stale(self, *, consumer):
+        self._setup_prefetch(consumer, [])
+
+        async def on_getmany(active_partitions, timeout):
+            consumer.stop_flow()
+            return {TP1: self._sized_records("A")}
+
+        consumer._getmany.side_effect = on_getmany
+        assert not await consumer._prefetch(1.0)
+        assert not consumer._prefetched
+        assert consumer._prefetch_needs_seek
+
+    @pytest.mark.asyncio
+    async def test_pause_partitions__rewinds_prefetched(self, *, consumer):
+        batches = [
+            {TP1: self._sized_records("A")},
+            {TP1: self._sized_records("B", offset=1), TP2: self._sized_records("C")},
+            {TP2: self._sized_records("D", offset=1)},
+        ]
+        self._setup_prefetch(consumer, batches)
+        assert [m async for _, m in consumer.getmany(1.0)] == ["A"]
+        assert len(await self._prefetched(consumer)) == 2
+        consumer._seek = AsyncMock()
+
+        consumer.pause_partitions([TP2])
+        assert [b.records for b in consumer._prefetched] == [
+            {TP1: batches[1][TP1]},
+            {},
+        ]
+        assert consumer._prefetched_bytes == 10
+        assert consumer._prefetch_rewind == {TP2: 0}
+
+        consumer.resume_partitions([TP2])
+        assert [m async for _, m in consumer.getmany(1.0)] == ["B"]
+        await self._prefetched(consumer)
+        consumer._seek.assert_called_once_with(TP2, 0)
+        assert not consumer._prefetch_rewind
+
+    @pytest.mark.asyncio
+    async def test_prefetch__partition_paused_while_fetching(self, *, consumer):
+        self._setup_prefetch(consumer, [])
+
+        async def on_getmany(active_partitions, timeout):
+            consumer.pause_partitions([TP2])
+            return {
+                TP1: self._sized_records("A"),
+                TP2: self._sized_records("B", offset=3),
+            }
+
+        consumer._getmany.side_effect = on_getmany
+        assert await consumer._prefetch(1.0)
+        assert consumer._prefetched[0].records == {TP1: ANY}
+        assert consumer._prefetch_rewind == {TP2: 3}
+
+    @pytest.mark.asyncio
+    async def test_seek__discards_prefetched_partition(self, *, consumer):
+        consumer._seek = AsyncMock()
+        records = {TP1: self._sized_records("A"), TP2: self._sized_records("B")}
+        self._setup_prefetch(consumer, [records])
+        assert await consumer._prefetch(1.0)
+        consumer._prefetch_rewind[TP1] = 0
+
+        await consumer.seek(TP1, 10)
+        assert consumer._prefetched[0].records == {TP2: records[TP2]}
+        assert consumer._prefetched_bytes == 10
+        assert not consumer._prefetch_rewind
+        consumer._seek.assert_called_once_with(TP1, 10)
+
+    @pytest.mark.asyncio
+    async def test_perform_seek__discards_prefetched(self, *, consumer):
+        self._setup_prefetch(consumer, [{TP1: self._sized_records("A")}])
+        assert await consumer._prefetch(1.0)
+        consumer._prefetch_rewind[TP2] = 0
+        await consumer.perform_seek()
+        assert not consumer._prefetched
+        assert not consumer._prefetch_rewind
+        assert not consumer._prefetch_needs_seek
+
+    @pytest.mark.asyncio
+    async def test__cancel_prefetch(self, *, consumer):
+        self._setup_prefetch(consumer, [])
+        fut = consumer._start_prefetch(1.0)
+        consumer._cancel_prefetch()
+        assert consumer._prefetch_fut is None
+        with pytest.raises(asyncio.CancelledError):
+            await fut
+
     @pytest.mark.asyncio
     async def test__wait_for_ack(self, *, consumer):
         async def set_ack():
@@ -930,12 +1305,14 @@ class TestConsumer:
         consumer._commit = AsyncMock(name="_commit")
         consumer.current_assignment.update({TP1, TP2})
         consumer.app.producer.flush = AsyncMock()
+        consumer.app.tables.flush = AsyncMock()
         await consumer._commit_offsets(
             {
                 TP1: 3003,
                 TP2: 6006,
             }
         )
+        consumer.app.tables.flush.assert_called_once_with()
         consumer._commit.assert_called_once_with(
             {
                 TP1: 3003,
@@ -950,6 +1327,7 @@ class TestConsumer:
         consumer.app.producer.flush = AsyncMock()
         consumer.current_assignment.update({TP1, TP2})
         consumer.app.tables = Mock(name="app.tables")
+        consumer.app.tables.flush = AsyncMock()
         await consumer._commit_offsets(
             {
                 TP1: 3003,
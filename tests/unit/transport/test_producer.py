@@ -1,13 +1,73 @@
 import asyncio
+import threading
 from typing import Any, Optional
 from unittest.mock import Mock, PropertyMock, call
 
 import pytest
 
-from faust.transport.producer import Producer, ProducerBuffer
+from faust.transport.producer import Producer, ProducerBuffer, ThreadedEventQueue
 from tests.helpers import AsyncMock
 
 
+class TestThreadedEventQueue:
+    @pytest.fixture()
+    def thread_loop(self):
+        return Mock(name="thread_loop")
+
+    @pytest.fixture()
+    def queue(self, *, thread_loop):
+        return ThreadedEventQueue(thread_loop)
+
+    def test_put__coalesces_wakeups(self, *, queue, thread_loop):
+        queue.put(1)
+        queue.put(2)
+        thread_loop.call_soon_threadsafe.assert_called_once_with(queue._wakeup)
+        assert queue.qsize() == 2
+
+        queue._wakeup()
+        assert queue._ready.is_set()
+        queue.put(3)
+        assert thread_loop.call_soon_threadsafe.call_count == 2
+
+    def test_get_nowait(self, *, queue):
+        queue.put(1)
+        assert not queue.empty()
+        assert queue.get_nowait() == 1
+        assert queue.empty()
+        with pytest.raises(asyncio.QueueEmpty):
+            queue.get_nowait()
+
+    def test_get_nowait_batch(self, *, queue):
+        for i in range(5):
+            queue.put(i)
+        assert queue.get_nowait_batch(3) == [0, 1, 2]
+        assert queue.get_nowait_batch(3) == [3, 4]
+        assert queue.get_nowait_batch(3) == []
+
+    @pytest.mark.asyncio
+    async def test_get_batch__ready(self, *, queue):
+        queue.put(1)
+        queue.put(2)
+        assert await queue.get_batch(10, timeout=0.0) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_get_batch__timeout(self, *, queue):
+        assert await queue.get_batch(10, timeout=0.01) == []
+
+    @pytest.mark.asyncio
+    async def test_get_batch__from_other_thread(self):
+        queue = ThreadedEventQueue(asyncio.get_running_loop())
+        waiting = asyncio.ensure_future(queue.get_batch(100, timeout=5.0))
+        await asyncio.sleep(0)
+        thread = threading.Thread(target=lambda: [queue.put(i) for i in range(10)])
+        thread.start()
+        thread.join()
+        received = await waiting
+        while len(received) < 10:
+            received += await queue.get_batch(100, timeout=5.0)
+        assert received == list(range(10))
+
+
 class TestProducerBuffer:
     @pytest.fixture()
     def buf(self, app):
@@ -22,6 +82,17 @@ class TestProducerBuffer:
 
         buf.pending.put_nowait.assert_called_once_with(fut)
 
+    def test_put__threaded(self, *, buf, app):
+        app.conf.producer_threaded = True
+        queue = ThreadedEventQueue(Mock(name="thread_loop"))
+        buf.threaded_producer = Mock(name="threaded_producer", event_queue=queue)
+        assert buf.size == 0
+        buf.put(1)
+        buf.put(2)
+        assert buf.queue is queue
+        assert buf.size == 2
+        assert queue.get_nowait_batch(10) == [1, 2]
+
     @pytest.mark.asyncio
     async def test_on_stop(self, *, buf):
         buf.flush = AsyncMock(name="flush")
@@ -1,4 +1,13 @@
-from faust.transport.utils import DefaultSchedulingStrategy, TopicBuffer
+from typing import NamedTuple
+from unittest.mock import Mock
+
+import pytest
+
+from faust.transport.utils import (
+    DefaultSchedulingStrategy,
+    TopicBuffer,
+    WeightedSchedulingStrategy,
+)
 from faust.types import TP
 
 TP1 = TP("foo", 0)
@@ -77,3 +86,157 @@ class Test_TopicBuffer:
             (TP1, 3),
             (TP1, 4),
         ]
+
+
+class Record(NamedTuple):
+    offset: int
+
+
+def records(start, stop):
+    return [Record(offset) for offset in range(start, stop)]
+
+
+class Test_DefaultSchedulingStrategy:
+    def test_iterate_slices(self):
+        strategy = DefaultSchedulingStrategy()
+        assert list(strategy.iterate_slices({TP1: [0, 1], TP3: [2]})) == [
+            (TP1, (0,)),
+            (TP3, (2,)),
+            (TP1, (1,)),
+        ]
+
+    def test_iterate_slices__same_order_as_iterate(self):
+        strategy = DefaultSchedulingStrategy()
+        records = {TP1: BUF1, TP3: BUF3, TP2: BUF2, TP5: BUF5, TP4: BUF4}
+        assert list(strategy.iterate_slices(records)) == [
+            (tp, (record,)) for tp, record in strategy.iterate(records)
+        ]
+
+    def test_iterate_slices__custom_iterate(self):
+        class Reversed(DefaultSchedulingStrategy):
+            def iterate(self, records):
+                return reversed(list(super().iterate(records)))
+
+        strategy = Reversed()
+        assert list(strategy.iterate_slices({TP1: [0, 1], TP3: [2]})) == [
+            (TP1, (1,)),
+            (TP3, (2,)),
+            (TP1, (0,)),
+        ]
+
+
+class Test_WeightedSchedulingStrategy:
+    def test_iterate_slices(self):
+        strategy = WeightedSchedulingStrategy(slice_size=2)
+        assert list(strategy.iterate_slices({TP1: BUF1, TP3: BUF3})) == [
+            (TP1, [0, 1]),
+            (TP3, [9, 10]),
+            (TP1, [2, 3]),
+            (TP1, [4]),
+        ]
+
+    def test_iterate(self):
+        strategy = WeightedSchedulingStrategy(slice_size=2)
+        assert list(strategy.iterate({TP1: BUF1, TP3: BUF3})) == [
+            (TP1, 0),
+            (TP1, 1),
+            (TP3, 9),
+            (TP3, 10),
+            (TP1, 2),
+            (TP1, 3),
+            (TP1, 4),
+        ]
+
+    def test_weights(self):
+        strategy = WeightedSchedulingStrategy(
+            weights={"bar": 2.0, "foo": 0.5},
+            slice_size=2,
+        )
+        assert list(strategy.iterate_slices({TP1: BUF1, TP3: BUF4 + BUF5})) == [
+            # higher weight goes first.
+            (TP3, [11, 12, 13, 14]),
+            (TP1, [0]),
+            (TP3, [15]),
+            (TP1, [1]),
+            (TP1, [2]),
+            (TP1, [3]),
+            (TP1, [4]),
+        ]
+
+    def test_partitions_share_topic(self):
+        strategy = WeightedSchedulingStrategy(slice_size=2)
+        assert list(strategy.iterate_slices({TP1: BUF1, TP2: BUF2})) == [
+            # the topic gets 2 * 2 records every round, shared in proportion
+            # to the records fetched: 5 and 4.
+            (TP1, [0, 1]),
+            (TP2, [5]),
+            (TP1, [2, 3]),
+            (TP2, [6, 7]),
+            (TP1, [4]),
+            (TP2, [8]),
+        ]
+
+    def test_lag(self):
+        highwaters = {TP1: 1000, TP2: 10}
+        strategy = WeightedSchedulingStrategy(
+            highwater=highwaters.__getitem__,
+            slice_size=5,
+        )
+        slices = list(
+            strategy.iterate_slices({TP1: records(0, 20), TP2: records(0, 10)})
+        )
+        # TP1 has 100 times the lag of TP2, so is delivered first.
+        assert [(tp, len(s)) for tp, s in slices] == [
+            (TP1, 9),
+            (TP1, 10),
+            (TP1, 1),
+            (TP2, 10),
+        ]
+
+    def test_lag__highwater_unknown(self):
+        strategy = WeightedSchedulingStrategy(
+            highwater=Mock(return_value=None),
+            slice_size=2,
+        )
+        assert list(strategy.iterate_slices({TP1: records(0, 2)})) == [
+            (TP1, records(0, 2)),
+        ]
+
+    @pytest.mark.parametrize("slice_size", [1, 3, 16])
+    def test_delivers_all_records_in_order(self, slice_size):
+        highwaters = {TP1: 30, TP2: 400, TP3: 11, TP4: 3, TP5: 1000}
+        fetched = {
+            TP1: records(0, 21),
+            TP2: records(7, 80),
+            TP3: records(10, 11),
+            TP4: records(0, 3),
+            TP5: [],
+        }
+        strategy = WeightedSchedulingStrategy(
+            weights={"foo": 0.3, "bar": 7.0},
+            highwater=highwaters.__getitem__,
+            slice_size=slice_size,
+        )
+        delivered = {tp: [] for tp in fetched}
+        for tp, tp_records in strategy.iterate_slices(fetched):
+            assert tp_records
+            delivered[tp].extend(tp_records)
+        assert delivered == fetched
+
+    def test_invalid_weight(self):
+        with pytest.raises(ValueError):
+            WeightedSchedulingStrategy(weights={"foo": 0.0})
+
+    def test_invalid_slice_size(self):
+        with pytest.raises(ValueError):
+            WeightedSchedulingStrategy(slice_size=0)
+
+    def test_for_consumer(self):
+        consumer = Mock(name="consumer")
+        conf = consumer.transport.app.conf
+        conf.consumer_topic_weights = {"foo": 3.0}
+        conf.consumer_scheduler_slice_size = 8
+        strategy = WeightedSchedulingStrategy.for_consumer(consumer)
+        assert strategy.weights == {"foo": 3.0}
+        assert strategy.highwater is consumer.highwater
+        assert strategy.slice_size == 8
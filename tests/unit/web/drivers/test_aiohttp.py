@@ -5,10 +5,12 @@ from unittest.mock import ANY, Mock, call, patch
 
 import aiohttp_cors
 import pytest
-from aiohttp.web import Application
+from aiohttp import WSMsgType
+from aiohttp.payload import BytesPayload
+from aiohttp.web import Application, Response, StreamResponse
 from yarl import URL
 
-from faust.types.web import ResourceOptions
+from faust.types.web import CachedResponse, ResourceOptions
 from faust.web import base
 from faust.web.drivers.aiohttp import (
     NON_OPTIONS_METHODS,
@@ -265,6 +267,93 @@ class Test_Web:
             )
             assert resp is Response()
 
+    def test_response_to_cached(self, *, web):
+        response = web.bytes(
+            b"foo", content_type="text/plain", status=201, headers={"k": "v"}
+        )
+        cached = web.response_to_cached(response)
+        assert cached.status == 201
+        assert ("k", "v") in cached.headers
+        assert cached.body is response.body
+
+        restored = web.cached_to_response(cached)
+        assert restored.status == 201
+        assert restored.headers["k"] == "v"
+        assert restored.content_type == "text/plain"
+        assert restored.body is cached.body
+
+    def test_response_to_cached__stream(self, *, web):
+        assert web.response_to_cached(StreamResponse()) is None
+
+    def test_response_to_cached__payload(self, *, web):
+        response = Response(body=BytesPayload(b"foo"))
+        assert web.response_to_cached(response) is None
+
+    def test_cached_to_response__empty_body(self, *, web):
+        response = web.cached_to_response(CachedResponse(204, (), b""))
+        assert response.status == 204
+        assert response.body == b""
+
+    @pytest.mark.asyncio
+    async def test_stream(self, *, web):
+        async def chunks():
+            yield b"foo"
+            yield b"bar"
+
+        request = Mock(name="request")
+        with patch("faust.web.drivers.aiohttp.StreamResponse") as StreamResponse:
+            response = StreamResponse.return_value
+            response.prepare = AsyncMock()
+            response.write = AsyncMock()
+            response.write_eof = AsyncMock()
+            resp = await web.stream(
+                request,
+                chunks(),
+                content_type="application/x-ndjson",
+                status=203,
+                headers={"k": "v"},
+            )
+            assert resp is response
+            StreamResponse.assert_called_once_with(
+                status=203, reason=None, headers={"k": "v"}
+            )
+            assert response.content_type == "application/x-ndjson"
+            response.enable_chunked_encoding.assert_called_once_with()
+            response.prepare.assert_called_once_with(request)
+            response.write.assert_has_calls([call(b"foo"), call(b"bar")])
+            response.write_eof.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_websocket(self, *, web):
+        messages = [
+            Mock(type=WSMsgType.TEXT, data="ignored"),
+            Mock(type=WSMsgType.BINARY, data=b"foo"),
+            Mock(type=WSMsgType.BINARY, data=b"bar"),
+        ]
+
+        async def handler(data):
+            return data.upper()
+
+        request = Mock(name="request")
+        with patch("faust.web.drivers.aiohttp.WebSocketResponse") as WSResponse:
+            ws = WSResponse.return_value
+            ws.prepare = AsyncMock()
+            ws.send_bytes = AsyncMock()
+            ws.closed = False
+
+            async def receive():
+                for message in messages:
+                    yield message
+                # let the replies be sent before the connection closes.
+                await asyncio.sleep(0.01)
+
+            ws.__aiter__ = lambda self: receive()
+            resp = await web.websocket(request, handler)
+            assert resp is ws
+            ws.prepare.assert_called_once_with(request)
+            ws.send_bytes.assert_has_calls([call(b"FOO"), call(b"BAR")])
+            assert ws.send_bytes.call_count == 2
+
     @pytest.mark.asyncio
     async def test_on_start(self, *, web):
         web.add_dependency = Mock(name="add_dependency")
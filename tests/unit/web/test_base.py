@@ -3,6 +3,7 @@ from unittest.mock import Mock, patch
 import pytest
 from yarl import URL
 
+from faust.types.web import CachedResponse
 from faust.web import Blueprint
 from faust.web.base import (
     DEBUG_BLUEPRINTS,
@@ -10,9 +11,14 @@ from faust.web.base import (
     PRODUCTION_BLUEPRINTS,
     BlueprintManager,
     Web,
+    dumps_json,
 )
 
 
+def test_dumps_json():
+    assert dumps_json({"a": [1, 2]}).replace(b" ", b"") == b'{"a":[1,2]}'
+
+
 class Test_BlueprintManager:
     @pytest.fixture()
     def manager(self):
@@ -62,6 +68,14 @@ class MyWeb(Web):
 
     def bytes(self, *args, **kwargs): ...
 
+    async def stream(self, *args, **kwargs): ...
+
+    async def websocket(self, *args, **kwargs): ...
+
+    def response_to_cached(self, *args, **kwargs): ...
+
+    def cached_to_response(self, *args, **kwargs): ...
+
     def bytes_to_response(self, *args, **kwargs): ...
 
     def response_to_bytes(self, *args, **kwargs): ...
@@ -109,3 +123,17 @@ class Test_Web:
             gethostname.return_value = "foobar.example.com"
             app.conf.canonical_url = URL("http://xuzzy.example.com")
             assert web.url == URL("http://xuzzy.example.com")
+
+    def test_cached_to_bytes(self, *, web):
+        cached = CachedResponse(
+            201, (("Set-Cookie", "a=1"), ("Set-Cookie", "b=2")), b"foo"
+        )
+        payload = web.cached_to_bytes(cached)
+        assert payload == b"201\r\n\r\nSet-Cookie: a=1\r\nSet-Cookie: b=2\r\n\r\nfoo"
+        assert web.bytes_to_cached(payload) == cached
+
+    def test_bytes_to_cached__from_response_to_bytes(self, *, web):
+        payload = web._response_to_bytes(200, {"Content-Type": "text/plain"}, b"x")
+        assert web.bytes_to_cached(payload) == CachedResponse(
+            200, (("Content-Type", "text/plain"),), b"x"
+        )
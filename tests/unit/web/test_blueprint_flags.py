@@ -16,6 +16,7 @@ TABLES = "faust.web.apps.tables.blueprint"
 GRAPH = "faust.web.apps.graph:blueprint"
 STATS = "faust.web.apps.stats:blueprint"
 METRICS = "faust.web.apps.metrics:blueprint"
+RPC = "faust.web.apps.rpc:blueprint"
 INDEX = "faust.web.apps.production_index:blueprint"
 
 
@@ -54,6 +55,7 @@ class Test_flags:
             ("web_graph_enabled", GRAPH),
             ("web_stats_enabled", STATS),
             ("web_metrics_enabled", METRICS),
+            ("web_rpc_enabled", RPC),
         ],
     )
     def test_off_by_default_and_can_be_turned_on(self, setting, blueprint):
@@ -0,0 +1,222 @@
+import asyncio
+from unittest.mock import Mock
+
+import aiohttp
+import pytest
+from yarl import URL
+
+from faust.agents.models import ReqRepResponse
+from faust.exceptions import RPCError
+from faust.utils import json
+from faust.web.rpc import (
+    ERROR,
+    REQUEST,
+    RESPONSE,
+    RPC_PATH,
+    RPCClient,
+    _Channel,
+    pack_frame,
+    unpack_frame,
+)
+from tests.helpers import AsyncMock
+
+
+class FakeWebSocket:
+    """Client WebSocket connected to the RPC endpoint of ``server``."""
+
+    def __init__(self, server):
+        self.server = server
+        self.closed = False
+        self.sent = []
+        self.incoming = asyncio.Queue()
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+        reply = await self.server.handle(data)
+        self.incoming.put_nowait(Mock(type=aiohttp.WSMsgType.BINARY, data=reply))
+
+    async def close(self):
+        self.closed = True
+        self.incoming.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise StopAsyncIteration()
+        return message
+
+
+class SilentWebSocket(FakeWebSocket):
+    """Client WebSocket never receiving replies."""
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+
+def test_frame_roundtrip():
+    frame = pack_frame(REQUEST, 303, b"payload", "tables.get_many")
+    assert unpack_frame(frame) == (REQUEST, 303, "tables.get_many", b"payload")
+    assert unpack_frame(pack_frame(RESPONSE, 1)) == (RESPONSE, 1, "", b"")
+
+
+@pytest.mark.parametrize(
+    "data", [b"", b"\x00\x00", pack_frame(REQUEST, 1, method="x")[:-1]]
+)
+def test_unpack_frame__truncated(data):
+    with pytest.raises(ValueError):
+        unpack_frame(data)
+
+
+class Test_RPCClient:
+    @pytest.fixture()
+    def rpc(self, *, app):
+        rpc = RPCClient(app)
+        rpc.handlers["echo"] = AsyncMock(side_effect=lambda payload: payload)
+        return rpc
+
+    @pytest.fixture()
+    def connect(self, *, app, rpc):
+        app.http_client = Mock(name="http_client")
+        app.http_client.ws_connect = AsyncMock(
+            side_effect=lambda url, **kw: FakeWebSocket(rpc)
+        )
+        return app.http_client.ws_connect
+
+    @pytest.mark.asyncio
+    async def test_handle(self, *, rpc):
+        reply = await rpc.handle(pack_frame(REQUEST, 7, b"foo", "echo"))
+        assert unpack_frame(reply) == (RESPONSE, 7, "", b"foo")
+
+    @pytest.mark.asyncio
+    async def test_handle__unknown_method(self, *, rpc):
+        reply = await rpc.handle(pack_frame(REQUEST, 7, b"foo", "nope"))
+        kind, call_id, _, payload = unpack_frame(reply)
+        assert (kind, call_id) == (ERROR, 7)
+        assert b"nope" in payload
+
+    @pytest.mark.asyncio
+    async def test_handle__raises(self, *, rpc):
+        rpc.handlers["echo"].side_effect = KeyError("foo")
+        kind, call_id, _, payload = unpack_frame(
+            await rpc.handle(pack_frame(REQUEST, 7, b"foo", "echo"))
+        )
+        assert (kind, call_id) == (ERROR, 7)
+        assert b"KeyError" in payload
+
+    @pytest.mark.asyncio
+    async def test_handle__truncated(self, *, rpc):
+        kind, call_id, _, _ = unpack_frame(await rpc.handle(b"\x00"))
+        assert (kind, call_id) == (ERROR, 0)
+
+    @pytest.mark.asyncio
+    async def test_call(self, *, rpc, connect):
+        url = "http://a.example.com:6066"
+        replies = await asyncio.gather(
+            rpc.call(url, "echo", b"foo"),
+            rpc.call(URL(url), "echo", b"bar"),
+        )
+        assert replies == [b"foo", b"bar"]
+        # one connection for all calls to the same worker.
+        connect.assert_called_once()
+        assert connect.call_args[0][0] == URL(url).with_path(RPC_PATH)
+        await rpc.close()
+        assert not rpc._channels
+
+    @pytest.mark.asyncio
+    async def test_call__error(self, *, rpc, connect):
+        rpc.handlers["echo"].side_effect = RPCError("no")
+        with pytest.raises(RPCError):
+            await rpc.call("http://a:6066", "echo", b"foo")
+        await rpc.close()
+
+    @pytest.mark.asyncio
+    async def test_call__reconnects_when_closed(self, *, rpc, connect):
+        assert await rpc.call("http://a:6066", "echo", b"foo") == b"foo"
+        await rpc._channels[URL("http://a:6066")].ws.close()
+        assert await rpc.call("http://a:6066", "echo", b"bar") == b"bar"
+        assert connect.call_count == 2
+        await rpc.close()
+
+    @pytest.mark.asyncio
+    async def test_call__cannot_connect(self, *, rpc, app):
+        app.http_client = Mock(name="http_client")
+        app.http_client.ws_connect = AsyncMock(side_effect=aiohttp.ClientError())
+        with pytest.raises(RPCError):
+            await rpc.call("http://a:6066", "echo", b"foo")
+
+    @pytest.mark.asyncio
+    async def test_call__timeout(self, *, rpc, connect):
+        async def handler(payload):
+            await asyncio.sleep(1.0)
+
+        rpc.handlers["echo"] = handler
+        connect.side_effect = lambda url, **kw: SilentWebSocket(rpc)
+        with pytest.raises(RPCError):
+            await rpc.call("http://a:6066", "echo", b"foo", timeout=0.01)
+        await rpc.close()
+
+    @pytest.mark.asyncio
+    async def test_call__connect_timeout(self, *, rpc, app):
+        async def ws_connect(url, **kwargs):
+            await asyncio.sleep(10.0)
+
+        app.http_client = Mock(name="http_client")
+        app.http_client.ws_connect = AsyncMock(side_effect=ws_connect)
+        with pytest.raises(RPCError):
+            await rpc.call("http://a:6066", "echo", b"foo", timeout=0.01)
+
+    @pytest.mark.asyncio
+    async def test_call__backoff(self, *, rpc, app, connect):
+        connect.side_effect = aiohttp.ClientError()
+        with pytest.raises(RPCError):
+            await rpc.call("http://a:6066", "echo", b"foo")
+        connect.side_effect = lambda url, **kw: FakeWebSocket(rpc)
+        # calls fail right away until the backoff elapsed.
+        with pytest.raises(RPCError):
+            await rpc.call("http://a:6066", "echo", b"foo")
+        assert connect.call_count == 1
+        # other workers can still be called.
+        assert await rpc.call("http://b:6066", "echo", b"foo") == b"foo"
+        rpc._unavailable_until[URL("http://a:6066")] = 0.0
+        assert await rpc.call("http://a:6066", "echo", b"foo") == b"foo"
+        assert not rpc._unavailable_until
+        await rpc.close()
+
+    @pytest.mark.asyncio
+    async def test_agent_reply(self, *, rpc, app):
+        app._reply_consumer.fulfill = Mock(return_value=True)
+        reply = ReqRepResponse(key="k", value="v", correlation_id="id1")
+        assert await rpc.handlers["agents.reply"](reply.dumps()) == b""
+        app._reply_consumer.fulfill.assert_called_once_with(reply)
+
+    @pytest.mark.asyncio
+    async def test_agent_reply__not_waiting(self, *, rpc, app):
+        app._reply_consumer.fulfill = Mock(return_value=False)
+        reply = ReqRepResponse(key="k", value="v", correlation_id="id1")
+        with pytest.raises(RPCError):
+            await rpc.handlers["agents.reply"](reply.dumps())
+
+    @pytest.mark.asyncio
+    async def test_table_get_many(self, *, rpc, app):
+        table = app.Table("rpc-table")
+        table.data.update({"a": 1, "b": 2})
+        table.get_many = Mock(return_value={"a": 1})
+        payload = json.dumps({"table": "rpc-table", "keys": ["a", "c"]})
+        body = await rpc.handlers["tables.get_many"](payload)
+        assert json.loads(body) == {"a": 1}
+        table.get_many.assert_called_once_with(["a", "c"])
+
+
+@pytest.mark.asyncio
+async def test_channel__closed_fails_pending():
+    channel = _Channel(SilentWebSocket(server=None))
+    call = asyncio.ensure_future(channel.call("echo", b"foo"))
+    await asyncio.sleep(0)
+    assert channel.pending
+    await channel.close()
+    assert channel.closed
+    with pytest.raises(RPCError):
+        await call